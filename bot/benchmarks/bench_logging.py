@@ -0,0 +1,191 @@
+"""
+Logging benchmark: event-loop stall caused by logging, before and after the queue pipeline.
+
+A coroutine logs N records (in chunks of 100, yielding to the loop in between, like
+handlers logging while serving events) while a probe task measures how late the loop
+wakes it up. Two setups are compared, each writing a log file and a console stream in
+a temporary directory:
+- direct: the former setup, FileHandler and StreamHandler on the logger, so every
+  record is formatted and written on the event loop thread;
+- queued: setup of logger.py, LazyQueueHandler on the logger and a QueueListener
+  thread formatting and writing to the rotating (gzip) log file and the console.
+
+`--slow-io` adds a delay to every write, standing for a busy disk, a bind-mounted
+volume or a console pipe the log collector reads slowly.
+
+Reported per setup, scaled to 10k records: time spent inside the logging calls on
+the loop thread, the slowest call, the worst probe lag, and for the queued setup the
+time the listener needed to write everything out.
+
+A second run compares the log lines of one webhook event at INFO level: the former
+eager f-strings (DEBUG payload dump, translated INFO lines) against %-style
+arguments, `lazy_t` and context fields bound once with `log_context`.
+
+Usage (from bot/):
+    python -m benchmarks.bench_logging [--records 10000] [--slow-io 0.05]
+"""
+
+import os
+import sys
+import time
+import queue
+import asyncio
+import logging
+import argparse
+import tempfile
+import logging.handlers
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("ENCRYPTION_KEY", "47DEQpj8HBSa-_TImW-5JCeuQeRkm5NMpJWZG3hSuFU=")
+
+from utils.i18n import t
+from utils.log import ContextFilter, lazy_t, log_context
+from logger import LOG_FORMAT, RotatingLogFileHandler, LazyQueueHandler, TextFormatter
+
+
+CHUNK = 100
+
+
+def _slow(handler: logging.Handler, delay: float) -> logging.Handler:
+    # Filters run in the thread emitting the record, right before the write
+    if delay:
+        handler.addFilter(lambda record: time.sleep(delay / 1000) or True)
+    return handler
+
+
+def build(mode: str, directory: str, slow_io: float) -> tuple[logging.Logger, logging.handlers.QueueListener | None, list]:
+    logger = logging.getLogger(f"bench.{mode}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers.clear()
+
+    console = open(os.path.join(directory, f"{mode}.console"), "w", encoding="utf-8")
+    path = os.path.join(directory, f"{mode}.log")
+    if mode == "direct":
+        file_handler = logging.FileHandler(path, encoding="utf-8")
+    else:
+        file_handler = RotatingLogFileHandler(path, max_bytes=1024 * 1024, backup_count=3, interval=0)
+    handlers = [_slow(file_handler, slow_io), _slow(logging.StreamHandler(console), slow_io)]
+    formatter = logging.Formatter(LOG_FORMAT) if mode == "direct" else TextFormatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    if mode == "direct":
+        for handler in handlers:
+            logger.addHandler(handler)
+        return logger, None, handlers + [console]
+
+    records = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(records)
+    queue_handler.addFilter(ContextFilter())
+    logger.addHandler(queue_handler)
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    return logger, listener, handlers + [console]
+
+
+async def run_mode(mode: str, records: int, slow_io: float) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        logger, listener, resources = build(mode, directory, slow_io)
+        done = asyncio.Event()
+        lags = []
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.001)
+                lags.append(time.perf_counter() - start - 0.001)
+
+        probe_task = asyncio.create_task(probe())
+        await asyncio.sleep(0.01)
+
+        stalls = []
+        for i in range(records):
+            start = time.perf_counter()
+            logger.info("📨 Reply queued for %s | hash=%s | %d bytes", f"user{i % 500}", f"{i:032x}", 120 + i % 80)
+            stalls.append(time.perf_counter() - start)
+            if i % CHUNK == CHUNK - 1:
+                await asyncio.sleep(0)
+
+        done.set()
+        await probe_task
+
+        flush = 0.0
+        if listener is not None:
+            start = time.perf_counter()
+            listener.stop()
+            flush = time.perf_counter() - start
+        for resource in resources:
+            resource.close()
+
+    scale = 10_000 / records
+    return {
+        "stall_ms": sum(stalls) * 1000 * scale,
+        "max_call_ms": max(stalls) * 1000,
+        "max_lag_ms": max(lags, default=0) * 1000,
+        "flush_ms": flush * 1000 * scale,
+    }
+
+
+def run_hot_path(style: str, events: int) -> float:
+    # The log lines of one webhook event at INFO level, with the queued setup
+    logger, listener, resources = build("queued", tempfile.mkdtemp(), 0)
+    data = {
+        "negotiation_hash": "0f" * 16,
+        "client_username": "buyer",
+        "listing_owner_username": "seller",
+        "listing_title": "Aurora MR - Cutlass Black",
+        "message": "Hello! Is it still available? " * 8,
+    }
+
+    # The listener is paused during the measure, so it doesn't compete for the GIL:
+    # the records wait in the queue and are written afterwards
+    listener.stop()
+    start = time.thread_time()
+    for i in range(events):
+        user_id = str(100_000 + i % 500)
+        if style == "eager":
+            logger.debug(f"Processing 'user_reply' for user_id={user_id} with data: {data}")
+            logger.debug(f"Retrieved thread_id={i} for user_id={user_id}")
+            logger.info(f"✅ Event successfully processed for event='user_reply' → user_id={user_id}")
+            logger.info(t("en", "server.webhook_request", user_id=user_id, event="user_reply"))
+        else:
+            with log_context(event_type="user_reply", user_id=user_id, negotiation_hash=data["negotiation_hash"]):
+                logger.debug("Processing event with data: %s", data)
+                logger.debug("Retrieved thread_id=%s", i)
+                logger.debug("✅ Event processed")
+                logger.info("%s", lazy_t("en", "server.webhook_request", user_id=user_id, event="user_reply"))
+    elapsed = time.thread_time() - start
+
+    listener.start()
+    listener.stop()
+    for resource in resources:
+        resource.close()
+    return elapsed / events * 1_000_000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--slow-io", type=float, default=0.0, help="milliseconds added to every write")
+    args = parser.parse_args()
+
+    print(f"{args.records} records, slow I/O {args.slow_io} ms per write")
+    print(f"{'setup':<8} {'loop stall /10k':>16} {'slowest call':>13} {'max probe lag':>14} {'listener /10k':>14}")
+    for mode in ("direct", "queued"):
+        result = await run_mode(mode, args.records, args.slow_io)
+        flush = f"{result['flush_ms']:.0f} ms" if mode == "queued" else "-"
+        print(
+            f"{mode:<8} {result['stall_ms']:>13.0f} ms {result['max_call_ms']:>10.2f} ms "
+            f"{result['max_lag_ms']:>11.1f} ms {flush:>14}"
+        )
+
+    print()
+    print(f"Log lines of one webhook event at INFO level, {args.records} events (queued setup)")
+    for style in ("eager", "lazy"):
+        best = min(run_hot_path(style, args.records) for _ in range(5))
+        print(f"{style:<8} {best:>8.1f} µs of loop thread CPU per event (best of 5)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
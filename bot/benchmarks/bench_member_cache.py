@@ -0,0 +1,109 @@
+"""
+Member cache benchmark: memory and startup cost of the DISCORD_MEMBER_CACHE modes.
+
+Replays, offline, what the gateway sends for a large guild: the GUILD_CREATE payload
+and, when startup chunking is enabled, the members of every GUILD_MEMBERS_CHUNK event
+(1000 per chunk, as Discord sends them). Each mode runs in a fresh client and reports
+the time spent processing the payloads and the memory retained afterwards.
+Times are inflated by tracemalloc and exclude the network: on a real gateway,
+chunking a large guild also takes one round trip per chunk.
+
+Usage (from bot/):
+    python -m benchmarks.bench_member_cache [--members 100000]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import discord
+from discord_bot.bot import build_member_cache_flags
+
+
+GUILD_ID = 1
+CHUNK_SIZE = 1000
+
+
+def _member(i: int) -> dict:
+    return {
+        "user": {"id": str(10_000 + i), "username": f"user{i}", "discriminator": "0", "avatar": None},
+        "roles": [str(GUILD_ID + 1 + i % 3)],
+        "joined_at": "2024-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+def _guild_payload() -> dict:
+    return {
+        "id": str(GUILD_ID),
+        "name": "Benchmark guild",
+        "member_count": 0,
+        "roles": [{"id": str(GUILD_ID + r), "name": f"role{r}", "permissions": "0", "position": r} for r in range(4)],
+        "channels": [],
+        "members": [],
+        "large": True,
+    }
+
+
+async def run_mode(mode: str, chunk: bool, members: int) -> tuple[float, float, int]:
+    intents = discord.Intents.default()
+    intents.members = True
+    client = discord.Client(
+        intents=intents,
+        member_cache_flags=build_member_cache_flags(mode, intents),
+        chunk_guilds_at_startup=chunk,
+    )
+    state = client._connection
+
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    guild = discord.Guild(data=_guild_payload(), state=state)
+    state._add_guild(guild)
+
+    if chunk:
+        for offset in range(0, members, CHUNK_SIZE):
+            # What a GUILD_MEMBERS_CHUNK event costs: every member is parsed, then cached
+            chunk_members = [
+                discord.Member(data=_member(i), guild=guild, state=state)
+                for i in range(offset, min(offset + CHUNK_SIZE, members))
+            ]
+            if state.member_cache_flags.joined:
+                for member in chunk_members:
+                    guild._add_member(member)
+
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    cached = len(guild._members)
+    await client.close()
+    return elapsed, current / 1024 / 1024, cached
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=100_000)
+    args = parser.parse_args()
+
+    modes = [
+        ("full", True, "discord.py defaults (cache all + chunk at startup)"),
+        ("joined", False, "joined members, no startup chunking"),
+        ("none", False, "no member cache (bot default)"),
+    ]
+
+    print(f"{'mode':<55} {'time':>10} {'memory':>10} {'cached':>10}")
+    for mode, chunk, label in modes:
+        elapsed, memory, cached = await run_mode(mode, chunk, args.members)
+        print(f"{label:<55} {elapsed * 1000:>8.0f}ms {memory:>8.1f}MB {cached:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,274 @@
+"""
+Onboarding burst benchmark: a launch where hundreds of users press "Open Chat" at once.
+
+A fake Discord HTTP API (aiohttp server) answers the routes used by the onboarding
+(thread creation, thread member, message). Like Discord, it enforces a hidden
+per-channel limit on thread creation: the rate-limit headers don't announce it, so
+discord.py's own bucket tracking can't avoid the 429s and only retries them.
+
+Two strategies are compared, each with a fresh server and client:
+- inline: the former handler, every press creates its thread right away and only
+  answers the interaction at the end (Discord drops the interaction after 3 s);
+- queued: the ThreadOnboarding queue, the press is deferred at once and the user
+  gets a followup once the thread exists.
+
+Reported per strategy: presses acknowledged within 3 s (with a thread or an error),
+threads created, users notified of their thread, 429s returned by the API, and the
+time from press to notification.
+
+Usage (from bot/):
+    python -m benchmarks.bench_onboarding_burst [--users 100] [--rate 2] [--burst 5]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("ENCRYPTION_KEY", "47DEQpj8HBSa-_TImW-5JCeuQeRkm5NMpJWZG3hSuFU=")
+
+import discord
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import db.sessions as sessions
+from discord_bot.views import SetupTutorialView
+from services.onboarding import ThreadOnboarding
+
+
+GUILD_ID = 1
+CHANNEL_ID = 10
+BOT_USER = {"id": "2", "username": "bot", "discriminator": "0", "avatar": None, "bot": True}
+ACK_DEADLINE = 3.0
+
+
+class FakeDiscord:
+
+    """Minimal Discord REST API with a hidden thread-creation limit per channel."""
+
+    def __init__(self, rate: float, burst: int, latency: float):
+        self.rate = rate
+        self.burst = burst
+        self.latency = latency
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.next_id = 1000
+        self.threads_created = 0
+        self.rate_limited = 0
+
+    def _id(self) -> str:
+        self.next_id += 1
+        return str(self.next_id)
+
+    def _take(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def _json(self, data, status=200, retry_after=None):
+        # discord.py only parses bodies whose content type is exactly "application/json"
+        headers = {
+            "Content-Type": "application/json",
+            "X-RateLimit-Limit": "50",
+            "X-RateLimit-Remaining": "49",
+            "X-RateLimit-Reset-After": "1",
+        }
+        if retry_after is not None:
+            headers.update({"Retry-After": f"{retry_after:.3f}", "Via": "1.1 google"})
+        return web.Response(body=json.dumps(data).encode(), status=status, headers=headers)
+
+    async def get_me(self, request):
+        return self._json(BOT_USER)
+
+    async def create_thread(self, request):
+        await asyncio.sleep(self.latency)
+        wait = self._take()
+        if wait:
+            self.rate_limited += 1
+            body = {"message": "You are being rate limited.", "retry_after": wait, "global": False}
+            return self._json(body, status=429, retry_after=wait)
+
+        payload = await request.json()
+        self.threads_created += 1
+        now = datetime.now(timezone.utc).isoformat()
+        return self._json({
+            "id": self._id(),
+            "type": 12,
+            "guild_id": str(GUILD_ID),
+            "parent_id": request.match_info["channel_id"],
+            "owner_id": BOT_USER["id"],
+            "name": payload.get("name", "thread"),
+            "member_count": 1,
+            "message_count": 0,
+            "thread_metadata": {
+                "archived": False,
+                "auto_archive_duration": 1440,
+                "archive_timestamp": now,
+                "locked": False,
+            },
+        }, status=201)
+
+    async def add_member(self, request):
+        await asyncio.sleep(self.latency)
+        return web.Response(status=204)
+
+    async def send_message(self, request):
+        await asyncio.sleep(self.latency)
+        return self._json({
+            "id": self._id(),
+            "channel_id": request.match_info["channel_id"],
+            "author": BOT_USER,
+            "content": "",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+        })
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/v10/users/@me", self.get_me)
+        app.router.add_post("/api/v10/channels/{channel_id}/threads", self.create_thread)
+        app.router.add_put("/api/v10/channels/{channel_id}/thread-members/{user_id}", self.add_member)
+        app.router.add_post("/api/v10/channels/{channel_id}/messages", self.send_message)
+        return app
+
+
+class FakeInteraction:
+
+    """The parts of a button interaction used by the onboarding."""
+
+    class _User:
+        def __init__(self, user_id: int):
+            self.id = user_id
+            self.name = f"user{user_id}"
+            self.mention = f"<@{user_id}>"
+
+    class _Followup:
+        def __init__(self, interaction):
+            self.interaction = interaction
+
+        async def send(self, content, ephemeral=False):
+            self.interaction.answered_at = time.perf_counter()
+
+    def __init__(self, client, channel, user_id: int):
+        self.client = client
+        self.channel = channel
+        self.user = self._User(user_id)
+        self.followup = self._Followup(self)
+        self.pressed_at = time.perf_counter()
+        self.acked_at = None
+        self.answered_at = None
+
+
+async def _save_user_session(**kwargs):
+    # No database in the benchmark: the session write is not what is measured
+    return None
+
+
+async def _inline(interaction):
+    # The former OpenThreadButton.open_thread, answering the interaction at the end
+    try:
+        thread = await interaction.channel.create_thread(
+            name=f"Chat {interaction.user.name.capitalize()}",
+            type=discord.ChannelType.private_thread,
+            invitable=False,
+        )
+        await thread.add_user(interaction.user)
+        await sessions.save_user_session(user_id=str(interaction.user.id), thread_id=thread.id, language="en")
+        tutorial_view = SetupTutorialView(lang="en", user_id=str(interaction.user.id), username=interaction.user.name)
+        await thread.send(content=interaction.user.mention, embed=tutorial_view.create_embed(), view=tutorial_view)
+        interaction.acked_at = interaction.answered_at = time.perf_counter()
+    except discord.HTTPException:
+        interaction.acked_at = time.perf_counter()
+
+
+async def _queued(onboarding, interaction):
+    # Deferring is a single interaction callback, outside the channel's buckets
+    interaction.acked_at = time.perf_counter()
+    onboarding.submit(interaction, "en")
+
+
+async def run_strategy(name: str, args) -> dict:
+    fake = FakeDiscord(args.rate, args.burst, args.latency)
+    server = TestServer(fake.app())
+    await server.start_server()
+    discord.http.Route.BASE = str(server.make_url("/api/v10"))
+
+    client = discord.Client(intents=discord.Intents.none())
+    await client.http.static_login("token")
+    state = client._connection
+    guild = discord.Guild(data={"id": str(GUILD_ID), "name": "Launch", "roles": [], "channels": []}, state=state)
+    state._add_guild(guild)
+    channel = discord.TextChannel(state=state, guild=guild, data={
+        "id": str(CHANNEL_ID), "type": 0, "name": "open-chat", "position": 0, "guild_id": str(GUILD_ID),
+    })
+
+    onboarding = ThreadOnboarding(rate_per_second=args.rate, burst=args.burst)
+    interactions = [FakeInteraction(client, channel, 10_000 + i) for i in range(args.users)]
+
+    start = time.perf_counter()
+    if name == "inline":
+        await asyncio.gather(*(_inline(interaction) for interaction in interactions))
+    else:
+        await asyncio.gather(*(_queued(onboarding, interaction) for interaction in interactions))
+        while onboarding.pending:
+            await onboarding.drain(timeout=60)
+    elapsed = time.perf_counter() - start
+
+    await client.close()
+    await server.close()
+
+    acked = sum(1 for i in interactions if i.acked_at - i.pressed_at <= ACK_DEADLINE)
+    ready = sorted(i.answered_at - i.pressed_at for i in interactions if i.answered_at)
+    if name == "inline":
+        # An interaction answered after the deadline is lost: the user sees an error
+        ready = [delay for delay in ready if delay <= ACK_DEADLINE]
+    return {
+        "acked": acked,
+        "threads": fake.threads_created,
+        "notified": len(ready),
+        "rate_limited": fake.rate_limited,
+        "p50": statistics.median(ready) if ready else float("nan"),
+        "p95": ready[int(len(ready) * 0.95) - 1] if ready else float("nan"),
+        "elapsed": elapsed,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=2, help="threads per second allowed per channel")
+    parser.add_argument("--burst", type=int, default=5, help="thread creation burst allowed per channel")
+    parser.add_argument("--latency", type=float, default=0.05, help="API latency, in seconds")
+    args = parser.parse_args()
+
+    sessions.save_user_session = _save_user_session
+
+    print(f"{args.users} presses, thread creation limited to {args.rate:g}/s (burst {args.burst}) per channel\n")
+    print(f"{'strategy':<10} {'acked':>9} {'threads':>8} {'notified':>9} {'429s':>6} {'p50':>8} {'p95':>8} {'total':>8}")
+    for name in ("inline", "queued"):
+        r = await run_strategy(name, args)
+        print(
+            f"{name:<10} {r['acked']:>9} {r['threads']:>8} {r['notified']:>9} {r['rate_limited']:>6} "
+            f"{r['p50']:>7.1f}s {r['p95']:>7.1f}s {r['elapsed']:>7.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,7 @@
 import os
 
 PORT = int(os.getenv("PORT", 20187))
+WEBHOOK_PIDFILE = os.getenv("WEBHOOK_PIDFILE", "bot.pid")
 TUNNEL_URL = os.getenv("TUNNEL_URL")
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 WEBHOOK_MONITORING_URL = os.getenv("WEBHOOK_MONITORING_URL")
@@ -11,4 +12,110 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_PORT = int(os.getenv("DB_PORT", 5432))
 
-SYSTEM_LANGUAGE = os.getenv("SYSTEM_LANGUAGE", "en")   
\ No newline at end of file
+SYSTEM_LANGUAGE = os.getenv("SYSTEM_LANGUAGE", "en")   
+
+# Default role names, configurable per guild with /admin set_roles
+UEX_MANAGER_ROLE_NAME = os.getenv("UEX_MANAGER_ROLE_NAME", "UEX Manager")
+UEX_USER_ROLE_NAME = os.getenv("UEX_USER_ROLE_NAME", "UEX user")
+
+# Discord gateway cache
+DISCORD_MEMBER_CACHE = os.getenv("DISCORD_MEMBER_CACHE", "none").lower()  # none | joined | full
+DISCORD_CHUNK_GUILDS_AT_STARTUP = os.getenv("DISCORD_CHUNK_GUILDS_AT_STARTUP", "false").lower() in ("1", "true", "yes")
+DISCORD_MAX_MESSAGES = int(os.getenv("DISCORD_MAX_MESSAGES", 100))
+THREAD_CACHE_SIZE = int(os.getenv("THREAD_CACHE_SIZE", 1000))
+
+# Parent channels of the private threads (comma separated IDs, may span guilds).
+# Empty: threads are created in the channel of the "Open Chat" button.
+THREAD_PARENT_CHANNEL_IDS = [int(i) for i in os.getenv("THREAD_PARENT_CHANNEL_IDS", "").split(",") if i.strip()]
+THREAD_PLACEMENT_REFRESH = float(os.getenv("THREAD_PLACEMENT_REFRESH", 60))
+
+# Onboarding queue ("Open Chat" thread creation)
+ONBOARDING_CONCURRENCY = int(os.getenv("ONBOARDING_CONCURRENCY", 2))
+ONBOARDING_MAX_PENDING = int(os.getenv("ONBOARDING_MAX_PENDING", 1000))
+ONBOARDING_THREADS_PER_SECOND = float(os.getenv("ONBOARDING_THREADS_PER_SECOND", 1))
+ONBOARDING_THREADS_BURST = int(os.getenv("ONBOARDING_THREADS_BURST", 5))
+ONBOARDING_MAX_ATTEMPTS = int(os.getenv("ONBOARDING_MAX_ATTEMPTS", 3))
+
+# Inactivity archiving of the private threads
+THREAD_IDLE_HOURS = float(os.getenv("THREAD_IDLE_HOURS", 72))
+THREAD_ARCHIVE_INTERVAL = float(os.getenv("THREAD_ARCHIVE_INTERVAL", 600))
+THREAD_ARCHIVE_BATCH_SIZE = int(os.getenv("THREAD_ARCHIVE_BATCH_SIZE", 50))
+THREAD_ARCHIVE_PER_SECOND = float(os.getenv("THREAD_ARCHIVE_PER_SECOND", 1))
+THREAD_ACTIVITY_FLUSH_INTERVAL = float(os.getenv("THREAD_ACTIVITY_FLUSH_INTERVAL", 30))
+
+# UEX API client
+UEX_HTTP_POOL_SIZE = int(os.getenv("UEX_HTTP_POOL_SIZE", 20))
+UEX_HTTP_POOL_PER_HOST = int(os.getenv("UEX_HTTP_POOL_PER_HOST", 10))
+UEX_HTTP_KEEPALIVE = float(os.getenv("UEX_HTTP_KEEPALIVE", 30))
+UEX_HTTP_DNS_TTL = int(os.getenv("UEX_HTTP_DNS_TTL", 300))
+UEX_CONNECT_TIMEOUT = float(os.getenv("UEX_CONNECT_TIMEOUT", 3))
+UEX_TIMEOUT_GET_USER = float(os.getenv("UEX_TIMEOUT_GET_USER", 5))
+UEX_TIMEOUT_POST_MESSAGE = float(os.getenv("UEX_TIMEOUT_POST_MESSAGE", 10))
+UEX_TIMEOUT_NOTIFICATIONS = float(os.getenv("UEX_TIMEOUT_NOTIFICATIONS", 10))
+UEX_GET_MAX_ATTEMPTS = int(os.getenv("UEX_GET_MAX_ATTEMPTS", 3))
+UEX_BREAKER_FAILURES = int(os.getenv("UEX_BREAKER_FAILURES", 5))
+UEX_BREAKER_RESET = float(os.getenv("UEX_BREAKER_RESET", 30))
+WEBHOOK_DEADLINE = float(os.getenv("WEBHOOK_DEADLINE", 10))
+
+# UEX outbound queue
+UEX_OUTBOX_CONCURRENCY = int(os.getenv("UEX_OUTBOX_CONCURRENCY", 4))
+UEX_OUTBOX_MAX_PENDING = int(os.getenv("UEX_OUTBOX_MAX_PENDING", 500))
+UEX_RATE_LIMIT_PER_MINUTE = float(os.getenv("UEX_RATE_LIMIT_PER_MINUTE", 10))
+UEX_RATE_LIMIT_BURST = int(os.getenv("UEX_RATE_LIMIT_BURST", 3))
+UEX_SEND_MAX_ATTEMPTS = int(os.getenv("UEX_SEND_MAX_ATTEMPTS", 5))
+UEX_RETRY_BASE_DELAY = float(os.getenv("UEX_RETRY_BASE_DELAY", 1))
+UEX_RETRY_MAX_DELAY = float(os.getenv("UEX_RETRY_MAX_DELAY", 60))
+
+# Merging of consecutive replies (opt-in per user)
+REPLY_COALESCE_WINDOW = float(os.getenv("REPLY_COALESCE_WINDOW", 8))
+REPLY_COALESCE_MAX_WAIT = float(os.getenv("REPLY_COALESCE_MAX_WAIT", 30))
+REPLY_COALESCE_MAX_LENGTH = int(os.getenv("REPLY_COALESCE_MAX_LENGTH", 1500))
+
+# Reconciliation of the UEX events missed by the webhook
+RECONCILE_MIN_INTERVAL = float(os.getenv("RECONCILE_MIN_INTERVAL", 30))
+RECONCILE_MAX_INTERVAL = float(os.getenv("RECONCILE_MAX_INTERVAL", 900))
+RECONCILE_CONCURRENCY = int(os.getenv("RECONCILE_CONCURRENCY", 4))
+RECONCILE_LOOKBACK = float(os.getenv("RECONCILE_LOOKBACK", 3600))
+RECONCILE_DEDUP_HOURS = float(os.getenv("RECONCILE_DEDUP_HOURS", 72))
+
+# Monitoring notifications
+NOTIFY_MAX_PENDING = int(os.getenv("NOTIFY_MAX_PENDING", 100))
+NOTIFY_COALESCE_WINDOW = float(os.getenv("NOTIFY_COALESCE_WINDOW", 60))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", 3))
+NOTIFY_TIMEOUT = float(os.getenv("NOTIFY_TIMEOUT", 5))
+
+# Broadcast engine
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", 4))
+BROADCAST_RATE_PER_SECOND = float(os.getenv("BROADCAST_RATE_PER_SECOND", 5))
+BROADCAST_BATCH_SIZE = int(os.getenv("BROADCAST_BATCH_SIZE", 50))
+BROADCAST_PROGRESS_INTERVAL = float(os.getenv("BROADCAST_PROGRESS_INTERVAL", 15))
+
+# Logging (file rotation: whichever of size or age comes first, 0 disables it)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_PATH = os.getenv("LOG_PATH", "bot.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_ROTATE_INTERVAL = float(os.getenv("LOG_ROTATE_INTERVAL", 86400))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 7))
+LOG_COMPRESS = os.getenv("LOG_COMPRESS", "true").lower() in ("1", "true", "yes")
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() in ("1", "true", "yes")  # one JSON object per line
+
+# Shutdown (docker stop kills the container 30 s after SIGTERM)
+SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", 25))
+
+# Health endpoint (/health?deep=1)
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", 5))  # seconds a deep probe result is reused
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", 2))
+HEALTH_LOOP_LAG_INTERVAL = float(os.getenv("HEALTH_LOOP_LAG_INTERVAL", 1))
+HEALTH_MAX_LOOP_LAG = float(os.getenv("HEALTH_MAX_LOOP_LAG", 0.5))  # above it the bot is reported degraded
+
+# Tracing
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", 2000))  # traces kept in memory for /admin traces
+TRACE_FILE = os.getenv("TRACE_FILE", "")  # JSONL file of finished spans, disabled if empty
+
+# Statistics
+COUNTERS_FLUSH_INTERVAL = float(os.getenv("COUNTERS_FLUSH_INTERVAL", 10))
+
+# Status boards
+STATUS_FANOUT_CONCURRENCY = int(os.getenv("STATUS_FANOUT_CONCURRENCY", 5))
+STATUS_CHANNEL_EDITS_PER_SECOND = float(os.getenv("STATUS_CHANNEL_EDITS_PER_SECOND", 1))
+STATUS_CHANNEL_EDITS_BURST = int(os.getenv("STATUS_CHANNEL_EDITS_BURST", 5))
@@ -1,11 +1,15 @@
-from .pool import init_db, db_pool
+from .pool import init_db, close_db, db_pool
 from .sessions import (
     remove_sessions_by_thread,
     find_session_by_username,
+    count_threads_by_parent,
+    mark_threads_archived,
     remove_user_session,
     get_user_thread_id,
     save_user_session,
+    get_idle_threads,
     get_user_session,
+    touch_threads,
 )
 from .negotiations import (
     delete_negotiation_link,
@@ -17,34 +21,93 @@ from .banned import(
     is_banned,
     ban_user,
 )
+from .broadcasts import (
+    fetch_broadcast_recipients,
+    get_running_broadcast_jobs,
+    update_broadcast_progress,
+    create_broadcast_job,
+    finish_broadcast_job,
+)
+from .counters import (
+    start_counter_flush_task,
+    get_bucket_totals,
+    get_daily_trend,
+    record_counter,
+    flush_counters,
+    get_counters,
+)
+from .guild_settings import (
+    get_guild_role_names,
+    set_guild_role_names,
+)
+from .uex_events import (
+    set_notification_cursor,
+    get_reconcile_targets,
+    release_event,
+    prune_events,
+    claim_event,
+)
+from .settings import (
+    get_setting,
+    set_setting,
+)
 from .maintenance import (
     update_maintenance_state_if_needed,
     get_maintenance_status, 
+    attach_status_messages,
+    delete_status_message,
     save_status_message,
-    get_status_message,
+    get_status_messages,
     set_maintenance,
     
 )
 
 __all__ = [
     "update_maintenance_state_if_needed",
+    "fetch_broadcast_recipients",
+    "get_running_broadcast_jobs",
+    "start_counter_flush_task",
+    "update_broadcast_progress",
     "remove_sessions_by_thread",
     "find_session_by_username",
+    "count_threads_by_parent",
+    "set_notification_cursor",
+    "mark_threads_archived",
     "delete_negotiation_link",
     "get_maintenance_status",
+    "get_reconcile_targets",
+    "get_guild_role_names",
+    "set_guild_role_names",
+    "attach_status_messages",
+    "delete_status_message",
     "save_negotiation_link",
+    "create_broadcast_job",
+    "finish_broadcast_job",
     "get_negotiation_link",
     "remove_user_session",
     "save_status_message",
-    "get_status_message",
+    "get_status_messages",
+    "get_bucket_totals",
     "get_user_thread_id",
     "save_user_session",
     "get_user_session",
+    "get_idle_threads",
+    "get_daily_trend",
+    "touch_threads",
     "set_maintenance",
+    "record_counter",
+    "flush_counters",
+    "release_event",
+    "get_counters",
+    "prune_events",
+    "get_setting",
+    "set_setting",
+    "claim_event",
     "unban_user",
     "is_banned",
     "ban_user",
     "db_pool",
     "init_db",
+    "close_db",
 
 ]
@@ -0,0 +1,140 @@
+import db.pool
+import logging
+
+
+
+async def create_broadcast_job(message: str, created_by: str) -> dict:
+
+    """
+    Creates a new broadcast job and snapshots the number of recipients.
+
+    Args:
+        message (str): The announcement text to deliver.
+        created_by (str): The Discord ID of the admin who started the broadcast.
+
+    Returns:
+        dict: The stored job row (id, message, status, cursor, counters and total).
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        row = await conn.fetchrow(
+            """
+            INSERT INTO broadcast_jobs (message, created_by, total)
+            VALUES ($1, $2, (SELECT COUNT(*) FROM sessions))
+            RETURNING *
+            """,
+            message,
+            str(created_by)
+        )
+
+    logging.info(f"📢 Broadcast job {row['id']} created by {created_by}")
+    return dict(row)
+
+
+async def get_running_broadcast_jobs() -> list[dict]:
+
+    """
+    Retrieves the broadcast jobs that were interrupted before completion.
+
+    Returns:
+        list[dict]: The jobs still marked as 'running', oldest first.
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        rows = await conn.fetch(
+            "SELECT * FROM broadcast_jobs WHERE status = 'running' ORDER BY id"
+        )
+
+    return [dict(row) for row in rows]
+
+
+async def fetch_broadcast_recipients(cursor_lang: str, cursor_user_id: str, limit: int) -> list[dict]:
+
+    """
+    Retrieves the next batch of recipients, grouped by language, after the given cursor.
+
+    Recipients are ordered by (language, user_id) so that a job can resume exactly
+    where it stopped and so that each language's embed is rendered only once.
+
+    Args:
+        cursor_lang (str): The language of the last processed recipient ('' to start).
+        cursor_user_id (str): The user ID of the last processed recipient ('' to start).
+        limit (int): The maximum number of recipients to return.
+
+    Returns:
+        list[dict]: Rows with 'user_id' and 'lang'.
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT user_id, COALESCE(language, 'en') AS lang
+            FROM sessions
+            WHERE (COALESCE(language, 'en'), user_id) > ($1, $2)
+            ORDER BY COALESCE(language, 'en'), user_id
+            LIMIT $3
+            """,
+            cursor_lang,
+            cursor_user_id,
+            limit
+        )
+
+    return [dict(row) for row in rows]
+
+
+async def update_broadcast_progress(job_id: int, cursor_lang: str, cursor_user_id: str, sent: int, failed: int):
+
+    """
+    Persists the progress of a broadcast job after a completed batch.
+
+    Args:
+        job_id (int): The broadcast job ID.
+        cursor_lang (str): The language of the last processed recipient.
+        cursor_user_id (str): The user ID of the last processed recipient.
+        sent (int): The total number of delivered messages so far.
+        failed (int): The total number of failed deliveries so far.
+
+    Returns:
+        None
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        await conn.execute(
+            """
+            UPDATE broadcast_jobs
+            SET cursor_lang = $2,
+                cursor_user_id = $3,
+                sent = $4,
+                failed = $5,
+                updated_at = NOW()
+            WHERE id = $1
+            """,
+            job_id,
+            cursor_lang,
+            cursor_user_id,
+            sent,
+            failed
+        )
+
+
+async def finish_broadcast_job(job_id: int, status: str = "completed"):
+
+    """
+    Marks a broadcast job as finished so it is not resumed again.
+
+    Args:
+        job_id (int): The broadcast job ID.
+        status (str): The final status ('completed' or 'failed').
+
+    Returns:
+        None
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        await conn.execute(
+            "UPDATE broadcast_jobs SET status = $2, updated_at = NOW() WHERE id = $1",
+            job_id,
+            status
+        )
+
+    logging.info(f"📢 Broadcast job {job_id} {status}")
@@ -0,0 +1,345 @@
+import db.pool
+import logging
+from discord.ext import tasks
+from config import COUNTERS_FLUSH_INTERVAL
+from datetime import datetime, timedelta, timezone
+
+
+# Counters maintained by triggers on the tables they describe
+SESSIONS_TOTAL = "sessions.total"
+SESSIONS_THREADS = "sessions.threads"
+NEGOTIATIONS_ACTIVE = "negotiations.active"
+BANNED_TOTAL = "banned.total"
+USERS_NEW = "users.new"
+
+# Counters recorded by the application (totals + hourly buckets)
+UEX_SENT_OK = "uex.sent.ok"
+UEX_SENT_FAILED = "uex.sent.failed"
+THREADS_CACHE_HIT = "threads.cache_hit"
+THREADS_REST_FALLBACK = "threads.rest_fallback"
+THREADS_ARCHIVED = "threads.archived"
+EVENTS_RECONCILED = "events.reconciled"
+EVENTS_DUPLICATE = "events.duplicate"
+REPLIES_COALESCED = "replies.coalesced"
+WEBHOOK_PREFIX = "webhooks."
+WEBHOOK_EVENTS = (
+    "negotiation_started",
+    "user_reply",
+    "negotiation_completed_client",
+    "negotiation_completed_advertiser",
+)
+
+BUCKET_RETENTION_DAYS = 30
+
+_pending: dict[tuple[str, datetime], int] = {}
+_last_prune: datetime | None = None
+
+
+COUNTER_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS bot_counters (
+        key TEXT PRIMARY KEY,
+        value BIGINT NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS bot_counter_buckets (
+        key TEXT NOT NULL,
+        bucket timestamptz NOT NULL,
+        value BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (key, bucket)
+    );
+
+    CREATE OR REPLACE FUNCTION bot_counter_add(counter_key TEXT, delta BIGINT) RETURNS void AS $$
+    BEGIN
+        INSERT INTO bot_counters (key, value) VALUES (counter_key, delta)
+        ON CONFLICT (key) DO UPDATE SET value = bot_counters.value + EXCLUDED.value;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION bot_counters_sessions() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM bot_counter_add('sessions.total', 1);
+            IF NEW.thread_id IS NOT NULL THEN
+                PERFORM bot_counter_add('sessions.threads', 1);
+            END IF;
+            INSERT INTO bot_counter_buckets (key, bucket, value)
+            VALUES ('users.new', date_trunc('day', NOW()), 1)
+            ON CONFLICT (key, bucket) DO UPDATE SET value = bot_counter_buckets.value + 1;
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM bot_counter_add('sessions.total', -1);
+            IF OLD.thread_id IS NOT NULL THEN
+                PERFORM bot_counter_add('sessions.threads', -1);
+            END IF;
+        ELSIF (OLD.thread_id IS NULL) <> (NEW.thread_id IS NULL) THEN
+            PERFORM bot_counter_add('sessions.threads', CASE WHEN NEW.thread_id IS NULL THEN -1 ELSE 1 END);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION bot_counters_rows() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM bot_counter_add(TG_ARGV[0], 1);
+        ELSE
+            PERFORM bot_counter_add(TG_ARGV[0], -1);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    INSERT INTO bot_counters (key, value)
+    SELECT 'sessions.total', (SELECT COUNT(*) FROM sessions)
+    WHERE NOT EXISTS (SELECT 1 FROM bot_counters WHERE key = 'sessions.total')
+    ON CONFLICT (key) DO NOTHING;
+
+    INSERT INTO bot_counters (key, value)
+    SELECT 'sessions.threads', (SELECT COUNT(*) FROM sessions WHERE thread_id IS NOT NULL)
+    WHERE NOT EXISTS (SELECT 1 FROM bot_counters WHERE key = 'sessions.threads')
+    ON CONFLICT (key) DO NOTHING;
+
+    INSERT INTO bot_counters (key, value)
+    SELECT 'negotiations.active', (SELECT COUNT(*) FROM negotiation_links)
+    WHERE NOT EXISTS (SELECT 1 FROM bot_counters WHERE key = 'negotiations.active')
+    ON CONFLICT (key) DO NOTHING;
+
+    INSERT INTO bot_counters (key, value)
+    SELECT 'banned.total', (SELECT COUNT(*) FROM banned_users)
+    WHERE NOT EXISTS (SELECT 1 FROM bot_counters WHERE key = 'banned.total')
+    ON CONFLICT (key) DO NOTHING;
+
+    CREATE OR REPLACE TRIGGER sessions_counters
+    AFTER INSERT OR DELETE OR UPDATE OF thread_id ON sessions
+    FOR EACH ROW EXECUTE FUNCTION bot_counters_sessions();
+
+    CREATE OR REPLACE TRIGGER negotiation_links_counters
+    AFTER INSERT OR DELETE ON negotiation_links
+    FOR EACH ROW EXECUTE FUNCTION bot_counters_rows('negotiations.active');
+
+    CREATE OR REPLACE TRIGGER banned_users_counters
+    AFTER INSERT OR DELETE ON banned_users
+    FOR EACH ROW EXECUTE FUNCTION bot_counters_rows('banned.total');
+"""
+
+
+
+async def ensure_counter_schema(conn):
+
+    """
+    Creates the counter tables and triggers, seeding the counters once from the existing rows.
+
+    The seeding `COUNT(*)` queries only run when a counter is missing, so regular
+    startups never scan the tables again.
+
+    Args:
+        conn (asyncpg.Connection): An open connection from the pool.
+
+    Returns:
+        None
+    """
+
+    async with conn.transaction():
+        await conn.execute(COUNTER_SCHEMA)
+
+
+def record_counter(key: str, amount: int = 1):
+
+    """
+    Records an application event in memory; it is written by the next `flush_counters()`.
+
+    The event increments both the all-time counter and the current hourly bucket,
+    without touching the database on the hot path.
+
+    Args:
+        key (str): The counter key (e.g. 'webhooks.user_reply').
+        amount (int): The increment.
+
+    Returns:
+        None
+    """
+
+    bucket = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    _pending[(key, bucket)] = _pending.get((key, bucket), 0) + amount
+
+
+def webhook_counter(event_type: str) -> str:
+
+    """
+    Maps a webhook event type to its counter key.
+
+    Event types come from the request URL, so unknown values share a single
+    'other' counter instead of creating arbitrary keys.
+
+    Args:
+        event_type (str): The event type from the webhook route.
+
+    Returns:
+        str: The counter key.
+    """
+
+    return WEBHOOK_PREFIX + (event_type if event_type in WEBHOOK_EVENTS else "other")
+
+
+async def flush_counters() -> int:
+
+    """
+    Writes the buffered application counters to the database in a single transaction.
+
+    Buckets older than BUCKET_RETENTION_DAYS are pruned at most once per hour.
+
+    Returns:
+        int: The number of buffered (key, bucket) entries written.
+    """
+
+    global _last_prune
+
+    if db.pool.db_pool is None:
+        return 0
+
+    entries = list(_pending.items())
+    _pending.clear()
+
+    try:
+        async with db.pool.db_pool.acquire() as conn:
+            async with conn.transaction():
+                if entries:
+                    await conn.executemany(
+                        "SELECT bot_counter_add($1, $2)",
+                        [(key, amount) for (key, _), amount in entries]
+                    )
+                    await conn.executemany(
+                        """
+                        INSERT INTO bot_counter_buckets (key, bucket, value)
+                        VALUES ($1, $2, $3)
+                        ON CONFLICT (key, bucket) DO UPDATE
+                            SET value = bot_counter_buckets.value + EXCLUDED.value
+                        """,
+                        [(key, bucket, amount) for (key, bucket), amount in entries]
+                    )
+
+                now = datetime.now(timezone.utc)
+                if _last_prune is None or now - _last_prune >= timedelta(hours=1):
+                    await conn.execute(
+                        "DELETE FROM bot_counter_buckets WHERE bucket < $1",
+                        now - timedelta(days=BUCKET_RETENTION_DAYS)
+                    )
+                    _last_prune = now
+
+    except BaseException as e:
+        # Put the counts back so they are retried on the next flush (a cancelled
+        # flush included: the transaction was rolled back)
+        for entry, amount in entries:
+            _pending[entry] = _pending.get(entry, 0) + amount
+        if not isinstance(e, Exception):
+            raise
+        logging.error("❌ Error flushing counters: %s", e)
+        return 0
+
+    return len(entries)
+
+
+async def get_counters() -> dict[str, int]:
+
+    """
+    Retrieves every all-time counter.
+
+    Returns:
+        dict[str, int]: The counter values keyed by name.
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        rows = await conn.fetch("SELECT key, value FROM bot_counters")
+
+    return {row["key"]: row["value"] for row in rows}
+
+
+async def get_bucket_totals(prefix: str, since: datetime) -> dict[str, int]:
+
+    """
+    Sums the bucketed counters whose key starts with `prefix` since a given time.
+
+    Args:
+        prefix (str): The key prefix (e.g. 'webhooks.').
+        since (datetime): The lower bound of the window (inclusive).
+
+    Returns:
+        dict[str, int]: The totals keyed by counter name.
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT key, SUM(value) AS value
+            FROM bot_counter_buckets
+            WHERE bucket >= $1 AND starts_with(key, $2)
+            GROUP BY key
+            """,
+            since,
+            prefix
+        )
+
+    return {row["key"]: row["value"] for row in rows}
+
+
+async def get_daily_trend(key: str, days: int) -> list[tuple[datetime, int]]:
+
+    """
+    Retrieves the per-day totals of a bucketed counter.
+
+    Args:
+        key (str): The counter key.
+        days (int): How many days to look back, today included.
+
+    Returns:
+        list[tuple[datetime, int]]: (day, value) pairs, oldest first, without empty days.
+    """
+
+    since = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+
+    async with db.pool.db_pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT date_trunc('day', bucket) AS day, SUM(value) AS value
+            FROM bot_counter_buckets
+            WHERE key = $1 AND bucket >= $2
+            GROUP BY day
+            ORDER BY day
+            """,
+            key,
+            since
+        )
+
+    return [(row["day"], row["value"]) for row in rows]
+
+
+@tasks.loop(seconds=COUNTERS_FLUSH_INTERVAL)
+async def counter_flush_loop():
+    await flush_counters()
+
+
+def start_counter_flush_task():
+
+    """
+    Starts the background loop that periodically writes the buffered counters.
+
+    Calling it again while the loop is running has no effect.
+
+    Returns:
+        None
+    """
+
+    if not counter_flush_loop.is_running():
+        counter_flush_loop.start()
+
+
+async def stop_counter_flush_task() -> int:
+
+    """
+    Stops the periodic flush loop and writes the counters buffered since its last run.
+
+    Returns:
+        int: The number of buffered (key, bucket) entries written.
+    """
+
+    counter_flush_loop.cancel()
+    return await flush_counters()
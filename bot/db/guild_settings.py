@@ -0,0 +1,55 @@
+import db.pool
+
+
+
+async def get_guild_role_names(guild_id: int) -> dict[str, str | None]:
+
+    """
+    Retrieves the role names configured for a guild.
+
+    Args:
+        guild_id (int): The Discord guild ID.
+
+    Returns:
+        dict[str, str | None]: The 'manager' and 'user' role names, None where the
+            guild keeps the default.
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        row = await conn.fetchrow(
+            "SELECT manager_role_name, user_role_name FROM guild_settings WHERE guild_id = $1",
+            guild_id
+        )
+
+    if not row:
+        return {"manager": None, "user": None}
+    return {"manager": row["manager_role_name"], "user": row["user_role_name"]}
+
+
+async def set_guild_role_names(guild_id: int, manager: str | None = None, user: str | None = None):
+
+    """
+    Stores the role names of a guild. Names left as None keep their current value.
+
+    Args:
+        guild_id (int): The Discord guild ID.
+        manager (str | None): The name of the role allowed to run admin commands.
+        user (str | None): The name of the role given to bot users.
+
+    Returns:
+        None
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        await conn.execute(
+            """
+            INSERT INTO guild_settings (guild_id, manager_role_name, user_role_name)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (guild_id) DO UPDATE
+                SET manager_role_name = COALESCE($2, guild_settings.manager_role_name),
+                    user_role_name = COALESCE($3, guild_settings.user_role_name)
+            """,
+            guild_id,
+            manager,
+            user
+        )
@@ -83,21 +83,44 @@ async def update_maintenance_state_if_needed():
 
 # ================== STATUS MESSAGE ==================
 
-async def save_status_message(channel_id: int, message_id: int, lang: str):
+async def save_status_message(channel_id: int, message_id: int, lang: str, guild_id: int = None):
     async with pool.db_pool.acquire() as conn:
         await conn.execute("""
-            INSERT INTO status_message (id, channel_id, message_id, lang)
-            VALUES (1, $1, $2, $3)
-            ON CONFLICT (id) DO UPDATE
-                SET channel_id = $1,
-                    message_id = $2,
-                    lang = $3
-        """, channel_id, message_id,lang)
+            INSERT INTO status_message (guild_id, channel_id, message_id, lang)
+            VALUES ($4, $1, $2, $3)
+            ON CONFLICT (guild_id, channel_id, lang) DO UPDATE
+                SET message_id = $2
+        """, channel_id, message_id, lang, guild_id)
 
 
-async def get_status_message():
+async def attach_status_messages(guild_id: int, channel_ids: list[int]):
+    # Boards saved before multiple boards have no guild: a board the guild already
+    # has in the same channel and language takes precedence over the old one
     async with pool.db_pool.acquire() as conn:
-        row = await conn.fetchrow("SELECT channel_id, message_id, lang FROM status_message WHERE id = 1")
-        if row:
-            return row["channel_id"], row["message_id"], row["lang"]
-        return None, None, None
\ No newline at end of file
+        async with conn.transaction():
+            await conn.execute("""
+                DELETE FROM status_message old
+                WHERE old.guild_id IS NULL AND old.channel_id = ANY($2::bigint[])
+                AND EXISTS (
+                    SELECT 1 FROM status_message board
+                    WHERE board.guild_id = $1 AND board.channel_id = old.channel_id AND board.lang = old.lang
+                )
+            """, guild_id, channel_ids)
+            await conn.execute(
+                "UPDATE status_message SET guild_id = $1 WHERE guild_id IS NULL AND channel_id = ANY($2::bigint[])",
+                guild_id, channel_ids
+            )
+
+
+async def get_status_messages() -> list[dict]:
+    async with pool.db_pool.acquire() as conn:
+        rows = await conn.fetch("SELECT guild_id, channel_id, message_id, lang FROM status_message ORDER BY id")
+    return [dict(row) for row in rows]
+
+
+async def delete_status_message(channel_id: int, message_id: int):
+    async with pool.db_pool.acquire() as conn:
+        await conn.execute(
+            "DELETE FROM status_message WHERE channel_id = $1 AND message_id = $2",
+            channel_id, message_id
+        )
@@ -1,10 +1,46 @@
+import asyncio
 import asyncpg
 import logging
+from db.counters import ensure_counter_schema
+from utils.tracing import span, current_span
 from config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD
 
 db_pool = None
 
 
+
+class TracedConnection(asyncpg.Connection):
+
+    """
+    Connection recording every query as a "db <OPERATION>" span of the current trace.
+
+    Queries run outside of a trace (background tasks, startup) are not recorded.
+    """
+
+    async def _traced(self, method, query: str, *args, **kwargs):
+        if current_span() is None:
+            return await method(query, *args, **kwargs)
+        statement = " ".join(query.split())
+        operation = statement.split(" ", 1)[0].upper()
+        with span(f"db {operation}", **{"db.system": "postgresql", "db.statement": statement[:200]}):
+            return await method(query, *args, **kwargs)
+
+    async def execute(self, query: str, *args, **kwargs):
+        return await self._traced(super().execute, query, *args, **kwargs)
+
+    async def executemany(self, command: str, args, **kwargs):
+        return await self._traced(super().executemany, command, args, **kwargs)
+
+    async def fetch(self, query: str, *args, **kwargs):
+        return await self._traced(super().fetch, query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        return await self._traced(super().fetchrow, query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        return await self._traced(super().fetchval, query, *args, **kwargs)
+
+
 async def init_db():
     
     """
@@ -12,7 +48,9 @@ async def init_db():
 
     This function sets up a global asyncpg connection pool with a size between 1 and 10 
     connections. It ensures that the 'sessions' and 'negotiation_links' tables exist 
-    in the database before the application starts.
+    in the database before the application starts, together with the incrementally 
+    maintained 'bot_counters' used by /admin stats. Calling it again once the pool 
+    exists returns the existing pool.
 
     Returns:
         asyncpg.pool.Pool|None: The initialized database pool object, or None if initialization fails.
@@ -22,6 +60,10 @@ async def init_db():
     """
     
     global db_pool
+
+    if db_pool is not None:
+        return db_pool
+
     try:
         db_pool = await asyncpg.create_pool(
             host=DB_HOST,
@@ -31,6 +73,7 @@ async def init_db():
             database=DB_NAME,
             min_size=1,
             max_size=10,
+            connection_class=TracedConnection,
         )
 
         async with db_pool.acquire() as conn:
@@ -71,6 +114,22 @@ async def init_db():
                     lang TEXT NOT NULL
                 );             
             """)
+
+            # One status board per (guild, channel, language)
+            await conn.execute("""
+                ALTER TABLE status_message ADD COLUMN IF NOT EXISTS guild_id BIGINT;
+            """)
+
+            await conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS status_message_board_idx
+                ON status_message (guild_id, channel_id, lang) NULLS NOT DISTINCT;
+            """)
+
+            # Boards used to be saved with an explicit id = 1: move the sequence past them
+            await conn.execute("""
+                SELECT setval(pg_get_serial_sequence('status_message', 'id'), COALESCE(MAX(id), 1))
+                FROM status_message;
+            """)
             
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS bot_status (
@@ -81,6 +140,87 @@ async def init_db():
                     maintenance_end timestamptz
                 );
             """)
+            
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS broadcast_jobs (
+                    id SERIAL PRIMARY KEY,
+                    message TEXT NOT NULL,
+                    created_by TEXT,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    total INT DEFAULT 0,
+                    sent INT DEFAULT 0,
+                    failed INT DEFAULT 0,
+                    cursor_lang TEXT DEFAULT '',
+                    cursor_user_id TEXT DEFAULT '',
+                    created_at timestamptz DEFAULT NOW(),
+                    updated_at timestamptz DEFAULT NOW()
+                );
+            """)
+            
+            await conn.execute("""
+                ALTER TABLE sessions
+                    ADD COLUMN IF NOT EXISTS last_activity timestamptz DEFAULT NOW(),
+                    ADD COLUMN IF NOT EXISTS thread_archived BOOLEAN DEFAULT FALSE,
+                    ADD COLUMN IF NOT EXISTS parent_channel_id BIGINT,
+                    ADD COLUMN IF NOT EXISTS coalesce_replies BOOLEAN DEFAULT FALSE;
+            """)
+
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS sessions_idle_threads_idx
+                ON sessions (last_activity)
+                WHERE thread_id IS NOT NULL AND NOT thread_archived;
+            """)
+
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS sessions_parent_channel_idx
+                ON sessions (parent_channel_id)
+                WHERE thread_id IS NOT NULL AND NOT thread_archived;
+            """)
+
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS sessions_language_user_idx
+                ON sessions ((COALESCE(language, 'en')), user_id);
+            """)
+            
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS bot_settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    updated_at timestamptz DEFAULT NOW()
+                );
+            """)
+
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS guild_settings (
+                    guild_id BIGINT PRIMARY KEY,
+                    manager_role_name TEXT,
+                    user_role_name TEXT
+                );
+            """)
+
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS uex_processed_events (
+                    event_key TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    processed_at timestamptz DEFAULT NOW()
+                );
+            """)
+
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS uex_processed_events_at_idx
+                ON uex_processed_events (processed_at);
+            """)
+
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS uex_notification_cursors (
+                    user_id TEXT PRIMARY KEY,
+                    last_id BIGINT NOT NULL,
+                    updated_at timestamptz DEFAULT NOW()
+                );
+            """)
+
+            await ensure_counter_schema(conn)
 
         logging.info("📦 Database initialized and ready")
         return db_pool
@@ -89,3 +229,31 @@ async def init_db():
         logging.exception(f"❌ Error initializing DB: {e}")
         db_pool = None
         raise
+
+
+async def close_db(timeout: float = 5):
+
+    """
+    Closes the database connection pool.
+
+    Waits up to `timeout` seconds for the connections in use to be released, then
+    terminates them. Calling it again once the pool is closed has no effect.
+
+    Args:
+        timeout (float): Maximum time to wait for a graceful close, in seconds.
+
+    Returns:
+        None
+    """
+
+    global db_pool
+
+    if db_pool is None:
+        return
+
+    closing, db_pool = db_pool, None
+    try:
+        await asyncio.wait_for(closing.close(), timeout=timeout)
+    except asyncio.TimeoutError:
+        logging.warning("⚠️ Database pool not closed within %.0fs, terminating it", timeout)
+        closing.terminate()
@@ -1,6 +1,7 @@
 import discord
 import logging
 import db.pool
+from datetime import datetime
 from utils.cryptography import encrypt,decrypt
 
 
@@ -13,6 +14,8 @@ async def save_user_session(
     enable: bool | None = None,
     welcome_message: str | None = None,
     language: str | None = None,
+    parent_channel_id: int | None = None,
+    coalesce_replies: bool | None = None,
 ):
     
     """
@@ -27,6 +30,8 @@ async def save_user_session(
         enable (bool | None): Whether automated messages are enabled.
         welcome_message (str | None): The custom message sent to new buyers.
         language (str | None): The preferred language code (e.g., 'en', 'it').
+        parent_channel_id (int | None): The channel the user's thread was created in.
+        coalesce_replies (bool | None): Whether consecutive replies are merged into one UEX message.
 
     Returns:
         None
@@ -52,9 +57,11 @@ async def save_user_session(
                 secret_key,
                 enable,
                 welcome_message,
-                language
+                language,
+                parent_channel_id,
+                coalesce_replies
             )
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
             ON CONFLICT (user_id)
             DO UPDATE SET
                 thread_id = COALESCE(EXCLUDED.thread_id, sessions.thread_id),
@@ -64,6 +71,8 @@ async def save_user_session(
                 enable = COALESCE(EXCLUDED.enable, sessions.enable),
                 welcome_message = COALESCE(EXCLUDED.welcome_message, sessions.welcome_message),
                 language = COALESCE(EXCLUDED.language, sessions.language),
+                parent_channel_id = COALESCE(EXCLUDED.parent_channel_id, sessions.parent_channel_id),
+                coalesce_replies = COALESCE(EXCLUDED.coalesce_replies, sessions.coalesce_replies),
                 last_update = NOW()
             """,
             user_id,
@@ -73,7 +82,9 @@ async def save_user_session(
             encrypted_secret,
             enable,
             welcome_message,
-            language
+            language,
+            parent_channel_id,
+            coalesce_replies
         )
 
     logging.info(f"💾 Session saved for {user_id}")
@@ -329,4 +340,116 @@ async def remove_sessions_by_thread(thread_id: int) -> int:
         import logging
         logging.exception(f"💥 Error removing sessions by thread {thread_id}: {e}")
     
-    return removed_count      
+    return removed_count
+
+
+async def touch_threads(activity: dict[int, datetime]):
+
+    """
+    Records the last activity of several threads in one statement.
+
+    A touched thread is also marked as not archived, since activity reopens it.
+
+    Args:
+        activity (dict[int, datetime]): The last activity time by thread ID.
+
+    Returns:
+        None
+    """
+
+    if not activity:
+        return
+
+    async with db.pool.db_pool.acquire() as conn:
+        await conn.execute(
+            """
+            UPDATE sessions s
+            SET last_activity = GREATEST(s.last_activity, a.at),
+                thread_archived = FALSE
+            FROM unnest($1::bigint[], $2::timestamptz[]) AS a(thread_id, at)
+            WHERE s.thread_id = a.thread_id
+            """,
+            list(activity.keys()),
+            list(activity.values())
+        )
+
+
+async def get_idle_threads(idle_since: datetime, limit: int) -> list[int]:
+
+    """
+    Retrieves the open threads with no activity since a given time, the oldest first.
+
+    Args:
+        idle_since (datetime): Threads last active before this time are idle.
+        limit (int): The maximum number of threads to return.
+
+    Returns:
+        list[int]: The idle thread IDs.
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT thread_id FROM sessions
+            WHERE thread_id IS NOT NULL
+              AND NOT thread_archived
+              AND last_activity < $1
+            ORDER BY last_activity
+            LIMIT $2
+            """,
+            idle_since,
+            limit
+        )
+    return [row["thread_id"] for row in rows]
+
+
+async def mark_threads_archived(thread_ids: list[int]):
+
+    """
+    Marks threads as archived, so the archiver skips them until their next activity.
+
+    Args:
+        thread_ids (list[int]): The archived thread IDs.
+
+    Returns:
+        None
+    """
+
+    if not thread_ids:
+        return
+
+    async with db.pool.db_pool.acquire() as conn:
+        await conn.execute(
+            "UPDATE sessions SET thread_archived = TRUE WHERE thread_id = ANY($1::bigint[])",
+            list(thread_ids)
+        )
+
+
+async def count_threads_by_parent(channel_ids: list[int]) -> dict[int, int]:
+
+    """
+    Counts the open (not archived) user threads of each parent channel.
+
+    Args:
+        channel_ids (list[int]): The parent channel IDs.
+
+    Returns:
+        dict[int, int]: The number of open threads by parent channel ID, 0 included.
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT parent_channel_id, COUNT(*) AS threads FROM sessions
+            WHERE parent_channel_id = ANY($1::bigint[])
+              AND thread_id IS NOT NULL
+              AND NOT thread_archived
+            GROUP BY parent_channel_id
+            """,
+            list(channel_ids)
+        )
+
+    counts = {channel_id: 0 for channel_id in channel_ids}
+    counts.update({row["parent_channel_id"]: row["threads"] for row in rows})
+    return counts
+
@@ -0,0 +1,43 @@
+import db.pool
+
+
+
+async def get_setting(key: str) -> str | None:
+
+    """
+    Retrieves a persisted bot setting.
+
+    Args:
+        key (str): The setting name.
+
+    Returns:
+        str | None: The stored value, or None if the setting was never written.
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        return await conn.fetchval("SELECT value FROM bot_settings WHERE key = $1", key)
+
+
+async def set_setting(key: str, value: str):
+
+    """
+    Stores (or replaces) a persisted bot setting.
+
+    Args:
+        key (str): The setting name.
+        value (str): The value to store.
+
+    Returns:
+        None
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        await conn.execute(
+            """
+            INSERT INTO bot_settings (key, value, updated_at)
+            VALUES ($1, $2, NOW())
+            ON CONFLICT (key) DO UPDATE SET value = $2, updated_at = NOW()
+            """,
+            key,
+            value
+        )
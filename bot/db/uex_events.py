@@ -0,0 +1,139 @@
+import db.pool
+from datetime import datetime
+from utils.cryptography import decrypt
+
+
+
+async def claim_event(event_key: str, user_id: str, source: str) -> str | None:
+
+    """
+    Records an event as delivered, unless it already was.
+
+    Args:
+        event_key (str): The event fingerprint.
+        user_id (str): The Discord user ID the event belongs to.
+        source (str): Where the event came from ('webhook' or 'reconciler').
+
+    Returns:
+        str | None: The source of the earlier delivery if the event was already
+            recorded, None if this call recorded it.
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        inserted = await conn.fetchval(
+            """
+            INSERT INTO uex_processed_events (event_key, user_id, source)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (event_key) DO NOTHING
+            RETURNING TRUE
+            """,
+            event_key,
+            str(user_id),
+            source
+        )
+        if inserted:
+            return None
+
+        return await conn.fetchval(
+            "SELECT source FROM uex_processed_events WHERE event_key = $1",
+            event_key
+        )
+
+
+async def release_event(event_key: str):
+
+    """
+    Forgets a recorded event whose delivery failed, so it can be delivered again.
+
+    Args:
+        event_key (str): The event fingerprint.
+
+    Returns:
+        None
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        await conn.execute("DELETE FROM uex_processed_events WHERE event_key = $1", event_key)
+
+
+async def prune_events(before: datetime) -> int:
+
+    """
+    Deletes the events recorded before a given time.
+
+    Args:
+        before (datetime): Events recorded earlier are deleted.
+
+    Returns:
+        int: The number of deleted events.
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        result = await conn.execute(
+            "DELETE FROM uex_processed_events WHERE processed_at < $1",
+            before
+        )
+    return int(result.split()[-1])
+
+
+async def get_reconcile_targets() -> list[dict]:
+
+    """
+    Lists the users whose UEX notifications can be pulled: stored credentials and a thread.
+
+    Returns:
+        list[dict]: One dict per user with 'user_id', 'bearer_token', 'secret_key'
+            (decrypted) and 'cursor' (the last notification ID pulled, None if never).
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT s.user_id, s.bearer_token, s.secret_key, c.last_id
+            FROM sessions s
+            LEFT JOIN uex_notification_cursors c ON c.user_id = s.user_id
+            WHERE s.thread_id IS NOT NULL
+              AND COALESCE(s.bearer_token, '') <> ''
+              AND COALESCE(s.secret_key, '') <> ''
+            ORDER BY s.user_id
+            """
+        )
+
+    targets = []
+    for row in rows:
+        bearer, secret = decrypt(row["bearer_token"]), decrypt(row["secret_key"])
+        if bearer and secret:
+            targets.append({
+                "user_id": row["user_id"],
+                "bearer_token": bearer,
+                "secret_key": secret,
+                "cursor": row["last_id"],
+            })
+    return targets
+
+
+async def set_notification_cursor(user_id: str, last_id: int):
+
+    """
+    Stores the last UEX notification pulled for a user.
+
+    Args:
+        user_id (str): The Discord user ID.
+        last_id (int): The ID of the last notification handled.
+
+    Returns:
+        None
+    """
+
+    async with db.pool.db_pool.acquire() as conn:
+        await conn.execute(
+            """
+            INSERT INTO uex_notification_cursors (user_id, last_id, updated_at)
+            VALUES ($1, $2, NOW())
+            ON CONFLICT (user_id) DO UPDATE
+                SET last_id = GREATEST(uex_notification_cursors.last_id, EXCLUDED.last_id),
+                    updated_at = NOW()
+            """,
+            str(user_id),
+            last_id
+        )
@@ -0,0 +1,48 @@
+"""Broadcast jobs
+
+Revision ID: 34f687c398c1
+Revises: 9d803f2ed00e
+Create Date: 2026-10-19 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '34f687c398c1'
+down_revision: Union[str, Sequence[str], None] = '9d803f2ed00e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. broadcast_jobs
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS broadcast_jobs (
+            id SERIAL PRIMARY KEY,
+            message TEXT NOT NULL,
+            created_by TEXT,
+            status TEXT NOT NULL DEFAULT 'running',
+            total INT DEFAULT 0,
+            sent INT DEFAULT 0,
+            failed INT DEFAULT 0,
+            cursor_lang TEXT DEFAULT '',
+            cursor_user_id TEXT DEFAULT '',
+            created_at timestamptz DEFAULT NOW(),
+            updated_at timestamptz DEFAULT NOW()
+        );
+    """)
+
+    # 2. recipients are paged by (language, user_id)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS sessions_language_user_idx
+        ON sessions ((COALESCE(language, 'en')), user_id);
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS sessions_language_user_idx;")
+    op.execute("DROP TABLE IF EXISTS broadcast_jobs;")
@@ -0,0 +1,140 @@
+"""Incremental bot counters
+
+Revision ID: 4a116e9c737d
+Revises: 34f687c398c1
+Create Date: 2026-10-19 10:03:17.582211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a116e9c737d'
+down_revision: Union[str, Sequence[str], None] = '34f687c398c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Counter tables, trigger functions, one-off seeding and triggers
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS bot_counters (
+            key TEXT PRIMARY KEY,
+            value BIGINT NOT NULL DEFAULT 0
+        );
+    """)
+
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS bot_counter_buckets (
+            key TEXT NOT NULL,
+            bucket timestamptz NOT NULL,
+            value BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (key, bucket)
+        );
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bot_counter_add(counter_key TEXT, delta BIGINT) RETURNS void AS $$
+        BEGIN
+            INSERT INTO bot_counters (key, value) VALUES (counter_key, delta)
+            ON CONFLICT (key) DO UPDATE SET value = bot_counters.value + EXCLUDED.value;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bot_counters_sessions() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM bot_counter_add('sessions.total', 1);
+                IF NEW.thread_id IS NOT NULL THEN
+                    PERFORM bot_counter_add('sessions.threads', 1);
+                END IF;
+                INSERT INTO bot_counter_buckets (key, bucket, value)
+                VALUES ('users.new', date_trunc('day', NOW()), 1)
+                ON CONFLICT (key, bucket) DO UPDATE SET value = bot_counter_buckets.value + 1;
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM bot_counter_add('sessions.total', -1);
+                IF OLD.thread_id IS NOT NULL THEN
+                    PERFORM bot_counter_add('sessions.threads', -1);
+                END IF;
+            ELSIF (OLD.thread_id IS NULL) <> (NEW.thread_id IS NULL) THEN
+                PERFORM bot_counter_add('sessions.threads', CASE WHEN NEW.thread_id IS NULL THEN -1 ELSE 1 END);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bot_counters_rows() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM bot_counter_add(TG_ARGV[0], 1);
+            ELSE
+                PERFORM bot_counter_add(TG_ARGV[0], -1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        INSERT INTO bot_counters (key, value)
+        SELECT 'sessions.total', (SELECT COUNT(*) FROM sessions)
+        WHERE NOT EXISTS (SELECT 1 FROM bot_counters WHERE key = 'sessions.total')
+        ON CONFLICT (key) DO NOTHING;
+    """)
+
+    op.execute("""
+        INSERT INTO bot_counters (key, value)
+        SELECT 'sessions.threads', (SELECT COUNT(*) FROM sessions WHERE thread_id IS NOT NULL)
+        WHERE NOT EXISTS (SELECT 1 FROM bot_counters WHERE key = 'sessions.threads')
+        ON CONFLICT (key) DO NOTHING;
+    """)
+
+    op.execute("""
+        INSERT INTO bot_counters (key, value)
+        SELECT 'negotiations.active', (SELECT COUNT(*) FROM negotiation_links)
+        WHERE NOT EXISTS (SELECT 1 FROM bot_counters WHERE key = 'negotiations.active')
+        ON CONFLICT (key) DO NOTHING;
+    """)
+
+    op.execute("""
+        INSERT INTO bot_counters (key, value)
+        SELECT 'banned.total', (SELECT COUNT(*) FROM banned_users)
+        WHERE NOT EXISTS (SELECT 1 FROM bot_counters WHERE key = 'banned.total')
+        ON CONFLICT (key) DO NOTHING;
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE TRIGGER sessions_counters
+        AFTER INSERT OR DELETE OR UPDATE OF thread_id ON sessions
+        FOR EACH ROW EXECUTE FUNCTION bot_counters_sessions();
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE TRIGGER negotiation_links_counters
+        AFTER INSERT OR DELETE ON negotiation_links
+        FOR EACH ROW EXECUTE FUNCTION bot_counters_rows('negotiations.active');
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE TRIGGER banned_users_counters
+        AFTER INSERT OR DELETE ON banned_users
+        FOR EACH ROW EXECUTE FUNCTION bot_counters_rows('banned.total');
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS banned_users_counters ON banned_users;")
+    op.execute("DROP TRIGGER IF EXISTS negotiation_links_counters ON negotiation_links;")
+    op.execute("DROP TRIGGER IF EXISTS sessions_counters ON sessions;")
+    op.execute("DROP FUNCTION IF EXISTS bot_counters_rows();")
+    op.execute("DROP FUNCTION IF EXISTS bot_counters_sessions();")
+    op.execute("DROP FUNCTION IF EXISTS bot_counter_add(TEXT, BIGINT);")
+    op.execute("DROP TABLE IF EXISTS bot_counter_buckets;")
+    op.execute("DROP TABLE IF EXISTS bot_counters;")
@@ -0,0 +1,51 @@
+"""UEX event reconciliation
+
+Revision ID: a7d25e9c4f10
+Revises: f3c61d8e2b45
+Create Date: 2026-10-19 18:24:07.512930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d25e9c4f10'
+down_revision: Union[str, Sequence[str], None] = 'f3c61d8e2b45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. events already delivered, by webhook or by the reconciliation poller
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS uex_processed_events (
+            event_key TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            source TEXT NOT NULL,
+            processed_at timestamptz DEFAULT NOW()
+        );
+    """)
+
+    # 2. pruning of the events older than the deduplication window
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS uex_processed_events_at_idx
+        ON uex_processed_events (processed_at);
+    """)
+
+    # 3. last UEX notification pulled for each user
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS uex_notification_cursors (
+            user_id TEXT PRIMARY KEY,
+            last_id BIGINT NOT NULL,
+            updated_at timestamptz DEFAULT NOW()
+        );
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS uex_notification_cursors;")
+    op.execute("DROP INDEX IF EXISTS uex_processed_events_at_idx;")
+    op.execute("DROP TABLE IF EXISTS uex_processed_events;")
@@ -0,0 +1,40 @@
+"""Status boards per guild, channel and language
+
+Revision ID: b7c2e5d90a41
+Revises: 4a116e9c737d
+Create Date: 2026-10-19 11:02:17.538204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c2e5d90a41'
+down_revision: Union[str, Sequence[str], None] = '4a116e9c737d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. guild of each status board
+    op.execute("ALTER TABLE status_message ADD COLUMN IF NOT EXISTS guild_id BIGINT;")
+
+    # 2. one board per (guild, channel, language)
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS status_message_board_idx
+        ON status_message (guild_id, channel_id, lang) NULLS NOT DISTINCT;
+    """)
+
+    # 3. boards used to be saved with an explicit id = 1: move the sequence past them
+    op.execute("""
+        SELECT setval(pg_get_serial_sequence('status_message', 'id'), COALESCE(MAX(id), 1))
+        FROM status_message;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS status_message_board_idx;")
+    op.execute("ALTER TABLE status_message DROP COLUMN IF EXISTS guild_id;")
@@ -0,0 +1,27 @@
+"""Coalesce replies
+
+Revision ID: b8e36f0d5a21
+Revises: a7d25e9c4f10
+Create Date: 2026-10-19 19:12:55.804217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e36f0d5a21'
+down_revision: Union[str, Sequence[str], None] = 'a7d25e9c4f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. opt-in merging of consecutive replies into one UEX message
+    op.execute("ALTER TABLE sessions ADD COLUMN IF NOT EXISTS coalesce_replies BOOLEAN DEFAULT FALSE;")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE sessions DROP COLUMN IF EXISTS coalesce_replies;")
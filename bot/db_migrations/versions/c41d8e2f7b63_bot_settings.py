@@ -0,0 +1,33 @@
+"""Bot settings
+
+Revision ID: c41d8e2f7b63
+Revises: b7c2e5d90a41
+Create Date: 2026-10-19 12:24:51.903117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e2f7b63'
+down_revision: Union[str, Sequence[str], None] = 'b7c2e5d90a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. bot_settings
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS bot_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at timestamptz DEFAULT NOW()
+        );
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS bot_settings;")
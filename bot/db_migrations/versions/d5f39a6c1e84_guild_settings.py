@@ -0,0 +1,33 @@
+"""Guild settings
+
+Revision ID: d5f39a6c1e84
+Revises: c41d8e2f7b63
+Create Date: 2026-10-19 14:08:33.716240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f39a6c1e84'
+down_revision: Union[str, Sequence[str], None] = 'c41d8e2f7b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. guild_settings
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS guild_settings (
+            guild_id BIGINT PRIMARY KEY,
+            manager_role_name TEXT,
+            user_role_name TEXT
+        );
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS guild_settings;")
@@ -0,0 +1,40 @@
+"""Thread activity
+
+Revision ID: e8b24f1c9a07
+Revises: d5f39a6c1e84
+Create Date: 2026-10-19 16:21:05.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b24f1c9a07'
+down_revision: Union[str, Sequence[str], None] = 'd5f39a6c1e84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. last activity and archive state of each thread
+    op.execute("""
+        ALTER TABLE sessions
+            ADD COLUMN IF NOT EXISTS last_activity timestamptz DEFAULT NOW(),
+            ADD COLUMN IF NOT EXISTS thread_archived BOOLEAN DEFAULT FALSE;
+    """)
+
+    # 2. open threads by idle time, scanned by the archiver
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS sessions_idle_threads_idx
+        ON sessions (last_activity)
+        WHERE thread_id IS NOT NULL AND NOT thread_archived;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS sessions_idle_threads_idx;")
+    op.execute("ALTER TABLE sessions DROP COLUMN IF EXISTS thread_archived;")
+    op.execute("ALTER TABLE sessions DROP COLUMN IF EXISTS last_activity;")
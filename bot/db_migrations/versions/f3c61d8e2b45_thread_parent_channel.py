@@ -0,0 +1,35 @@
+"""Thread parent channel
+
+Revision ID: f3c61d8e2b45
+Revises: e8b24f1c9a07
+Create Date: 2026-10-19 17:02:41.119354
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c61d8e2b45'
+down_revision: Union[str, Sequence[str], None] = 'e8b24f1c9a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. parent channel of each user thread
+    op.execute("ALTER TABLE sessions ADD COLUMN IF NOT EXISTS parent_channel_id BIGINT;")
+
+    # 2. open threads by parent, counted by the placement policy
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS sessions_parent_channel_idx
+        ON sessions (parent_channel_id)
+        WHERE thread_id IS NOT NULL AND NOT thread_archived;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS sessions_parent_channel_idx;")
+    op.execute("ALTER TABLE sessions DROP COLUMN IF EXISTS parent_channel_id;")
@@ -0,0 +1,458 @@
+"""
+Local UEX simulator: a fake of the UEX API endpoints used by the bot, and a driver
+sending it the UEX webhooks, to reproduce production load patterns offline.
+
+The fake API (aiohttp) answers, under /2.0:
+- GET  /user/?username=...                 credentials check and username lookup;
+- POST /marketplace_negotiations_messages/ replies posted by the bot;
+- GET  /user_notifications/?id_after=...   the events of a user, for the reconciler.
+Every answer goes through the fault model: a latency drawn from a distribution,
+a 5xx error rate and periodic 429 bursts (with Retry-After). GET /_sim/stats
+reports what the API received and returned.
+
+The scenario models N users (sellers) x M negotiations x K messages: for each
+negotiation the buyer opens it (negotiation_started), buyer and seller exchange
+K messages (user_reply) and the negotiation completes (negotiation_completed_client
+or negotiation_completed_advertiser). Each event is recorded as a notification of
+the seller and POSTed to the bot's /webhook/{event_type}/{user_id} route, unless
+dropped (--drop-rate) to exercise the reconciler.
+
+Point the bot at the simulator with UEX_API_BASE=http://localhost:<port>/2.0; the
+users' bearer tokens are accepted whatever they are (--strict-tokens to only accept
+sim-token-<user>).
+
+Usage (from bot/):
+    python -m devtools.uex_simulator [--port 8090] [--latency lognormal:80,0.6]
+        [--error-rate 0.02] [--burst-every 60 --burst-length 5]
+        [--bot-url http://localhost:20187 --users 20 --negotiations 3 --messages 5]
+
+Latency distributions, in milliseconds: fixed:50, uniform:20-200, exp:80,
+lognormal:80,0.6 (median, sigma).
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import itertools
+from collections import Counter, defaultdict
+
+import aiohttp
+from aiohttp import web
+
+
+EVENT_TYPES = (
+    "negotiation_started",
+    "user_reply",
+    "negotiation_completed_client",
+    "negotiation_completed_advertiser",
+)
+
+
+class LatencyModel:
+
+    """Latency distribution parsed from a spec such as 'lognormal:80,0.6' (milliseconds)."""
+
+    def __init__(self, spec: str = "fixed:0", rng: random.Random | None = None):
+        self.spec = spec
+        self.rng = rng or random.Random()
+        kind, _, args = spec.partition(":")
+        values = [float(v) for v in args.replace("-", ",").split(",") if v] or [0.0]
+
+        if kind == "fixed":
+            self._sample = lambda: values[0]
+        elif kind == "uniform":
+            self._sample = lambda: self.rng.uniform(values[0], values[1])
+        elif kind == "exp":
+            self._sample = lambda: self.rng.expovariate(1 / values[0]) if values[0] else 0.0
+        elif kind == "lognormal":
+            mu, sigma = math.log(max(values[0], 1e-3)), values[1] if len(values) > 1 else 0.5
+            self._sample = lambda: self.rng.lognormvariate(mu, sigma)
+        else:
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        return max(0.0, self._sample()) / 1000
+
+
+class FaultModel:
+
+    """5xx error rate and periodic 429 bursts: `burst_length` seconds every `burst_every` seconds."""
+
+    def __init__(
+        self,
+        error_rate: float = 0.0,
+        burst_every: float = 0.0,
+        burst_length: float = 0.0,
+        rng: random.Random | None = None,
+    ):
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.rng = rng or random.Random()
+        self.started = time.monotonic()
+
+    def retry_after(self) -> float | None:
+        # Seconds until the current 429 burst ends, None outside bursts
+        if not self.burst_every or not self.burst_length:
+            return None
+        phase = (time.monotonic() - self.started) % self.burst_every
+        if phase < self.burst_length:
+            return self.burst_length - phase
+        return None
+
+    def server_error(self) -> bool:
+        return self.rng.random() < self.error_rate
+
+
+class UexSimulator:
+
+    """
+    Fake UEX API and webhook driver.
+
+    Attributes:
+        latency (LatencyModel): Latency added to every API answer.
+        faults (FaultModel): Errors and 429 bursts of the API.
+        pad_bytes (int): Padding added to every JSON answer, to model payload sizes.
+        strict_tokens (bool): Only accept the bearer tokens `sim-token-<user_id>`.
+        stats (Counter): Requests received and answers returned, by kind.
+    """
+
+    def __init__(
+        self,
+        latency: LatencyModel | None = None,
+        faults: FaultModel | None = None,
+        pad_bytes: int = 0,
+        strict_tokens: bool = False,
+        seed: int | None = None,
+    ):
+        self.rng = random.Random(seed)
+        self.latency = latency or LatencyModel(rng=self.rng)
+        self.faults = faults or FaultModel(rng=self.rng)
+        self.pad_bytes = pad_bytes
+        self.strict_tokens = strict_tokens
+        self.stats = Counter()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.notifications: dict[str, list[dict]] = defaultdict(list)
+        self.messages: list[dict] = []
+        self._ids = itertools.count(1)
+        self._runner: web.AppRunner | None = None
+        self.base_url: str | None = None
+
+    # ----- fake API -----
+
+    def _json(self, data: dict, status: int = 200, headers: dict | None = None) -> web.Response:
+        if self.pad_bytes:
+            data = {**data, "padding": "x" * self.pad_bytes}
+        return web.Response(
+            body=json.dumps(data).encode(),
+            status=status,
+            headers={"Content-Type": "application/json", **(headers or {})},
+        )
+
+    def _user_id(self, request: web.Request) -> str | None:
+        # The bearer token stands for the user: sim-token-<user_id>, or anything when not strict
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if token.startswith("sim-token-"):
+            return token.removeprefix("sim-token-")
+        if self.strict_tokens or not token:
+            return None
+        return token
+
+    @web.middleware
+    async def _faults(self, request: web.Request, handler):
+        if request.path.startswith("/_sim/"):
+            return await handler(request)
+
+        route = request.path.rstrip("/").rsplit("/", 1)[-1]
+        self.stats[f"{route}.requests"] += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.sleep(self.latency.sample())
+
+            retry_after = self.faults.retry_after()
+            if retry_after is not None:
+                self.stats[f"{route}.429"] += 1
+                return self._json(
+                    {"status": "error", "message": "too_many_requests"},
+                    status=429,
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+            if self.faults.server_error():
+                self.stats[f"{route}.5xx"] += 1
+                return self._json({"status": "error", "message": "internal_error"}, status=503)
+            if self._user_id(request) is None:
+                self.stats[f"{route}.401"] += 1
+                return self._json({"status": "error", "message": "invalid_token"}, status=401)
+
+            response = await handler(request)
+            self.stats[f"{route}.{response.status}"] += 1
+            return response
+        finally:
+            self.latencies[route].append(time.perf_counter() - start)
+
+    async def get_user(self, request: web.Request) -> web.Response:
+        username = request.query.get("username") or f"user{self._user_id(request)}"
+        return self._json({"status": "ok", "data": {"username": username, "id": self._user_id(request)}})
+
+    async def post_message(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        if not payload.get("hash") or not payload.get("message"):
+            return self._json({"status": "error", "message": "missing_hash_or_message"}, status=400)
+        message_id = next(self._ids)
+        self.messages.append({"id": message_id, "user_id": self._user_id(request), **payload})
+        return self._json({"status": "ok", "data": {"id_message": message_id}})
+
+    async def get_notifications(self, request: web.Request) -> web.Response:
+        try:
+            after = int(request.query.get("id_after", 0))
+        except ValueError:
+            after = 0
+        notifications = [n for n in self.notifications[self._user_id(request)] if n["id"] > after]
+        return self._json({"status": "ok", "data": notifications})
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.report())
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._faults])
+        app.router.add_get("/2.0/user/", self.get_user)
+        app.router.add_post("/2.0/marketplace_negotiations_messages/", self.post_message)
+        app.router.add_get("/2.0/user_notifications/", self.get_notifications)
+        app.router.add_get("/_sim/stats", self.get_stats)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+
+        """
+        Starts the fake API.
+
+        Args:
+            host (str): The interface to bind.
+            port (int): The port, 0 for any free one.
+
+        Returns:
+            str: The base URL to use as UEX_API_BASE.
+        """
+
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{port}/2.0"
+        return self.base_url
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def report(self) -> dict:
+
+        """
+        Summarizes the traffic seen by the fake API.
+
+        Returns:
+            dict: Counters by route and answer, and per-route latency percentiles (ms).
+        """
+
+        latency = {}
+        for route, samples in self.latencies.items():
+            ordered = sorted(samples)
+            latency[route] = {
+                "p50_ms": ordered[len(ordered) // 2] * 1000,
+                "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            }
+        return {"counters": dict(self.stats), "latency": latency, "messages": len(self.messages)}
+
+    # ----- webhooks -----
+
+    def record_event(self, user_id: str, event_type: str, data: dict) -> dict:
+
+        """
+        Stores an event as a notification of the user, as UEX does for every webhook.
+
+        Args:
+            user_id (str): The Discord user ID the webhook is sent for.
+            event_type (str): One of EVENT_TYPES.
+            data (dict): The webhook payload.
+
+        Returns:
+            dict: The notification.
+        """
+
+        notification = {"id": next(self._ids), "type": event_type, "date_added": int(time.time()), **data}
+        self.notifications[str(user_id)].append(notification)
+        return notification
+
+    async def emit(
+        self,
+        session: aiohttp.ClientSession,
+        bot_url: str,
+        user_id: str,
+        event_type: str,
+        data: dict,
+        drop_rate: float = 0.0,
+    ) -> int | None:
+
+        """
+        Records an event and POSTs it to the bot's webhook route.
+
+        Args:
+            session (aiohttp.ClientSession): The session used to call the bot.
+            bot_url (str): The bot's webhook server, e.g. http://localhost:20187.
+            user_id (str): The Discord user ID of the webhook URL.
+            event_type (str): One of EVENT_TYPES.
+            data (dict): The webhook payload.
+            drop_rate (float): Probability of not sending the webhook (the event stays
+                in the notifications).
+
+        Returns:
+            int | None: The bot's HTTP status, None if dropped or unreachable.
+        """
+
+        self.record_event(user_id, event_type, data)
+        if self.rng.random() < drop_rate:
+            self.stats["webhooks.dropped"] += 1
+            return None
+
+        start = time.perf_counter()
+        try:
+            async with session.post(f"{bot_url.rstrip('/')}/webhook/{event_type}/{user_id}", json=data) as resp:
+                status = resp.status
+        except aiohttp.ClientError:
+            status = None
+        self.latencies["webhooks"].append(time.perf_counter() - start)
+        self.stats[f"webhooks.{status or 'unreachable'}"] += 1
+        return status
+
+    async def run_scenario(
+        self,
+        bot_url: str,
+        users: int,
+        negotiations: int,
+        messages: int,
+        rate: float = 10.0,
+        message_size: int = 80,
+        drop_rate: float = 0.0,
+        first_user_id: int = 100_000,
+    ) -> dict:
+
+        """
+        Plays N users x M negotiations x K messages against the bot.
+
+        Negotiations run concurrently; webhooks are paced to `rate` per second overall.
+
+        Args:
+            bot_url (str): The bot's webhook server.
+            users (int): Number of sellers; user IDs start at `first_user_id`.
+            negotiations (int): Negotiations per seller.
+            messages (int): Messages per negotiation, alternating buyer and seller.
+            rate (float): Webhooks per second, all negotiations together.
+            message_size (int): Length of every message, in characters.
+            drop_rate (float): Probability of dropping each webhook.
+            first_user_id (int): Discord user ID of the first seller.
+
+        Returns:
+            dict: The traffic report (see `report()`).
+        """
+
+        interval = 1 / rate if rate > 0 else 0
+        next_slot = time.monotonic()
+        pace = asyncio.Lock()
+
+        async def paced_emit(session, user_id, event_type, data):
+            nonlocal next_slot
+            async with pace:
+                delay = next_slot - time.monotonic()
+                next_slot = max(next_slot, time.monotonic()) + interval
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.emit(session, bot_url, user_id, event_type, data, drop_rate)
+
+        async def negotiation(session, seller_index, negotiation_index):
+            user_id = str(first_user_id + seller_index)
+            seller = f"seller{seller_index}"
+            buyer = f"buyer{seller_index}_{negotiation_index}"
+            base = {
+                "negotiation_hash": f"sim{seller_index:05d}{negotiation_index:04d}",
+                "listing_owner_username": seller,
+                "client_username": buyer,
+                "listing_title": f"Listing {negotiation_index} of {seller}",
+            }
+
+            await paced_emit(session, user_id, "negotiation_started", base)
+            for k in range(messages):
+                author = buyer if k % 2 == 0 else seller
+                text = f"[{author} #{k}] " + "lorem ipsum " * (message_size // 12 + 1)
+                await paced_emit(session, user_id, "user_reply", {
+                    **base, "client_username": author, "message": text[:message_size],
+                })
+
+            completed = self.rng.choice(EVENT_TYPES[2:])
+            await paced_emit(session, user_id, completed, {
+                **base, "rating_stars": self.rng.randint(1, 5), "rating_comments": "sim",
+            })
+
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*(
+                negotiation(session, u, n) for u in range(users) for n in range(negotiations)
+            ))
+        return self.report()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="lognormal:80,0.6", help="API latency distribution, in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of API calls answered with a 503")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="seconds between two 429 bursts")
+    parser.add_argument("--burst-length", type=float, default=0.0, help="duration of a 429 burst, in seconds")
+    parser.add_argument("--pad-bytes", type=int, default=0, help="padding added to every API answer")
+    parser.add_argument("--strict-tokens", action="store_true", help="only accept the tokens sim-token-<user_id>")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--bot-url", help="the bot's webhook server; without it the API is only served")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--negotiations", type=int, default=2)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--rate", type=float, default=10, help="webhooks per second")
+    parser.add_argument("--message-size", type=int, default=80)
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of webhooks not sent")
+    parser.add_argument("--exit", action="store_true", help="stop once the scenario is over")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    simulator = UexSimulator(
+        latency=LatencyModel(args.latency, rng),
+        faults=FaultModel(args.error_rate, args.burst_every, args.burst_length, rng),
+        pad_bytes=args.pad_bytes,
+        strict_tokens=args.strict_tokens,
+        seed=args.seed,
+    )
+    base_url = await simulator.start(args.host, args.port)
+    print(f"UEX simulator on {base_url} (set UEX_API_BASE={base_url})", file=sys.stderr)
+
+    try:
+        if args.bot_url:
+            total = args.users * args.negotiations * (args.messages + 2)
+            print(f"Sending {total} webhooks to {args.bot_url} at {args.rate:g}/s", file=sys.stderr)
+            report = await simulator.run_scenario(
+                args.bot_url, args.users, args.negotiations, args.messages,
+                rate=args.rate, message_size=args.message_size, drop_rate=args.drop_rate,
+            )
+            print(json.dumps(report, indent=2))
+        if not args.exit:
+            await asyncio.Event().wait()
+    finally:
+        await simulator.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -1,3 +1,8 @@
-API_GET_USER = "https://api.uexcorp.uk/2.0/user/"
-API_NOTIFICATIONS = "https://api.uexcorp.uk/2.0/user_notifications/"
-API_POST_MESSAGE = "https://api.uexcorp.uk/2.0/marketplace_negotiations_messages/"
+import os
+
+# Point the bot at another UEX deployment, e.g. the local simulator (devtools/uex_simulator.py)
+UEX_API_BASE = os.getenv("UEX_API_BASE", "https://api.uexcorp.uk/2.0").rstrip("/")
+
+API_GET_USER = f"{UEX_API_BASE}/user/"
+API_NOTIFICATIONS = f"{UEX_API_BASE}/user_notifications/"
+API_POST_MESSAGE = f"{UEX_API_BASE}/marketplace_negotiations_messages/"
@@ -1,5 +1,6 @@
 import discord
 from discord.ext import commands
+from config import DISCORD_MEMBER_CACHE, DISCORD_CHUNK_GUILDS_AT_STARTUP, DISCORD_MAX_MESSAGES
 
 
 intents = discord.Intents.default()
@@ -8,18 +9,55 @@ intents.members = True
 
 
 
+def build_member_cache_flags(mode: str, intents: discord.Intents) -> discord.MemberCacheFlags:
+
+    """
+    Translates the DISCORD_MEMBER_CACHE mode into discord.py member cache flags.
+
+    The bot only needs the interacting member (sent with every interaction) and the 
+    occasional lazy fetch, so nothing is cached by default.
+
+    Args:
+        mode (str): 'none' (default), 'joined' (members seen through gateway events) 
+            or 'full' (every member, as allowed by the intents).
+        intents (discord.Intents): The gateway intents of the bot.
+
+    Returns:
+        discord.MemberCacheFlags: The flags to pass to the client.
+    """
+
+    if mode == "full":
+        return discord.MemberCacheFlags.from_intents(intents)
+    if mode == "joined":
+        return discord.MemberCacheFlags(voice=False, joined=True)
+    return discord.MemberCacheFlags.none()
+
+
+
 """
 Initializes the Discord Bot instance with required intents and configurations.
 
 This setup defines the gateway intents necessary for the bot to function, 
 specifically enabling access to message content and member events. It also 
 initializes the command prefix and an internationalization placeholder.
+The member cache, startup chunking and message cache are configurable: in large 
+guilds caching every member is the biggest memory cost and chunking delays 
+`on_ready` by minutes, while the bot only reads the interacting member.
 
 Args:
     command_prefix (str): The prefix used to trigger bot commands.
     intents (discord.Intents): The configured gateway intents for the bot.
+    member_cache_flags (discord.MemberCacheFlags): Which members are cached (DISCORD_MEMBER_CACHE).
+    chunk_guilds_at_startup (bool): Whether every guild's members are requested at startup.
+    max_messages (int | None): Size of the message cache, None to disable it (DISCORD_MAX_MESSAGES=0).
 
 Returns:
     commands.Bot: The configured Discord bot instance.
 """
-bot = commands.Bot(command_prefix="!", intents=intents)
\ No newline at end of file
+bot = commands.Bot(
+    command_prefix="!",
+    intents=intents,
+    member_cache_flags=build_member_cache_flags(DISCORD_MEMBER_CACHE, intents),
+    chunk_guilds_at_startup=DISCORD_CHUNK_GUILDS_AT_STARTUP,
+    max_messages=DISCORD_MAX_MESSAGES or None,
+)
@@ -0,0 +1,69 @@
+import json
+import hashlib
+import logging
+from discord import app_commands
+from db.settings import get_setting, set_setting
+
+
+COMMAND_TREE_HASH_KEY = "command_tree_hash"
+
+
+
+def command_tree_hash(tree: app_commands.CommandTree) -> str:
+
+    """
+    Computes a stable fingerprint of the global command tree.
+
+    The payload Discord receives on sync (names, descriptions, options, choices,
+    permissions and group contents) is serialized with sorted keys, so the hash only
+    changes when the commands do.
+
+    Args:
+        tree (app_commands.CommandTree): The command tree of the bot.
+
+    Returns:
+        str: The SHA-256 hex digest of the tree.
+    """
+
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands()),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def sync_commands(bot, force: bool = False) -> int | None:
+
+    """
+    Synchronizes the global slash commands only when the command tree changed.
+
+    Global syncs are rate-limited by Discord: the hash of the last synced tree is stored
+    in Postgres and compared on startup, so plain restarts skip the round trip.
+
+    Args:
+        bot (commands.Bot): The bot instance.
+        force (bool): Sync even if the stored hash matches.
+
+    Returns:
+        int | None: The number of synced commands, or None if the sync was skipped.
+    """
+
+    current = command_tree_hash(bot.tree)
+
+    if not force:
+        try:
+            if await get_setting(COMMAND_TREE_HASH_KEY) == current:
+                logging.info("✅ Commands unchanged, sync skipped.")
+                return None
+        except Exception as e:
+            logging.warning(f"⚠️ Unable to read the command tree hash, syncing anyway: {e}")
+
+    synced = await bot.tree.sync()
+    logging.info(f"✅ Commands synchronized ({len(synced)}).")
+
+    try:
+        await set_setting(COMMAND_TREE_HASH_KEY, current)
+    except Exception as e:
+        logging.warning(f"⚠️ Unable to store the command tree hash: {e}")
+
+    return len(synced)
@@ -1,17 +1,26 @@
+import io
 import discord
 import logging
 import db.pool as pool
 import db.banned as ban
+import db.broadcasts as broadcasts
+import db.counters as counters
 from utils.i18n import t
 import db.sessions as sessions
 from discord_bot.bot import bot
 from discord import app_commands
 from config import SYSTEM_LANGUAGE
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from db.maintenance import set_maintenance
-from utils.roles_management import has_uex_manager_role
+from services.broadcast import launch_broadcast
+from services.uex_client import get_uex_client
+from utils.threads import get_thread
+from utils.tracing import get_tracer
+from discord_bot.command_sync import sync_commands
+from db.guild_settings import set_guild_role_names
+from utils.roles_management import has_uex_manager_role, invalidate_guild_roles, get_role_names
 from discord_bot.views import OpenThreadButton, StatusView, MaintenanceModal
-from utils.status import build_status_embed, check_user_security, update_status_message
+from utils.status import build_status_embed, check_user_security, refresh_status_boards, register_status_message
 
 
 admin_group = app_commands.Group(
@@ -95,6 +104,48 @@ async def enable_welcome_mex(interaction: discord.Interaction, enable: bool):
     logging.info(f"💾 Welcome message {'enabled' if enable else 'disabled'} for {user_id}")
 
 
+@bot.tree.command(name="coalesce_replies", description="Merge consecutive replies to a negotiation into one message")
+@app_commands.describe(enable="True to merge replies written within a few seconds, False to send each one")
+async def coalesce_replies(interaction: discord.Interaction, enable: bool):
+
+    """
+    Enables or disables the merging of consecutive replies to the same negotiation.
+
+    While enabled, replies written in quick succession are collected under a single
+    "reply sent" embed and delivered to UEX as one message.
+
+    Args:
+        interaction (discord.Interaction): The interaction object for the slash command.
+        enable (bool): Set to True to enable, False to disable.
+
+    Returns:
+        None
+    """
+    sec = await check_user_security(interaction)
+    if not sec:
+        return
+
+    lang = await sessions.resolve_and_store_language(interaction)
+
+    user_id = str(interaction.user.id)
+
+    await sessions.save_user_session(
+        user_id=user_id,
+        coalesce_replies=enable
+    )
+
+    await interaction.response.send_message(
+        t(
+            lang,
+            "coalesce_toggle",
+            status=t(lang, "enabled") if enable else t(lang, "disabled")
+        ),
+        ephemeral=True
+    )
+
+    logging.info(f"💾 Reply merging {'enabled' if enable else 'disabled'} for {user_id}")
+
+
 
 
 ############  Admin Only Command  ############
@@ -137,9 +188,6 @@ async def add_button(
     Returns:
         None
     """
-    from db.maintenance import save_status_message
-    
-    
     lang = language.value
 
     try:
@@ -147,7 +195,7 @@ async def add_button(
         embed_status = await build_status_embed(lang=lang)
         msg = await interaction.channel.send(embed=embed_status, view=StatusView())
         
-        await save_status_message(interaction.channel.id, msg.id, lang=lang)        
+        await register_status_message(msg, lang, embed_status)
         
         view = OpenThreadButton(lang=lang)
 
@@ -184,7 +232,9 @@ async def add_button(
 async def stats(interaction: discord.Interaction):
     
     """
-    Displays bot statistics including total registered users and active threads.
+    Displays bot statistics: registered users, active threads and negotiations, bans,
+    webhook traffic, UEX delivery rate and the new-user trend.
+    Reads the incremental counters, so the cost does not grow with the tables.
     Requires 'Manage Guild' permissions.
 
     Args:
@@ -207,14 +257,14 @@ async def stats(interaction: discord.Interaction):
         return
 
     try:
-        async with pool.db_pool.acquire() as conn:
-            # Total number of registered users
-            users_count = await conn.fetchval("SELECT COUNT(*) FROM sessions")
-            
-            # number of active threads (non-null thread_id)
-            threads_active = await conn.fetchval(
-                "SELECT COUNT(*) FROM sessions WHERE thread_id IS NOT NULL"
-            )
+        # Include the events buffered since the last periodic flush
+        await counters.flush_counters()
+
+        now = datetime.now(timezone.utc)
+        totals = await counters.get_counters()
+        last_hour = await counters.get_bucket_totals(counters.WEBHOOK_PREFIX, now - timedelta(hours=1))
+        last_day = await counters.get_bucket_totals("", now - timedelta(days=1))
+        trend = {day.date(): value for day, value in await counters.get_daily_trend(counters.USERS_NEW, 7)}
 
         embed = discord.Embed(
             title=t(lang, "stats_title"),
@@ -222,14 +272,56 @@ async def stats(interaction: discord.Interaction):
         )
         embed.add_field(
             name=t(lang, "stats_users"),
-            value=str(users_count),
+            value=str(totals.get(counters.SESSIONS_TOTAL, 0)),
             inline=True
         )
         embed.add_field(
             name=t(lang, "stats_threads"),
-            value=str(threads_active),
+            value=str(totals.get(counters.SESSIONS_THREADS, 0)),
+            inline=True
+        )
+        embed.add_field(
+            name=t(lang, "stats_negotiations"),
+            value=str(totals.get(counters.NEGOTIATIONS_ACTIVE, 0)),
+            inline=True
+        )
+        embed.add_field(
+            name=t(lang, "stats_banned"),
+            value=str(totals.get(counters.BANNED_TOTAL, 0)),
             inline=True
         )
+        embed.add_field(
+            name=t(lang, "stats_webhooks_hour"),
+            value=_format_webhooks(last_hour),
+            inline=False
+        )
+        embed.add_field(
+            name=t(lang, "stats_webhooks_day"),
+            value=_format_webhooks(last_day),
+            inline=False
+        )
+        embed.add_field(
+            name=t(lang, "stats_uex_rate"),
+            value=_format_rate(totals.get(counters.UEX_SENT_OK, 0), totals.get(counters.UEX_SENT_FAILED, 0)),
+            inline=True
+        )
+        embed.add_field(
+            name=t(lang, "stats_uex_rate_day"),
+            value=_format_rate(last_day.get(counters.UEX_SENT_OK, 0), last_day.get(counters.UEX_SENT_FAILED, 0)),
+            inline=True
+        )
+        embed.add_field(
+            name=t(lang, "stats_uex_latency"),
+            value=_format_latency(get_uex_client().stats()),
+            inline=False
+        )
+
+        days = [now.date() - timedelta(days=i) for i in range(6, -1, -1)]
+        embed.add_field(
+            name=t(lang, "stats_new_users"),
+            value="\n".join(f"`{day:%m-%d}` {trend.get(day, 0)}" for day in days),
+            inline=False
+        )
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -241,6 +333,71 @@ async def stats(interaction: discord.Interaction):
                 )
 
 
+def _format_webhooks(totals: dict[str, int]) -> str:
+    lines = [
+        f"`{key.removeprefix(counters.WEBHOOK_PREFIX)}`: {value}"
+        for key, value in sorted(totals.items())
+        if key.startswith(counters.WEBHOOK_PREFIX)
+    ]
+    return "\n".join(lines) or "—"
+
+
+def _format_rate(ok: int, failed: int) -> str:
+    total = ok + failed
+    if not total:
+        return "—"
+    return f"{ok / total:.1%} ({ok}/{total})"
+
+
+def _format_latency(stats: dict[str, dict]) -> str:
+    lines = [
+        f"`{endpoint}`: {s['p50_ms']:.0f} / {s['p95_ms']:.0f} ms ({s['errors']}/{s['calls']} errors)"
+        for endpoint, s in sorted(stats.items())
+    ]
+    return "\n".join(lines) or "—"
+
+
+@admin_group.command(name="traces", description="Show the slowest requests of the last hour")
+@app_commands.describe(count="Number of traces to show (1-25)")
+@has_uex_manager_role()
+async def traces(interaction: discord.Interaction, count: app_commands.Range[int, 1, 25] = 5):
+
+    """
+    Shows the slowest traced requests of the last hour (webhooks, reconciled events,
+    replies), each as a tree of its DB, Discord and UEX calls with their timings.
+    Long reports are attached as a text file. Requires 'Manage Guild' permissions.
+
+    Args:
+        interaction (discord.Interaction): The interaction object for the slash command.
+        count (int): The number of traces to show.
+
+    Returns:
+        None
+    """
+
+    lang = SYSTEM_LANGUAGE
+    slowest = get_tracer().slowest(count, since=3600)
+    if not slowest:
+        await interaction.response.send_message(t(lang, "traces_none"), ephemeral=True)
+        return
+
+    title = t(lang, "traces_title", count=len(slowest))
+    report = "\n\n".join(_format_trace(trace) for trace in slowest)
+    if len(title) + len(report) < 1900:
+        await interaction.response.send_message(f"**{title}**\n```\n{report}\n```", ephemeral=True)
+    else:
+        await interaction.response.send_message(
+            f"**{title}**",
+            file=discord.File(io.BytesIO(report.encode()), filename="traces.txt"),
+            ephemeral=True
+        )
+
+
+def _format_trace(trace) -> str:
+    started = datetime.fromtimestamp(trace.root.start_ns / 1e9, timezone.utc)
+    return f"{trace.duration_ms:.0f} ms  {started:%H:%M:%S}  trace={trace.trace_id}\n{trace.format()}"
+
+
 @admin_group.command(name="ban", description="Ban a specific user")
 @app_commands.describe(user="Ban a specific user, insert the motivations")
 @has_uex_manager_role()
@@ -262,7 +419,13 @@ async def ban_user(
             )
             return
         
-        thread = await interaction.client.fetch_channel(int(thread_id))
+        thread = await get_thread(interaction.client, thread_id)
+        if not thread:
+            await interaction.response.send_message(
+                t(lang, "chat_not_found", username=user.name),
+                ephemeral=True
+            )
+            return
             
         await thread.send(
             t(lang, "chat_closed_readonly")
@@ -349,7 +512,6 @@ async def maintenance_cmd(
     lang = await sessions.resolve_and_store_language(interaction)
     
     await set_maintenance(status="inactive", message="", start=None, end=None)
-    await update_status_message(interaction.client)
     
     await interaction.response.send_message(
         t(lang, "maintenance_deleted",
@@ -357,6 +519,7 @@ async def maintenance_cmd(
         ),
         ephemeral=True
     )
+    refresh_status_boards(interaction.client)
 
 
 @admin_group.command(name="broadcast", description="Send a message to all users")
@@ -364,45 +527,118 @@ async def maintenance_cmd(
 @has_uex_manager_role()
 async def broadcast(interaction: discord.Interaction, message: str):
 
-    lang = await sessions.resolve_and_store_language(interaction)
+    """
+    Starts a broadcast job that sends an announcement to every registered user by DM.
 
-    sent = 0
-    async with pool.db_pool.acquire() as conn:
-        users = await conn.fetch("SELECT DISTINCT user_id FROM sessions")
+    The interaction is deferred right away; delivery runs in the background 
+    (see services/broadcast.py) and progress is reported through ephemeral followups.
 
-    logging.debug(f"📢 Broadcasting message to {len(users)} users")
-    
-    embed = discord.Embed(
-        title=t(lang, "broadcast_embed_title"), 
-        description=message,
-        color=discord.Color.blurple(),
-        timestamp=discord.utils.utcnow()
-    )
+    Args:
+        interaction (discord.Interaction): The interaction object for the slash command.
+        message (str): The announcement text.
 
-    embed.set_footer(
-        text=t(lang, "broadcast_embed_footer")
-    )
+    Returns:
+        None
+    """
 
-    for row in users:
-        user = await bot.fetch_user(int(row["user_id"]))
-        try:
-            logging.debug(f"📩 Sending broadcast to user {user.id}")
-            await user.send(embed=embed)
-            sent += 1
-        except discord.Forbidden:
-            logging.warning(f"❌ DM closed for user {user.id}")
-        except discord.HTTPException as e:
-            logging.error(f"❌ Errore HTTP DM {user.id}: {e}")
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    lang = await sessions.resolve_and_store_language(interaction)
 
-    
+    async def progress(job: dict, sent: int, failed: int, finished: bool):
+        await interaction.followup.send(
+            t(
+                lang,
+                "broadcast_finished" if finished else "broadcast_progress",
+                job_id=job["id"],
+                sent=sent,
+                failed=failed,
+                total=job["total"]
+            ),
+            ephemeral=True
+        )
 
-    await interaction.response.send_message(
-        t(lang, "broadcast_sent_to", sent=sent),
+    try:
+        job = await broadcasts.create_broadcast_job(message, interaction.user.id)
+    except Exception as e:
+        logging.exception(f"❌ Unable to create broadcast job: {e}")
+        await interaction.followup.send(t(lang, "broadcast_error"), ephemeral=True)
+        return
+
+    logging.debug(f"📢 Broadcasting message to {job['total']} users")
+
+    await interaction.followup.send(
+        t(lang, "broadcast_started", job_id=job["id"], total=job["total"]),
         ephemeral=True
     )
+    launch_broadcast(interaction.client, job, progress)
+
+
 
 
 
+@admin_group.command(name="sync_commands", description="Force a sync of the slash commands with Discord")
+@has_uex_manager_role()
+async def sync_commands_cmd(interaction: discord.Interaction):
+
+    """
+    Forces a global slash command sync, even if the command tree did not change.
+
+    Args:
+        interaction (discord.Interaction): The interaction object for the slash command.
+
+    Returns:
+        None
+    """
+
+    lang = await sessions.resolve_and_store_language(interaction)
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    try:
+        count = await sync_commands(interaction.client, force=True)
+        await interaction.followup.send(t(lang, "commands_synced", count=count), ephemeral=True)
+        logging.info(f"🔄 Commands sync forced by {interaction.user.name}")
+    except Exception as e:
+        logging.exception(f"❌ Error forcing command sync: {e}")
+        await interaction.followup.send(t(lang, "commands_sync_error"), ephemeral=True)
+
+
+@admin_group.command(name="set_roles", description="Set the names of the bot roles in this server")
+@app_commands.describe(
+    manager_role="Name of the role allowed to manage the bot",
+    user_role="Name of the role given to users on their first interaction"
+)
+@has_uex_manager_role()
+async def set_roles(interaction: discord.Interaction, manager_role: str = None, user_role: str = None):
+
+    """
+    Sets the names of the bot roles for the current guild.
+
+    Omitted names keep their current value. The cached role IDs of the guild are 
+    resolved again from the new names on the next permission check.
+
+    Args:
+        interaction (discord.Interaction): The interaction object for the slash command.
+        manager_role (str, optional): The name of the manager role.
+        user_role (str, optional): The name of the user role.
+
+    Returns:
+        None
+    """
+
+    lang = await sessions.resolve_and_store_language(interaction)
+
+    try:
+        await set_guild_role_names(interaction.guild.id, manager=manager_role, user=user_role)
+        invalidate_guild_roles(interaction.guild.id, names=True)
+        names = await get_role_names(interaction.guild.id)
+        await interaction.response.send_message(
+            t(lang, "roles_updated", manager=names["manager"], user=names["user"]),
+            ephemeral=True
+        )
+        logging.info(f"🛡️ Bot roles of guild {interaction.guild.id} set by {interaction.user.name}: {names}")
+    except Exception as e:
+        logging.exception(f"❌ Error setting the bot roles: {e}")
+        await interaction.response.send_message(t(lang, "roles_update_error"), ephemeral=True)
 
 
 bot.tree.add_command(admin_group)
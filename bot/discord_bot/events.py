@@ -3,79 +3,50 @@ import discord
 import logging
 from config import *
 from utils.i18n import t
-from db.pool import init_db
-from config import TUNNEL_URL
+from utils.log import log_context, lazy_t
+from utils.tracing import span
 from discord_bot.bot import bot
-from utils.logo import show_logo
+from discord_bot.startup import run_startup
+from utils.threads import forget_thread, touch_thread
+from utils.roles_management import invalidate_guild_roles
 import db.sessions as db_session
-from utils.status import start_status_task
-from webserver.session_http import init_http, get_http_session
-from services.uex_api import send_uex_message
-from webserver.server import start_aiohttp_server
-from services.notifications import send_startup_notification
+from services.uex_outbox import get_uex_outbox
+from services.reply_coalescer import get_reply_coalescer
+from discord_bot.receipts import build_reply_embed, delivery_receipt
 
 aiohttp_session = None
 
 
 
-"""
-Handles the bot's startup sequence.
+@bot.event
+async def setup_hook():
+
+    """
+    Runs the one-time startup sequence before the gateway connection.
+
+    See `discord_bot.startup.run_startup` for the steps.
+
+    Returns:
+        None
+    """
+
+    await run_startup(bot)
 
-This event performs several critical initialization steps:
-1. Displays the startup logo.
-2. Sends a startup notification via the notifications service.
-3. Initializes the database connection pool.
-4. Sets up a global aiohttp session for API requests.
-5. Starts the internal webserver for webhooks.
-6. Synchronizes global slash commands with Discord.
-7. Re-registers persistent views (like the Open Thread button).
 
-Returns:
-    None
-"""
 @bot.event
 async def on_ready():
-    
-    from discord_bot.views import OpenThreadButton
-    from discord_bot.views import StatusView
-
-# 1. Show logo at startup
-    show_logo()
 
-# 2. log the start and send the startup notification
-    logging.info(f"✅ Online bots like {bot.user}")
-    await send_startup_notification()
-    
-    
-# 3. Start Database
-    
-    try:
-        await init_db()
-        logging.info("✅ Database Ready.")
-    except Exception as e:
-        logging.critical(f"❌ DB not initialized: {e}")
-        return
+    """
+    Logs the gateway connection.
 
-    await init_http()
-    logging.info("🌐 aiohttp session initialized")
+    `on_ready` fires again on every reconnect, so it must stay cheap: the startup
+    sequence lives in `setup_hook`.
 
-# 4. Start Server (Last fase)
-    logging.info(f"📡 Base URL webhook: {TUNNEL_URL}")
-    logging.info("🌐 Starting webhook server...")
-    bot.loop.create_task(start_aiohttp_server())
+    Returns:
+        None
+    """
 
-# 5. Synchronizing Command
-    try:
-        await bot.tree.sync()
-        logging.info("✅ Commands synchronized.")
-    except Exception as e:
-        logging.error(f"❌ Error synchronizing commands: {e}")
-        
-    
-    bot.add_view(StatusView())
-    bot.add_view(OpenThreadButton(lang=SYSTEM_LANGUAGE))
-    
-    start_status_task(bot)
+    logging.info(f"✅ Online bots like {bot.user}")
 
 
 
@@ -88,7 +59,10 @@ async def on_message(message: discord.Message):
     Processes incoming messages to handle notification replies.
 
     If a user replies to a bot-sent notification embed, the bot extracts 
-    the negotiation hash from the embed and forwards the user's message to the UEX API.
+    the negotiation hash from the embed and queues the user's message for the UEX API. 
+    The "reply sent" embed is posted right away as pending and is edited once the 
+    delivery succeeds or definitively fails. Users who enabled `/coalesce_replies`
+    get their consecutive replies merged into one message by the reply coalescer.
 
     Args:
         message (discord.Message): The message object sent by a user.
@@ -100,68 +74,76 @@ async def on_message(message: discord.Message):
     if message.author.bot or not isinstance(message.channel, discord.Thread):
         return
 
+    touch_thread(message.channel.id)
+
     uid = str(message.author.id)
     content = message.content.strip()
-    session = await db_session.get_user_session(uid)
+    # Replies to a notification are traced, from the session lookup to the UEX delivery
+    with span("discord.reply", root=message.reference is not None, user_id=uid):
+        session = await db_session.get_user_session(uid)
    
-    lang = await db_session.get_user_language(uid)
+        lang = await db_session.get_user_language(uid)
    
 # ---------- If the user is responding to a notification ----------
-    if message.reference and message.reference.resolved:
-        replied_msg = message.reference.resolved
+        if message.reference and message.reference.resolved:
+            replied_msg = message.reference.resolved
 
 # ---------- Get the notification hash from the embed ----------
-        embed = replied_msg.embeds[0] if replied_msg.embeds else None
-        notif_hash = None
-
-        if embed and embed.description:
-            match = re.search(r"/hash/([a-f0-9-]+)", embed.description)
-            if match:
-                notif_hash = match.group(1)
-
-        if not notif_hash:
-            await message.channel.send(t(lang, "hash_not_found"),)
-            return
-
-        try:
-            
-            ok, error = await send_uex_message(
-                        session=get_http_session(),
-                        bearer_token=session['bearer_token'],
-                        secret_key=session["secret_key"],
-                        notif_hash=notif_hash,
-                        message=content
-                    )
-            
-            if ok:
-                embed = discord.Embed(
-                    title=t(lang, "embed.reply_sent.title"),
-                    description=t(
-                        lang,
-                        "embed.reply_sent.description",
-                        message=content
-                    ),
-                    color=discord.Color.green()
-                )
-                embed.add_field(
-                    name=t(lang, "embed.reply_sent.negotiation"),
-                    value=t(
-                        lang=lang,
-                        key="embed.reply_sent.link",
-                        hash=notif_hash
-                    ),
-                    inline=False
-                )
-                embed.set_footer(text=t(lang, "add_footer"))
-
-                await message.channel.send(embed=embed)
-
-            else:
+            embed = replied_msg.embeds[0] if replied_msg.embeds else None
+            notif_hash = None
+
+            if embed and embed.description:
+                match = re.search(r"/hash/([a-f0-9-]+)", embed.description)
+                if match:
+                    notif_hash = match.group(1)
+
+            if not notif_hash:
+                await message.channel.send(t(lang, "hash_not_found"),)
+                return
+
+            with log_context(user_id=uid, negotiation_hash=notif_hash):
+                try:
+                    if session.get("coalesce_replies"):
+                        added = await get_reply_coalescer().add(
+                            message.channel,
+                            user_id=uid,
+                            bearer_token=session["bearer_token"],
+                            secret_key=session["secret_key"],
+                            notif_hash=notif_hash,
+                            message=content,
+                            lang=lang
+                        )
+                        if not added:
+                            await message.channel.send(t(lang, "errors.uex_queue_full"))
+                            return
+
+                    else:
+                        embed = build_reply_embed(lang, content, notif_hash)
+
+                        outbox = get_uex_outbox()
+                        if outbox.pending >= outbox.max_pending:
+                            await message.channel.send(t(lang, "errors.uex_queue_full"))
+                            return
+
+                        with span("discord.send", target=f"thread {message.channel.id}"):
+                            receipt = await message.channel.send(embed=embed)
+
+                        on_status = delivery_receipt(receipt, embed, lang)
+                        task = outbox.submit(
+                            user_id=uid,
+                            bearer_token=session["bearer_token"],
+                            secret_key=session["secret_key"],
+                            notif_hash=notif_hash,
+                            message=content,
+                            on_status=on_status
+                        )
+
+                        # The outbox may have filled up while the receipt was being sent
+                        if task is None:
+                            await on_status("failed", t(lang, "errors.uex_queue_full"))
                 
-                await message.channel.send(t(lang,"errors.uex_send_failed",error=error))
-                
-        except Exception as e:
-            logging.info(t(lang,"errors.uex_send_failed",error=e))
+                except Exception as e:
+                    logging.info("%s", lazy_t(lang, "errors.uex_send_failed", error=e))
 
     await bot.process_commands(message)
 
@@ -182,6 +164,8 @@ async def on_thread_delete(thread: discord.Thread):
         None
     """
 
+    forget_thread(thread.id)
+
     try:
         removed_count = await db_session.remove_sessions_by_thread(thread.id)
 
@@ -231,3 +215,55 @@ async def on_thread_member_remove(thread: discord.Thread, member: discord.Member
         logging.exception(
             t(SYSTEM_LANGUAGE, "thread.user_leave_error", user_id=member.id, thread_id=thread.id, error=e)
         )
+
+
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+
+    """
+    Forgets the cached bot role IDs of the guild, in case the new role carries one of their names.
+
+    Args:
+        role (discord.Role): The created role.
+
+    Returns:
+        None
+    """
+
+    invalidate_guild_roles(role.guild.id)
+
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+
+    """
+    Forgets the cached bot role IDs of the guild when a role is renamed.
+
+    Permission or color changes keep the role ID, so they don't touch the cache.
+
+    Args:
+        before (discord.Role): The role before the update.
+        after (discord.Role): The role after the update.
+
+    Returns:
+        None
+    """
+
+    if before.name != after.name:
+        invalidate_guild_roles(after.guild.id)
+
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+
+    """
+    Forgets the cached bot role IDs of the guild, in case the deleted role was one of them.
+
+    Args:
+        role (discord.Role): The deleted role.
+
+    Returns:
+        None
+    """
+
+    invalidate_guild_roles(role.guild.id)
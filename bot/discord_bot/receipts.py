@@ -0,0 +1,97 @@
+import discord
+import logging
+from utils.i18n import t
+from utils.tracing import span
+
+
+_STATUS_COLORS = {
+    "collecting": discord.Color.blurple(),
+    "pending": discord.Color.orange(),
+    "delivered": discord.Color.green(),
+    "failed": discord.Color.red(),
+}
+
+
+
+def set_delivery_status(embed: discord.Embed, lang: str, state: str, error: str = "") -> discord.Embed:
+
+    """
+    Writes (or rewrites) the delivery status field of a "reply sent" embed.
+
+    Args:
+        embed (discord.Embed): The embed to update in place.
+        lang (str): The language code of the recipient.
+        state (str): One of `collecting`, `pending`, `delivered` or `failed`.
+        error (str): The error text shown when the delivery failed.
+
+    Returns:
+        discord.Embed: The same embed, for chaining.
+    """
+
+    name = t(lang, "delivery.status")
+    value = t(lang, f"delivery.{state}", error=error)
+
+    for index, field in enumerate(embed.fields):
+        if field.name == name:
+            embed.set_field_at(index, name=name, value=value, inline=False)
+            break
+    else:
+        embed.add_field(name=name, value=value, inline=False)
+
+    embed.color = _STATUS_COLORS.get(state, embed.color)
+    return embed
+
+
+def build_reply_embed(lang: str, message: str, notif_hash: str, state: str = "pending") -> discord.Embed:
+
+    """
+    Builds the "reply sent" embed confirming a reply to a negotiation.
+
+    Args:
+        lang (str): The language code of the recipient.
+        message (str): The reply, as sent to UEX.
+        notif_hash (str): The negotiation hash.
+        state (str): The initial delivery status (see `set_delivery_status`).
+
+    Returns:
+        discord.Embed: The embed.
+    """
+
+    embed = discord.Embed(
+        title=t(lang, "embed.reply_sent.title"),
+        description=t(lang, "embed.reply_sent.description", message=message),
+        color=discord.Color.green()
+    )
+    embed.add_field(
+        name=t(lang, "embed.reply_sent.negotiation"),
+        value=t(lang=lang, key="embed.reply_sent.link", hash=notif_hash),
+        inline=False
+    )
+    set_delivery_status(embed, lang, state)
+    embed.set_footer(text=t(lang, "add_footer"))
+    return embed
+
+
+def delivery_receipt(message: discord.Message, embed: discord.Embed, lang: str):
+
+    """
+    Builds the `on_status` callback that edits a sent embed once the UEX delivery settles.
+
+    Args:
+        message (discord.Message): The Discord message carrying the pending embed.
+        embed (discord.Embed): The embed that was sent with the message.
+        lang (str): The language code of the recipient.
+
+    Returns:
+        Callable[[str, str], Awaitable[None]]: The receipt coroutine function.
+    """
+
+    async def on_status(state: str, error: str):
+        set_delivery_status(embed, lang, state, error)
+        try:
+            with span("discord.edit", target=f"message {message.id}"):
+                await message.edit(embed=embed)
+        except discord.HTTPException as e:
+            logging.warning("⚠️ Unable to update delivery receipt %s: %s", message.id, e)
+
+    return on_status
@@ -0,0 +1,167 @@
+import time
+import signal
+import asyncio
+import logging
+from config import SHUTDOWN_TIMEOUT
+from db.pool import close_db
+from utils.tracing import get_tracer
+from utils.status import stop_status_task
+from utils.threads import stop_thread_tasks
+from db.counters import stop_counter_flush_task
+from webserver.session_http import close_http
+from services.uex_client import get_uex_client
+from services.uex_outbox import get_uex_outbox
+from services.onboarding import get_onboarding
+from services.notifications import get_notifier
+from services.broadcast import stop_broadcasts
+from services.reconciler import stop_reconciler
+from services.reply_coalescer import get_reply_coalescer
+from webserver.server import drain_webhooks, stop_aiohttp_server, webhooks_in_flight
+
+
+_shutdown: asyncio.Task | None = None
+
+
+
+def install_signal_handlers(bot):
+
+    """
+    Runs `shutdown` when the process receives SIGTERM (docker stop, watchdog updates) or SIGINT.
+
+    Signals received while the shutdown runs are ignored.
+
+    Args:
+        bot (commands.Bot): The bot instance.
+
+    Returns:
+        None
+    """
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, request_shutdown, bot, sig)
+        except (NotImplementedError, RuntimeError):
+            # Windows event loops have no signal handlers: Ctrl+C still stops the bot
+            pass
+
+
+def request_shutdown(bot, sig: signal.Signals | None = None) -> asyncio.Task:
+
+    """
+    Starts the shutdown in the background, unless it already started.
+
+    Args:
+        bot (commands.Bot): The bot instance.
+        sig (signal.Signals | None): The signal that requested it, for the log.
+
+    Returns:
+        asyncio.Task: The shutdown task.
+    """
+
+    global _shutdown
+
+    if _shutdown is None:
+        logging.info("🛑 %s received, shutting down", sig.name if sig else "Shutdown")
+        _shutdown = asyncio.create_task(shutdown(bot))
+    else:
+        logging.info("🛑 Shutdown already in progress")
+    return _shutdown
+
+
+async def shutdown(bot, timeout: float = SHUTDOWN_TIMEOUT) -> dict:
+
+    """
+    Stops the bot without losing the work in progress.
+
+    1. New webhooks are refused with 503 and Retry-After, so UEX sends them again to
+       the restarted bot; the webhooks being handled and a reconciliation round in
+       progress are finished.
+    2. Pending replies are handed to the UEX outbox, then the queued UEX deliveries,
+       thread onboardings and monitoring notifications are waited for.
+    3. Broadcast jobs are interrupted (resumed at the next start) and the buffered
+       counters and thread activity are written.
+    4. The webhook server, the HTTP sessions, the database pool and the trace file
+       are closed, then the Discord connection, which ends `bot.run`. The log is
+       flushed at exit.
+
+    Steps 1 and 2 share a `timeout` seconds budget: what is not done by then is
+    reported and dropped.
+
+    Args:
+        bot (commands.Bot): The bot instance.
+        timeout (float): Seconds allowed for the drain.
+
+    Returns:
+        dict: By step, the items pending when it started and those left over
+            (webhooks, replies, uex, onboarding, notifications), and the broadcasts
+            interrupted, counters and threads written.
+    """
+
+    started = time.monotonic()
+    deadline = started + timeout
+    report = {}
+
+    def remaining() -> float:
+        return max(0.0, deadline - time.monotonic())
+
+    async def drain(name: str, pending: int, drainer):
+        left = await drainer(remaining())
+        report[name] = (pending, left)
+
+    outbox, coalescer = get_uex_outbox(), get_reply_coalescer()
+    onboarding, notifier = get_onboarding(), get_notifier()
+
+    await asyncio.gather(
+        drain("webhooks", webhooks_in_flight(), drain_webhooks),
+        stop_reconciler(remaining()),
+    )
+    # The coalescer feeds the outbox: its batches must be handed over first
+    await drain("replies", coalescer.pending, coalescer.drain)
+    await asyncio.gather(
+        drain("uex", outbox.pending, outbox.drain),
+        drain("onboarding", onboarding.pending, onboarding.drain),
+        drain("notifications", notifier.pending, notifier.drain),
+    )
+
+    report["broadcasts"] = await stop_broadcasts()
+    stop_status_task()
+    report["counters"] = await stop_counter_flush_task()
+    report["threads"] = await stop_thread_tasks()
+
+    await _close("webhook server", stop_aiohttp_server())
+    await _close("HTTP session", close_http())
+    await _close("UEX client", get_uex_client().close())
+    await _close("database", close_db())
+    get_tracer().close()
+
+    lost = sum(value[1] for value in report.values() if isinstance(value, tuple))
+    logging.log(
+        logging.WARNING if lost else logging.INFO,
+        "🛑 Shutdown completed in %.0f ms | %s",
+        (time.monotonic() - started) * 1000,
+        _format_report(report),
+    )
+
+    # Last: once the connection is closed `bot.run` returns and cancels the remaining tasks
+    await _close("Discord connection", bot.close())
+    return report
+
+
+async def _close(name: str, coro):
+    try:
+        await coro
+    except Exception as e:
+        logging.error("❌ Unable to close the %s: %s", name, e)
+
+
+def _format_report(report: dict) -> str:
+    # "uex 4/5 drained" for the drains, "broadcasts=1" for the others
+    parts = []
+    for name, value in report.items():
+        if isinstance(value, tuple):
+            pending, left = value
+            parts.append(f"{name} {pending - left}/{pending} drained")
+        else:
+            parts.append(f"{name}={value}")
+    return ", ".join(parts)
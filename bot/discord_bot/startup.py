@@ -0,0 +1,141 @@
+import time
+import asyncio
+import logging
+from config import TUNNEL_URL, SYSTEM_LANGUAGE
+from db.pool import init_db
+from utils.logo import show_logo
+from utils.status import start_status_task
+from utils.threads import warm_thread_cache, start_thread_tasks
+from db.counters import start_counter_flush_task
+from webserver.session_http import init_http
+from discord_bot.command_sync import sync_commands
+from services.broadcast import resume_broadcasts
+from services.reconciler import start_reconciler
+from webserver.server import start_aiohttp_server
+from services.notifications import send_startup_notification
+from discord_bot.shutdown import install_signal_handlers
+
+
+_started = False
+
+
+
+async def _timed(name: str, coro) -> float:
+    start = time.perf_counter()
+    try:
+        await coro
+    finally:
+        elapsed = time.perf_counter() - start
+        logging.info(f"⏱️ Startup step '{name}' took {elapsed * 1000:.0f} ms")
+    return elapsed
+
+
+async def _sync_commands(bot, db_ready):
+    # The hash of the last synced tree is stored in the database.
+    # A failed database step is reported on its own: sync_commands then just syncs.
+    try:
+        await db_ready
+    except Exception:
+        pass
+
+    try:
+        await sync_commands(bot)
+    except Exception as e:
+        logging.error(f"❌ Error synchronizing commands: {e}")
+
+
+async def _notify_startup(db_ready):
+    # The time of the last startup notification is stored in the database
+    try:
+        await db_ready
+    except Exception:
+        pass
+
+    await send_startup_notification()
+
+
+async def _resume_when_ready(bot):
+    # Broadcast recipients and active threads are resolved once the gateway is ready
+    await bot.wait_until_ready()
+    try:
+        await warm_thread_cache(bot)
+    except Exception as e:
+        logging.error(f"❌ Unable to warm the thread cache: {e}")
+
+    try:
+        await resume_broadcasts(bot)
+    except Exception as e:
+        logging.error(f"❌ Unable to resume broadcast jobs: {e}")
+
+    # Events sent to the webhook while the bot was down are pulled from UEX
+    start_reconciler()
+
+
+async def run_startup(bot) -> bool:
+
+    """
+    Runs the one-time startup sequence of the bot.
+
+    Called from `setup_hook`, before the gateway connection, so reconnects (which fire
+    `on_ready` again) never repeat it. The independent steps run concurrently:
+    1. Database pool and schema.
+    2. Shared aiohttp session.
+    3. Webhook server.
+    4. Slash command synchronization, skipped when the command tree is unchanged.
+    5. Startup notification, coalesced with the previous ones through the database.
+    Then the persistent views are registered and the background tasks started.
+    SIGTERM and SIGINT are handled from the start by `discord_bot.shutdown`.
+    The duration of each step and of the whole sequence is logged.
+
+    Args:
+        bot (commands.Bot): The bot instance.
+
+    Returns:
+        bool: False if the startup already ran or the database could not be initialized.
+    """
+
+    global _started
+
+    from discord_bot.views import OpenThreadButton, StatusView
+
+    if _started:
+        return False
+    _started = True
+
+    show_logo()
+    install_signal_handlers(bot)
+    started_at = time.perf_counter()
+    logging.info(f"📡 Base URL webhook: {TUNNEL_URL}")
+
+    db_ready = asyncio.ensure_future(init_db())
+    steps = {
+        "database": db_ready,
+        "http session": init_http(),
+        "webhook server": start_aiohttp_server(),
+        "command sync": _sync_commands(bot, db_ready),
+        "startup notification": _notify_startup(db_ready),
+    }
+    results = await asyncio.gather(
+        *(_timed(name, coro) for name, coro in steps.items()),
+        return_exceptions=True,
+    )
+    failed = {name: result for name, result in zip(steps, results) if isinstance(result, BaseException)}
+
+    bot.add_view(StatusView())
+    bot.add_view(OpenThreadButton(lang=SYSTEM_LANGUAGE))
+
+    if "database" in failed:
+        logging.critical(f"❌ DB not initialized: {failed['database']}")
+        return False
+    logging.info("✅ Database Ready.")
+
+    for name, error in failed.items():
+        logging.error(f"❌ Startup step '{name}' failed: {error}")
+
+    start_counter_flush_task()
+    start_status_task(bot)
+    start_thread_tasks(bot)
+    asyncio.create_task(_resume_when_ready(bot))
+
+    logging.info(f"🚀 Startup completed in {(time.perf_counter() - started_at) * 1000:.0f} ms")
+    return True
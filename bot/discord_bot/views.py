@@ -1,16 +1,16 @@
 import discord
-import aiohttp
 import logging
-import dateparser
 from utils.i18n import t
 from config import TUNNEL_URL
 import db.sessions as sessions
 from discord import ui
 from datetime import datetime, timezone
+from utils.threads import get_thread
+from services.onboarding import get_onboarding
 from utils.status import check_user_security
 from services.uex_api import fetch_and_store_uex_username
 from db.maintenance import set_maintenance
-from utils.status import update_status_message
+from utils.status import refresh_status_boards
 
 
 
@@ -56,6 +56,9 @@ class MaintenanceModal(ui.Modal):
         
     async def on_submit(self, interaction: discord.Interaction):
         
+        # dateparser takes hundreds of ms to import: load it on first use only
+        import dateparser
+
         now = datetime.now(timezone.utc)
         end_dt = dateparser.parse(self.end_input.value, settings={'RELATIVE_BASE': now, 'PREFER_DATES_FROM': 'future'})
         
@@ -85,8 +88,6 @@ class MaintenanceModal(ui.Modal):
                 end=end_dt.astimezone(timezone.utc)
             )
             
-            await update_status_message(bot=self.bot)
-            
             await interaction.response.send_message(
                 t(
                     lang=self.lang,
@@ -97,6 +98,7 @@ class MaintenanceModal(ui.Modal):
                 ),
                 ephemeral=True
             )
+            refresh_status_boards(self.bot)
             
             logging.info(
                          t(lang=self.lang,
@@ -116,11 +118,10 @@ class MaintenanceModal(ui.Modal):
 
 
 class DataModal(ui.Modal):
-    def __init__(self, lang: str, user_id: str, aiohttp_session: aiohttp.ClientSession):
+    def __init__(self, lang: str, user_id: str):
         super().__init__(title=t(lang, "modal_title"))
         self.lang = lang
         self.user_id = user_id
-        self.aiohttp_session = aiohttp_session
 
         self.bearer_input = ui.TextInput(
             label=t(lang, "modal_label_bearer"),
@@ -161,8 +162,7 @@ class DataModal(ui.Modal):
                 user_id=self.user_id,
                 bearer_token=self.bearer_input.value,
                 secret_key=self.secret_input.value,
-                username_guess=self.user_input.value,
-                session=self.aiohttp_session
+                username_guess=self.user_input.value
             )
 
             if not verified_username:
@@ -195,14 +195,12 @@ class DataModal(ui.Modal):
 class SetupTutorialView(ui.View):
     
     def __init__(self, lang: str, user_id: str, username: str):
-        from webserver.session_http import get_http_session
         super().__init__(timeout=None)
         self.lang = lang
         self.user_id = user_id
         self.username = username
         self.current_page = 0
         self.total_pages = 3
-        self.aiohttp_session = get_http_session()
 
         # Button to open the modal
         self.data_button = ui.Button(
@@ -260,7 +258,7 @@ class SetupTutorialView(ui.View):
                 self.remove_item(self.data_button)
 
     async def open_modal(self, interaction: discord.Interaction, ):
-        await interaction.response.send_modal(DataModal(self.lang, interaction.user.id, self.aiohttp_session))
+        await interaction.response.send_modal(DataModal(self.lang, interaction.user.id))
 
     # Left arrow button
     @ui.button(label="⬅️", style=discord.ButtonStyle.gray)
@@ -301,47 +299,28 @@ class OpenThreadButton(ui.View):
             return
         
         
+        # Thread creation is queued: answer Discord right away, the user gets a followup
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
         lang = await sessions.resolve_and_store_language(interaction)
         user_id = str(interaction.user.id)
-        channel = interaction.channel
+        onboarding = get_onboarding()
 
         try:
-            thread_id = await sessions.get_user_thread_id(user_id)
-            if thread_id:
-                try:
-                    existing_thread = await interaction.client.fetch_channel(int(thread_id))
-                    if existing_thread and not existing_thread.archived:
-                        await interaction.response.send_message(t(lang, "already_active"), ephemeral=True)
+            if not onboarding.is_pending(user_id):
+                thread_id = await sessions.get_user_thread_id(user_id)
+                if thread_id:
+                    # Idle threads are archived by the bot: reopen the user's thread instead of creating a new one
+                    existing_thread = await get_thread(interaction.client, thread_id, unarchive=True)
+                    if existing_thread is None:
+                        await sessions.remove_user_session(user_id)
+                    else:
+                        await interaction.followup.send(t(lang, "already_active"), ephemeral=True)
                         return
-                except discord.NotFound:
-                    await sessions.remove_user_session(user_id)
-
-            #1. Creating a private thread
-            thread = await channel.create_thread(
-                name=f"Chat {interaction.user.name.capitalize()}",
-                type=discord.ChannelType.private_thread,
-                invitable=False,
-            )
-            await thread.add_user(interaction.user)
-
-            # 2. Save session
-            await sessions.save_user_session(
-                user_id=user_id,
-                thread_id=thread.id,
-                language=lang
-            )
-
-            #3. Launch the Paginated Tutorial in the thread
-            tutorial_view = SetupTutorialView(lang=lang, user_id=user_id, username=interaction.user.name)
-            await thread.send(
-                content=f"👋 {interaction.user.mention}", 
-                embed=tutorial_view.create_embed(), 
-                view=tutorial_view
-            )
 
-            #4. Feedback to the user on the button
-            await interaction.response.send_message(t(lang, "thread_created"), ephemeral=True)
+            if onboarding.submit(interaction, lang) is None:
+                await interaction.followup.send(t(lang, "onboarding_queue_full"), ephemeral=True)
 
         except Exception as e:
             logging.error(f"❌ Error on open_thread: {e}")
-            await interaction.response.send_message(t(lang, "generic_error"), ephemeral=True)
\ No newline at end of file
+            await interaction.followup.send(t(lang, "generic_error"), ephemeral=True)
\ No newline at end of file
@@ -1,34 +1,288 @@
+import os
 import sys
+import json
+import time
+import queue
+import atexit
 import logging
+import threading
+import logging.handlers
+from datetime import datetime, timezone
+from utils.log import ContextFilter, LazyText
+from config import (
+    LOG_LEVEL,
+    LOG_PATH,
+    LOG_MAX_BYTES,
+    LOG_ROTATE_INTERVAL,
+    LOG_BACKUP_COUNT,
+    LOG_COMPRESS,
+    LOG_JSON,
+)
 
 
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 
-"""
-Configures the global logging system for the application.
+# Arguments safe to format later, in the logging thread
+_DEFERRABLE = (str, int, float, bool, type(None), LazyText)
 
-This function performs two main tasks:
-1. **UTF-8 Enforcement**: Reconfigures standard output and error streams to use UTF-8 
-   encoding, preventing crashes or broken characters when logging emojis or 
-   special symbols on certain operating systems (like Windows).
-2. **Multi-Handler Logging**: Sets up a centralized logging format that records 
-   timestamps, log levels, and messages. Logs are simultaneously sent to the 
-   console (stdout) and persisted in a file named 'bot.log'.
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: logging.handlers.QueueHandler | None = None
+
+
+
+class RotatingLogFileHandler(logging.handlers.RotatingFileHandler):
+
+    """
+    Log file rotated when it reaches a size or an age, whichever comes first.
+
+    Rotated files are renamed `<path>.1`, `<path>.2`... up to `backup_count`, and
+    gzipped (`<path>.1.gz`) by a background thread when `compress` is set, so the
+    thread writing the logs never waits on the compression. The age is counted from
+    the start of the process or the last rotation.
+
+    Attributes:
+        interval (float): Maximum age of the file in seconds, 0 for no limit.
+    """
+
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = LOG_MAX_BYTES,
+        backup_count: int = LOG_BACKUP_COUNT,
+        interval: float = LOG_ROTATE_INTERVAL,
+        compress: bool = LOG_COMPRESS,
+    ):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.interval = interval
+        self.rollover_at = time.time() + interval if interval else None
+        self._compression: threading.Thread | None = None
+        if compress:
+            self.namer = lambda name: f"{name}.gz"
+            self.rotator = self._rotate_compressed
+
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at and self.backupCount > 0:
+            return True
+        return bool(super().shouldRollover(record))
+
+
+    def doRollover(self):
+        # The backups are shifted first: the previous compression must be done with them
+        self.wait_compression()
+        super().doRollover()
+        if self.interval:
+            self.rollover_at = time.time() + self.interval
+
+
+    def _rotate_compressed(self, source: str, dest: str):
+        plain = dest.removesuffix(".gz")
+        os.replace(source, plain)
+        self._compression = threading.Thread(
+            target=_gzip_file, args=(plain, dest), name="log-compress", daemon=True
+        )
+        self._compression.start()
+
+
+    def wait_compression(self, timeout: float | None = None):
+
+        """
+        Waits for the compression of the last rotated file, if one is running.
+
+        Args:
+            timeout (float | None): Maximum time to wait, in seconds.
+
+        Returns:
+            None
+        """
+
+        if self._compression is not None:
+            self._compression.join(timeout)
+
+
+    def close(self):
+        super().close()
+        self.wait_compression()
+
+
+def _gzip_file(source: str, dest: str):
+    import gzip
+    import shutil
+
+    try:
+        partial = f"{dest}.part"
+        with open(source, "rb") as f_in, gzip.open(partial, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.replace(partial, dest)
+        os.remove(source)
+    except OSError as e:
+        # The plain rotated file stays on disk: nothing is lost
+        print(f"⚠️ Unable to compress {source}: {e}", file=sys.stderr)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+
+    """
+    Queue handler leaving the formatting to the logging thread.
+
+    The stock `QueueHandler` formats every record in the thread that logs it. Here
+    the %-style arguments are only merged in that thread when they could change
+    before the record is written (anything but strings, numbers and `lazy_t`
+    translations); exceptions are rendered right away, while their frames exist.
+    """
+
+    _exceptions = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # A shallow copy (other handlers may see the record), without copy.copy's overhead
+        prepared = logging.LogRecord.__new__(logging.LogRecord)
+        prepared.__dict__.update(record.__dict__)
+        record = prepared
+
+        args = record.args
+        if not isinstance(record.msg, str) or (args and not (
+            isinstance(args, tuple) and all(isinstance(arg, _DEFERRABLE) for arg in args)
+        )):
+            record.msg, record.args = record.getMessage(), None
+
+        if record.exc_info:
+            record.exc_text = self._exceptions.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class TextFormatter(logging.Formatter):
+
+    """LOG_FORMAT lines, followed by the bound context fields as `key=value`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        context = getattr(record, "context", None)
+        if not context:
+            return line
+
+        fields = " ".join(f"{key}={value}" for key, value in context.items())
+        head, newline, traceback = line.partition("\n")
+        return f"{head} | {fields}{newline}{traceback}"
+
+
+class JsonFormatter(logging.Formatter):
+
+    """One JSON object per record: time, level, logger, message, context fields, exception."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "context", None) or {})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logger(
+    level: str = LOG_LEVEL,
+    path: str = LOG_PATH,
+    stream=None,
+    force: bool = False,
+    json_format: bool = LOG_JSON,
+) -> logging.handlers.QueueListener | None:
+
+    """
+    Configures the global logging system for the application.
+
+    1. **UTF-8 Enforcement**: Reconfigures standard output and error streams to use UTF-8
+       encoding, preventing crashes or broken characters when logging emojis or
+       special symbols on certain operating systems (like Windows).
+    2. **Non-blocking pipeline**: The root logger only gets a `LazyQueueHandler`, which
+       tags the records with the `utils.log.log_context` fields and puts them on an
+       in-memory queue. A `QueueListener` thread formats them and writes them to the
+       console (stdout) and to the rotating log file at `path`, so the event loop
+       never waits on formatting, disk or console I/O.
+    3. **Format**: Text lines (LOG_FORMAT and the context fields), or one JSON object
+       per line with `json_format`.
+
+    Like `logging.basicConfig`, it does nothing if the root logger already has
+    handlers, unless `force` is set. The listener is stopped at exit, flushing the
+    queued records.
+
+    Args:
+        level (str): The root log level.
+        path (str): The log file.
+        stream (TextIO | None): The console stream, stdout if None.
+        force (bool): Removes and closes the existing root handlers first.
+        json_format (bool): Writes JSON lines instead of text.
+
+    Returns:
+        QueueListener | None: The running listener, None if logging was already configured.
+    """
+
+    global _listener, _queue_handler
 
-Returns:
-    None
-"""
-def setup_logger():
     # Force UTF-8 output (Windows fix)
     if hasattr(sys.stdout, "reconfigure"):
         sys.stdout.reconfigure(encoding="utf-8")
     if hasattr(sys.stderr, "reconfigure"):
         sys.stderr.reconfigure(encoding="utf-8")
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler("bot.log", encoding="utf-8"),
-            logging.StreamHandler(sys.stdout),
-        ],
-    )
+    root = logging.getLogger()
+    if force:
+        stop_logger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+            handler.close()
+    elif root.handlers:
+        return None
+
+    formatter = JsonFormatter() if json_format else TextFormatter(LOG_FORMAT)
+    handlers = [RotatingLogFileHandler(path), logging.StreamHandler(stream or sys.stdout)]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # Neither format uses them, and looking them up is part of every record's cost
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    records = queue.SimpleQueue()
+    _queue_handler = LazyQueueHandler(records)
+    _queue_handler.addFilter(ContextFilter())
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logger)
+    return _listener
+
+
+def stop_logger():
+
+    """
+    Stops the logging thread after it wrote the queued records, and closes the log file.
+
+    The queue is detached from the root logger, so later records fall back to
+    Python's last-resort stderr handler. Calling it again has no effect.
+
+    Returns:
+        None
+    """
+
+    global _listener, _queue_handler
+
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+
+    logging.getLogger().removeHandler(_queue_handler)
+    _queue_handler = None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
@@ -13,11 +13,12 @@ setup_logger()
 Main entry point for the Discord Bot application.
 
 This script orchestrates the startup process by:
-1. Initializing the global logger with UTF-8 support and file logging.
+1. Initializing the global logger (UTF-8, background thread, rotating log file).
 2. Importing all event listeners and slash commands to register them with the bot.
 3. Starting the Discord client using the provided authentication token.
 
-The bot runs in a blocking loop until the process is terminated.
+The bot runs in a blocking loop until the process is terminated. SIGTERM and
+SIGINT stop it gracefully (see `discord_bot.shutdown`).
 """
 
 if __name__ == "__main__":
@@ -1,8 +1,34 @@
-from .uex_api import fetch_and_store_uex_username, send_uex_message
-from .notifications import send_startup_notification
+from .uex_api import fetch_and_store_uex_username, send_uex_message, post_uex_message
+from .uex_client import UexClient, get_uex_client, uex_deadline
+from .uex_outbox import UexOutbox, get_uex_outbox
+from .reply_coalescer import ReplyCoalescer, get_reply_coalescer
+from .onboarding import ThreadOnboarding, get_onboarding
+from .reconciler import Reconciler, get_reconciler, start_reconciler, stop_reconciler
+from .notifications import MonitoringNotifier, get_notifier, send_startup_notification
+from .broadcast import launch_broadcast, resume_broadcasts, run_broadcast, stop_broadcasts
 
 __all__ = [
     "fetch_and_store_uex_username",
     "send_startup_notification",
-    "send_uex_message"
+    "get_reply_coalescer",
+    "MonitoringNotifier",
+    "resume_broadcasts",
+    "start_reconciler",
+    "stop_reconciler",
+    "launch_broadcast",
+    "stop_broadcasts",
+    "ThreadOnboarding",
+    "post_uex_message",
+    "send_uex_message",
+    "get_uex_client",
+    "get_uex_outbox",
+    "ReplyCoalescer",
+    "get_onboarding",
+    "get_reconciler",
+    "run_broadcast",
+    "uex_deadline",
+    "get_notifier",
+    "Reconciler",
+    "UexOutbox",
+    "UexClient",
 ]
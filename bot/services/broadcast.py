@@ -0,0 +1,214 @@
+import time
+import asyncio
+import discord
+import logging
+from utils.i18n import t
+import db.broadcasts as broadcasts
+from utils.rate_limit import TokenBucket
+from config import (
+    BROADCAST_CONCURRENCY,
+    BROADCAST_RATE_PER_SECOND,
+    BROADCAST_BATCH_SIZE,
+    BROADCAST_PROGRESS_INTERVAL,
+)
+
+
+_running: dict[int, asyncio.Task] = {}
+
+
+
+def build_broadcast_embed(lang: str, message: str) -> discord.Embed:
+
+    """
+    Renders the announcement embed for one language.
+
+    Args:
+        lang (str): The language code of the recipients.
+        message (str): The announcement text written by the admin.
+
+    Returns:
+        discord.Embed: The localized broadcast embed.
+    """
+
+    embed = discord.Embed(
+        title=t(lang, "broadcast_embed_title"),
+        description=message,
+        color=discord.Color.blurple(),
+        timestamp=discord.utils.utcnow()
+    )
+    embed.set_footer(text=t(lang, "broadcast_embed_footer"))
+    return embed
+
+
+async def _resolve_user(bot: discord.Client, user_id: int, bucket: TokenBucket) -> discord.User | None:
+
+    # The gateway cache is free, REST lookups count against the rate limit
+    user = bot.get_user(user_id)
+    if user:
+        return user
+
+    await bucket.acquire()
+    try:
+        return await bot.fetch_user(user_id)
+    except discord.HTTPException as e:
+        logging.warning(f"❌ Unable to resolve broadcast recipient {user_id}: {e}")
+        return None
+
+
+async def _send_one(bot, row: dict, embed: discord.Embed, semaphore: asyncio.Semaphore, bucket: TokenBucket) -> bool:
+    async with semaphore:
+        user = await _resolve_user(bot, int(row["user_id"]), bucket)
+        if not user:
+            return False
+
+        await bucket.acquire()
+        try:
+            logging.debug(f"📩 Sending broadcast to user {user.id}")
+            await user.send(embed=embed)
+            return True
+        except discord.Forbidden:
+            logging.warning(f"❌ DM closed for user {user.id}")
+        except discord.HTTPException as e:
+            logging.error(f"❌ Errore HTTP DM {user.id}: {e}")
+        return False
+
+
+async def _report(progress, job: dict, sent: int, failed: int, finished: bool):
+    if not progress:
+        return
+    try:
+        await progress(job, sent, failed, finished)
+    except Exception as e:
+        # Interaction followups expire after 15 minutes, the job must go on regardless
+        logging.warning(f"⚠️ Broadcast {job['id']} progress update failed: {e}")
+
+
+async def run_broadcast(bot: discord.Client, job: dict, progress=None):
+
+    """
+    Delivers a broadcast job, resuming from its persisted cursor.
+
+    Recipients are read in batches ordered by (language, user_id). Each batch is sent
+    with bounded concurrency and paced by a token bucket to respect Discord's DM rate
+    limits; the embed is rendered once per language. The cursor and counters are
+    stored after every batch, so a restart resends at most one batch.
+
+    Args:
+        bot (discord.Client): The bot instance used to resolve users and send DMs.
+        job (dict): The broadcast job row.
+        progress (Callable | None): Coroutine called as `progress(job, sent, failed, finished)`
+            at most every BROADCAST_PROGRESS_INTERVAL seconds and once at the end.
+
+    Returns:
+        None
+    """
+
+    job_id = job["id"]
+    sent = job.get("sent") or 0
+    failed = job.get("failed") or 0
+    cursor = (job.get("cursor_lang") or "", job.get("cursor_user_id") or "")
+
+    embeds: dict[str, discord.Embed] = {}
+    semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    bucket = TokenBucket(BROADCAST_RATE_PER_SECOND, BROADCAST_CONCURRENCY)
+    last_report = time.monotonic()
+
+    logging.info(f"📢 Broadcast job {job_id} running (sent={sent}, failed={failed})")
+
+    try:
+        while True:
+            rows = await broadcasts.fetch_broadcast_recipients(cursor[0], cursor[1], BROADCAST_BATCH_SIZE)
+            if not rows:
+                break
+
+            for row in rows:
+                if row["lang"] not in embeds:
+                    embeds[row["lang"]] = build_broadcast_embed(row["lang"], job["message"])
+
+            results = await asyncio.gather(
+                *(_send_one(bot, row, embeds[row["lang"]], semaphore, bucket) for row in rows)
+            )
+            sent += sum(results)
+            failed += len(results) - sum(results)
+            cursor = (rows[-1]["lang"], rows[-1]["user_id"])
+
+            await broadcasts.update_broadcast_progress(job_id, cursor[0], cursor[1], sent, failed)
+
+            if time.monotonic() - last_report >= BROADCAST_PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                await _report(progress, job, sent, failed, finished=False)
+
+        await broadcasts.finish_broadcast_job(job_id)
+        await _report(progress, job, sent, failed, finished=True)
+
+    except asyncio.CancelledError:
+        logging.info(f"⏸️ Broadcast job {job_id} interrupted at sent={sent}, failed={failed}")
+        raise
+    except Exception as e:
+        # The job stays 'running' and is resumed from the last stored cursor on the next start
+        logging.exception(f"💥 Broadcast job {job_id} error: {e}")
+
+
+def launch_broadcast(bot: discord.Client, job: dict, progress=None) -> asyncio.Task:
+
+    """
+    Starts a broadcast job in the background unless it is already running.
+
+    Args:
+        bot (discord.Client): The bot instance.
+        job (dict): The broadcast job row.
+        progress (Callable | None): The optional progress callback.
+
+    Returns:
+        asyncio.Task: The task delivering the job.
+    """
+
+    task = _running.get(job["id"])
+    if task and not task.done():
+        return task
+
+    task = asyncio.create_task(run_broadcast(bot, job, progress))
+    _running[job["id"]] = task
+    task.add_done_callback(lambda _: _running.pop(job["id"], None))
+    return task
+
+
+async def resume_broadcasts(bot: discord.Client) -> int:
+
+    """
+    Resumes the broadcast jobs interrupted by a restart.
+
+    Args:
+        bot (discord.Client): The bot instance.
+
+    Returns:
+        int: The number of jobs resumed.
+    """
+
+    jobs = await broadcasts.get_running_broadcast_jobs()
+    for job in jobs:
+        launch_broadcast(bot, job)
+
+    if jobs:
+        logging.info(f"📢 Resumed {len(jobs)} broadcast job(s)")
+    return len(jobs)
+
+
+async def stop_broadcasts() -> int:
+
+    """
+    Interrupts the running broadcast jobs.
+
+    Their cursor is stored after every batch, so they are resumed by the next start
+    (see `resume_broadcasts`), resending at most one batch.
+
+    Returns:
+        int: The number of jobs interrupted.
+    """
+
+    running = [task for task in _running.values() if not task.done()]
+    for task in running:
+        task.cancel()
+    if running:
+        await asyncio.gather(*running, return_exceptions=True)
+    return len(running)
@@ -1,51 +1,270 @@
+import time
+import json
+import asyncio
 import logging
 import datetime
-import requests
+import aiohttp
 from utils.i18n import t
-from config import WEBHOOK_MONITORING_URL, SYSTEM_LANGUAGE
+from utils.rate_limit import is_retryable, backoff_delay
+from utils.log import log_throttled
+from db.settings import get_setting, set_setting
+from webserver.session_http import init_http, get_http_session
+from config import (
+    WEBHOOK_MONITORING_URL,
+    SYSTEM_LANGUAGE,
+    NOTIFY_MAX_PENDING,
+    NOTIFY_COALESCE_WINDOW,
+    NOTIFY_MAX_ATTEMPTS,
+    NOTIFY_TIMEOUT,
+    UEX_RETRY_BASE_DELAY,
+    UEX_RETRY_MAX_DELAY,
+)
 
 
 
+class MonitoringNotifier:
+
+    """
+    Background queue posting embeds to the monitoring webhook.
+
+    `notify()` only enqueues: a single worker posts on the shared aiohttp session, so
+    the event loop (gateway heartbeats, webhooks) never waits for Discord. The same
+    event repeated within `window` seconds of the last post is coalesced: it is sent
+    once when the window ends, with the number of occurrences in the footer. The
+    state is kept in memory: events spanning restarts are coalesced by the caller
+    (see `send_startup_notification`). 429 responses are retried after Discord's `retry_after`,
+    5xx and connection errors with backoff.
+
+    Attributes:
+        url (str | None): The monitoring webhook URL; without it notifications are dropped.
+        window (float): Seconds during which repeats of an event are coalesced.
+        max_pending (int): Maximum number of distinct queued events.
+        max_attempts (int): Attempts per post before giving up.
+    """
+
+
+    def __init__(
+        self,
+        url: str | None = WEBHOOK_MONITORING_URL,
+        window: float = NOTIFY_COALESCE_WINDOW,
+        max_pending: int = NOTIFY_MAX_PENDING,
+        max_attempts: int = NOTIFY_MAX_ATTEMPTS,
+        timeout: float = NOTIFY_TIMEOUT,
+        base_delay: float = UEX_RETRY_BASE_DELAY,
+        max_delay: float = UEX_RETRY_MAX_DELAY,
+    ):
+        self.url = url
+        self.window = window
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._pending: dict[str, dict] = {}
+        self._last_sent: dict[str, float] = {}
+        self._worker: asyncio.Task | None = None
+
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+
+    def notify(self, key: str, embed: dict) -> bool:
+
+        """
+        Queues an embed for the monitoring webhook and returns immediately.
+
+        Args:
+            key (str): Identifies the event: repeats with the same key are coalesced.
+            embed (dict): The Discord embed to post; the latest one of a coalesced
+                event is sent.
+
+        Returns:
+            bool: True if the event was queued or coalesced, False if it was dropped.
+        """
+
+        if not self.url:
+            return False
+
+        entry = self._pending.get(key)
+        if entry is not None:
+            entry["embed"] = embed
+            entry["count"] += 1
+            return True
+
+        if len(self._pending) >= self.max_pending:
+            log_throttled("notifications.full", 10, logging.WARNING, "⚠️ Monitoring queue full (%d pending), dropping '%s'", self.pending, key)
+            return False
+
+        self._pending[key] = {"embed": embed, "count": 1}
+        delay = self._last_sent.get(key, float("-inf")) + self.window - time.monotonic()
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, key)
+        else:
+            self._queue.put_nowait(key)
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        return True
+
+
+    async def _run(self):
+        while self._pending:
+            key = await self._queue.get()
+            entry = self._pending.pop(key, None)
+            if entry is None:
+                continue
+
+            embed = dict(entry["embed"])
+            if entry["count"] > 1:
+                embed["footer"] = {
+                    "text": t(SYSTEM_LANGUAGE, "notify.repeated", count=entry["count"], window=f"{self.window:g}")
+                }
+
+            self._last_sent[key] = time.monotonic()
+            try:
+                await self._post({"embeds": [embed]})
+            except Exception as e:
+                logging.error("💥 Unable to send monitoring notification '%s': %s", key, e)
+
+
+    async def _post(self, payload: dict) -> bool:
+        await init_http()
+        session = get_http_session()
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        for attempt in range(1, self.max_attempts + 1):
+            retry_after = None
+            try:
+                async with session.post(self.url, json=payload, timeout=timeout) as resp:
+                    status = resp.status
+                    if status < 300:
+                        return True
+                    if status == 429:
+                        try:
+                            retry_after = float((await resp.json(content_type=None)).get("retry_after"))
+                        except (TypeError, ValueError, AttributeError):
+                            retry_after = None
+                        if retry_after is None:
+                            try:
+                                retry_after = float(resp.headers.get("Retry-After"))
+                            except (TypeError, ValueError):
+                                pass
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = None
+                logging.debug("Monitoring webhook unreachable: %s", e)
+
+            if not is_retryable(status) or attempt == self.max_attempts:
+                logging.warning("⚠️ Monitoring webhook failed: %s", status or "no response")
+                return False
+
+            delay = backoff_delay(attempt, self.base_delay, self.max_delay, retry_after)
+            logging.info("🔁 Monitoring webhook retry %d/%d in %.1fs (status=%s)", attempt, self.max_attempts - 1, delay, status)
+            await asyncio.sleep(delay)
+
+
+    async def drain(self, timeout: float) -> int:
+
+        """
+        Waits for queued notifications to be posted.
+
+        Args:
+            timeout (float): Maximum time to wait, in seconds.
+
+        Returns:
+            int: The number of events still pending after the wait.
+        """
+
+        if self._worker is not None and not self._worker.done():
+            await asyncio.wait({self._worker}, timeout=timeout)
+        return self.pending
+
+
+_notifier: MonitoringNotifier | None = None
+
+STARTUP_NOTIFICATION_KEY = "startup_notification"
+
+
+def get_notifier() -> MonitoringNotifier:
+
+    """
+    Returns the process-wide monitoring notifier, creating it on first use.
+
+    Returns:
+        MonitoringNotifier: The shared monitoring notifier.
+    """
+
+    global _notifier
+    if _notifier is None:
+        _notifier = MonitoringNotifier()
+    return _notifier
+
+
 async def send_startup_notification():
-    
+
     """
     Sends a system startup notification to a dedicated Discord monitoring channel via Webhook.
 
-    This function creates a localized embed message containing the bot's current status 
-    and the actions performed during initialization. It uses the monitoring URL defined 
-    in the configuration and includes a UTC timestamp.
+    This function creates a localized embed message containing the bot's current status
+    and the actions performed during initialization, and queues it on the monitoring
+    notifier: it returns at once, the post happens in the background.
+
+    The time of the last post is stored in the bot settings, so a bot restarting in a
+    loop posts at most once per coalescing window: the restarts in between are counted
+    and reported in the footer of the next post. Without the database every start posts.
 
     Returns:
         None
-
-    Raises:
-        Exception: Logs an error if the HTTP POST request to the monitoring webhook fails.
     """
-    
+
     lang = SYSTEM_LANGUAGE
 
-    payload = {
-        "embeds": [{
-            "title": t(lang, "startup.title"),
-            "description": t(lang, "startup.description"),
-            "color": 3066993,
-            "fields": [
-                {
-                    "name": t(lang, "startup.status_name"),
-                    "value": t(lang, "startup.status_value"),
-                    "inline": True
-                },
-                {
-                    "name": t(lang, "startup.action_name"),
-                    "value": t(lang, "startup.action_value"),
-                    "inline": True
-                }
-            ],
-            "timestamp": datetime.datetime.utcnow().isoformat()
-        }]
+    embed = {
+        "title": t(lang, "startup.title"),
+        "description": t(lang, "startup.description"),
+        "color": 3066993,
+        "fields": [
+            {
+                "name": t(lang, "startup.status_name"),
+                "value": t(lang, "startup.status_value"),
+                "inline": True
+            },
+            {
+                "name": t(lang, "startup.action_name"),
+                "value": t(lang, "startup.action_value"),
+                "inline": True
+            }
+        ],
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
     }
 
+    notifier = get_notifier()
+    now = time.time()
+    try:
+        state = json.loads(await get_setting(STARTUP_NOTIFICATION_KEY) or "null")
+    except Exception as e:
+        logging.warning(f"⚠️ Unable to read the last startup notification: {e}")
+        state = None
+
+    if state and now - state["sent_at"] < notifier.window:
+        state["skipped"] += 1
+        await _store_startup_state(state)
+        logging.info("🔕 Startup notification coalesced (%d restarts since the last one)", state["skipped"])
+        return
+
+    if state and state["skipped"]:
+        embed["footer"] = {
+            "text": t(lang, "notify.repeated", count=state["skipped"] + 1, window=f"{now - state['sent_at']:.0f}")
+        }
+
+    if notifier.notify("startup", embed):
+        await _store_startup_state({"sent_at": now, "skipped": 0})
+
+
+async def _store_startup_state(state: dict):
     try:
-        requests.post(WEBHOOK_MONITORING_URL, json=payload, timeout=5)
+        await set_setting(STARTUP_NOTIFICATION_KEY, json.dumps(state))
     except Exception as e:
-        logging.error(f"💥 Unable to send startup notification: {e}")
+        logging.warning(f"⚠️ Unable to store the last startup notification: {e}")
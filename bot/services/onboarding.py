@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import discord
+import db.sessions as sessions
+from utils.i18n import t
+from utils.rate_limit import TokenBucket, is_retryable, backoff_delay
+from utils.log import log_throttled
+from utils.threads import touch_thread
+from utils.thread_placement import choose_parent_channel
+from config import (
+    ONBOARDING_CONCURRENCY,
+    ONBOARDING_MAX_PENDING,
+    ONBOARDING_THREADS_PER_SECOND,
+    ONBOARDING_THREADS_BURST,
+    ONBOARDING_MAX_ATTEMPTS,
+    UEX_RETRY_BASE_DELAY,
+    UEX_RETRY_MAX_DELAY,
+)
+
+
+
+class ThreadOnboarding:
+
+    """
+    Queue creating the private threads requested with the "Open Chat" button.
+
+    The button handler only defers the interaction and submits the request: a
+    background task creates the thread, adds the user, saves the session, posts the
+    tutorial and tells the user through a followup. Thread creations are paced by a
+    token bucket per parent channel (Discord rate-limits them per channel), capped
+    globally by a semaphore, and retried with backoff on 429 and 5xx responses.
+    Presses from a user whose thread is already queued are coalesced: every pressed
+    interaction gets the final followup, but only one thread is created.
+
+    Attributes:
+        concurrency (int): Maximum number of threads being created at once.
+        max_pending (int): Maximum number of queued users before new ones are refused.
+        max_attempts (int): Attempts per thread creation before giving up.
+    """
+
+
+    def __init__(
+        self,
+        concurrency: int = ONBOARDING_CONCURRENCY,
+        max_pending: int = ONBOARDING_MAX_PENDING,
+        rate_per_second: float = ONBOARDING_THREADS_PER_SECOND,
+        burst: int = ONBOARDING_THREADS_BURST,
+        max_attempts: int = ONBOARDING_MAX_ATTEMPTS,
+        base_delay: float = UEX_RETRY_BASE_DELAY,
+        max_delay: float = UEX_RETRY_MAX_DELAY,
+    ):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rate = rate_per_second
+        self._burst = burst
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._buckets: dict[int, TokenBucket] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._waiters: dict[str, list[discord.Interaction]] = {}
+
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+
+    def is_pending(self, user_id: str) -> bool:
+        return str(user_id) in self._tasks
+
+
+    def submit(self, interaction: discord.Interaction, lang: str) -> asyncio.Task | None:
+
+        """
+        Queues the creation of the user's thread and returns immediately.
+
+        The interaction must already be deferred: it is answered with a followup once
+        the thread exists (or could not be created).
+
+        Args:
+            interaction (discord.Interaction): The deferred "Open Chat" interaction.
+            lang (str): The user's language.
+
+        Returns:
+            asyncio.Task | None: The onboarding task (the existing one if the user is
+                already queued), or None if the queue is full.
+        """
+
+        user_id = str(interaction.user.id)
+
+        task = self._tasks.get(user_id)
+        if task is not None:
+            self._waiters[user_id].append(interaction)
+            logging.debug("🧵 Onboarding of %s already queued, press coalesced", user_id)
+            return task
+
+        if len(self._tasks) >= self.max_pending:
+            log_throttled("onboarding.full", 10, logging.WARNING, "⚠️ Onboarding queue full (%d pending), refusing %s", self.pending, user_id)
+            return None
+
+        self._waiters[user_id] = [interaction]
+        task = asyncio.create_task(self._onboard(interaction, user_id, lang))
+        self._tasks[user_id] = task
+        task.add_done_callback(lambda done: self._forget(user_id, done))
+        return task
+
+
+    def _forget(self, user_id: str, task: asyncio.Task):
+        if self._tasks.get(user_id) is task:
+            del self._tasks[user_id]
+
+
+    def _bucket(self, channel_id: int) -> TokenBucket:
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = TokenBucket(self._rate, self._burst)
+        return bucket
+
+
+    async def _create_thread(self, parent: discord.TextChannel, user: discord.abc.User) -> discord.Thread:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with self._semaphore:
+                    # Paced when actually sent, so time spent waiting for a slot doesn't add up to a burst
+                    await self._bucket(parent.id).acquire()
+                    return await parent.create_thread(
+                        name=f"Chat {user.name.capitalize()}",
+                        type=discord.ChannelType.private_thread,
+                        invitable=False,
+                    )
+            except discord.RateLimited as e:
+                retry_after = e.retry_after
+            except discord.HTTPException as e:
+                if not is_retryable(e.status) or attempt == self.max_attempts:
+                    raise
+                retry_after = None
+
+            if attempt == self.max_attempts:
+                raise RuntimeError(f"Thread creation still rate limited after {attempt} attempts")
+
+            delay = backoff_delay(attempt, self.base_delay, self.max_delay, retry_after)
+            log_throttled("onboarding.retry", 5, logging.INFO, "🔁 Thread creation retry %d/%d for %s in %.1fs", attempt, self.max_attempts - 1, user, delay)
+            await asyncio.sleep(delay)
+
+
+    async def _onboard(self, interaction: discord.Interaction, user_id: str, lang: str) -> bool:
+        from discord_bot.views import SetupTutorialView
+        user = interaction.user
+
+        try:
+            parent = await choose_parent_channel(interaction.client, user, interaction.channel)
+            thread = await self._create_thread(parent, user)
+            await thread.add_user(user)
+            touch_thread(thread.id)
+
+            await sessions.save_user_session(
+                user_id=user_id,
+                thread_id=thread.id,
+                language=lang,
+                parent_channel_id=parent.id
+            )
+
+            tutorial_view = SetupTutorialView(lang=lang, user_id=user_id, username=user.name)
+            await thread.send(
+                content=f"👋 {user.mention}",
+                embed=tutorial_view.create_embed(),
+                view=tutorial_view
+            )
+            message, created = t(lang, "thread_created_link", thread=thread.mention), True
+        except Exception as e:
+            logging.error("❌ Error creating the thread of %s: %s", user_id, e)
+            message, created = t(lang, "generic_error"), False
+
+        # No longer pending before the followups are awaited: a press from now on starts afresh
+        self._forget(user_id, asyncio.current_task())
+        for waiter in self._waiters.pop(user_id, []):
+            try:
+                await waiter.followup.send(message, ephemeral=True)
+            except discord.HTTPException as e:
+                # The interaction token expires 15 minutes after the press
+                logging.debug("Onboarding followup not delivered to %s: %s", user_id, e)
+
+        return created
+
+
+    async def drain(self, timeout: float) -> int:
+
+        """
+        Waits for queued onboardings to complete.
+
+        Args:
+            timeout (float): Maximum time to wait, in seconds.
+
+        Returns:
+            int: The number of onboardings still pending after the wait.
+        """
+
+        if self._tasks:
+            await asyncio.wait(set(self._tasks.values()), timeout=timeout)
+        return self.pending
+
+
+_onboarding: ThreadOnboarding | None = None
+
+
+def get_onboarding() -> ThreadOnboarding:
+
+    """
+    Returns the process-wide onboarding queue, creating it on first use.
+
+    Returns:
+        ThreadOnboarding: The shared onboarding queue.
+    """
+
+    global _onboarding
+    if _onboarding is None:
+        _onboarding = ThreadOnboarding()
+    return _onboarding
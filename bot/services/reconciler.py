@@ -0,0 +1,254 @@
+import time
+import asyncio
+import logging
+from discord.ext import tasks
+from datetime import datetime, timedelta, timezone
+from services.uex_client import get_uex_client
+from db.counters import record_counter, EVENTS_RECONCILED, WEBHOOK_EVENTS
+from db.uex_events import get_reconcile_targets, set_notification_cursor, prune_events
+from config import (
+    RECONCILE_MIN_INTERVAL,
+    RECONCILE_MAX_INTERVAL,
+    RECONCILE_CONCURRENCY,
+    RECONCILE_LOOKBACK,
+    RECONCILE_DEDUP_HOURS,
+)
+
+
+_loop = None
+
+# Fields UEX adds around the webhook payload when it stores it as a notification
+_NOTIFICATION_ENVELOPE = ("id", "type", "event", "date_added")
+
+
+
+def _parse_notification(notification: dict) -> tuple[int, str | None, dict, float | None] | None:
+    # A notification carries the webhook event name and the same fields as the
+    # webhook payload, either inline or under "data"
+    try:
+        notification_id = int(notification["id"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    event_type = notification.get("event") or notification.get("type")
+
+    # Handed over in the webhook payload shape, so both paths fingerprint it alike
+    data = notification.get("data")
+    if not isinstance(data, dict):
+        data = {key: value for key, value in notification.items() if key not in _NOTIFICATION_ENVELOPE}
+
+    try:
+        date_added = float(notification.get("date_added"))
+    except (TypeError, ValueError):
+        date_added = None
+
+    return notification_id, event_type, data, date_added
+
+
+class Reconciler:
+
+    """
+    Poller delivering the UEX events the webhook missed (bot restarts, nginx reloads...).
+
+    For every user with stored credentials, the UEX notifications after the user's
+    persisted cursor are pulled and run through the webhook delivery path, which
+    skips the events already delivered. Users are polled with bounded concurrency.
+    The interval adapts: RECONCILE_MIN_INTERVAL after a downtime (the bot starting)
+    or a round that recovered events, then doubling up to RECONCILE_MAX_INTERVAL
+    while nothing is missed.
+
+    Only the notifications of webhook events are delivered; the others just move
+    the cursor forward. So do the notifications older than `lookback` of a user
+    polled for the first time (no cursor yet).
+
+    Attributes:
+        min_interval (float): Seconds between rounds after a downtime or a recovery.
+        max_interval (float): Seconds between rounds in steady state.
+        interval (float): Seconds until the next round.
+    """
+
+
+    def __init__(
+        self,
+        concurrency: int = RECONCILE_CONCURRENCY,
+        min_interval: float = RECONCILE_MIN_INTERVAL,
+        max_interval: float = RECONCILE_MAX_INTERVAL,
+        lookback: float = RECONCILE_LOOKBACK,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.lookback = lookback
+        self.interval = min_interval
+        self.running = False
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+
+    def tighten(self):
+
+        """
+        Brings the next rounds back to the minimum interval, e.g. after a downtime.
+
+        Returns:
+            None
+        """
+
+        self.interval = self.min_interval
+
+
+    async def run_once(self) -> int:
+
+        """
+        Polls every user once and delivers the missed events.
+
+        Returns:
+            int: The number of events recovered in this round.
+        """
+
+        from webserver.handlers import process_event, RECONCILER
+
+        self.running = True
+        try:
+            try:
+                await prune_events(datetime.now(timezone.utc) - timedelta(hours=RECONCILE_DEDUP_HOURS))
+            except Exception as e:
+                logging.error("❌ Unable to prune the delivered events: %s", e)
+
+            targets = await get_reconcile_targets()
+            results = await asyncio.gather(
+                *(self._reconcile_user(target, process_event, RECONCILER) for target in targets),
+                return_exceptions=True,
+            )
+
+            recovered = 0
+            for target, result in zip(targets, results):
+                if isinstance(result, BaseException):
+                    logging.error("❌ Reconciliation failed for %s: %s", target["user_id"], result)
+                else:
+                    recovered += result
+
+            if recovered:
+                record_counter(EVENTS_RECONCILED, recovered)
+                logging.info("🔄 Reconciliation recovered %d missed UEX events", recovered)
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.max_interval, self.interval * 2)
+            return recovered
+        finally:
+            self.running = False
+
+
+    async def _reconcile_user(self, target: dict, process_event, source: str) -> int:
+        user_id, cursor = target["user_id"], target["cursor"]
+
+        async with self._semaphore:
+            status, body = await get_uex_client().get_notifications(
+                bearer_token=target["bearer_token"],
+                secret_key=target["secret_key"],
+                since_id=cursor,
+            )
+        if status != 200:
+            logging.debug("Notifications of %s not pulled: %s", user_id, status)
+            return 0
+
+        notifications = [
+            parsed for parsed in map(_parse_notification, body.get("data") or [])
+            if parsed and (cursor is None or parsed[0] > cursor)
+        ]
+        notifications.sort(key=lambda parsed: parsed[0])
+
+        recovered, last_id = 0, cursor
+        oldest = time.time() - self.lookback
+        for notification_id, event_type, data, date_added in notifications:
+            # Only webhook events are replayed, and not the history behind a new cursor
+            skipped = cursor is None and (date_added is None or date_added < oldest)
+            if skipped or event_type not in WEBHOOK_EVENTS:
+                last_id = notification_id
+                continue
+
+            result = await process_event(event_type, user_id, data, source=source)
+            if result["status"] >= 500:
+                # Stop before the failed event: the next round pulls it again
+                break
+            if not result.get("duplicate"):
+                recovered += 1
+            last_id = notification_id
+
+        if last_id is not None and last_id != cursor:
+            await set_notification_cursor(user_id, last_id)
+        return recovered
+
+
+_reconciler: Reconciler | None = None
+
+
+def get_reconciler() -> Reconciler:
+
+    """
+    Returns the process-wide reconciler, creating it on first use.
+
+    Returns:
+        Reconciler: The shared reconciler.
+    """
+
+    global _reconciler
+    if _reconciler is None:
+        _reconciler = Reconciler()
+    return _reconciler
+
+
+def start_reconciler():
+
+    """
+    Starts the reconciliation loop, first round right away at the minimum interval.
+
+    The bot starting means the webhook endpoint was down, so the interval is
+    tightened. Calling it again while the loop is running has no effect.
+
+    Returns:
+        None
+    """
+
+    global _loop
+
+    reconciler = get_reconciler()
+    reconciler.tighten()
+
+    if _loop is not None and _loop.is_running():
+        return
+
+    @tasks.loop(seconds=reconciler.interval)
+    async def reconcile_loop():
+        try:
+            await reconciler.run_once()
+        except Exception as e:
+            logging.exception("❌ Error in reconciliation loop: %s", e)
+        reconcile_loop.change_interval(seconds=reconciler.interval)
+
+    _loop = reconcile_loop
+    reconcile_loop.start()
+
+
+async def stop_reconciler(timeout: float) -> bool:
+
+    """
+    Stops the reconciliation loop, letting a round in progress finish.
+
+    Cancelling a round would drop the events it claimed before delivering them.
+
+    Args:
+        timeout (float): Maximum time to wait for the round, in seconds.
+
+    Returns:
+        bool: False if a round was still running after the wait (it is then cancelled).
+    """
+
+    if _loop is None or not _loop.is_running():
+        return True
+
+    task = _loop.get_task()
+    _loop.stop()
+    if get_reconciler().running:
+        await asyncio.wait({task}, timeout=timeout)
+    finished = not get_reconciler().running
+    _loop.cancel()
+    return finished
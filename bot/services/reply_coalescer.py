@@ -0,0 +1,231 @@
+import time
+import asyncio
+import logging
+import discord
+from utils.i18n import t
+from utils.tracing import span
+from services.uex_outbox import get_uex_outbox
+from db.counters import record_counter, REPLIES_COALESCED
+from discord_bot.receipts import build_reply_embed, delivery_receipt, set_delivery_status
+from config import REPLY_COALESCE_WINDOW, REPLY_COALESCE_MAX_WAIT, REPLY_COALESCE_MAX_LENGTH
+
+
+
+class _Batch:
+
+    """Replies collected for one user and negotiation, and their preview embed."""
+
+    def __init__(self, lang, bearer_token, secret_key, message):
+        self.lang = lang
+        self.bearer_token = bearer_token
+        self.secret_key = secret_key
+        self.parts = [message]
+        self.started = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.receipt: discord.Message | None = None
+        self.embed: discord.Embed | None = None
+        self.handle: asyncio.TimerHandle | None = None
+
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.parts)
+
+
+class ReplyCoalescer:
+
+    """
+    Merges consecutive replies to the same negotiation into one UEX message.
+
+    The first reply posts a "reply sent" embed in the collecting state; the replies
+    written to the same negotiation hash within `window` seconds of the previous one
+    are appended to it and the embed preview is edited. When the window closes (or
+    `max_wait` seconds after the first reply, whichever comes first) the merged text
+    is handed to the UEX outbox and the embed becomes the delivery receipt. A reply
+    that would make the text longer than `max_length` closes the current batch and
+    starts a new one.
+
+    Attributes:
+        window (float): Seconds of silence closing a batch.
+        max_wait (float): Maximum age of a batch, in seconds.
+        max_length (int): Maximum length of a merged message.
+    """
+
+
+    def __init__(
+        self,
+        window: float = REPLY_COALESCE_WINDOW,
+        max_wait: float = REPLY_COALESCE_MAX_WAIT,
+        max_length: int = REPLY_COALESCE_MAX_LENGTH,
+    ):
+        self.window = window
+        self.max_wait = max_wait
+        self.max_length = max_length
+        self._batches: dict[tuple[str, str], _Batch] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+
+    @property
+    def pending(self) -> int:
+        return len(self._batches) + len(self._tasks)
+
+
+    async def add(
+        self,
+        channel: discord.abc.Messageable,
+        *,
+        user_id: str,
+        bearer_token: str,
+        secret_key: str,
+        notif_hash: str,
+        message: str,
+        lang: str,
+    ) -> bool:
+
+        """
+        Adds a reply to the user's open batch for the negotiation, opening one if needed.
+
+        Args:
+            channel (discord.abc.Messageable): Where the preview embed is posted.
+            user_id (str): The Discord user the reply is sent for.
+            bearer_token (str): The user's UEX bearer token.
+            secret_key (str): The user's UEX secret key.
+            notif_hash (str): The negotiation hash.
+            message (str): The reply.
+            lang (str): The language code of the user.
+
+        Returns:
+            bool: False if a new batch was needed but the UEX outbox is full.
+        """
+
+        key = (str(user_id), notif_hash)
+        batch = self._batches.get(key)
+
+        if batch is not None and len(batch.text) + 1 + len(message) > self.max_length:
+            await self._flush(key, batch)
+            batch = None
+
+        if batch is None:
+            outbox = get_uex_outbox()
+            if outbox.pending >= outbox.max_pending:
+                return False
+
+            batch = self._batches[key] = _Batch(lang, bearer_token, secret_key, message)
+            async with batch.lock:
+                batch.embed = build_reply_embed(lang, message, notif_hash, state="collecting")
+                try:
+                    with span("discord.send", target=f"thread {channel.id}"):
+                        batch.receipt = await channel.send(embed=batch.embed)
+                except discord.HTTPException as e:
+                    logging.warning("⚠️ Unable to post reply preview for %s: %s", user_id, e)
+        else:
+            batch.parts.append(message)
+            await self._edit(batch)
+
+        self._schedule(key, batch)
+        return True
+
+
+    def _schedule(self, key: tuple[str, str], batch: _Batch):
+        if batch.handle is not None:
+            batch.handle.cancel()
+
+        # The window slides with every reply, but a batch never outlives max_wait
+        delay = min(self.window, batch.started + self.max_wait - time.monotonic())
+        batch.handle = asyncio.get_running_loop().call_later(max(0.0, delay), self._on_timer, key, batch)
+
+
+    def _on_timer(self, key: tuple[str, str], batch: _Batch):
+        if self._batches.get(key) is not batch:
+            return
+        del self._batches[key]
+        task = asyncio.create_task(self._flush(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+    async def _edit(self, batch: _Batch):
+        async with batch.lock:
+            if batch.embed is not None:
+                batch.embed.description = t(batch.lang, "embed.reply_sent.description", message=batch.text)
+                await self._show(batch)
+
+
+    async def _show(self, batch: _Batch):
+        if batch.receipt is None:
+            return
+        try:
+            with span("discord.edit", target=f"message {batch.receipt.id}"):
+                await batch.receipt.edit(embed=batch.embed)
+        except discord.HTTPException as e:
+            logging.warning("⚠️ Unable to update reply preview %s: %s", batch.receipt.id, e)
+
+
+    async def _flush(self, key: tuple[str, str], batch: _Batch):
+        if self._batches.get(key) is batch:
+            del self._batches[key]
+        if batch.handle is not None:
+            batch.handle.cancel()
+
+        user_id, notif_hash = key
+        async with batch.lock:
+            lang, embed = batch.lang, batch.embed
+            embed.description = t(lang, "embed.reply_sent.description", message=batch.text)
+
+            # The receipt shows pending before the outbox can report the outcome
+            set_delivery_status(embed, lang, "pending")
+            await self._show(batch)
+
+            on_status = delivery_receipt(batch.receipt, embed, lang) if batch.receipt else None
+            task = get_uex_outbox().submit(
+                user_id=user_id,
+                bearer_token=batch.bearer_token,
+                secret_key=batch.secret_key,
+                notif_hash=notif_hash,
+                message=batch.text,
+                on_status=on_status
+            )
+
+            if task is None:
+                set_delivery_status(embed, lang, "failed", t(lang, "errors.uex_queue_full"))
+                await self._show(batch)
+            elif len(batch.parts) > 1:
+                record_counter(REPLIES_COALESCED, len(batch.parts) - 1)
+
+
+    async def drain(self, timeout: float) -> int:
+
+        """
+        Closes every open batch right away and waits for them to reach the UEX outbox.
+
+        Args:
+            timeout (float): Maximum time to wait, in seconds.
+
+        Returns:
+            int: The number of batches still not handed over after the wait.
+        """
+
+        for key, batch in list(self._batches.items()):
+            self._on_timer(key, batch)
+
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+        return self.pending
+
+
+_coalescer: ReplyCoalescer | None = None
+
+
+def get_reply_coalescer() -> ReplyCoalescer:
+
+    """
+    Returns the process-wide reply coalescer, creating it on first use.
+
+    Returns:
+        ReplyCoalescer: The shared coalescer.
+    """
+
+    global _coalescer
+    if _coalescer is None:
+        _coalescer = ReplyCoalescer()
+    return _coalescer
@@ -1,12 +1,11 @@
 # services/uex_api.py
-import aiohttp
 import logging
 from db import  save_user_session
-from directory import API_GET_USER,API_POST_MESSAGE
+from services.uex_client import get_uex_client
 
 
 
-async def fetch_and_store_uex_username(user_id: str, secret_key: str, bearer_token: str, username_guess: str, session: "aiohttp.ClientSession") -> str | None:
+async def fetch_and_store_uex_username(user_id: str, secret_key: str, bearer_token: str, username_guess: str) -> str | None:
     
     """
     Fetches the official UEX username via API and updates the user's session in the database.
@@ -20,30 +19,24 @@ async def fetch_and_store_uex_username(user_id: str, secret_key: str, bearer_tok
         secret_key (str): The UEX API secret key provided by the user.
         bearer_token (str): The UEX API bearer token provided by the user.
         username_guess (str): The username input by the user for validation.
-        session (aiohttp.ClientSession): The active asynchronous HTTP session.
 
     Returns:
         str | None: The confirmed UEX username if successful, or None if the 
                     API call fails or credentials are invalid.
     """
     
-    """
-    Retrieve the UEX username via API using the past session.
-    """
     try:
-        headers = {
-            "Authorization": f"Bearer {bearer_token}",
-            "secret-key": secret_key,
-            "Content-Type": "application/json"
-        }
-        async with session.get(f"{API_GET_USER}?username={username_guess}", headers=headers) as resp:
-            if resp.status != 200:
-                logging.warning(f"Error fetch UEX username for {user_id}: {resp.status}")
-                return None
-            data = await resp.json()
-            uex_username = data.get("data", {}).get("username")
-            if not uex_username:
-                return None
+        status, data = await get_uex_client().get_user(
+            bearer_token=bearer_token,
+            secret_key=secret_key,
+            username=username_guess
+        )
+        if status != 200:
+            logging.warning("Error fetch UEX username for %s: %s", user_id, status)
+            return None
+        uex_username = data.get("data", {}).get("username")
+        if not uex_username:
+            return None
 
         await save_user_session(
             user_id=user_id,
@@ -53,13 +46,52 @@ async def fetch_and_store_uex_username(user_id: str, secret_key: str, bearer_tok
         return uex_username
 
     except Exception as e:
-        logging.exception(f"Errore fetch_and_store_uex_username per {user_id}: {e}")
+        logging.exception("Errore fetch_and_store_uex_username per %s: %s", user_id, e)
         return None
 
 
+async def post_uex_message(
+    *,
+    bearer_token: str,
+    secret_key: str,
+    notif_hash: str,
+    message: str,
+    is_production: int = 1
+) -> tuple[int | None, str, float | None]:
+    
+    """
+    Posts a message to an ongoing UEX negotiation and reports the raw outcome.
+
+    Unlike `send_uex_message`, this function exposes the HTTP status and the 
+    `Retry-After` hint so that callers (e.g. the outbound queue) can decide 
+    whether a failure is worth retrying.
+
+    Args:
+        bearer_token (str): The user's UEX bearer token.
+        secret_key (str): The user's UEX secret key.
+        notif_hash (str): The unique hash identifier for the specific negotiation.
+        message (str): The text content to be sent to the negotiation partner.
+        is_production (int): Flag to toggle between production (1) and test (0) environments.
+
+    Returns:
+        tuple[int | None, str, float | None]: The HTTP status (None on connection errors, 
+                        timeouts and while the circuit is open), the error text (empty on 
+                        success) and the retry delay in seconds, if any.
+    """
+
+    logging.debug("📤 UEX SEND | hash=%s", notif_hash)
+
+    return await get_uex_client().post_message(
+        bearer_token=bearer_token,
+        secret_key=secret_key,
+        notif_hash=notif_hash,
+        message=message,
+        is_production=is_production
+    )
+
+
 async def send_uex_message(
     *,
-    session: aiohttp.ClientSession,
     bearer_token: str,
     secret_key: str,
     notif_hash: str,
@@ -75,7 +107,6 @@ async def send_uex_message(
     user's specific authentication headers.
 
     Args:
-        session (aiohttp.ClientSession): The shared asynchronous HTTP session.
         bearer_token (str): The user's UEX bearer token.
         secret_key (str): The user's UEX secret key.
         notif_hash (str): The unique hash identifier for the specific negotiation.
@@ -87,29 +118,16 @@ async def send_uex_message(
                         (which is empty if the operation was successful).
     """
 
-    headers = {
-        "Authorization": f"Bearer {bearer_token}",
-        "secret-key": secret_key,
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "is_production": is_production,
-        "hash": notif_hash,
-        "message": message
-    }
-
-    logging.info(f"📤 UEX SEND | hash={notif_hash}")
-
-    try:
-        async with session.post(API_POST_MESSAGE, headers=headers, json=payload) as resp:
-            if resp.status == 200:
-                return True, ""
-
-            text = await resp.text()
-            logging.warning(f"⚠️ UEX ERROR {resp.status}: {text}")
-            return False, f"{resp.status}: {text[:200]}"
-
-    except Exception as e:
-        logging.exception("💥 UEX connection error")
-        return False, str(e)
+    status, error, _ = await post_uex_message(
+        bearer_token=bearer_token,
+        secret_key=secret_key,
+        notif_hash=notif_hash,
+        message=message,
+        is_production=is_production
+    )
+
+    if status == 200:
+        return True, ""
+    if status is None:
+        return False, error
+    return False, f"{status}: {error}"
@@ -0,0 +1,473 @@
+import time
+import asyncio
+import logging
+import aiohttp
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from utils.rate_limit import is_retryable, backoff_delay
+from utils.log import log_throttled
+from utils.tracing import span
+from directory import API_GET_USER, API_NOTIFICATIONS, API_POST_MESSAGE
+from config import (
+    UEX_HTTP_POOL_SIZE,
+    UEX_HTTP_POOL_PER_HOST,
+    UEX_HTTP_KEEPALIVE,
+    UEX_HTTP_DNS_TTL,
+    UEX_CONNECT_TIMEOUT,
+    UEX_TIMEOUT_GET_USER,
+    UEX_TIMEOUT_POST_MESSAGE,
+    UEX_TIMEOUT_NOTIFICATIONS,
+    UEX_GET_MAX_ATTEMPTS,
+    UEX_BREAKER_FAILURES,
+    UEX_BREAKER_RESET,
+    UEX_RETRY_BASE_DELAY,
+    UEX_RETRY_MAX_DELAY,
+)
+
+
+# Monotonic time by which the current unit of work (e.g. a webhook) must be done
+_deadline: ContextVar[float | None] = ContextVar("uex_deadline", default=None)
+
+
+
+@contextmanager
+def uex_deadline(seconds: float | None):
+
+    """
+    Bounds every UEX call made in the block (and in the tasks it starts) by a shared deadline.
+
+    Each request then times out after its endpoint timeout or the time left before
+    the deadline, whichever comes first. `None` lifts the deadline, e.g. for background
+    work that outlives the webhook that queued it.
+
+    Args:
+        seconds (float | None): The time budget, from now.
+
+    Yields:
+        None
+    """
+
+    token = _deadline.set(None if seconds is None else time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> float | None:
+
+    """
+    Returns the time left before the current deadline.
+
+    Returns:
+        float | None: The seconds left (0 once expired), or None without a deadline.
+    """
+
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+class CircuitOpenError(Exception):
+
+    """Raised while the circuit breaker refuses calls; `retry_after` tells when it will probe again."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"UEX circuit open, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+
+    """
+    Fails fast while UEX is down instead of letting every caller wait for a timeout.
+
+    After `failures` consecutive failures (connection errors, timeouts, 5xx) the
+    circuit opens and calls are refused for `reset` seconds. Then a single probe
+    call is let through (half-open): its success closes the circuit, its failure
+    opens it again.
+
+    Attributes:
+        failures (int): Consecutive failures that open the circuit.
+        reset (float): Seconds the circuit stays open before probing.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+    def __init__(self, failures: int = UEX_BREAKER_FAILURES, reset: float = UEX_BREAKER_RESET):
+        self.failures = failures
+        self.reset = reset
+        self._consecutive = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset:
+            return self.OPEN
+        return self.HALF_OPEN
+
+
+    def check(self):
+
+        """
+        Lets a call through or refuses it.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe already running.
+        """
+
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+
+        retry_after = max(0.0, self._opened_at + self.reset - time.monotonic())
+        raise CircuitOpenError(retry_after)
+
+
+    def record(self, success: bool):
+
+        """
+        Records the outcome of a call let through by `check()`.
+
+        Args:
+            success (bool): False for connection errors, timeouts and 5xx responses.
+
+        Returns:
+            None
+        """
+
+        self._probing = False
+        if success:
+            if self._opened_at is not None:
+                logging.info("✅ UEX circuit closed")
+            self._consecutive = 0
+            self._opened_at = None
+            return
+
+        self._consecutive += 1
+        if self._opened_at is not None or self._consecutive >= self.failures:
+            if self._opened_at is None:
+                logging.warning("⚠️ UEX circuit opened after %d failures", self._consecutive)
+            self._opened_at = time.monotonic()
+
+
+class EndpointStats:
+
+    """Latency and error counts of one UEX endpoint, over all calls and the recent ones."""
+
+    def __init__(self, window: int = 256):
+        self.calls = 0
+        self.errors = 0
+        self.max_ms = 0.0
+        self._recent = deque(maxlen=window)
+
+
+    def record(self, elapsed_ms: float, ok: bool):
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self._recent.append(elapsed_ms)
+
+
+    def snapshot(self) -> dict:
+        recent = sorted(self._recent)
+
+        def percentile(p: float) -> float:
+            return recent[min(len(recent) - 1, int(len(recent) * p))] if recent else 0.0
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": self.max_ms,
+        }
+
+
+class UexClient:
+
+    """
+    HTTP client for the UEX API.
+
+    Owns a dedicated connection pool (keep-alive, per-host limit, DNS cache) instead
+    of the shared default session, and for every call:
+    - builds the authentication headers;
+    - applies the endpoint timeout, shortened by the caller's deadline (`uex_deadline`);
+    - goes through a circuit breaker that fails fast while UEX is down;
+    - records the latency per endpoint (see `stats()`).
+    Idempotent GETs are retried with jittered backoff; POSTs are not, their callers
+    (e.g. the outbox) decide.
+
+    Attributes:
+        breaker (CircuitBreaker): The circuit breaker shared by all endpoints.
+        get_attempts (int): Attempts per GET request.
+    """
+
+
+    def __init__(
+        self,
+        pool_size: int = UEX_HTTP_POOL_SIZE,
+        pool_per_host: int = UEX_HTTP_POOL_PER_HOST,
+        keepalive: float = UEX_HTTP_KEEPALIVE,
+        dns_ttl: int = UEX_HTTP_DNS_TTL,
+        connect_timeout: float = UEX_CONNECT_TIMEOUT,
+        get_attempts: int = UEX_GET_MAX_ATTEMPTS,
+        base_delay: float = UEX_RETRY_BASE_DELAY,
+        max_delay: float = UEX_RETRY_MAX_DELAY,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.pool_size = pool_size
+        self.pool_per_host = pool_per_host
+        self.keepalive = keepalive
+        self.dns_ttl = dns_ttl
+        self.connect_timeout = connect_timeout
+        self.get_attempts = get_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self._session: aiohttp.ClientSession | None = None
+        self._stats: dict[str, EndpointStats] = {}
+
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_per_host,
+                keepalive_timeout=self.keepalive,
+                ttl_dns_cache=self.dns_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+
+    async def close(self):
+
+        """
+        Closes the connection pool.
+
+        Returns:
+            None
+        """
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+    def stats(self) -> dict[str, dict]:
+
+        """
+        Returns the latency stats of every endpoint called so far.
+
+        Returns:
+            dict[str, dict]: By endpoint: calls, errors, p50_ms and p95_ms (recent calls), max_ms.
+        """
+
+        return {endpoint: stats.snapshot() for endpoint, stats in self._stats.items()}
+
+
+    async def _request(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        timeout: float,
+        *,
+        bearer_token: str,
+        secret_key: str,
+        **kwargs
+    ) -> tuple[int | None, dict | str, float | None]:
+
+        remaining = remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                return None, "deadline exceeded", None
+            timeout = min(timeout, remaining)
+
+        try:
+            self.breaker.check()
+        except CircuitOpenError as e:
+            return None, str(e), e.retry_after
+
+        headers = {
+            "Authorization": f"Bearer {bearer_token}",
+            "secret-key": secret_key,
+            "Content-Type": "application/json"
+        }
+        client_timeout = aiohttp.ClientTimeout(total=timeout, connect=min(timeout, self.connect_timeout))
+
+        with span(f"uex {endpoint}", **{"http.method": method}) as request_span:
+            status, body, retry_after = None, "", None
+            start = time.perf_counter()
+            try:
+                async with self._get_session().request(method, url, headers=headers, timeout=client_timeout, **kwargs) as resp:
+                    status = resp.status
+                    if status == 200:
+                        body = await resp.json(content_type=None)
+                    else:
+                        body = (await resp.text())[:200]
+                        try:
+                            retry_after = float(resp.headers.get("Retry-After"))
+                        except (TypeError, ValueError):
+                            pass
+            except asyncio.TimeoutError:
+                status, body = None, f"timeout after {timeout:.1f}s"
+            except (aiohttp.ClientError, ValueError) as e:
+                status, body = None, str(e) or type(e).__name__
+            finally:
+                healthy = status is not None and status < 500
+                self._stats.setdefault(endpoint, EndpointStats()).record(
+                    (time.perf_counter() - start) * 1000, status == 200
+                )
+                self.breaker.record(healthy)
+            if request_span is not None:
+                request_span.set_attribute("http.status_code", status or 0)
+                if status != 200:
+                    request_span.set_error(f"{status or 'no response'}: {body}")
+
+        if status != 200:
+            log_throttled(f"uex_client.{endpoint}.failed", 5, logging.WARNING, "⚠️ UEX %s failed: %s %s", endpoint, status or "no response", body)
+        return status, body, retry_after
+
+
+    async def _get(self, endpoint: str, url: str, timeout: float, **kwargs) -> tuple[int | None, dict | str]:
+        for attempt in range(1, self.get_attempts + 1):
+            status, body, retry_after = await self._request(endpoint, "GET", url, timeout, **kwargs)
+            if status == 200 or not is_retryable(status) or attempt == self.get_attempts:
+                break
+            if self.breaker.state != CircuitBreaker.CLOSED:
+                break
+
+            delay = backoff_delay(attempt, self.base_delay, self.max_delay, retry_after)
+            remaining = remaining_time()
+            if remaining is not None and delay >= remaining:
+                break
+
+            log_throttled(f"uex_client.{endpoint}.retry", 5, logging.INFO, "🔁 UEX %s retry %d/%d in %.1fs (status=%s)", endpoint, attempt, self.get_attempts - 1, delay, status)
+            await asyncio.sleep(delay)
+
+        return status, body
+
+
+    async def get_user(self, *, bearer_token: str, secret_key: str, username: str) -> tuple[int | None, dict | str]:
+
+        """
+        Fetches a UEX user profile, validating the credentials on the way.
+
+        Args:
+            bearer_token (str): The user's UEX bearer token.
+            secret_key (str): The user's UEX secret key.
+            username (str): The UEX username to look up.
+
+        Returns:
+            tuple[int | None, dict | str]: The HTTP status (None without a response) and
+                the decoded JSON body on success, the error text otherwise.
+        """
+
+        return await self._get(
+            "get_user",
+            API_GET_USER,
+            UEX_TIMEOUT_GET_USER,
+            bearer_token=bearer_token,
+            secret_key=secret_key,
+            params={"username": username},
+        )
+
+
+    async def get_notifications(
+        self,
+        *,
+        bearer_token: str,
+        secret_key: str,
+        since_id: int | None = None
+    ) -> tuple[int | None, dict | str]:
+
+        """
+        Fetches the notifications of a UEX user.
+
+        Args:
+            bearer_token (str): The user's UEX bearer token.
+            secret_key (str): The user's UEX secret key.
+            since_id (int | None): Only notifications after this ID are asked for.
+
+        Returns:
+            tuple[int | None, dict | str]: The HTTP status (None without a response) and
+                the decoded JSON body on success, the error text otherwise.
+        """
+
+        return await self._get(
+            "notifications",
+            API_NOTIFICATIONS,
+            UEX_TIMEOUT_NOTIFICATIONS,
+            bearer_token=bearer_token,
+            secret_key=secret_key,
+            params={"id_after": since_id} if since_id is not None else None,
+        )
+
+
+    async def post_message(
+        self,
+        *,
+        bearer_token: str,
+        secret_key: str,
+        notif_hash: str,
+        message: str,
+        is_production: int = 1
+    ) -> tuple[int | None, str, float | None]:
+
+        """
+        Posts a message to a UEX negotiation, once.
+
+        Args:
+            bearer_token (str): The user's UEX bearer token.
+            secret_key (str): The user's UEX secret key.
+            notif_hash (str): The negotiation hash.
+            message (str): The text to post.
+            is_production (int): Flag to toggle between production (1) and test (0) environments.
+
+        Returns:
+            tuple[int | None, str, float | None]: The HTTP status (None without a response),
+                the error text (empty on success) and the retry delay hinted by UEX or
+                by the open circuit, if any.
+        """
+
+        status, body, retry_after = await self._request(
+            "post_message",
+            "POST",
+            API_POST_MESSAGE,
+            UEX_TIMEOUT_POST_MESSAGE,
+            bearer_token=bearer_token,
+            secret_key=secret_key,
+            json={"is_production": is_production, "hash": notif_hash, "message": message},
+        )
+        return status, "" if status == 200 else str(body), retry_after
+
+
+_client: UexClient | None = None
+
+
+def get_uex_client() -> UexClient:
+
+    """
+    Returns the process-wide UEX client, creating it on first use.
+
+    Returns:
+        UexClient: The shared UEX client.
+    """
+
+    global _client
+    if _client is None:
+        _client = UexClient()
+    return _client
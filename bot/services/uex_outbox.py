@@ -0,0 +1,214 @@
+import asyncio
+import logging
+from utils.rate_limit import TokenBucket, is_retryable, backoff_delay
+from utils.log import log_throttled
+from utils.tracing import span
+from services.uex_api import post_uex_message
+from services.uex_client import uex_deadline
+from db.counters import record_counter, UEX_SENT_OK, UEX_SENT_FAILED
+from config import (
+    UEX_OUTBOX_CONCURRENCY,
+    UEX_OUTBOX_MAX_PENDING,
+    UEX_RATE_LIMIT_PER_MINUTE,
+    UEX_RATE_LIMIT_BURST,
+    UEX_SEND_MAX_ATTEMPTS,
+    UEX_RETRY_BASE_DELAY,
+    UEX_RETRY_MAX_DELAY,
+)
+
+
+PENDING = "pending"
+DELIVERED = "delivered"
+FAILED = "failed"
+
+
+
+class UexOutbox:
+
+    """
+    Outbound queue for UEX API writes.
+
+    Every submitted message is delivered by a background task, so Discord handlers
+    and webhooks never wait on the UEX API. Deliveries are ordered per user, paced
+    by a per-user token bucket matching UEX's rate limits, and capped globally by a
+    semaphore. Transient failures (429, 5xx, connection errors) are retried with
+    exponential backoff and jitter; the outcome is reported through an optional
+    `on_status(state, error)` coroutine acting as a delivery receipt.
+
+    Attributes:
+        concurrency (int): Maximum number of UEX requests in flight.
+        max_pending (int): Maximum number of queued messages before new ones are refused.
+        max_attempts (int): Attempts per message before giving up.
+    """
+
+
+    def __init__(
+        self,
+        concurrency: int = UEX_OUTBOX_CONCURRENCY,
+        max_pending: int = UEX_OUTBOX_MAX_PENDING,
+        rate_per_minute: float = UEX_RATE_LIMIT_PER_MINUTE,
+        burst: int = UEX_RATE_LIMIT_BURST,
+        max_attempts: int = UEX_SEND_MAX_ATTEMPTS,
+        base_delay: float = UEX_RETRY_BASE_DELAY,
+        max_delay: float = UEX_RETRY_MAX_DELAY,
+    ):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rate = rate_per_minute / 60
+        self._burst = burst
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+
+    def submit(
+        self,
+        *,
+        user_id: str,
+        bearer_token: str,
+        secret_key: str,
+        notif_hash: str,
+        message: str,
+        on_status=None,
+    ) -> asyncio.Task | None:
+
+        """
+        Queues a message for delivery to a UEX negotiation and returns immediately.
+
+        Args:
+            user_id (str): The Discord user the message is sent for (rate-limit key).
+            bearer_token (str): The user's UEX bearer token.
+            secret_key (str): The user's UEX secret key.
+            notif_hash (str): The negotiation hash.
+            message (str): The text to deliver.
+            on_status (Callable[[str, str], Awaitable] | None): Receipt callback invoked
+                with `delivered` or `failed` and the last error text.
+
+        Returns:
+            asyncio.Task | None: The delivery task, or None if the queue is full.
+        """
+
+        if len(self._tasks) >= self.max_pending:
+            log_throttled("uex_outbox.full", 10, logging.WARNING, "⚠️ UEX outbox full (%d pending), refusing message for %s", self.pending, user_id)
+            return None
+
+        task = asyncio.create_task(
+            self._deliver(str(user_id), bearer_token, secret_key, notif_hash, message, on_status)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+
+    def _bucket(self, user_id: str) -> TokenBucket:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) > 1000:
+                self._prune()
+            bucket = self._buckets[user_id] = TokenBucket(self._rate, self._burst)
+        return bucket
+
+
+    def _prune(self):
+        for user_id, bucket in list(self._buckets.items()):
+            lock = self._locks.get(user_id)
+            if bucket.is_idle(600) and not (lock and lock.locked()):
+                self._buckets.pop(user_id, None)
+                self._locks.pop(user_id, None)
+
+
+    async def _deliver(self, user_id, bearer_token, secret_key, notif_hash, message, on_status):
+        # The span covers the wait for the user's turn and rate limit, and every attempt
+        with span("uex.outbox", negotiation_hash=notif_hash) as delivery:
+            delivered = await self._send(user_id, bearer_token, secret_key, notif_hash, message, on_status)
+            if delivery is not None:
+                delivery.set_attribute("delivered", delivered)
+            return delivered
+
+
+    async def _send(self, user_id, bearer_token, secret_key, notif_hash, message, on_status):
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        status, error = None, ""
+
+        # One delivery at a time per user keeps replies in the order they were written
+        async with lock:
+            for attempt in range(1, self.max_attempts + 1):
+                await self._bucket(user_id).acquire()
+
+                # Retries outlive the caller, so a deadline inherited from it must not apply
+                async with self._semaphore:
+                    with uex_deadline(None):
+                        status, error, retry_after = await post_uex_message(
+                            bearer_token=bearer_token,
+                            secret_key=secret_key,
+                            notif_hash=notif_hash,
+                            message=message
+                        )
+
+                if status == 200 or not is_retryable(status) or attempt == self.max_attempts:
+                    break
+
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay, retry_after)
+                log_throttled("uex_outbox.retry", 5, logging.INFO, "🔁 UEX retry %d/%d for %s in %.1fs (status=%s)", attempt, self.max_attempts - 1, user_id, delay, status)
+                await asyncio.sleep(delay)
+
+        if status == 200:
+            state = DELIVERED
+            record_counter(UEX_SENT_OK)
+        else:
+            state = FAILED
+            record_counter(UEX_SENT_FAILED)
+            error = f"{status}: {error}" if status else error
+            logging.warning("❌ UEX delivery failed for %s | hash=%s: %s", user_id, notif_hash, error)
+
+        if on_status:
+            try:
+                await on_status(state, error)
+            except Exception as e:
+                logging.error("❌ Delivery receipt error for %s: %s", user_id, e)
+
+        return state == DELIVERED
+
+
+    async def drain(self, timeout: float) -> int:
+
+        """
+        Waits for queued deliveries to complete.
+
+        Args:
+            timeout (float): Maximum time to wait, in seconds.
+
+        Returns:
+            int: The number of deliveries still pending after the wait.
+        """
+
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+        return self.pending
+
+
+_outbox: UexOutbox | None = None
+
+
+def get_uex_outbox() -> UexOutbox:
+
+    """
+    Returns the process-wide UEX outbox, creating it on first use.
+
+    Returns:
+        UexOutbox: The shared outbound queue.
+    """
+
+    global _outbox
+    if _outbox is None:
+        _outbox = UexOutbox()
+    return _outbox
@@ -10,7 +10,8 @@ Copre:
 - get_maintenance_status()        — trovato, assente, UTC-naivety fix
 - update_maintenance_state_if_needed() — transizioni scheduled→active, active→inactive, nessun record
 - save_status_message()           — scrittura OK
-- get_status_message()            — trovato, assente
+- get_status_messages()           — trovati, assenti
+- delete_status_message()         — cancellazione per canale e messaggio
 """
 
 import pytest
@@ -267,36 +268,66 @@ class TestSaveStatusMessage:
         assert 99 in args
         assert "it" in args
 
+    @pytest.mark.asyncio
+    async def test_upserts_per_guild_channel_and_lang(self):
+        conn, ctx = _make_ctx()
+        pool = _make_pool(ctx)
+
+        with patch('db.pool.db_pool', pool):
+            from db.maintenance import save_status_message
+            await save_status_message(channel_id=42, message_id=99, lang="it", guild_id=7)
+
+        args = conn.execute.call_args[0]
+        assert "ON CONFLICT (guild_id, channel_id, lang)" in args[0]
+        assert 7 in args
+
 
 # ---------------------------------------------------------------------------
-# get_status_message
+# get_status_messages / delete_status_message
 # ---------------------------------------------------------------------------
 
-class TestGetStatusMessage:
+class TestGetStatusMessages:
 
     @pytest.mark.asyncio
-    async def test_returns_tuple_when_found(self):
-        fake_row = {"channel_id": 10, "message_id": 20, "lang": "en"}
-        conn, ctx = _make_ctx(fetchrow_result=fake_row)
+    async def test_returns_all_boards(self):
+        rows = [
+            {"guild_id": 1, "channel_id": 10, "message_id": 20, "lang": "en"},
+            {"guild_id": 2, "channel_id": 11, "message_id": 21, "lang": "it"},
+        ]
+        conn, ctx = _make_ctx()
+        conn.fetch = AsyncMock(return_value=rows)
         pool = _make_pool(ctx)
 
         with patch('db.pool.db_pool', pool):
-            from db.maintenance import get_status_message
-            ch, msg, lang = await get_status_message()
+            from db.maintenance import get_status_messages
+            boards = await get_status_messages()
 
-        assert ch == 10
-        assert msg == 20
-        assert lang == "en"
+        assert boards == rows
 
     @pytest.mark.asyncio
-    async def test_returns_none_tuple_when_not_found(self):
-        conn, ctx = _make_ctx(fetchrow_result=None)
+    async def test_returns_empty_list_when_not_found(self):
+        conn, ctx = _make_ctx()
+        conn.fetch = AsyncMock(return_value=[])
         pool = _make_pool(ctx)
 
         with patch('db.pool.db_pool', pool):
-            from db.maintenance import get_status_message
-            ch, msg, lang = await get_status_message()
+            from db.maintenance import get_status_messages
+            boards = await get_status_messages()
+
+        assert boards == []
+
 
-        assert ch is None
-        assert msg is None
-        assert lang is None
+class TestDeleteStatusMessage:
+
+    @pytest.mark.asyncio
+    async def test_deletes_by_channel_and_message(self):
+        conn, ctx = _make_ctx()
+        pool = _make_pool(ctx)
+
+        with patch('db.pool.db_pool', pool):
+            from db.maintenance import delete_status_message
+            await delete_status_message(channel_id=10, message_id=20)
+
+        args = conn.execute.call_args[0]
+        assert "DELETE FROM status_message" in args[0]
+        assert args[1:] == (10, 20)
@@ -0,0 +1,173 @@
+# bot/tests/test_broadcast.py
+"""
+Tests per bot/services/broadcast.py e bot/db/broadcasts.py
+
+Copre:
+- fetch_broadcast_recipients() — cursore e limite passati alla query
+- create_broadcast_job()       — ritorna la riga creata
+- run_broadcast()              — cache prima di REST, fetch_user fallito, DM chiusi,
+                                 embed renderizzato una volta per lingua, cursore salvato,
+                                 ripresa dal cursore, progress finale
+- stop_broadcasts()            — job in corso interrotti allo shutdown
+"""
+
+import pytest
+import discord
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def _make_ctx(fetchrow_result=None, fetch_result=None):
+    conn = MagicMock()
+    conn.fetchrow = AsyncMock(return_value=fetchrow_result)
+    conn.fetch = AsyncMock(return_value=fetch_result or [])
+    conn.execute = AsyncMock()
+    ctx = MagicMock()
+    ctx.__aenter__ = AsyncMock(return_value=conn)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    return conn, ctx
+
+
+def _job(**kwargs):
+    job = {"id": 7, "message": "hello", "total": 3, "sent": 0, "failed": 0,
+           "cursor_lang": "", "cursor_user_id": ""}
+    job.update(kwargs)
+    return job
+
+
+def _user(user_id, send_error=None):
+    user = MagicMock()
+    user.id = user_id
+    user.send = AsyncMock(side_effect=send_error)
+    return user
+
+
+def _forbidden():
+    response = MagicMock(status=403, reason="Forbidden")
+    return discord.Forbidden(response, "Cannot send messages to this user")
+
+
+class TestBroadcastDb:
+
+    @pytest.mark.asyncio
+    async def test_fetch_recipients_passes_cursor_and_limit(self):
+        conn, ctx = _make_ctx(fetch_result=[{"user_id": "2", "lang": "it"}])
+
+        with patch('db.broadcasts.db.pool.db_pool') as mock_pool:
+            mock_pool.acquire.return_value = ctx
+            from db.broadcasts import fetch_broadcast_recipients
+            rows = await fetch_broadcast_recipients("en", "1", 50)
+
+        args = conn.fetch.call_args[0]
+        assert args[1:] == ("en", "1", 50)
+        assert "ORDER BY" in args[0]
+        assert rows == [{"user_id": "2", "lang": "it"}]
+
+    @pytest.mark.asyncio
+    async def test_create_job_returns_row(self):
+        conn, ctx = _make_ctx(fetchrow_result={"id": 1, "message": "m", "total": 10})
+
+        with patch('db.broadcasts.db.pool.db_pool') as mock_pool:
+            mock_pool.acquire.return_value = ctx
+            from db.broadcasts import create_broadcast_job
+            job = await create_broadcast_job("m", 123)
+
+        assert job["id"] == 1
+        assert "123" in conn.fetchrow.call_args[0]
+
+
+class TestRunBroadcast:
+
+    async def _run(self, bot, batches, job=None, progress=None):
+        fetch = AsyncMock(side_effect=batches + [[]])
+        update = AsyncMock()
+        finish = AsyncMock()
+
+        with (
+            patch('services.broadcast.broadcasts.fetch_broadcast_recipients', fetch),
+            patch('services.broadcast.broadcasts.update_broadcast_progress', update),
+            patch('services.broadcast.broadcasts.finish_broadcast_job', finish),
+        ):
+            from services.broadcast import run_broadcast
+            await run_broadcast(bot, job or _job(), progress)
+
+        return fetch, update, finish
+
+    @pytest.mark.asyncio
+    async def test_uses_cache_before_rest(self):
+        """Utente in cache → nessuna chiamata a fetch_user."""
+        cached = _user(1)
+        bot = MagicMock()
+        bot.get_user = MagicMock(return_value=cached)
+        bot.fetch_user = AsyncMock()
+
+        await self._run(bot, [[{"user_id": "1", "lang": "en"}]])
+
+        bot.fetch_user.assert_not_awaited()
+        cached.send.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_counts_failures_and_persists_cursor(self):
+        """fetch_user fallito e DM chiusi → contati come falliti, cursore sull'ultima riga."""
+        ok_user = _user(1)
+        closed_user = _user(3, send_error=_forbidden())
+        bot = MagicMock()
+        bot.get_user = MagicMock(side_effect=lambda uid: {1: ok_user, 3: closed_user}.get(uid))
+        response = MagicMock(status=404, reason="Not Found")
+        bot.fetch_user = AsyncMock(side_effect=discord.NotFound(response, "Unknown User"))
+        progress = AsyncMock()
+
+        rows = [
+            {"user_id": "1", "lang": "en"},
+            {"user_id": "2", "lang": "en"},
+            {"user_id": "3", "lang": "it"},
+        ]
+        _, update, finish = await self._run(bot, [rows], progress=progress)
+
+        update.assert_awaited_once_with(7, "it", "3", 1, 2)
+        finish.assert_awaited_once_with(7)
+        job, sent, failed, finished = progress.call_args[0]
+        assert (sent, failed, finished) == (1, 2, True)
+
+    @pytest.mark.asyncio
+    async def test_renders_embed_once_per_language(self):
+        bot = MagicMock()
+        bot.get_user = MagicMock(side_effect=lambda uid: _user(uid))
+        rows = [{"user_id": str(i), "lang": "en" if i < 3 else "de"} for i in range(1, 6)]
+
+        import services.broadcast as broadcast
+        with patch.object(broadcast, 'build_broadcast_embed', wraps=broadcast.build_broadcast_embed) as build:
+            await self._run(bot, [rows])
+
+        assert sorted(call.args[0] for call in build.call_args_list) == ["de", "en"]
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_stored_cursor(self):
+        """Un job ripreso continua dal cursore e dai contatori salvati."""
+        bot = MagicMock()
+        bot.get_user = MagicMock(side_effect=lambda uid: _user(uid))
+        job = _job(sent=10, failed=1, cursor_lang="en", cursor_user_id="42")
+
+        fetch, update, _ = await self._run(bot, [[{"user_id": "43", "lang": "en"}]], job=job)
+
+        assert fetch.call_args_list[0].args[:2] == ("en", "42")
+        update.assert_awaited_once_with(7, "en", "43", 11, 1)
+
+
+class TestStopBroadcasts:
+
+    @pytest.mark.asyncio
+    async def test_interrupts_running_jobs(self):
+        import asyncio
+        from services.broadcast import launch_broadcast, stop_broadcasts
+
+        async def run_broadcast(bot, job, progress=None):
+            await asyncio.sleep(60)
+
+        with patch('services.broadcast.run_broadcast', run_broadcast):
+            task = launch_broadcast(MagicMock(), _job())
+            await asyncio.sleep(0)
+            interrupted = await stop_broadcasts()
+
+        assert interrupted == 1
+        assert task.cancelled()
+        assert await stop_broadcasts() == 0
@@ -0,0 +1,101 @@
+# bot/tests/test_command_sync.py
+"""
+Tests per bot/discord_bot/command_sync.py
+
+Copre:
+- command_tree_hash() — stabile, cambia con descrizioni e opzioni
+- sync_commands()     — saltato con hash invariato, sync + salvataggio con hash
+                        cambiato, force ignora l'hash salvato
+"""
+
+import pytest
+import discord
+from discord import app_commands
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def _tree(description="Show bot statistics", with_option=False):
+    client = discord.Client(intents=discord.Intents.none())
+    tree = app_commands.CommandTree(client)
+    group = app_commands.Group(name="admin", description="Admin-only bot management commands")
+
+    if with_option:
+        @group.command(name="stats", description=description)
+        @app_commands.describe(days="Days to show")
+        async def stats(interaction: discord.Interaction, days: int):
+            pass
+    else:
+        @group.command(name="stats", description=description)
+        async def stats(interaction: discord.Interaction):
+            pass
+
+    tree.add_command(group)
+    return tree
+
+
+class TestCommandTreeHash:
+
+    def test_is_stable(self):
+        from discord_bot.command_sync import command_tree_hash
+        assert command_tree_hash(_tree()) == command_tree_hash(_tree())
+
+    def test_changes_with_commands(self):
+        from discord_bot.command_sync import command_tree_hash
+        base = command_tree_hash(_tree())
+        assert command_tree_hash(_tree(description="Other")) != base
+        assert command_tree_hash(_tree(with_option=True)) != base
+
+
+class TestSyncCommands:
+
+    def _bot(self):
+        bot = MagicMock()
+        bot.tree = _tree()
+        bot.tree.sync = AsyncMock(return_value=[MagicMock()])
+        return bot
+
+    @pytest.mark.asyncio
+    async def test_skips_when_unchanged(self):
+        from discord_bot.command_sync import command_tree_hash, sync_commands
+        bot = self._bot()
+        stored = command_tree_hash(bot.tree)
+
+        with (
+            patch('discord_bot.command_sync.get_setting', AsyncMock(return_value=stored)),
+            patch('discord_bot.command_sync.set_setting', AsyncMock()) as set_setting,
+        ):
+            result = await sync_commands(bot)
+
+        assert result is None
+        bot.tree.sync.assert_not_awaited()
+        set_setting.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_syncs_and_stores_when_changed(self):
+        from discord_bot.command_sync import command_tree_hash, sync_commands
+        bot = self._bot()
+
+        with (
+            patch('discord_bot.command_sync.get_setting', AsyncMock(return_value="old")),
+            patch('discord_bot.command_sync.set_setting', AsyncMock()) as set_setting,
+        ):
+            result = await sync_commands(bot)
+
+        assert result == 1
+        bot.tree.sync.assert_awaited_once()
+        set_setting.assert_awaited_once_with("command_tree_hash", command_tree_hash(bot.tree))
+
+    @pytest.mark.asyncio
+    async def test_force_ignores_stored_hash(self):
+        from discord_bot.command_sync import command_tree_hash, sync_commands
+        bot = self._bot()
+        get_setting = AsyncMock(return_value=command_tree_hash(bot.tree))
+
+        with (
+            patch('discord_bot.command_sync.get_setting', get_setting),
+            patch('discord_bot.command_sync.set_setting', AsyncMock()),
+        ):
+            await sync_commands(bot, force=True)
+
+        get_setting.assert_not_awaited()
+        bot.tree.sync.assert_awaited_once()
@@ -0,0 +1,168 @@
+# bot/tests/test_counters.py
+"""
+Tests per bot/db/counters.py
+
+Copre:
+- record_counter()    — eventi accumulati in memoria per (chiave, ora)
+- webhook_counter()   — tipi di evento sconosciuti raggruppati in 'other'
+- flush_counters()    — scrittura in batch, buffer vuoto, re-buffer in caso di errore
+                        o di cancellazione (shutdown)
+- get_counters()      — mapping chiave → valore
+- COUNTER_SCHEMA      — seeding dei contatori solo se mancanti, rieseguibile a ogni avvio
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture(autouse=True)
+def clear_pending():
+    import db.counters as counters
+    counters._pending.clear()
+    yield
+    counters._pending.clear()
+
+
+def _make_ctx(fetch_result=None, executemany_error=None):
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=fetch_result or [])
+    conn.execute = AsyncMock()
+    conn.executemany = AsyncMock(side_effect=executemany_error)
+    transaction = MagicMock()
+    transaction.__aenter__ = AsyncMock(return_value=None)
+    transaction.__aexit__ = AsyncMock(return_value=False)
+    conn.transaction = MagicMock(return_value=transaction)
+    ctx = MagicMock()
+    ctx.__aenter__ = AsyncMock(return_value=conn)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    return conn, ctx
+
+
+class TestRecordCounter:
+
+    def test_accumulates_in_memory(self):
+        from db.counters import record_counter, _pending
+        record_counter("uex.sent.ok")
+        record_counter("uex.sent.ok")
+        record_counter("uex.sent.failed", 3)
+
+        totals = {key: amount for (key, _), amount in _pending.items()}
+        assert totals == {"uex.sent.ok": 2, "uex.sent.failed": 3}
+
+    def test_unknown_webhook_events_share_a_key(self):
+        from db.counters import webhook_counter
+        assert webhook_counter("user_reply") == "webhooks.user_reply"
+        assert webhook_counter("../../anything") == "webhooks.other"
+
+
+class TestFlushCounters:
+
+    @pytest.mark.asyncio
+    async def test_writes_buffer_in_batch(self):
+        from db.counters import record_counter, flush_counters, _pending
+        record_counter("webhooks.user_reply")
+        record_counter("webhooks.user_reply")
+        conn, ctx = _make_ctx()
+
+        with patch('db.counters.db.pool.db_pool') as mock_pool:
+            mock_pool.acquire.return_value = ctx
+            written = await flush_counters()
+
+        assert written == 1
+        assert _pending == {}
+        totals_call, buckets_call = conn.executemany.call_args_list
+        assert totals_call.args[1] == [("webhooks.user_reply", 2)]
+        assert buckets_call.args[1][0][0] == "webhooks.user_reply"
+        assert buckets_call.args[1][0][2] == 2
+
+    @pytest.mark.asyncio
+    async def test_rebuffers_on_error(self):
+        """Se la scrittura fallisce i conteggi restano in memoria per il flush successivo."""
+        from db.counters import record_counter, flush_counters, _pending
+        record_counter("uex.sent.ok")
+        conn, ctx = _make_ctx(executemany_error=Exception("db down"))
+
+        with patch('db.counters.db.pool.db_pool') as mock_pool:
+            mock_pool.acquire.return_value = ctx
+            written = await flush_counters()
+
+        assert written == 0
+        assert list(_pending.values()) == [1]
+
+    @pytest.mark.asyncio
+    async def test_rebuffers_when_cancelled(self):
+        """Un flush interrotto dallo shutdown non perde i conteggi: li scrive il flush finale."""
+        import asyncio
+        from db.counters import record_counter, flush_counters, _pending
+        record_counter("uex.sent.ok")
+        conn, ctx = _make_ctx(executemany_error=asyncio.CancelledError())
+
+        with patch('db.counters.db.pool.db_pool') as mock_pool:
+            mock_pool.acquire.return_value = ctx
+            with pytest.raises(asyncio.CancelledError):
+                await flush_counters()
+
+        assert list(_pending.values()) == [1]
+
+    @pytest.mark.asyncio
+    async def test_noop_without_pool(self):
+        from db.counters import record_counter, flush_counters, _pending
+        record_counter("uex.sent.ok")
+
+        with patch('db.counters.db.pool.db_pool', None):
+            assert await flush_counters() == 0
+
+        assert list(_pending.values()) == [1]
+
+
+class TestGetCounters:
+
+    @pytest.mark.asyncio
+    async def test_maps_rows(self):
+        conn, ctx = _make_ctx(fetch_result=[
+            {"key": "sessions.total", "value": 42},
+            {"key": "banned.total", "value": 1},
+        ])
+
+        with patch('db.counters.db.pool.db_pool') as mock_pool:
+            mock_pool.acquire.return_value = ctx
+            from db.counters import get_counters
+            result = await get_counters()
+
+        assert result == {"sessions.total": 42, "banned.total": 1}
+
+
+class TestCounterSchema:
+
+    def _seed(self, conn):
+        # The seeding statements are plain SQL: SQLite runs them as PostgreSQL does
+        import re
+        from db.counters import COUNTER_SCHEMA
+        statements = re.findall(r"INSERT INTO bot_counters \(key, value\)\s+SELECT.*?;", COUNTER_SCHEMA, re.S)
+        assert len(statements) == 4
+        for statement in statements:
+            conn.execute(statement)
+
+    def test_seeding_runs_on_every_startup(self):
+        import sqlite3
+        conn = sqlite3.connect(":memory:")
+        conn.executescript("""
+            CREATE TABLE bot_counters (key TEXT PRIMARY KEY, value BIGINT NOT NULL DEFAULT 0);
+            CREATE TABLE sessions (user_id TEXT, thread_id TEXT);
+            CREATE TABLE negotiation_links (negotiation_hash TEXT);
+            CREATE TABLE banned_users (user_id TEXT);
+            INSERT INTO sessions VALUES ('1', NULL), ('2', '99');
+            INSERT INTO banned_users VALUES ('3');
+        """)
+
+        self._seed(conn)
+        conn.execute("UPDATE bot_counters SET value = value + 5 WHERE key = 'sessions.total'")
+        self._seed(conn)
+
+        counters = dict(conn.execute("SELECT key, value FROM bot_counters"))
+        assert counters == {
+            "sessions.total": 7,
+            "sessions.threads": 1,
+            "negotiations.active": 0,
+            "banned.total": 1,
+        }
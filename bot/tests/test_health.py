@@ -0,0 +1,164 @@
+# bot/tests/test_health.py
+"""
+Tests per bot/webserver/health.py
+
+Copre:
+- deep_health()   — report con DB, Discord, sessioni HTTP, lag del loop e ultimo
+                    webhook; risultato in cache per HEALTH_CACHE_TTL, una sola
+                    sonda per chiamate concorrenti; "down" se DB (anche pool
+                    esaurito) o gateway non disponibili, "degraded" per circuito
+                    UEX aperto o loop in ritardo
+- handle_health   — /health resta testo statico, ?deep=1 risponde in JSON,
+                    503 quando lo stato è "down"
+"""
+
+import json
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture
+def deps():
+    import webserver.health as health
+    health._cache, health._probing, health._last_webhook = None, None, None
+    health._lags.clear()
+
+    pool = MagicMock()
+    pool.get_size.return_value, pool.get_idle_size.return_value, pool.get_max_size.return_value = 3, 2, 10
+    pool.fetchval = AsyncMock(return_value=1)
+    client = MagicMock()
+    client.breaker.state = "closed"
+
+    with (
+        patch('db.pool.db_pool', pool),
+        patch('webserver.health.bot') as bot,
+        patch('webserver.health.is_http_open', return_value=True),
+        patch('webserver.health.get_uex_client', return_value=client),
+    ):
+        bot.is_ready.return_value, bot.is_closed.return_value, bot.latency = True, False, 0.042
+        yield SimpleNamespace(pool=pool, bot=bot, client=client)
+
+    health._cache, health._probing = None, None
+    health._lags.clear()
+
+
+class TestDeepHealth:
+
+    @pytest.mark.asyncio
+    async def test_healthy_report(self, deps):
+        import webserver.health as health
+        health.mark_webhook_processed()
+        health._lags.extend([0.001, 0.003])
+
+        report = await health.deep_health()
+
+        assert report["status"] == "ok"
+        assert report["database"]["status"] == "ok"
+        assert report["database"]["size"] == 3 and report["database"]["max_size"] == 10
+        assert report["discord"]["latency_ms"] == 42.0
+        assert report["http"] == {"status": "ok", "session": "open", "uex_breaker": "closed"}
+        assert report["event_loop"]["max_lag_ms"] == 3.0
+        assert report["webhooks"]["last_processed_age_s"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_probes_are_cached_and_shared(self, deps):
+        import webserver.health as health
+
+        async def slow_select(*args, **kwargs):
+            await asyncio.sleep(0.02)
+            return 1
+        deps.pool.fetchval = AsyncMock(side_effect=slow_select)
+
+        reports = await asyncio.gather(*(health.deep_health() for _ in range(5)))
+        again = await health.deep_health()
+
+        assert deps.pool.fetchval.await_count == 1
+        assert all(report is reports[0] for report in reports)
+        assert again is reports[0]
+
+    @pytest.mark.asyncio
+    async def test_cache_expires(self, deps):
+        import webserver.health as health
+        with patch('webserver.health.HEALTH_CACHE_TTL', 0):
+            await health.deep_health()
+            await health.deep_health()
+
+        assert deps.pool.fetchval.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_database_failure_is_down(self, deps):
+        import webserver.health as health
+        deps.pool.fetchval = AsyncMock(side_effect=OSError("connection refused"))
+
+        report = await health.deep_health()
+
+        assert report["status"] == "down"
+        assert report["database"] == {"status": "down", "error": "connection refused", "size": 3, "idle": 2, "max_size": 10}
+
+    @pytest.mark.asyncio
+    async def test_exhausted_pool_is_down(self, deps):
+        import webserver.health as health
+
+        async def no_free_connection(*args, **kwargs):
+            await asyncio.sleep(60)
+        deps.pool.fetchval = AsyncMock(side_effect=no_free_connection)
+
+        with patch('webserver.health.HEALTH_PROBE_TIMEOUT', 0.01):
+            report = await asyncio.wait_for(health.deep_health(), 1)
+
+        assert report["status"] == "down"
+        assert report["database"]["error"] == "no answer within 0.01 s"
+
+    @pytest.mark.asyncio
+    async def test_gateway_not_ready_is_down(self, deps):
+        import webserver.health as health
+        deps.bot.is_ready.return_value = False
+
+        report = await health.deep_health()
+
+        assert report["status"] == "down"
+        assert report["discord"]["ready"] is False
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_and_loop_lag_are_degraded(self, deps):
+        import webserver.health as health
+        deps.client.breaker.state = "open"
+        health._lags.append(2.0)
+
+        report = await health.deep_health()
+
+        assert report["status"] == "degraded"
+        assert report["http"]["status"] == "degraded"
+        assert report["event_loop"]["status"] == "degraded"
+
+
+class TestHandleHealth:
+
+    def _request(self, **query):
+        request = MagicMock()
+        request.query = query
+        return request
+
+    @pytest.mark.asyncio
+    async def test_shallow(self):
+        from webserver.server import handle_health
+
+        with patch('webserver.server.deep_health') as deep:
+            response = await handle_health(self._request())
+
+        assert response.status == 200
+        assert response.text == "online"
+        deep.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status, code", [("ok", 200), ("degraded", 200), ("down", 503)])
+    async def test_deep(self, status, code):
+        from webserver.server import handle_health
+
+        with patch('webserver.server.deep_health', AsyncMock(return_value={"status": status})):
+            response = await handle_health(self._request(deep="1"))
+
+        assert response.status == code
+        assert json.loads(response.text) == {"status": status}
@@ -0,0 +1,57 @@
+# bot/tests/test_import_time.py
+"""
+Import-time budget per l'entry point del bot (main.py).
+
+Ogni riavvio del watchdog paga il tempo di import: il test misura `import main`
+con `python -X importtime` in un processo separato e fallisce se:
+- il tempo cumulativo supera IMPORT_TIME_BUDGET_MS (default 800 ms, migliore di 3 run)
+- uno dei moduli pesanti caricati on-demand (dateparser, psutil, requests) torna
+  nel percorso di import
+"""
+
+import os
+import sys
+import subprocess
+from pathlib import Path
+
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", 800))
+RUNS = 3
+LAZY_MODULES = ("dateparser", "psutil", "requests")
+
+
+def _import_main(tmp_path) -> dict[str, int]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(BOT_DIR)
+    env.setdefault("ENCRYPTION_KEY", "47DEQpj8HBSa-_TImW-5JCeuQeRkm5NMpJWZG3hSuFU=")
+
+    # cwd separata: setup_logger() crea bot.log nella directory corrente
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    # Formato: "import time: <self us> | <cumulative us> | <indentazione><modulo>"
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumul_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumul_us)
+    return cumulative
+
+
+def test_entry_point_import_budget(tmp_path):
+    runs = [_import_main(tmp_path) for _ in range(RUNS)]
+
+    best_ms = min(run["main"] for run in runs) / 1000
+    assert best_ms <= BUDGET_MS, f"import main took {best_ms:.0f} ms (budget {BUDGET_MS:.0f} ms)"
+
+    eager = [name for name in LAZY_MODULES if name in runs[0]]
+    assert not eager, f"Heavy modules imported at startup: {eager}"
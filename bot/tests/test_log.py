@@ -0,0 +1,87 @@
+# bot/tests/test_log.py
+"""
+Tests per bot/utils/log.py
+
+Copre:
+- log_context()    — campi annidati, None ignorati, ripristino all'uscita, ereditati
+                     dai task avviati nel blocco, ContextFilter li copia sul record
+- lazy_t()         — traduzione risolta solo alla formattazione
+- log_throttled()  — un record per intervallo e chiave, conteggio dei soppressi
+"""
+
+import time
+import asyncio
+import logging
+import pytest
+from unittest.mock import patch
+
+
+class TestLogContext:
+
+    def test_nested_fields(self):
+        from utils.log import log_context, current_context
+
+        with log_context(request_id="r1", user_id=None):
+            with log_context(event_type="user_reply"):
+                inner = current_context()
+            outer = current_context()
+
+        assert inner == {"request_id": "r1", "event_type": "user_reply"}
+        assert outer == {"request_id": "r1"}
+        assert current_context() == {}
+
+    @pytest.mark.asyncio
+    async def test_tasks_inherit_context(self):
+        from utils.log import log_context, current_context
+
+        async def child():
+            await asyncio.sleep(0)
+            return current_context()
+
+        with log_context(user_id="7"):
+            task = asyncio.create_task(child())
+
+        assert await task == {"user_id": "7"}
+
+    def test_filter_tags_record(self):
+        from utils.log import log_context, ContextFilter
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "hi", None, None)
+
+        with log_context(user_id="7"):
+            ContextFilter().filter(record)
+
+        assert record.context == {"user_id": "7"}
+
+
+class TestLazyText:
+
+    def test_translated_when_formatted(self):
+        from utils.log import lazy_t
+
+        with patch('utils.log.t', return_value="translated") as translate:
+            text = lazy_t("en", "server.webhook_request", user_id=7)
+            translate.assert_not_called()
+
+            assert str(text) == "translated"
+            translate.assert_called_once_with("en", "server.webhook_request", user_id="7")
+
+
+class TestLogThrottled:
+
+    def test_one_record_per_interval(self, caplog):
+        from utils.log import log_throttled
+        caplog.set_level(logging.INFO)
+
+        logged = [log_throttled("test.burst", 0.05, logging.INFO, "retry %d", i) for i in range(3)]
+        time.sleep(0.06)
+        log_throttled("test.burst", 0.05, logging.INFO, "retry %d", 3)
+
+        assert logged == [True, False, False]
+        assert [r.getMessage() for r in caplog.records] == ["retry 0", "retry 3 (+2 suppressed)"]
+
+    def test_disabled_level_is_free(self, caplog):
+        from utils.log import log_throttled
+        caplog.set_level(logging.WARNING)
+
+        assert log_throttled("test.debug", 60, logging.DEBUG, "hidden") is False
+        assert caplog.records == []
@@ -0,0 +1,164 @@
+# bot/tests/test_logger.py
+"""
+Tests per bot/logger.py
+
+Copre:
+- RotatingLogFileHandler — rotazione per dimensione con backup compressi in gzip,
+                           numero di backup limitato, rotazione per età
+- LazyQueueHandler       — argomenti semplici e lazy_t formattati nel thread del
+                           listener, argomenti mutabili ed eccezioni subito
+- TextFormatter / JsonFormatter — campi di contesto in coda alla riga / nel JSON
+- setup_logger()         — root logger con solo la QueueHandler, scrittura su file
+                           e console dal thread del listener, stop_logger() svuota
+                           la coda; nessun effetto se il logging è già configurato
+"""
+
+import io
+import sys
+import json
+import gzip
+import queue
+import time
+import logging
+import threading
+import logging.handlers
+import pytest
+
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+@pytest.fixture
+def root():
+    root = logging.getLogger()
+    level = root.level
+    yield root
+    from logger import stop_logger
+    stop_logger()
+    root.setLevel(level)
+
+
+class TestRotatingLogFileHandler:
+
+    def test_size_rotation_compresses_backups(self, tmp_path):
+        from logger import RotatingLogFileHandler
+        path = tmp_path / "bot.log"
+        handler = RotatingLogFileHandler(str(path), max_bytes=100, backup_count=2, interval=0, compress=True)
+
+        for i in range(12):
+            handler.emit(_record(f"line {i:02d} " + "x" * 30))
+        handler.close()
+
+        backups = sorted(p.name for p in tmp_path.iterdir() if p.name != "bot.log")
+        assert backups == ["bot.log.1.gz", "bot.log.2.gz"]
+        newest = gzip.decompress((tmp_path / "bot.log.1.gz").read_bytes()).decode()
+        assert "line 09" in newest
+        assert "line 11" in path.read_text()
+
+    def test_age_rotation(self, tmp_path):
+        from logger import RotatingLogFileHandler
+        path = tmp_path / "bot.log"
+        handler = RotatingLogFileHandler(str(path), max_bytes=0, backup_count=3, interval=0.05, compress=False)
+
+        handler.emit(_record("old"))
+        time.sleep(0.06)
+        handler.emit(_record("new"))
+        handler.close()
+
+        assert (tmp_path / "bot.log.1").read_text().strip() == "old"
+        assert path.read_text().strip() == "new"
+
+
+class TestLazyQueueHandler:
+
+    def _prepare(self, msg, *args, exc_info=None):
+        from logger import LazyQueueHandler
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, exc_info)
+        return LazyQueueHandler(queue.SimpleQueue()).prepare(record)
+
+    def test_simple_arguments_are_deferred(self):
+        from utils.log import lazy_t
+
+        record = self._prepare("%s sent %d bytes: %s", "alice", 12, lazy_t("en", "enabled"))
+
+        assert record.msg == "%s sent %d bytes: %s"
+        assert record.getMessage() == "alice sent 12 bytes: enabled"
+
+    def test_mutable_arguments_are_formatted_now(self):
+        data = {"message": "hi"}
+
+        record = self._prepare("payload: %s", data)
+        data["message"] = "changed"
+
+        assert record.args is None
+        assert record.getMessage() == "payload: {'message': 'hi'}"
+
+    def test_exception_is_rendered_now(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = self._prepare("failed", exc_info=sys.exc_info())
+
+        assert record.exc_info is None
+        assert "ValueError: boom" in record.exc_text
+
+
+class TestFormatters:
+
+    def _record(self, **context):
+        record = _record("hello")
+        if context:
+            record.context = context
+        return record
+
+    def test_text_appends_context(self):
+        from logger import TextFormatter
+
+        line = TextFormatter("%(levelname)s - %(message)s").format(self._record(event_type="user_reply", user_id="7"))
+
+        assert line == "INFO - hello | event_type=user_reply user_id=7"
+
+    def test_json_line(self):
+        from logger import JsonFormatter
+
+        entry = json.loads(JsonFormatter().format(self._record(request_id="abc")))
+
+        assert entry["level"] == "INFO"
+        assert entry["message"] == "hello"
+        assert entry["request_id"] == "abc"
+        assert entry["time"].endswith("+00:00")
+
+
+class TestSetupLogger:
+
+    def test_records_go_through_the_queue(self, tmp_path, root):
+        from logger import setup_logger, stop_logger
+        path, console = tmp_path / "bot.log", io.StringIO()
+        threads = []
+
+        listener = setup_logger(level="INFO", path=str(path), stream=console, force=True)
+        queue_handlers = root.handlers[:]
+        listener.handlers[0].addFilter(lambda record: threads.append(threading.current_thread()) or True)
+        logging.info("hello %s", "queue")
+        logging.debug("hidden")
+        stop_logger()
+
+        assert [type(h).__name__ for h in queue_handlers] == ["LazyQueueHandler"]
+        assert "INFO - hello queue" in path.read_text(encoding="utf-8")
+        assert "hello queue" in console.getvalue()
+        assert "hidden" not in console.getvalue()
+        assert threads and threading.main_thread() not in threads
+        assert root.handlers == []
+
+    def test_already_configured(self, tmp_path, root):
+        from logger import setup_logger
+        handler = logging.NullHandler()
+        root.addHandler(handler)
+
+        try:
+            assert setup_logger(path=str(tmp_path / "bot.log")) is None
+        finally:
+            root.removeHandler(handler)
+
+        assert not (tmp_path / "bot.log").exists()
@@ -0,0 +1,80 @@
+# bot/tests/test_member_cache.py
+"""
+Tests per la cache dei membri (bot/discord_bot/bot.py, bot/utils/roles_management.py)
+
+Copre:
+- build_member_cache_flags() — modalità none / joined / full
+- resolve_member()           — Member già presente, cache, fetch lazy, fetch fallito
+"""
+
+import pytest
+import discord
+from unittest.mock import AsyncMock, MagicMock
+
+
+class TestBuildMemberCacheFlags:
+
+    def _intents(self):
+        intents = discord.Intents.default()
+        intents.members = True
+        return intents
+
+    def test_none_caches_nothing(self):
+        from discord_bot.bot import build_member_cache_flags
+        flags = build_member_cache_flags("none", self._intents())
+        assert flags.value == 0
+
+    def test_joined(self):
+        from discord_bot.bot import build_member_cache_flags
+        flags = build_member_cache_flags("joined", self._intents())
+        assert flags.joined and not flags.voice
+
+    def test_full_follows_intents(self):
+        from discord_bot.bot import build_member_cache_flags
+        intents = self._intents()
+        assert build_member_cache_flags("full", intents) == discord.MemberCacheFlags.from_intents(intents)
+
+
+class TestResolveMember:
+
+    @pytest.mark.asyncio
+    async def test_returns_member_as_is(self):
+        from utils.roles_management import resolve_member
+        member = MagicMock(spec=discord.Member)
+        guild = MagicMock()
+
+        assert await resolve_member(guild, member) is member
+        guild.fetch_member.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_uses_cache_before_fetch(self):
+        from utils.roles_management import resolve_member
+        cached = MagicMock()
+        guild = MagicMock()
+        guild.get_member = MagicMock(return_value=cached)
+        guild.fetch_member = AsyncMock()
+
+        assert await resolve_member(guild, MagicMock(id=5)) is cached
+        guild.fetch_member.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_fetches_lazily(self):
+        from utils.roles_management import resolve_member
+        fetched = MagicMock()
+        guild = MagicMock()
+        guild.get_member = MagicMock(return_value=None)
+        guild.fetch_member = AsyncMock(return_value=fetched)
+
+        assert await resolve_member(guild, MagicMock(id=5)) is fetched
+        guild.fetch_member.assert_awaited_once_with(5)
+
+    @pytest.mark.asyncio
+    async def test_returns_none_when_fetch_fails(self):
+        from utils.roles_management import resolve_member
+        guild = MagicMock()
+        guild.get_member = MagicMock(return_value=None)
+        response = MagicMock(status=404, reason="Not Found")
+        guild.fetch_member = AsyncMock(side_effect=discord.NotFound(response, "Unknown Member"))
+
+        assert await resolve_member(guild, MagicMock(id=5)) is None
+        assert await resolve_member(None, MagicMock(id=5)) is None
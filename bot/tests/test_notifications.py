@@ -0,0 +1,185 @@
+# bot/tests/test_notifications.py
+"""
+Tests per bot/services/notifications.py
+
+Copre:
+- MonitoringNotifier.notify() — ritorna subito, post in background, senza URL
+                                → scartato
+- coalescing                  — eventi ripetuti nella finestra → un solo post
+                                con il conteggio nel footer
+- retry                       — 429 rispetta retry_after, 4xx non ritentato
+- send_startup_notification() — accoda l'embed di avvio senza attendere il post,
+                                riavvii nella finestra contati nel database e
+                                riportati nel footer del post successivo, post
+                                anche senza database
+"""
+
+import json
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+class FakeWebhook:
+
+    def __init__(self, statuses=None, delay=0.0):
+        self.statuses = list(statuses or [])
+        self.delay = delay
+        self.payloads = []
+
+    async def handle(self, request):
+        self.payloads.append(await request.json())
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        status = self.statuses.pop(0) if self.statuses else 204
+        if status == 429:
+            return web.json_response({"message": "You are being rate limited.", "retry_after": 0.25}, status=429)
+        return web.Response(status=status)
+
+
+@pytest.fixture
+async def webhook():
+    from webserver.session_http import close_http
+    servers = []
+
+    async def start(**kwargs):
+        fake = FakeWebhook(**kwargs)
+        app = web.Application()
+        app.router.add_post("/hook", fake.handle)
+        server = TestServer(app)
+        await server.start_server()
+        servers.append(server)
+        return fake, str(server.make_url("/hook"))
+
+    yield start
+
+    for server in servers:
+        await server.close()
+    await close_http()
+
+
+class TestMonitoringNotifier:
+
+    @pytest.mark.asyncio
+    async def test_notify_returns_before_post(self, webhook):
+        from services.notifications import MonitoringNotifier
+        fake, url = await webhook(delay=0.2)
+        notifier = MonitoringNotifier(url=url)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        assert notifier.notify("startup", {"title": "up"}) is True
+        assert loop.time() - start < 0.05
+
+        assert await notifier.drain(timeout=2) == 0
+        assert fake.payloads == [{"embeds": [{"title": "up"}]}]
+
+    @pytest.mark.asyncio
+    async def test_without_url_drops(self):
+        from services.notifications import MonitoringNotifier
+        notifier = MonitoringNotifier(url=None)
+
+        assert notifier.notify("startup", {"title": "up"}) is False
+        assert notifier.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_repeats_are_coalesced(self, webhook):
+        from services.notifications import MonitoringNotifier
+        fake, url = await webhook()
+        notifier = MonitoringNotifier(url=url, window=0.3)
+
+        notifier.notify("startup", {"title": "1"})
+        await notifier.drain(timeout=2)
+        for i in range(2, 5):
+            notifier.notify("startup", {"title": str(i)})
+        notifier.notify("other", {"title": "other"})
+        await notifier.drain(timeout=2)
+
+        titles = [payload["embeds"][0]["title"] for payload in fake.payloads]
+        assert titles == ["1", "other", "4"]
+        assert "3×" in fake.payloads[2]["embeds"][0]["footer"]["text"]
+
+    @pytest.mark.asyncio
+    async def test_honours_retry_after(self, webhook):
+        from services.notifications import MonitoringNotifier
+        fake, url = await webhook(statuses=[429])
+        notifier = MonitoringNotifier(url=url, base_delay=0.01, max_delay=0.01)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        notifier.notify("startup", {"title": "up"})
+        await notifier.drain(timeout=2)
+
+        assert len(fake.payloads) == 2
+        assert loop.time() - start >= 0.25
+
+    @pytest.mark.asyncio
+    async def test_client_error_not_retried(self, webhook):
+        from services.notifications import MonitoringNotifier
+        fake, url = await webhook(statuses=[404])
+        notifier = MonitoringNotifier(url=url)
+
+        notifier.notify("startup", {"title": "up"})
+        await notifier.drain(timeout=2)
+
+        assert len(fake.payloads) == 1
+
+
+class TestSendStartupNotification:
+
+    async def _start(self, stored, now=1000.0):
+        from services.notifications import MonitoringNotifier, send_startup_notification
+        notifier = MonitoringNotifier(url="http://monitoring.invalid/hook", window=60)
+        notifier.notify = lambda key, embed: notifier._pending.setdefault(key, embed) is not None
+        settings = {"startup_notification": stored}
+
+        async def set_setting(key, value):
+            settings[key] = value
+
+        with (
+            patch('services.notifications.get_notifier', return_value=notifier),
+            patch('services.notifications.get_setting', AsyncMock(side_effect=settings.get)),
+            patch('services.notifications.set_setting', set_setting),
+            patch('services.notifications.time.time', return_value=now),
+        ):
+            await send_startup_notification()
+        return notifier._pending.get("startup"), json.loads(settings["startup_notification"] or "null")
+
+    @pytest.mark.asyncio
+    async def test_queues_startup_embed(self):
+        embed, state = await self._start(None)
+
+        assert "title" in embed
+        assert "footer" not in embed
+        assert state == {"sent_at": 1000.0, "skipped": 0}
+
+    @pytest.mark.asyncio
+    async def test_restarts_within_the_window_are_coalesced(self):
+        embed, state = await self._start(json.dumps({"sent_at": 970.0, "skipped": 2}))
+
+        assert embed is None
+        assert state == {"sent_at": 970.0, "skipped": 3}
+
+    @pytest.mark.asyncio
+    async def test_next_post_reports_the_restarts(self):
+        embed, state = await self._start(json.dumps({"sent_at": 900.0, "skipped": 3}))
+
+        assert embed["footer"]["text"].startswith("4×")
+        assert state == {"sent_at": 1000.0, "skipped": 0}
+
+    @pytest.mark.asyncio
+    async def test_posts_without_the_database(self):
+        from services.notifications import MonitoringNotifier, send_startup_notification
+        notifier = MonitoringNotifier(url="http://monitoring.invalid/hook")
+        notifier.notify = MagicMock(return_value=True)
+
+        with (
+            patch('services.notifications.get_notifier', return_value=notifier),
+            patch('services.notifications.get_setting', AsyncMock(side_effect=OSError("db down"))),
+            patch('services.notifications.set_setting', AsyncMock(side_effect=OSError("db down"))),
+        ):
+            await send_startup_notification()
+
+        notifier.notify.assert_called_once()
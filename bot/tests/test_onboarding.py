@@ -0,0 +1,180 @@
+# bot/tests/test_onboarding.py
+"""
+Tests per bot/services/onboarding.py
+
+Copre:
+- ThreadOnboarding.submit() — thread creato in background con followup,
+                              pressioni duplicate unite (un solo thread, un
+                              followup per interazione), pressione durante i
+                              followup non persa, coda piena → None
+- creazione thread          — retry su 429, errore definitivo → generic_error
+- OpenThreadButton          — thread esistente (anche archiviato) riaperto con
+                              already_active, thread eliminato → nuovo onboarding
+"""
+
+import asyncio
+import discord
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def _interaction(user_id=1):
+    interaction = MagicMock()
+    interaction.user.id = user_id
+    interaction.user.name = f"user{user_id}"
+    interaction.followup.send = AsyncMock()
+    return interaction
+
+
+def _parent(create_thread):
+    parent = MagicMock(spec=discord.TextChannel)
+    parent.id = 100
+    parent.create_thread = create_thread
+    return parent
+
+
+def _thread():
+    thread = MagicMock()
+    thread.id = 500
+    thread.mention = "<#500>"
+    thread.add_user = AsyncMock()
+    thread.send = AsyncMock()
+    return thread
+
+
+def _http_error(status):
+    return discord.HTTPException(MagicMock(status=status), "error")
+
+
+async def _run(onboarding, parent, *interactions):
+    with (
+        patch('services.onboarding.choose_parent_channel', AsyncMock(return_value=parent)),
+        patch('services.onboarding.sessions.save_user_session', AsyncMock()) as save,
+        patch('services.onboarding.touch_thread'),
+        patch('discord_bot.views.SetupTutorialView'),
+        patch('services.onboarding.asyncio.sleep', AsyncMock()),
+    ):
+        tasks = [onboarding.submit(interaction, "en") for interaction in interactions]
+        await asyncio.gather(*{task for task in tasks if task})
+    return tasks, save
+
+
+class TestThreadOnboarding:
+
+    @pytest.mark.asyncio
+    async def test_creates_thread_and_follows_up(self):
+        from services.onboarding import ThreadOnboarding
+        thread = _thread()
+        parent = _parent(AsyncMock(return_value=thread))
+        interaction = _interaction()
+
+        _, save = await _run(ThreadOnboarding(), parent, interaction)
+
+        thread.add_user.assert_awaited_once_with(interaction.user)
+        assert save.await_args.kwargs["parent_channel_id"] == 100
+        message = interaction.followup.send.await_args.args[0]
+        assert "<#500>" in message
+
+    @pytest.mark.asyncio
+    async def test_duplicate_presses_are_coalesced(self):
+        from services.onboarding import ThreadOnboarding
+        parent = _parent(AsyncMock(return_value=_thread()))
+        first, second = _interaction(), _interaction()
+        onboarding = ThreadOnboarding()
+
+        tasks, _ = await _run(onboarding, parent, first, second)
+
+        assert tasks[0] is tasks[1]
+        parent.create_thread.assert_awaited_once()
+        first.followup.send.assert_awaited_once()
+        second.followup.send.assert_awaited_once()
+        assert onboarding.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_press_during_followups_is_not_lost(self):
+        from services.onboarding import ThreadOnboarding
+        parent = _parent(AsyncMock(return_value=_thread()))
+        first, second = _interaction(), _interaction()
+        onboarding = ThreadOnboarding()
+        late = []
+
+        async def followup(*args, **kwargs):
+            late.append(onboarding.submit(second, "en"))
+        first.followup.send = AsyncMock(side_effect=followup)
+
+        await _run(onboarding, parent, first)
+
+        assert late[0] is not None and late[0].done()
+        assert "<#500>" in second.followup.send.await_args.args[0]
+        assert onboarding.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_full(self):
+        from services.onboarding import ThreadOnboarding
+        parent = _parent(AsyncMock(return_value=_thread()))
+
+        tasks, _ = await _run(ThreadOnboarding(max_pending=1), parent, _interaction(1), _interaction(2))
+
+        assert tasks[0] is not None
+        assert tasks[1] is None
+
+    @pytest.mark.asyncio
+    async def test_retries_rate_limited_creation(self):
+        from services.onboarding import ThreadOnboarding
+        parent = _parent(AsyncMock(side_effect=[_http_error(429), _thread()]))
+        interaction = _interaction()
+
+        await _run(ThreadOnboarding(), parent, interaction)
+
+        assert parent.create_thread.await_count == 2
+        assert "<#500>" in interaction.followup.send.await_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_definitive_failure_reports_error(self):
+        from services.onboarding import ThreadOnboarding
+        from utils.i18n import t
+        parent = _parent(AsyncMock(side_effect=_http_error(403)))
+        interaction = _interaction()
+
+        await _run(ThreadOnboarding(), parent, interaction)
+
+        parent.create_thread.assert_awaited_once()
+        interaction.followup.send.assert_awaited_once_with(t("en", "generic_error"), ephemeral=True)
+
+
+class TestOpenThreadButton:
+
+    async def _press(self, thread):
+        from discord_bot.views import OpenThreadButton
+        interaction = _interaction()
+        interaction.response.defer = AsyncMock()
+        onboarding = MagicMock()
+        onboarding.is_pending.return_value = False
+        with (
+            patch('discord_bot.views.check_user_security', AsyncMock(return_value=True)),
+            patch('discord_bot.views.sessions') as sessions,
+            patch('discord_bot.views.get_onboarding', return_value=onboarding),
+            patch('discord_bot.views.get_thread', AsyncMock(return_value=thread)) as get_thread,
+        ):
+            sessions.resolve_and_store_language = AsyncMock(return_value="en")
+            sessions.get_user_thread_id = AsyncMock(return_value=500)
+            sessions.remove_user_session = AsyncMock()
+            await OpenThreadButton.open_thread(OpenThreadButton("en"), interaction, MagicMock())
+        return interaction, onboarding, get_thread, sessions
+
+    @pytest.mark.asyncio
+    async def test_archived_thread_is_reopened(self):
+        from utils.i18n import t
+
+        interaction, onboarding, get_thread, _ = await self._press(_thread())
+
+        assert get_thread.await_args.kwargs["unarchive"] is True
+        interaction.followup.send.assert_awaited_once_with(t("en", "already_active"), ephemeral=True)
+        onboarding.submit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_deleted_thread_starts_onboarding(self):
+        interaction, onboarding, _, sessions = await self._press(None)
+
+        sessions.remove_user_session.assert_awaited_once_with("1")
+        onboarding.submit.assert_called_once_with(interaction, "en")
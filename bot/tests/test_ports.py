@@ -0,0 +1,132 @@
+# bot/tests/test_ports.py
+"""
+Tests per bot/utils/ports.py
+
+Copre:
+- bind_port() — bind diretto + pidfile scritto, porta occupata dal processo
+                stesso (mai terminato), listener Python esterno trovato via
+                /proc/net/tcp e terminato, istanza precedente fermata in
+                background dopo un bind riuscito
+- _terminate() — SIGKILL solo dopo SHUTDOWN_TIMEOUT, il processo può svuotare
+                 il lavoro in corso
+"""
+
+import os
+import sys
+import time
+import socket
+import subprocess
+import pytest
+
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="/proc is Linux only")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _exclusive_listener(port: int) -> socket.socket:
+    # No SO_REUSEPORT: a second bind on the port fails with EADDRINUSE
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", port))
+    sock.listen()
+    return sock
+
+
+class TestBindPort:
+
+    def test_binds_and_writes_pidfile(self, tmp_path):
+        from utils.ports import bind_port
+        pidfile = tmp_path / "bot.pid"
+        port = _free_port()
+
+        sock = bind_port("127.0.0.1", port, pidfile=pidfile)
+        try:
+            assert sock.getsockname()[1] == port
+            assert pidfile.read_text() == str(os.getpid())
+        finally:
+            sock.close()
+
+    @linux_only
+    def test_never_terminates_itself(self, tmp_path):
+        from utils.ports import bind_port
+        pidfile = tmp_path / "bot.pid"
+        pidfile.write_text(str(os.getpid()))
+        port = _free_port()
+        listener = _exclusive_listener(port)
+
+        try:
+            with pytest.raises(OSError):
+                bind_port("127.0.0.1", port, pidfile=pidfile)
+        finally:
+            listener.close()
+
+    @linux_only
+    def test_stops_stale_python_listener(self, tmp_path):
+        from utils.ports import bind_port
+        port = _free_port()
+        child = subprocess.Popen([
+            sys.executable, "-c",
+            "import socket, time\n"
+            f"s = socket.socket(); s.bind(('127.0.0.1', {port})); s.listen()\n"
+            "print('ready', flush=True); time.sleep(60)",
+        ], stdout=subprocess.PIPE, text=True)
+
+        try:
+            assert child.stdout.readline().strip() == "ready"
+
+            start = time.monotonic()
+            sock = bind_port("127.0.0.1", port, pidfile=tmp_path / "bot.pid")
+            sock.close()
+
+            assert child.wait(timeout=5) is not None
+            assert time.monotonic() - start < 3
+        finally:
+            if child.poll() is None:
+                child.kill()
+
+    def test_previous_instance_stopped_in_background(self, tmp_path):
+        from unittest.mock import patch
+        from utils.ports import bind_port
+        stopped = []
+
+        def slow_terminate(pid, port):
+            time.sleep(0.5)
+            stopped.append(pid)
+
+        with (
+            patch('utils.ports._previous_instance', return_value=[4242]),
+            patch('utils.ports._terminate', slow_terminate),
+        ):
+            start = time.monotonic()
+            sock = bind_port("127.0.0.1", _free_port(), pidfile=tmp_path / "bot.pid")
+            elapsed = time.monotonic() - start
+            sock.close()
+
+        assert elapsed < 0.4
+        assert stopped == []
+
+
+@linux_only
+def test_terminate_lets_the_process_drain():
+    import inspect
+    from config import SHUTDOWN_TIMEOUT
+    from utils.ports import _terminate
+    child = subprocess.Popen([
+        sys.executable, "-c",
+        "import signal, sys, time\n"
+        "signal.signal(signal.SIGTERM, lambda *args: (time.sleep(0.5), sys.exit(0)))\n"
+        "print('ready', flush=True); time.sleep(60)",
+    ], stdout=subprocess.PIPE, text=True)
+
+    try:
+        assert child.stdout.readline().strip() == "ready"
+        assert _terminate(child.pid, 0)
+        assert child.wait(timeout=5) == 0
+        assert inspect.signature(_terminate).parameters["timeout"].default > SHUTDOWN_TIMEOUT
+    finally:
+        if child.poll() is None:
+            child.kill()
@@ -0,0 +1,280 @@
+# bot/tests/test_reconciler.py
+"""
+Tests per bot/services/reconciler.py e process_event() in bot/webserver/handlers.py
+
+Copre:
+- process_event()       — webhook ripetuto consegnato di nuovo, evento già
+                          consegnato dall'altro percorso saltato, errore 500 →
+                          evento rilasciato
+- Reconciler.run_once() — contro uno stub locale delle API UEX: eventi dopo il
+                          cursore consegnati in ordine e cursore avanzato, eventi
+                          già consegnati via webhook (payload senza id) saltati,
+                          primo polling solo
+                          per gli eventi recenti, errore → cursore fermo prima
+                          dell'evento fallito, concorrenza limitata
+- intervallo adattivo   — minimo dopo un recupero, raddoppia fino al massimo
+"""
+
+import json
+import time
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+class FakeUex:
+
+    """Stub of the UEX notifications API: one list of notifications per bearer token."""
+
+    def __init__(self, notifications, delay=0.0):
+        self.notifications = notifications
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request):
+        self.requests.append(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            bearer = request.headers["Authorization"].removeprefix("Bearer ")
+            return web.json_response({"status": "ok", "data": self.notifications.get(bearer, [])})
+        finally:
+            self.in_flight -= 1
+
+
+class EventLog:
+
+    """In-memory uex_processed_events."""
+
+    def __init__(self):
+        self.events = {}
+
+    async def claim(self, key, user_id, source):
+        if key in self.events:
+            return self.events[key]
+        self.events[key] = source
+        return None
+
+    async def release(self, key):
+        self.events.pop(key, None)
+
+
+def _payload(message):
+    # What the webhook receives
+    return {
+        "negotiation_hash": "h1",
+        "client_username": "buyer",
+        "listing_owner_username": "seller",
+        "message": message,
+    }
+
+
+def _reply(notification_id, message, age=0, event="user_reply"):
+    # The same event as stored by UEX in the user's notifications
+    return {"id": notification_id, "type": event, "date_added": int(time.time() - age), **_payload(message)}
+
+
+def _target(user_id="1", cursor=None):
+    return {"user_id": user_id, "bearer_token": f"token{user_id}", "secret_key": "s", "cursor": cursor}
+
+
+@pytest.fixture
+def log():
+    log = EventLog()
+    with (
+        patch('webserver.handlers.claim_event', log.claim),
+        patch('webserver.handlers.release_event', log.release),
+    ):
+        yield log
+
+
+@pytest.fixture
+def dispatch():
+    with patch('webserver.handlers._dispatch_event', AsyncMock(return_value={"status": 200, "text": "ok"})) as dispatch:
+        yield dispatch
+
+
+@pytest.fixture
+async def uex():
+    from services.uex_client import UexClient
+    servers, clients = [], []
+
+    async def start(notifications, delay=0.0):
+        fake = FakeUex(notifications, delay)
+        app = web.Application()
+        app.router.add_get("/notifications", fake.handle)
+        server = TestServer(app)
+        await server.start_server()
+        servers.append(server)
+        client = UexClient(get_attempts=1)
+        clients.append(client)
+        return fake, str(server.make_url("/notifications")), client
+
+    yield start
+
+    for client in clients:
+        await client.close()
+    for server in servers:
+        await server.close()
+
+
+async def _run(reconciler, targets, uex_url, client):
+    cursors = AsyncMock()
+    with (
+        patch('services.uex_client.API_NOTIFICATIONS', uex_url),
+        patch('services.reconciler.get_uex_client', return_value=client),
+        patch('services.reconciler.get_reconcile_targets', AsyncMock(return_value=targets)),
+        patch('services.reconciler.set_notification_cursor', cursors),
+        patch('services.reconciler.prune_events', AsyncMock(return_value=0)),
+        patch('services.reconciler.record_counter'),
+    ):
+        recovered = await reconciler.run_once()
+    return recovered, cursors
+
+
+def _delivered(dispatch):
+    return [call.args[2]["message"] for call in dispatch.await_args_list]
+
+
+class TestProcessEvent:
+
+    @pytest.mark.asyncio
+    async def test_repeated_webhook_is_delivered_again(self, log, dispatch):
+        from webserver.handlers import process_event
+        data = _payload("hi")
+
+        await process_event("user_reply", "1", data)
+        await process_event("user_reply", "1", data)
+
+        assert dispatch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_other_path_is_skipped(self, log, dispatch):
+        from webserver.handlers import process_event, RECONCILER
+
+        await process_event("user_reply", "1", _payload("by webhook"))
+        duplicate = await process_event("user_reply", "1", _payload("by webhook"), source=RECONCILER)
+        await process_event("user_reply", "1", _payload("by poller"), source=RECONCILER)
+        await process_event("user_reply", "1", _payload("by poller"))
+
+        assert duplicate["duplicate"] is True
+        assert _delivered(dispatch) == ["by webhook", "by poller"]
+
+    @pytest.mark.asyncio
+    async def test_failed_delivery_is_released(self, log, dispatch):
+        from webserver.handlers import process_event
+        dispatch.return_value = {"status": 500, "text": "boom"}
+
+        await process_event("user_reply", "1", _payload("hi"))
+
+        assert log.events == {}
+
+
+class TestReconciler:
+
+    @pytest.mark.asyncio
+    async def test_delivers_missed_events_after_cursor(self, uex, log, dispatch):
+        from services.reconciler import Reconciler
+        from webserver.handlers import process_event
+        _, url, client = await uex({"token1": [_reply(12, "third"), _reply(10, "old"), _reply(11, "second")]})
+        await process_event("user_reply", "1", _payload("second"))
+        dispatch.reset_mock()
+
+        recovered, cursors = await _run(Reconciler(), [_target(cursor=10)], url, client)
+
+        assert _delivered(dispatch) == ["third"]
+        assert recovered == 1
+        cursors.assert_awaited_once_with("1", 12)
+
+    @pytest.mark.asyncio
+    async def test_webhook_event_is_not_reconciled_again(self, uex, log, dispatch):
+        from services.reconciler import Reconciler
+        from webserver.server import handle_webhook
+        _, url, client = await uex({"token1": [_reply(11, "hi")]})
+
+        request = MagicMock()
+        request.match_info = {"event_type": "user_reply", "user_id": "1"}
+        request.headers = {}
+        request.text = AsyncMock(return_value=json.dumps(_payload("hi")))
+        with (
+            patch('webserver.server.bot') as bot,
+            patch('webserver.server.record_counter'),
+        ):
+            bot.is_ready.return_value = True
+            await handle_webhook(request)
+        recovered, cursors = await _run(Reconciler(), [_target(cursor=10)], url, client)
+
+        assert _delivered(dispatch) == ["hi"]
+        assert dispatch.await_args.args[2] == _payload("hi")
+        assert recovered == 0
+        cursors.assert_awaited_once_with("1", 11)
+
+    @pytest.mark.asyncio
+    async def test_sends_cursor_and_credentials(self, uex, log, dispatch):
+        from services.reconciler import Reconciler
+        fake, url, client = await uex({})
+
+        await _run(Reconciler(), [_target(cursor=10)], url, client)
+
+        request = fake.requests[0]
+        assert request.query["id_after"] == "10"
+        assert request.headers["Authorization"] == "Bearer token1"
+
+    @pytest.mark.asyncio
+    async def test_first_poll_only_replays_recent_events(self, uex, log, dispatch):
+        from services.reconciler import Reconciler
+        _, url, client = await uex({"token1": [
+            _reply(1, "ancient", age=86400),
+            _reply(2, "listing", event="listing_expired"),
+            _reply(3, "recent", age=60),
+        ]})
+
+        _, cursors = await _run(Reconciler(lookback=3600), [_target()], url, client)
+
+        assert _delivered(dispatch) == ["recent"]
+        cursors.assert_awaited_once_with("1", 3)
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_cursor_before_failed_event(self, uex, log, dispatch):
+        from services.reconciler import Reconciler
+        _, url, client = await uex({"token1": [_reply(11, "ok"), _reply(12, "fails"), _reply(13, "later")]})
+        dispatch.side_effect = [{"status": 200, "text": "ok"}, {"status": 500, "text": "boom"}]
+
+        _, cursors = await _run(Reconciler(), [_target(cursor=10)], url, client)
+
+        assert _delivered(dispatch) == ["ok", "fails"]
+        cursors.assert_awaited_once_with("1", 11)
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self, uex, log, dispatch):
+        from services.reconciler import Reconciler
+        fake, url, client = await uex({}, delay=0.05)
+        targets = [_target(str(i), cursor=0) for i in range(6)]
+
+        await _run(Reconciler(concurrency=2), targets, url, client)
+
+        assert len(fake.requests) == 6
+        assert fake.max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_adaptive_interval(self, uex, log, dispatch):
+        from services.reconciler import Reconciler
+        fake, url, client = await uex({})
+        reconciler = Reconciler(min_interval=30, max_interval=100)
+
+        intervals = []
+        for _ in range(3):
+            await _run(reconciler, [_target(cursor=0)], url, client)
+            intervals.append(reconciler.interval)
+
+        fake.notifications = {"token1": [_reply(1, "missed")]}
+        await _run(reconciler, [_target(cursor=0)], url, client)
+        intervals.append(reconciler.interval)
+
+        assert intervals == [60, 100, 100, 30]
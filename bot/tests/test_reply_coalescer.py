@@ -0,0 +1,156 @@
+# bot/tests/test_reply_coalescer.py
+"""
+Tests per bot/services/reply_coalescer.py
+
+Copre:
+- ReplyCoalescer.add() — risposte consecutive unite in un solo messaggio UEX e un
+                         solo embed, anteprima aggiornata, hash diversi separati,
+                         finestra scorrevole limitata da max_wait, lunghezza
+                         massima → nuovo batch, coda piena
+- ReplyCoalescer.drain() — batch aperti consegnati subito
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+class FakeOutbox:
+
+    """Records the submitted messages; refuses them when `full`."""
+
+    def __init__(self, full=False):
+        self.full = full
+        self.max_pending = 10
+        self.submitted = []
+
+    @property
+    def pending(self):
+        return self.max_pending if self.full else 0
+
+    def submit(self, **kwargs):
+        if self.full:
+            return None
+        self.submitted.append(kwargs)
+        return MagicMock()
+
+
+def _channel():
+    channel = MagicMock()
+    channel.receipts = []
+
+    async def send(embed):
+        receipt = MagicMock(id=len(channel.receipts), edit=AsyncMock())
+        channel.receipts.append(receipt)
+        return receipt
+
+    channel.send = AsyncMock(side_effect=send)
+    return channel
+
+
+@pytest.fixture
+def outbox():
+    outbox = FakeOutbox()
+    with (
+        patch('services.reply_coalescer.get_uex_outbox', return_value=outbox),
+        patch('services.reply_coalescer.record_counter') as counter,
+    ):
+        outbox.counter = counter
+        yield outbox
+
+
+def _coalescer(**kwargs):
+    from services.reply_coalescer import ReplyCoalescer
+    params = dict(window=0.05, max_wait=1, max_length=100)
+    params.update(kwargs)
+    return ReplyCoalescer(**params)
+
+
+async def _add(coalescer, channel, message, notif_hash="h1", user_id="1"):
+    return await coalescer.add(
+        channel, user_id=user_id, bearer_token="b", secret_key="s",
+        notif_hash=notif_hash, message=message, lang="en"
+    )
+
+
+class TestReplyCoalescer:
+
+    @pytest.mark.asyncio
+    async def test_merges_consecutive_replies(self, outbox):
+        coalescer, channel = _coalescer(), _channel()
+
+        for message in ("hi", "is it still available?", "thanks"):
+            await _add(coalescer, channel, message)
+        await asyncio.sleep(0.1)
+
+        assert [s["message"] for s in outbox.submitted] == ["hi\nis it still available?\nthanks"]
+        assert channel.send.await_count == 1
+        outbox.counter.assert_called_once_with("replies.coalesced", 2)
+
+    @pytest.mark.asyncio
+    async def test_preview_is_updated(self, outbox):
+        coalescer, channel = _coalescer(), _channel()
+
+        await _add(coalescer, channel, "hi")
+        await _add(coalescer, channel, "there")
+
+        receipt = channel.receipts[0]
+        preview = receipt.edit.await_args.kwargs["embed"]
+        assert "hi\nthere" in preview.description
+        assert preview.fields[-1].value == "✍️ Waiting for more messages…"
+
+        await asyncio.sleep(0.1)
+
+        assert preview.fields[-1].value == "⏳ Pending"
+        assert outbox.submitted[0]["on_status"] is not None
+
+    @pytest.mark.asyncio
+    async def test_hashes_are_separate(self, outbox):
+        coalescer, channel = _coalescer(), _channel()
+
+        await _add(coalescer, channel, "a", notif_hash="h1")
+        await _add(coalescer, channel, "b", notif_hash="h2")
+        await asyncio.sleep(0.1)
+
+        assert sorted((s["notif_hash"], s["message"]) for s in outbox.submitted) == [("h1", "a"), ("h2", "b")]
+        outbox.counter.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_max_wait_caps_sliding_window(self, outbox):
+        coalescer, channel = _coalescer(window=0.05, max_wait=0.12), _channel()
+
+        for i in range(6):
+            await _add(coalescer, channel, str(i))
+            await asyncio.sleep(0.03)
+        await asyncio.sleep(0.1)
+
+        assert 1 < len(outbox.submitted) < 6
+        assert "\n".join(s["message"] for s in outbox.submitted) == "0\n1\n2\n3\n4\n5"
+
+    @pytest.mark.asyncio
+    async def test_max_length_starts_new_batch(self, outbox):
+        coalescer, channel = _coalescer(max_length=10), _channel()
+
+        await _add(coalescer, channel, "12345")
+        await _add(coalescer, channel, "678901")
+
+        assert [s["message"] for s in outbox.submitted] == ["12345"]
+        assert channel.send.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_full_outbox_is_refused(self, outbox):
+        outbox.full = True
+
+        added = await _add(_coalescer(), _channel(), "hi")
+
+        assert added is False
+
+    @pytest.mark.asyncio
+    async def test_drain_flushes_open_batches(self, outbox):
+        coalescer, channel = _coalescer(window=60, max_wait=60), _channel()
+        await _add(coalescer, channel, "hi")
+
+        left = await coalescer.drain(timeout=1)
+
+        assert left == 0
+        assert [s["message"] for s in outbox.submitted] == ["hi"]
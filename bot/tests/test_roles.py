@@ -0,0 +1,179 @@
+# bot/tests/test_roles.py
+"""
+Tests per bot/utils/roles_management.py
+
+Copre:
+- get_role_id()            — risolto per nome una sola volta per gilda, nomi
+                             personalizzati da guild_settings, invalidazione
+- has_uex_manager_role()   — controllo per ID, lingua risolta solo al rifiuto
+- assign_uex_user_role()   — manager saltati, ruolo utente assegnato per ID
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    import utils.roles_management as roles
+    roles._role_names.clear()
+    roles._role_ids.clear()
+    yield
+    roles._role_names.clear()
+    roles._role_ids.clear()
+
+
+def _role(role_id, name):
+    role = MagicMock()
+    role.id = role_id
+    role.name = name
+    return role
+
+
+def _guild(roles, guild_id=1):
+    guild = MagicMock()
+    guild.id = guild_id
+    guild.roles = roles
+    guild.get_role = lambda role_id: next((r for r in roles if r.id == role_id), None)
+    return guild
+
+
+def _member(guild, role_ids=()):
+    import discord
+    member = MagicMock(spec=discord.Member)
+    member.guild = guild
+    member.get_role = lambda role_id: MagicMock() if role_id in role_ids else None
+    member.add_roles = AsyncMock()
+    return member
+
+
+def _names(manager=None, user=None):
+    return patch(
+        'db.guild_settings.get_guild_role_names',
+        AsyncMock(return_value={"manager": manager, "user": user})
+    )
+
+
+class TestGetRoleId:
+
+    @pytest.mark.asyncio
+    async def test_resolves_once_per_guild(self):
+        from utils.roles_management import get_role_id, MANAGER, USER
+        guild = _guild([_role(10, "UEX Manager"), _role(11, "UEX user")])
+
+        with _names() as load:
+            assert await get_role_id(guild, MANAGER) == 10
+            guild.roles = []
+            assert await get_role_id(guild, USER) == 11
+
+        load.assert_awaited_once_with(1)
+
+    @pytest.mark.asyncio
+    async def test_custom_names(self):
+        from utils.roles_management import get_role_id, MANAGER, USER
+        guild = _guild([_role(10, "UEX Manager"), _role(20, "Traders")])
+
+        with _names(manager="Traders"):
+            assert await get_role_id(guild, MANAGER) == 20
+            assert await get_role_id(guild, USER) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_resolves_again(self):
+        from utils.roles_management import get_role_id, invalidate_guild_roles, MANAGER
+        guild = _guild([_role(10, "UEX Manager")])
+
+        with _names():
+            assert await get_role_id(guild, MANAGER) == 10
+            guild.roles = [_role(30, "UEX Manager")]
+            invalidate_guild_roles(guild.id)
+            assert await get_role_id(guild, MANAGER) == 30
+
+    @pytest.mark.asyncio
+    async def test_database_error_falls_back_to_defaults(self):
+        import utils.roles_management as roles
+        guild = _guild([_role(10, "UEX Manager")])
+
+        with patch('db.guild_settings.get_guild_role_names', AsyncMock(side_effect=Exception("db down"))):
+            assert await roles.get_role_id(guild, roles.MANAGER) == 10
+
+        # Defaults are not cached: the names are loaded again once the database is back
+        assert guild.id not in roles._role_names
+
+
+class TestHasUexManagerRole:
+
+    async def _check(self, member):
+        from utils.roles_management import has_uex_manager_role
+        interaction = MagicMock()
+        interaction.guild = member.guild
+        interaction.user = member
+        interaction.response.send_message = AsyncMock()
+
+        captured = {}
+        def fake_check(predicate):
+            captured["predicate"] = predicate
+            return lambda func: func
+
+        with patch('utils.roles_management.app_commands.check', fake_check):
+            has_uex_manager_role()
+
+        return await captured["predicate"](interaction), interaction
+
+    @pytest.mark.asyncio
+    async def test_manager_skips_language_lookup(self):
+        guild = _guild([_role(10, "UEX Manager")])
+        member = _member(guild, role_ids={10})
+
+        with _names(), patch('db.sessions.resolve_and_store_language', AsyncMock()) as resolve:
+            allowed, _ = await self._check(member)
+
+        assert allowed is True
+        resolve.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_denied_in_user_language(self):
+        guild = _guild([_role(10, "UEX Manager")])
+        member = _member(guild)
+
+        with _names(), patch('db.sessions.resolve_and_store_language', AsyncMock(return_value="en")) as resolve:
+            allowed, interaction = await self._check(member)
+
+        assert allowed is False
+        resolve.assert_awaited_once()
+        interaction.response.send_message.assert_awaited_once()
+
+
+class TestAssignUexUserRole:
+
+    def _interaction(self, member):
+        interaction = MagicMock()
+        interaction.guild = member.guild
+        interaction.user = member
+        return interaction
+
+    @pytest.mark.asyncio
+    async def test_manager_not_assigned(self):
+        from utils.roles_management import assign_uex_user_role
+        guild = _guild([_role(10, "UEX Manager"), _role(11, "UEX user")])
+        member = _member(guild, role_ids={10})
+
+        with _names():
+            assert await assign_uex_user_role(self._interaction(member)) is True
+
+        member.add_roles.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_assigns_user_role(self):
+        from utils.roles_management import assign_uex_user_role
+        user_role = _role(11, "UEX user")
+        guild = _guild([_role(10, "UEX Manager"), user_role])
+        member = _member(guild)
+
+        with (
+            _names(),
+            patch('utils.roles_management.is_user_banned', AsyncMock(return_value=False)),
+        ):
+            assert await assign_uex_user_role(self._interaction(member)) is True
+
+        member.add_roles.assert_awaited_once()
+        assert member.add_roles.await_args.args[0] is user_role
@@ -0,0 +1,215 @@
+# bot/tests/test_shutdown.py
+"""
+Tests per bot/discord_bot/shutdown.py e lo stop del webhook server
+
+Copre:
+- drain_webhooks()   — nuovi webhook rifiutati con 503 e Retry-After, attesa dei
+                       webhook in corso
+- stop_reconciler()  — un round in corso viene completato prima dello stop
+- shutdown()         — ordine degli step (risposte raggruppate prima dell'outbox,
+                       connessione Discord per ultima), report di quanto svuotato,
+                       errori di chiusura non bloccanti
+- request_shutdown() — un solo shutdown anche con segnali ripetuti
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture
+def server():
+    import webserver.server as server
+    server._closing = False
+    yield server
+    server._closing = False
+    server._in_flight.clear()
+
+
+def _request():
+    request = MagicMock()
+    request.match_info = {"event_type": "user_reply", "user_id": "42"}
+    request.headers = {}
+    return request
+
+
+class TestDrainWebhooks:
+
+    @pytest.mark.asyncio
+    async def test_waits_in_flight_and_refuses_new(self, server):
+        release = asyncio.Event()
+        done = []
+
+        async def handler(request, event_type, user_id):
+            await release.wait()
+            done.append(user_id)
+            return {"status": 200, "text": "ok"}
+
+        with (
+            patch('webserver.server.bot') as bot,
+            patch('webserver.server.handle_webhook_unificato', handler),
+            patch('webserver.server.record_counter'),
+        ):
+            bot.is_ready.return_value = True
+            in_flight = asyncio.create_task(server.handle_webhook(_request()))
+            await asyncio.sleep(0)
+            assert server.webhooks_in_flight() == 1
+
+            drain = asyncio.create_task(server.drain_webhooks(5))
+            await asyncio.sleep(0)
+            refused = await server.handle_webhook(_request())
+            release.set()
+            left = await drain
+
+        assert refused.status == 503
+        assert refused.headers["Retry-After"] == "10"
+        assert (await in_flight).status == 200
+        assert done == ["42"]
+        assert left == 0
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_timeout(self, server):
+        async def handler(request, event_type, user_id):
+            await asyncio.sleep(60)
+
+        with (
+            patch('webserver.server.bot') as bot,
+            patch('webserver.server.handle_webhook_unificato', handler),
+        ):
+            bot.is_ready.return_value = True
+            task = asyncio.create_task(server.handle_webhook(_request()))
+            await asyncio.sleep(0)
+            left = await server.drain_webhooks(0.01)
+            task.cancel()
+
+        assert left == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_reconciler_finishes_round():
+    import services.reconciler as module
+    from services.reconciler import Reconciler
+    reconciler = Reconciler(min_interval=60)
+    rounds = []
+
+    async def run_once():
+        reconciler.running = True
+        await asyncio.sleep(0.05)
+        rounds.append("done")
+        reconciler.running = False
+
+    reconciler.run_once = run_once
+    with (
+        patch('services.reconciler._reconciler', reconciler),
+        patch('services.reconciler._loop', None),
+    ):
+        module.start_reconciler()
+        await asyncio.sleep(0.01)
+        finished = await module.stop_reconciler(5)
+        loop = module._loop
+
+    assert finished
+    assert rounds == ["done"]
+    await asyncio.sleep(0)
+    assert not loop.is_running()
+
+
+class TestShutdown:
+
+    def _patches(self, calls, **overrides):
+        def step(name, result=None):
+            async def run(*args):
+                calls.append(name)
+                return result
+            return run
+
+        def service(name, pending):
+            queue = MagicMock(pending=pending)
+            queue.drain = AsyncMock(side_effect=lambda timeout: calls.append(name) or 0)
+            return queue
+
+        outbox, coalescer = service("uex", 3), service("replies", 1)
+        onboarding, notifier = service("onboarding", 0), service("notifications", 0)
+        targets = {
+            "webhooks_in_flight": MagicMock(return_value=2),
+            "drain_webhooks": step("webhooks", 0),
+            "stop_reconciler": step("reconciler", True),
+            "get_uex_outbox": MagicMock(return_value=outbox),
+            "get_reply_coalescer": MagicMock(return_value=coalescer),
+            "get_onboarding": MagicMock(return_value=onboarding),
+            "get_notifier": MagicMock(return_value=notifier),
+            "stop_broadcasts": step("broadcasts", 1),
+            "stop_status_task": MagicMock(),
+            "stop_counter_flush_task": step("counters", 4),
+            "stop_thread_tasks": step("threads", 2),
+            "stop_aiohttp_server": step("server"),
+            "close_http": step("http"),
+            "close_db": step("db"),
+            "get_uex_client": MagicMock(return_value=MagicMock(close=step("uex client"))),
+            "get_tracer": MagicMock(),
+        }
+        targets.update(overrides)
+        return [patch(f'discord_bot.shutdown.{name}', value) for name, value in targets.items()]
+
+    async def _shutdown(self, calls, **overrides):
+        from discord_bot.shutdown import shutdown
+        bot = MagicMock()
+        bot.close = AsyncMock(side_effect=lambda: calls.append("discord"))
+        patches = self._patches(calls, **overrides)
+        for p in patches:
+            p.start()
+        try:
+            return await shutdown(bot, timeout=5)
+        finally:
+            for p in patches:
+                p.stop()
+
+    @pytest.mark.asyncio
+    async def test_order_and_report(self):
+        calls = []
+
+        report = await self._shutdown(calls)
+
+        assert calls.index("webhooks") < calls.index("replies") < calls.index("uex")
+        assert calls.index("uex") < calls.index("counters") < calls.index("db")
+        assert calls[-1] == "discord"
+        assert report == {
+            "webhooks": (2, 0),
+            "replies": (1, 0),
+            "uex": (3, 0),
+            "onboarding": (0, 0),
+            "notifications": (0, 0),
+            "broadcasts": 1,
+            "counters": 4,
+            "threads": 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_close_errors_do_not_stop_the_shutdown(self):
+        calls = []
+
+        async def broken():
+            raise OSError("already closed")
+
+        await self._shutdown(calls, close_http=broken)
+
+        assert "db" in calls
+        assert calls[-1] == "discord"
+
+
+@pytest.mark.asyncio
+async def test_request_shutdown_once():
+    import signal
+    from discord_bot.shutdown import request_shutdown
+    shutdown = AsyncMock()
+
+    with (
+        patch('discord_bot.shutdown._shutdown', None),
+        patch('discord_bot.shutdown.shutdown', shutdown),
+    ):
+        first = request_shutdown(MagicMock(), signal.SIGTERM)
+        second = request_shutdown(MagicMock(), signal.SIGTERM)
+        await first
+
+    assert first is second
+    shutdown.assert_awaited_once()
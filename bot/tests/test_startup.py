@@ -0,0 +1,113 @@
+# bot/tests/test_startup.py
+"""
+Tests per bot/discord_bot/startup.py
+
+Copre:
+- run_startup()  — eseguito una sola volta, step indipendenti in parallelo,
+                   DB non disponibile → task in background non avviati
+- handle_webhook — 503 con Retry-After finché il gateway non è pronto
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture(autouse=True)
+def reset_started():
+    import discord_bot.startup as startup
+    startup._started = False
+    yield
+    startup._started = False
+
+
+def _slow(delay=0.05, error=None):
+    async def step(*args, **kwargs):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+    return step
+
+
+async def _run(bot, init_db=None):
+    counter = MagicMock()
+    status = MagicMock()
+    threads = MagicMock()
+    with (
+        patch('discord_bot.startup.sync_commands', bot.sync_commands),
+        patch('discord_bot.startup.show_logo'),
+        patch('discord_bot.startup.init_db', init_db or _slow()),
+        patch('discord_bot.startup.init_http', _slow()),
+        patch('discord_bot.startup.start_aiohttp_server', _slow()),
+        patch('discord_bot.startup.send_startup_notification', _slow()),
+        patch('discord_bot.startup.start_counter_flush_task', counter),
+        patch('discord_bot.startup.start_status_task', status),
+        patch('discord_bot.startup.start_thread_tasks', threads),
+        patch('discord_bot.startup._resume_when_ready', AsyncMock()),
+    ):
+        from discord_bot.startup import run_startup
+        result = await run_startup(bot)
+    return result, counter, status
+
+
+def _bot():
+    bot = MagicMock()
+    bot.sync_commands = AsyncMock(side_effect=_slow())
+    return bot
+
+
+class TestRunStartup:
+
+    @pytest.mark.asyncio
+    async def test_runs_steps_concurrently(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        result, counter, status = await _run(_bot())
+
+        # Five steps of 50 ms each: in parallel, well below their sum
+        assert result is True
+        assert loop.time() - start < 0.2
+        counter.assert_called_once()
+        status.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_runs_only_once(self):
+        bot = _bot()
+
+        first, _, _ = await _run(bot)
+        second, counter, _ = await _run(bot)
+
+        assert (first, second) == (True, False)
+        bot.sync_commands.assert_awaited_once()
+        counter.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_db_failure_skips_background_tasks(self):
+        bot = _bot()
+
+        result, counter, status = await _run(bot, init_db=_slow(error=Exception("db down")))
+
+        assert result is False
+        counter.assert_not_called()
+        status.assert_not_called()
+        assert bot.add_view.call_count == 2
+
+
+class TestWebhookBeforeReady:
+
+    @pytest.mark.asyncio
+    async def test_returns_503_until_ready(self):
+        handler = AsyncMock()
+
+        with (
+            patch('webserver.server.bot') as bot,
+            patch('webserver.server.handle_webhook_unificato', handler),
+        ):
+            bot.is_ready.return_value = False
+            from webserver.server import handle_webhook
+            response = await handle_webhook(MagicMock())
+
+        assert response.status == 503
+        assert response.headers["Retry-After"] == "5"
+        handler.assert_not_awaited()
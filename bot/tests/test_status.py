@@ -0,0 +1,194 @@
+# bot/tests/test_status.py
+"""
+Tests per bot/utils/status.py
+
+Copre:
+- embed_digest()            — il timestamp non influisce sul digest
+- update_status_message()   — PartialMessage senza fetch, edit saltato se invariato,
+                              un solo render per lingua, edit su cambio di stato,
+                              board rimossa su NotFound
+- register_status_message() — board senza gilda (schema precedente) nello stesso
+                              canale attaccata alla gilda e sostituita
+- refresh_status_boards()   — aggiornamento in background, errori solo loggati
+"""
+
+import pytest
+import discord
+from datetime import datetime, timezone, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    import utils.status as status
+    status._boards = None
+    status._last_digests.clear()
+    status._channel_buckets.clear()
+    status._transition_task = None
+    status._transition_at = None
+    yield
+    if status._transition_task:
+        status._transition_task.cancel()
+
+
+def _board(guild_id, channel_id, message_id, lang):
+    return {"guild_id": guild_id, "channel_id": channel_id, "message_id": message_id, "lang": lang}
+
+
+def _bot():
+    messages = {}
+
+    def partial_messageable(channel_id):
+        channel = MagicMock()
+        channel.id = channel_id
+
+        def partial_message(message_id):
+            message = MagicMock()
+            message.id = message_id
+            message.channel = channel
+            message.edit = AsyncMock()
+            messages[message_id] = message
+            return message
+
+        channel.get_partial_message = MagicMock(side_effect=partial_message)
+        return channel
+
+    bot = MagicMock()
+    bot.get_partial_messageable = MagicMock(side_effect=partial_messageable)
+    return bot, messages
+
+
+class TestEmbedDigest:
+
+    def test_ignores_timestamp(self):
+        from utils.status import embed_digest
+        a = discord.Embed(title="x", timestamp=datetime(2025, 1, 1, tzinfo=timezone.utc))
+        b = discord.Embed(title="x", timestamp=datetime(2025, 1, 2, tzinfo=timezone.utc))
+        c = discord.Embed(title="y", timestamp=datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+        assert embed_digest(a) == embed_digest(b)
+        assert embed_digest(a) != embed_digest(c)
+
+
+class TestUpdateStatusMessage:
+
+    async def _update(self, bot, boards, state=("inactive", None), delete=None):
+        with (
+            patch('utils.status.get_status_messages', AsyncMock(return_value=boards)) as get_boards,
+            patch('utils.status.update_maintenance_state_if_needed', AsyncMock(return_value=state)),
+            patch('utils.status.delete_status_message', delete or AsyncMock()),
+        ):
+            from utils.status import update_status_message
+            edited = await update_status_message(bot)
+        return edited, get_boards
+
+    @pytest.mark.asyncio
+    async def test_skips_edit_when_unchanged(self):
+        bot, messages = _bot()
+        boards = [_board(1, 10, 20, "en")]
+
+        first, get_boards = await self._update(bot, boards)
+        second, _ = await self._update(bot, boards)
+
+        assert (first, second) == (1, 0)
+        messages[20].edit.assert_awaited_once()
+        get_boards.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_renders_once_per_language(self):
+        bot, messages = _bot()
+        boards = [
+            _board(1, 10, 20, "en"),
+            _board(2, 11, 21, "en"),
+            _board(2, 11, 22, "it"),
+        ]
+
+        import utils.status as status
+        with patch.object(status, 'build_status_embed', wraps=status.build_status_embed) as build:
+            edited, _ = await self._update(bot, boards)
+
+        assert edited == 3
+        assert sorted(call.kwargs["lang"] for call in build.call_args_list) == ["en", "it"]
+        assert all(message.edit.await_count == 1 for message in messages.values())
+
+    @pytest.mark.asyncio
+    async def test_edits_on_state_change(self):
+        bot, messages = _bot()
+        boards = [_board(1, 10, 20, "en")]
+        start = datetime.now(timezone.utc) + timedelta(hours=1)
+        status = {"maintenance_start": start, "maintenance_end": start + timedelta(hours=1)}
+
+        await self._update(bot, boards)
+        edited, _ = await self._update(bot, boards, state=("scheduled", status))
+
+        assert edited == 1
+        assert messages[20].edit.await_count == 2
+
+        import utils.status as status_module
+        assert status_module._transition_at == start
+
+    @pytest.mark.asyncio
+    async def test_removes_board_on_not_found(self):
+        bot, messages = _bot()
+        boards = [_board(1, 10, 20, "en"), _board(1, 10, 21, "it")]
+        delete = AsyncMock()
+
+        import utils.status as status_module
+        with patch('utils.status.get_status_messages', AsyncMock(return_value=boards)):
+            await status_module._load_boards(bot)
+        response = MagicMock(status=404, reason="Not Found")
+        messages[20].edit.side_effect = discord.NotFound(response, "Unknown Message")
+
+        edited, _ = await self._update(bot, boards, delete=delete)
+
+        assert edited == 1
+        delete.assert_awaited_once_with(10, 20)
+        assert list(status_module._boards) == [(1, 10, "it")]
+
+
+class TestRegisterStatusMessage:
+
+    @pytest.mark.asyncio
+    async def test_legacy_board_is_attached_and_replaced(self):
+        import utils.status as status
+        bot, messages = _bot()
+        legacy = [_board(None, 10, 20, "en"), _board(None, 99, 30, "en")]
+        with patch('utils.status.get_status_messages', AsyncMock(return_value=legacy)):
+            await status._load_boards(bot)
+
+        channel = MagicMock()
+        channel.id = 10
+        channel.get_partial_message = MagicMock(return_value="new board")
+        message = MagicMock()
+        message.id = 21
+        message.channel = channel
+        message.guild.id = 1
+        message.guild.get_channel_or_thread = MagicMock(return_value=None)
+        with (
+            patch('utils.status.get_status_messages', AsyncMock(return_value=legacy)),
+            patch('utils.status.attach_status_messages', AsyncMock()) as attach,
+            patch('utils.status.save_status_message', AsyncMock()) as save,
+        ):
+            await status.register_status_message(message, "en", discord.Embed(title="status"))
+
+        attach.assert_awaited_once_with(1, [10])
+        save.assert_awaited_once_with(10, 21, lang="en", guild_id=1)
+        assert status._boards[(1, 10, "en")] == "new board"
+        assert set(status._boards) == {(1, 10, "en"), (None, 99, "en")}
+
+
+@pytest.mark.asyncio
+async def test_refresh_runs_in_background():
+    import asyncio
+    from utils.status import refresh_status_boards
+    release = asyncio.Event()
+
+    async def slow_update(bot):
+        await release.wait()
+        raise RuntimeError("edit failed")
+
+    with patch('utils.status.update_status_message', slow_update):
+        task = refresh_status_boards(MagicMock())
+        assert not task.done()
+        release.set()
+        await task
@@ -0,0 +1,94 @@
+# bot/tests/test_thread_placement.py
+"""
+Tests per bot/utils/thread_placement.py
+
+Copre:
+- choose_parent_channel() — nessun pool → canale del bottone, canale meno
+                            carico, carico contato in memoria tra due letture
+                            del DB, canali di altre gilde solo per i membri
+"""
+
+import discord
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture(autouse=True)
+def reset_load():
+    import utils.thread_placement as placement
+    placement._load = {}
+    placement._loaded_at = None
+    yield
+    placement._load = {}
+    placement._loaded_at = None
+
+
+def _channel(channel_id, guild):
+    channel = MagicMock(spec=discord.TextChannel)
+    channel.id = channel_id
+    channel.guild = guild
+    return channel
+
+
+def _bot(channels):
+    bot = MagicMock()
+    bot.get_channel = lambda channel_id: channels.get(channel_id)
+    return bot
+
+
+def _pool(channel_ids, load):
+    return (
+        patch('utils.thread_placement.THREAD_PARENT_CHANNEL_IDS', channel_ids),
+        patch('utils.thread_placement.count_threads_by_parent', AsyncMock(return_value=load)),
+    )
+
+
+class TestChooseParentChannel:
+
+    @pytest.mark.asyncio
+    async def test_no_pool_uses_fallback(self):
+        from utils.thread_placement import choose_parent_channel
+        fallback = _channel(1, MagicMock())
+
+        with patch('utils.thread_placement.THREAD_PARENT_CHANNEL_IDS', []):
+            assert await choose_parent_channel(_bot({}), MagicMock(), fallback) is fallback
+
+    @pytest.mark.asyncio
+    async def test_least_loaded_then_counted_in_memory(self):
+        from utils.thread_placement import choose_parent_channel
+        guild = MagicMock()
+        fallback = _channel(1, guild)
+        channels = {10: _channel(10, guild), 20: _channel(20, guild)}
+        ids, counts = _pool([10, 20], {10: 5, 20: 4})
+
+        with ids, counts as load:
+            picks = [
+                (await choose_parent_channel(_bot(channels), MagicMock(), fallback)).id
+                for _ in range(3)
+            ]
+
+        # 20 has 4 threads, then 5 (tie, pool order wins → 10), then 20 again
+        assert picks == [20, 10, 20]
+        load.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_other_guild_requires_membership(self):
+        from utils.thread_placement import choose_parent_channel
+        home, other = MagicMock(), MagicMock()
+        fallback = _channel(1, home)
+        channels = {10: _channel(10, other), 20: _channel(20, home)}
+        ids, counts = _pool([10, 20], {10: 0, 20: 9})
+
+        with ids, counts, patch('utils.thread_placement.resolve_member', AsyncMock(return_value=None)):
+            chosen = await choose_parent_channel(_bot(channels), MagicMock(), fallback)
+
+        assert chosen.id == 20
+
+    @pytest.mark.asyncio
+    async def test_unknown_channels_use_fallback(self):
+        from utils.thread_placement import choose_parent_channel
+        fallback = _channel(1, MagicMock())
+        ids, counts = _pool([10], {10: 0})
+
+        with ids, counts:
+            assert await choose_parent_channel(_bot({}), MagicMock(), fallback) is fallback
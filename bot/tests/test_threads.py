@@ -0,0 +1,239 @@
+# bot/tests/test_threads.py
+"""
+Tests per bot/utils/threads.py
+
+Copre:
+- get_thread()         — cache gateway, cache LRU limitata, fallback REST
+                         single-flight, thread eliminato → None, unarchive
+- warm_thread_cache()  — una chiamata active_threads() per gilda
+- flush_thread_activity() — attività bufferizzata scritta in un'unica query,
+                            ribufferizzata in caso di errore
+- archive_idle_threads()  — thread inattivi archiviati, thread toccati dopo
+                            il flush saltati, thread eliminati marcati
+"""
+
+import asyncio
+import discord
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    import utils.threads as threads
+    threads._threads.clear()
+    threads._inflight.clear()
+    threads._touched.clear()
+    yield
+    threads._threads.clear()
+    threads._inflight.clear()
+    threads._touched.clear()
+
+
+@pytest.fixture
+def counters():
+    recorded = []
+    with patch('utils.threads.record_counter', lambda key: recorded.append(key)):
+        yield recorded
+
+
+def _thread(thread_id=1, archived=False, locked=False):
+    thread = MagicMock(spec=discord.Thread)
+    thread.id = thread_id
+    thread.archived = archived
+    thread.locked = locked
+    return thread
+
+
+def _bot(cached=None, fetched=None):
+    bot = MagicMock()
+    bot.get_channel.return_value = cached
+    bot.fetch_channel = AsyncMock(return_value=fetched)
+    return bot
+
+
+class TestGetThread:
+
+    @pytest.mark.asyncio
+    async def test_gateway_cache_hit(self, counters):
+        from utils.threads import get_thread
+        thread = _thread()
+        bot = _bot(cached=thread)
+
+        assert await get_thread(bot, "1") is thread
+        bot.fetch_channel.assert_not_awaited()
+        assert counters == ["threads.cache_hit"]
+
+    @pytest.mark.asyncio
+    async def test_rest_fallback_then_cached(self, counters):
+        from utils.threads import get_thread
+        thread = _thread()
+        bot = _bot(fetched=thread)
+
+        assert await get_thread(bot, 1) is thread
+        assert await get_thread(bot, 1) is thread
+
+        bot.fetch_channel.assert_awaited_once_with(1)
+        assert counters == ["threads.rest_fallback", "threads.cache_hit"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_fetch(self, counters):
+        from utils.threads import get_thread
+        thread = _thread()
+        bot = _bot()
+
+        async def slow_fetch(thread_id):
+            await asyncio.sleep(0.05)
+            return thread
+        bot.fetch_channel = AsyncMock(side_effect=slow_fetch)
+
+        results = await asyncio.gather(*(get_thread(bot, 1) for _ in range(5)))
+
+        assert all(result is thread for result in results)
+        bot.fetch_channel.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_deleted_thread_returns_none(self, counters):
+        from utils.threads import get_thread
+        bot = _bot()
+        bot.fetch_channel.side_effect = discord.NotFound(MagicMock(status=404), "Unknown Channel")
+
+        assert await get_thread(bot, 1) is None
+
+    @pytest.mark.asyncio
+    async def test_unarchives_before_returning(self, counters):
+        from utils.threads import get_thread
+        archived = _thread(archived=True)
+        reopened = _thread()
+        archived.edit = AsyncMock(return_value=reopened)
+
+        assert await get_thread(_bot(fetched=archived), 1) is reopened
+        archived.edit.assert_awaited_once_with(archived=False)
+
+    @pytest.mark.asyncio
+    async def test_sending_counts_as_activity(self, counters):
+        import utils.threads as threads
+
+        await threads.get_thread(_bot(cached=_thread(1)), 1)
+        await threads.get_thread(_bot(cached=_thread(2)), 2, unarchive=False)
+
+        assert set(threads._touched) == {1}
+
+    @pytest.mark.asyncio
+    async def test_unarchive_can_be_skipped(self, counters):
+        from utils.threads import get_thread
+        archived = _thread(archived=True)
+        archived.edit = AsyncMock()
+
+        assert await get_thread(_bot(fetched=archived), 1, unarchive=False) is archived
+        archived.edit.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self, counters):
+        import utils.threads as threads
+
+        with patch('utils.threads.THREAD_CACHE_SIZE', 2):
+            for thread_id in (1, 2, 3):
+                await threads.get_thread(_bot(fetched=_thread(thread_id)), thread_id)
+
+        assert list(threads._threads) == [2, 3]
+
+
+class TestWarmThreadCache:
+
+    @pytest.mark.asyncio
+    async def test_one_call_per_guild(self):
+        import utils.threads as threads
+        guilds = [MagicMock(), MagicMock()]
+        guilds[0].active_threads = AsyncMock(return_value=[_thread(1), _thread(2)])
+        guilds[1].active_threads = AsyncMock(return_value=[_thread(3)])
+        bot = MagicMock()
+        bot.guilds = guilds
+
+        assert await threads.warm_thread_cache(bot) == 3
+        assert set(threads._threads) == {1, 2, 3}
+        for guild in guilds:
+            guild.active_threads.assert_awaited_once()
+
+
+class TestThreadActivity:
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_once(self):
+        import utils.threads as threads
+        threads.touch_thread(1)
+        threads.touch_thread("2")
+        threads.touch_thread(1)
+
+        with patch('utils.threads.touch_threads', AsyncMock()) as write:
+            assert await threads.flush_thread_activity() == 2
+
+        write.assert_awaited_once()
+        assert set(write.await_args.args[0]) == {1, 2}
+        assert threads._touched == {}
+
+    @pytest.mark.asyncio
+    async def test_flush_failure_keeps_activity(self):
+        import utils.threads as threads
+        threads.touch_thread(1)
+
+        with patch('utils.threads.touch_threads', AsyncMock(side_effect=Exception("db down"))):
+            assert await threads.flush_thread_activity() == 0
+
+        assert set(threads._touched) == {1}
+
+
+class TestArchiveIdleThreads:
+
+    async def _archive(self, bot, idle, touched=()):
+        import utils.threads as threads
+        mark = AsyncMock()
+
+        async def flush():
+            # Activity received after the flush, while the batch is processed
+            for thread_id in touched:
+                threads.touch_thread(thread_id)
+            return 0
+
+        with (
+            patch('utils.threads.flush_thread_activity', flush),
+            patch('utils.threads.get_idle_threads', AsyncMock(return_value=idle)),
+            patch('utils.threads.mark_threads_archived', mark),
+            patch('utils.threads.record_counter'),
+            patch.object(threads._archive_bucket, 'acquire', AsyncMock()),
+        ):
+            archived = await threads.archive_idle_threads(bot)
+        return archived, mark
+
+    @pytest.mark.asyncio
+    async def test_archives_idle_threads(self):
+        idle = _thread(1)
+        idle.edit = AsyncMock()
+        bot = _bot(cached=idle)
+
+        archived, mark = await self._archive(bot, [1])
+
+        assert archived == 1
+        idle.edit.assert_awaited_once_with(archived=True)
+        mark.assert_awaited_once_with([1])
+
+    @pytest.mark.asyncio
+    async def test_skips_threads_touched_since_flush(self):
+        active = _thread(1)
+        active.edit = AsyncMock()
+
+        archived, mark = await self._archive(_bot(cached=active), [1], touched=[1])
+
+        assert archived == 0
+        active.edit.assert_not_awaited()
+        mark.assert_awaited_once_with([])
+
+    @pytest.mark.asyncio
+    async def test_deleted_threads_are_marked(self):
+        bot = _bot()
+        bot.fetch_channel.side_effect = discord.NotFound(MagicMock(status=404), "Unknown Channel")
+
+        archived, mark = await self._archive(bot, [1])
+
+        assert archived == 0
+        mark.assert_awaited_once_with([1])
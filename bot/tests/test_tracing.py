@@ -0,0 +1,206 @@
+# bot/tests/test_tracing.py
+"""
+Tests per bot/utils/tracing.py
+
+Copre:
+- span()            — nessuna registrazione fuori da una trace, root=True avvia una
+                      trace, span figli annidati, errori marcati, traceparent W3C
+                      continuato (e ignorato se non valido), task avviati dalla
+                      richiesta che si aggiungono alla trace anche dopo la sua fine
+- Tracer            — ring buffer limitato, slowest() ordinato e limitato all'ultima
+                      ora, export JSONL degli span dal thread del listener
+- Trace.format()    — albero indentato con offset, durata e statement SQL
+- TracedConnection  — query registrate come "db <OPERAZIONE>" solo dentro una trace
+- handle_webhook    — span root "webhook", request_id uguale al trace id
+"""
+
+import json
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture
+def tracer():
+    from utils.tracing import Tracer
+    tracer = Tracer(capacity=10)
+    with patch('utils.tracing._tracer', tracer):
+        yield tracer
+
+
+class TestSpan:
+
+    def test_not_recorded_outside_a_trace(self, tracer):
+        from utils.tracing import span
+
+        with span("db SELECT") as current:
+            assert current is None
+
+        assert tracer.slowest() == []
+
+    def test_children_join_the_root_trace(self, tracer):
+        from utils.tracing import span, current_span
+
+        with span("webhook", root=True) as root:
+            with span("db SELECT") as child:
+                assert current_span() is child
+                with span("discord.send") as grandchild:
+                    pass
+        assert current_span() is None
+
+        trace = tracer.slowest()[0]
+        assert [s.name for s in trace.spans] == ["webhook", "db SELECT", "discord.send"]
+        assert child.parent_id == root.span_id
+        assert grandchild.parent_id == child.span_id
+        assert len(trace.trace_id) == 32 and len(root.span_id) == 16
+        assert all(s.end_ns is not None for s in trace.spans)
+
+    def test_error_is_recorded(self, tracer):
+        from utils.tracing import span, ERROR
+
+        with pytest.raises(ValueError):
+            with span("webhook", root=True) as root:
+                raise ValueError("boom")
+
+        assert root.status == ERROR
+        assert root.error == "ValueError: boom"
+
+    def test_traceparent_is_continued(self, tracer):
+        from utils.tracing import span
+        header = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+        with span("webhook", root=True, traceparent=header) as root:
+            pass
+        with span("webhook", root=True, traceparent="00-garbage-01") as other:
+            pass
+
+        assert root.trace.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+        assert root.parent_id == "00f067aa0ba902b7"
+        assert other.trace.trace_id != root.trace.trace_id
+        assert other.parent_id is None
+
+    @pytest.mark.asyncio
+    async def test_tasks_outliving_the_request_join_its_trace(self, tracer):
+        from utils.tracing import span
+
+        async def deliver():
+            await asyncio.sleep(0.02)
+            with span("uex post_message"):
+                await asyncio.sleep(0.01)
+
+        with span("webhook", root=True) as root:
+            task = asyncio.create_task(deliver())
+        await task
+
+        trace = tracer.slowest()[0]
+        assert [s.name for s in trace.spans] == ["webhook", "uex post_message"]
+        assert trace.duration_ms > root.duration_ms
+
+
+class TestTracer:
+
+    def _trace(self, tracer, name, duration_ms, age=0.0):
+        from utils.tracing import span
+        with span(name, root=True) as root:
+            pass
+        root.start_ns -= int((age + duration_ms / 1000) * 1e9)
+        root.end_ns = root.start_ns + int(duration_ms * 1e6)
+
+    def test_slowest_of_the_last_hour(self, tracer):
+        self._trace(tracer, "fast", 10)
+        self._trace(tracer, "slow", 900)
+        self._trace(tracer, "medium", 200)
+        self._trace(tracer, "old", 5000, age=7200)
+
+        assert [trace.root.name for trace in tracer.slowest(2)] == ["slow", "medium"]
+        assert [trace.root.name for trace in tracer.slowest(10)] == ["slow", "medium", "fast"]
+
+    def test_ring_buffer_is_bounded(self, tracer):
+        for i in range(15):
+            self._trace(tracer, f"t{i}", i)
+
+        names = {trace.root.name for trace in tracer.slowest(20)}
+        assert len(names) == 10
+        assert "t0" not in names and "t14" in names
+
+    def test_spans_exported_as_json_lines(self, tmp_path):
+        from utils.tracing import Tracer, span
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(capacity=10, path=str(path))
+
+        with patch('utils.tracing._tracer', tracer):
+            with span("webhook", root=True, event_type="user_reply"):
+                with span("db SELECT"):
+                    pass
+        tracer.close()
+
+        lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        assert [line["name"] for line in lines] == ["db SELECT", "webhook"]
+        assert lines[0]["traceId"] == lines[1]["traceId"]
+        assert lines[0]["parentSpanId"] == lines[1]["spanId"]
+        assert lines[1]["attributes"] == {"event_type": "user_reply"}
+        assert lines[1]["status"]["code"] == "OK"
+
+
+def test_format_tree(tracer):
+    from utils.tracing import span
+
+    with span("webhook", root=True) as root:
+        with span("event user_reply"):
+            with span("db SELECT", **{"db.statement": "SELECT * FROM sessions WHERE user_id = $1"}):
+                pass
+
+    lines = root.trace.format().splitlines()
+    assert lines[0].endswith("ms webhook")
+    assert lines[1].endswith("ms   event user_reply")
+    assert lines[2].endswith("ms     db SELECT SELECT * FROM sessions WHERE user_id = $1")
+
+
+class TestTracedConnection:
+
+    @pytest.mark.asyncio
+    async def test_queries_are_traced_inside_a_trace(self, tracer):
+        from db.pool import TracedConnection
+        from utils.tracing import span
+        query = AsyncMock(return_value="row")
+
+        assert await TracedConnection._traced(None, query, "SELECT 1") == "row"
+        with span("webhook", root=True) as root:
+            await TracedConnection._traced(None, query, "\n  update sessions\n  SET enable = $1", True)
+
+        assert query.await_count == 2
+        db = root.trace.spans[1]
+        assert db.name == "db UPDATE"
+        assert db.attributes["db.statement"] == "update sessions SET enable = $1"
+        assert len(root.trace.spans) == 2
+
+
+@pytest.mark.asyncio
+async def test_webhook_trace(tracer):
+    from utils.log import current_context
+    from utils.tracing import span
+    seen = {}
+
+    async def handler(request, event_type, user_id):
+        seen.update(current_context())
+        with span("db SELECT"):
+            pass
+        return {"status": 200, "text": "ok"}
+
+    request = MagicMock()
+    request.match_info = {"event_type": "user_reply", "user_id": "42"}
+    request.headers = {"traceparent": "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"}
+    with (
+        patch('webserver.server.bot') as bot,
+        patch('webserver.server.handle_webhook_unificato', handler),
+        patch('webserver.server.record_counter'),
+    ):
+        bot.is_ready.return_value = True
+        from webserver.server import handle_webhook
+        response = await handle_webhook(request)
+
+    trace = tracer.slowest()[0]
+    assert response.status == 200
+    assert seen["request_id"] == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert [s.name for s in trace.spans] == ["webhook", "db SELECT"]
+    assert trace.root.attributes["http.status_code"] == 200
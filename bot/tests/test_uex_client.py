@@ -0,0 +1,278 @@
+# bot/tests/test_uex_client.py
+"""
+Tests per bot/services/uex_client.py
+
+Copre:
+- UexClient.get_user()     — header di autenticazione, retry su 5xx, nessun
+                             retry su 4xx, timeout per endpoint
+- UexClient.post_message() — nessun retry, Retry-After esposto
+- uex_deadline()           — il timeout si accorcia alla scadenza del chiamante,
+                             scadenza passata → nessuna richiesta
+- CircuitBreaker           — si apre dopo N errori, fallisce subito, una sola
+                             richiesta di prova dopo il reset
+- stats()                  — chiamate, errori e latenze per endpoint
+- tracing                  — uno span "uex <endpoint>" per richiesta, con lo
+                             status HTTP e l'errore
+"""
+
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from unittest.mock import patch
+
+
+class FakeUex:
+
+    def __init__(self, statuses=None, delay=0.0, retry_after=None):
+        self.statuses = list(statuses or [])
+        self.delay = delay
+        self.retry_after = retry_after
+        self.requests = []
+
+    async def handle(self, request):
+        self.requests.append(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status == 200:
+            return web.json_response({"data": {"username": request.query.get("username")}})
+        headers = {"Retry-After": str(self.retry_after)} if self.retry_after else {}
+        return web.Response(status=status, text="error", headers=headers)
+
+
+@pytest.fixture
+async def uex():
+    servers = []
+
+    async def start(**kwargs):
+        fake = FakeUex(**kwargs)
+        app = web.Application()
+        app.router.add_get("/user", fake.handle)
+        app.router.add_post("/message", fake.handle)
+        server = TestServer(app)
+        await server.start_server()
+        servers.append(server)
+        patches = [
+            patch('services.uex_client.API_GET_USER', str(server.make_url("/user"))),
+            patch('services.uex_client.API_POST_MESSAGE', str(server.make_url("/message"))),
+        ]
+        for p in patches:
+            p.start()
+            servers.append(p)
+        return fake
+
+    yield start
+
+    for item in reversed(servers):
+        if isinstance(item, TestServer):
+            await item.close()
+        else:
+            item.stop()
+
+
+def _client(**kwargs):
+    from services.uex_client import UexClient, CircuitBreaker
+    kwargs.setdefault("base_delay", 0.01)
+    kwargs.setdefault("max_delay", 0.01)
+    kwargs.setdefault("breaker", CircuitBreaker(failures=5, reset=60))
+    return UexClient(**kwargs)
+
+
+async def _get_user(client):
+    return await client.get_user(bearer_token="b", secret_key="s", username="alice")
+
+
+class TestUexClient:
+
+    @pytest.mark.asyncio
+    async def test_get_user_sends_credentials(self, uex):
+        fake = await uex()
+        client = _client()
+
+        status, body = await _get_user(client)
+        await client.close()
+
+        assert status == 200
+        assert body["data"]["username"] == "alice"
+        assert fake.requests[0].headers["Authorization"] == "Bearer b"
+        assert fake.requests[0].headers["secret-key"] == "s"
+
+    @pytest.mark.asyncio
+    async def test_get_retries_server_errors(self, uex):
+        fake = await uex(statuses=[503, 502])
+        client = _client(get_attempts=3)
+
+        status, _ = await _get_user(client)
+        await client.close()
+
+        assert status == 200
+        assert len(fake.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_get_does_not_retry_client_errors(self, uex):
+        fake = await uex(statuses=[401])
+        client = _client(get_attempts=3)
+
+        status, _ = await _get_user(client)
+        await client.close()
+
+        assert status == 401
+        assert len(fake.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_endpoint_timeout(self, uex):
+        await uex(delay=0.5)
+        client = _client(get_attempts=1)
+
+        with patch('services.uex_client.UEX_TIMEOUT_GET_USER', 0.05):
+            status, body = await _get_user(client)
+        await client.close()
+
+        assert status is None
+        assert "timeout" in body
+
+    @pytest.mark.asyncio
+    async def test_post_is_not_retried(self, uex):
+        fake = await uex(statuses=[503], retry_after=7)
+        client = _client()
+
+        status, error, retry_after = await client.post_message(
+            bearer_token="b", secret_key="s", notif_hash="h", message="hi"
+        )
+        await client.close()
+
+        assert status == 503
+        assert error == "error"
+        assert retry_after == 7
+        assert len(fake.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_stats_per_endpoint(self, uex):
+        await uex(statuses=[200, 401])
+        client = _client()
+
+        await _get_user(client)
+        await _get_user(client)
+        await client.close()
+
+        stats = client.stats()["get_user"]
+        assert stats["calls"] == 2
+        assert stats["errors"] == 1
+        assert 0 < stats["p50_ms"] <= stats["max_ms"]
+
+    @pytest.mark.asyncio
+    async def test_requests_are_traced(self, uex):
+        from utils.tracing import Tracer, span, ERROR
+        await uex(statuses=[401])
+        client = _client()
+
+        with patch('utils.tracing._tracer', Tracer(10)), span("webhook", root=True) as root:
+            await _get_user(client)
+        await client.close()
+
+        request = root.trace.spans[1]
+        assert request.name == "uex get_user"
+        assert request.parent_id == root.span_id
+        assert request.attributes["http.status_code"] == 401
+        assert request.status == ERROR
+
+
+class TestDeadline:
+
+    @pytest.mark.asyncio
+    async def test_deadline_shortens_timeout(self, uex):
+        from services.uex_client import uex_deadline
+        await uex(delay=0.5)
+        client = _client(get_attempts=3)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with uex_deadline(0.1):
+            status, _ = await _get_user(client)
+        await client.close()
+
+        assert status is None
+        assert loop.time() - start < 0.4
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_skips_request(self, uex):
+        from services.uex_client import uex_deadline, remaining_time
+        fake = await uex()
+        client = _client()
+
+        with uex_deadline(0):
+            status, body = await _get_user(client)
+        await client.close()
+
+        assert status is None
+        assert fake.requests == []
+        assert remaining_time() is None
+
+    @pytest.mark.asyncio
+    async def test_none_lifts_deadline(self):
+        from services.uex_client import uex_deadline, remaining_time
+
+        with uex_deadline(5):
+            assert 0 < remaining_time() <= 5
+            with uex_deadline(None):
+                assert remaining_time() is None
+            assert remaining_time() is not None
+
+
+class TestCircuitBreaker:
+
+    @pytest.mark.asyncio
+    async def test_opens_and_fails_fast(self, uex):
+        from services.uex_client import CircuitBreaker
+        fake = await uex(statuses=[500, 500, 500])
+        client = _client(get_attempts=1, breaker=CircuitBreaker(failures=2, reset=60))
+
+        await _get_user(client)
+        await _get_user(client)
+        status, body = await _get_user(client)
+        await client.close()
+
+        assert status is None
+        assert "circuit open" in body
+        assert len(fake.requests) == 2
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+    def test_client_errors_do_not_open(self):
+        from services.uex_client import CircuitBreaker
+        breaker = CircuitBreaker(failures=1, reset=60)
+
+        breaker.check()
+        breaker.record(True)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_lets_a_single_probe(self):
+        from services.uex_client import CircuitBreaker, CircuitOpenError
+        breaker = CircuitBreaker(failures=1, reset=60)
+
+        with patch('services.uex_client.time.monotonic', return_value=1000):
+            breaker.check()
+            breaker.record(False)
+            with pytest.raises(CircuitOpenError):
+                breaker.check()
+
+        with patch('services.uex_client.time.monotonic', return_value=1061):
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            breaker.check()
+            with pytest.raises(CircuitOpenError):
+                breaker.check()
+            breaker.record(True)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        from services.uex_client import CircuitBreaker
+
+        breaker = CircuitBreaker(failures=1, reset=60)
+        with patch('services.uex_client.time.monotonic', return_value=1000):
+            breaker.record(False)
+        with patch('services.uex_client.time.monotonic', return_value=1061):
+            breaker.check()
+            breaker.record(False)
+            assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,219 @@
+# bot/tests/test_uex_outbox.py
+"""
+Tests per bot/services/uex_outbox.py e bot/utils/rate_limit.py
+
+Copre:
+- TokenBucket          — burst iniziale, attesa quando vuoto
+- is_retryable()       — 429/5xx/errori di rete sì, 4xx no
+- backoff_delay()      — limite massimo, Retry-After rispettato
+- UexOutbox.submit()   — consegna, retry su 5xx, nessun retry su 4xx, coda piena, ordine per utente
+- on_message           — ricevuta marcata failed se la coda si riempie durante l'invio
+"""
+
+import time
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def _outbox(**kwargs):
+    from services.uex_outbox import UexOutbox
+    params = dict(
+        concurrency=2, max_pending=10, rate_per_minute=6000, burst=10,
+        max_attempts=3, base_delay=0.001, max_delay=0.01,
+    )
+    params.update(kwargs)
+    return UexOutbox(**params)
+
+
+def _submit(outbox, user_id="1", message="ciao", on_status=None):
+    return outbox.submit(
+        user_id=user_id, bearer_token="b", secret_key="s",
+        notif_hash="hash123", message=message, on_status=on_status
+    )
+
+
+class TestTokenBucket:
+
+    @pytest.mark.asyncio
+    async def test_allows_initial_burst(self):
+        """Il bucket parte pieno: `capacity` acquisizioni immediate."""
+        from utils.rate_limit import TokenBucket
+        bucket = TokenBucket(rate=1, capacity=3)
+
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_refill(self):
+        """Con il bucket vuoto, acquire() attende il token successivo."""
+        from utils.rate_limit import TokenBucket
+        bucket = TokenBucket(rate=50, capacity=1)
+        await bucket.acquire()
+
+        start = time.monotonic()
+        await bucket.acquire()
+
+        assert time.monotonic() - start >= 0.015
+
+
+class TestRetryPolicy:
+
+    def test_retryable_statuses(self):
+        from services.uex_outbox import is_retryable
+        assert is_retryable(None)
+        assert is_retryable(429)
+        assert is_retryable(503)
+        assert not is_retryable(400)
+        assert not is_retryable(401)
+
+    def test_backoff_is_capped(self):
+        from services.uex_outbox import backoff_delay
+        for attempt in range(1, 20):
+            assert 0 <= backoff_delay(attempt, base=1, cap=5) <= 5
+
+    def test_backoff_honours_retry_after(self):
+        from services.uex_outbox import backoff_delay
+        assert backoff_delay(1, base=0.1, cap=1, retry_after=7) == 7
+
+
+class TestUexOutbox:
+
+    @pytest.mark.asyncio
+    async def test_delivers_and_reports_receipt(self):
+        """Status 200 → receipt 'delivered'."""
+        post = AsyncMock(return_value=(200, "", None))
+        receipt = AsyncMock()
+
+        with (
+            patch('services.uex_outbox.post_uex_message', post),
+        ):
+            outbox = _outbox()
+            await _submit(outbox, on_status=receipt)
+
+        post.assert_awaited_once()
+        receipt.assert_awaited_once_with("delivered", "")
+        assert outbox.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self):
+        """500 e poi 200 → due tentativi, consegnato."""
+        post = AsyncMock(side_effect=[(500, "boom", None), (200, "", None)])
+        receipt = AsyncMock()
+
+        with (
+            patch('services.uex_outbox.post_uex_message', post),
+        ):
+            await _submit(_outbox(), on_status=receipt)
+
+        assert post.await_count == 2
+        receipt.assert_awaited_once_with("delivered", "")
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        """Errori di rete continui → 'failed' dopo max_attempts tentativi."""
+        post = AsyncMock(return_value=(None, "timeout", None))
+        receipt = AsyncMock()
+
+        with (
+            patch('services.uex_outbox.post_uex_message', post),
+        ):
+            await _submit(_outbox(max_attempts=3), on_status=receipt)
+
+        assert post.await_count == 3
+        state, error = receipt.call_args[0]
+        assert state == "failed"
+        assert "timeout" in error
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_client_errors(self):
+        """401 → nessun retry, 'failed' con lo status nel messaggio."""
+        post = AsyncMock(return_value=(401, "unauthorized", None))
+        receipt = AsyncMock()
+
+        with (
+            patch('services.uex_outbox.post_uex_message', post),
+        ):
+            await _submit(_outbox(), on_status=receipt)
+
+        post.assert_awaited_once()
+        assert receipt.call_args[0] == ("failed", "401: unauthorized")
+
+    @pytest.mark.asyncio
+    async def test_refuses_when_full(self):
+        """Oltre max_pending, submit() restituisce None."""
+        gate = asyncio.Event()
+
+        async def slow_post(**kwargs):
+            await gate.wait()
+            return 200, "", None
+
+        with (
+            patch('services.uex_outbox.post_uex_message', slow_post),
+        ):
+            outbox = _outbox(max_pending=1)
+            first = _submit(outbox)
+            second = _submit(outbox)
+            gate.set()
+            await first
+
+        assert first is not None
+        assert second is None
+
+    @pytest.mark.asyncio
+    async def test_keeps_per_user_order(self):
+        """I messaggi dello stesso utente vengono consegnati nell'ordine di invio."""
+        delivered = []
+
+        async def post(**kwargs):
+            await asyncio.sleep(0.01 if kwargs["message"] == "first" else 0)
+            delivered.append(kwargs["message"])
+            return 200, "", None
+
+        with (
+            patch('services.uex_outbox.post_uex_message', post),
+        ):
+            outbox = _outbox()
+            tasks = [_submit(outbox, message="first"), _submit(outbox, message="second")]
+            await asyncio.gather(*tasks)
+
+        assert delivered == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_receipt_failed_when_queue_fills_during_send():
+    """Se la coda si riempie mentre la ricevuta viene inviata, la ricevuta è marcata failed."""
+    import discord
+    from discord_bot.events import on_message
+    from utils.i18n import t
+
+    notification = MagicMock()
+    notification.embeds = [MagicMock(description="https://uexcorp.space/hash/abc123")]
+    receipt = MagicMock()
+    receipt.edit = AsyncMock()
+    message = MagicMock()
+    message.author.bot = False
+    message.author.id = 42
+    message.content = "ok"
+    message.reference.resolved = notification
+    message.channel = MagicMock(spec=discord.Thread)
+    message.channel.send = AsyncMock(return_value=receipt)
+    outbox = MagicMock(pending=0, max_pending=10)
+    outbox.submit.return_value = None
+
+    with (
+        patch('discord_bot.events.touch_thread'),
+        patch('discord_bot.events.db_session') as db_session,
+        patch('discord_bot.events.get_uex_outbox', return_value=outbox),
+        patch('discord_bot.events.bot.process_commands', AsyncMock()),
+    ):
+        db_session.get_user_session = AsyncMock(return_value={"bearer_token": "b", "secret_key": "s"})
+        db_session.get_user_language = AsyncMock(return_value="en")
+        await on_message(message)
+
+    outbox.submit.assert_called_once()
+    embed = receipt.edit.await_args.kwargs["embed"]
+    status = next(field.value for field in embed.fields if field.name == t("en", "delivery.status"))
+    assert status == t("en", "delivery.failed", error=t("en", "errors.uex_queue_full"))
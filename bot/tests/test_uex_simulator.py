@@ -0,0 +1,128 @@
+# bot/tests/test_uex_simulator.py
+"""
+Tests per bot/devtools/uex_simulator.py
+
+Copre:
+- API finta          — UexClient contro il simulatore: lookup utente, messaggi
+                       registrati, notifiche dopo il cursore, token non validi
+- modello di guasti  — burst di 429 con Retry-After, tasso di errori 5xx
+- scenario           — N utenti × M negoziazioni × K messaggi inviati al webhook
+                       del bot, webhook scartati restano tra le notifiche
+"""
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from unittest.mock import patch
+
+
+@pytest.fixture
+async def simulator():
+    from devtools.uex_simulator import UexSimulator
+    from services.uex_client import UexClient
+    started = []
+
+    async def start(**kwargs):
+        sim = UexSimulator(seed=1, **kwargs)
+        base = await sim.start()
+        client = UexClient(get_attempts=1)
+        patches = [
+            patch('services.uex_client.API_GET_USER', f"{base}/user/"),
+            patch('services.uex_client.API_POST_MESSAGE', f"{base}/marketplace_negotiations_messages/"),
+            patch('services.uex_client.API_NOTIFICATIONS', f"{base}/user_notifications/"),
+        ]
+        for p in patches:
+            p.start()
+        started.append((sim, client, patches))
+        return sim, client
+
+    yield start
+
+    for sim, client, patches in started:
+        for p in patches:
+            p.stop()
+        await client.close()
+        await sim.close()
+
+
+class TestFakeApi:
+
+    @pytest.mark.asyncio
+    async def test_client_round_trip(self, simulator):
+        sim, client = await simulator()
+        sim.record_event("7", "user_reply", {"negotiation_hash": "h", "message": "old"})
+        sim.record_event("7", "user_reply", {"negotiation_hash": "h", "message": "new"})
+
+        status, user = await client.get_user(bearer_token="sim-token-7", secret_key="s", username="alice")
+        posted, _, _ = await client.post_message(bearer_token="sim-token-7", secret_key="s", notif_hash="h", message="hi")
+        _, notifications = await client.get_notifications(bearer_token="sim-token-7", secret_key="s", since_id=1)
+
+        assert status == 200 and user["data"]["username"] == "alice"
+        assert posted == 200 and sim.messages[0]["message"] == "hi"
+        assert [n["message"] for n in notifications["data"]] == ["new"]
+
+    @pytest.mark.asyncio
+    async def test_strict_tokens(self, simulator):
+        _, client = await simulator(strict_tokens=True)
+
+        status, _ = await client.get_user(bearer_token="stolen", secret_key="s", username="alice")
+
+        assert status == 401
+
+    @pytest.mark.asyncio
+    async def test_429_burst(self, simulator):
+        from devtools.uex_simulator import FaultModel
+        sim, client = await simulator(faults=FaultModel(burst_every=60, burst_length=30))
+
+        status, _, retry_after = await client.post_message(bearer_token="t", secret_key="s", notif_hash="h", message="hi")
+
+        assert status == 429
+        assert 0 < retry_after <= 30
+        assert sim.report()["counters"]["marketplace_negotiations_messages.429"] == 1
+
+    @pytest.mark.asyncio
+    async def test_error_rate(self, simulator):
+        from devtools.uex_simulator import FaultModel
+        _, client = await simulator(faults=FaultModel(error_rate=1.0))
+
+        status, _ = await client.get_user(bearer_token="t", secret_key="s", username="alice")
+
+        assert status == 503
+
+    def test_latency_models(self):
+        from devtools.uex_simulator import LatencyModel
+
+        assert LatencyModel("fixed:50").sample() == 0.05
+        assert all(0.02 <= LatencyModel("uniform:20-30").sample() <= 0.03 for _ in range(20))
+        assert LatencyModel("lognormal:80,0.6").sample() > 0
+        with pytest.raises(ValueError):
+            LatencyModel("gaussian:1")
+
+
+class TestScenario:
+
+    @pytest.mark.asyncio
+    async def test_users_negotiations_messages(self, simulator):
+        sim, _ = await simulator()
+        received = []
+
+        async def webhook(request):
+            received.append((request.match_info["event_type"], request.match_info["user_id"]))
+            return web.Response(text="ok")
+
+        app = web.Application()
+        app.router.add_post("/webhook/{event_type}/{user_id}", webhook)
+        bot = TestServer(app)
+        await bot.start_server()
+
+        report = await sim.run_scenario(str(bot.make_url("")), users=2, negotiations=3, messages=4, rate=0, drop_rate=0.5)
+        await bot.close()
+
+        # Each negotiation: started + 4 replies + completed
+        total = 2 * 3 * 6
+        dropped = report["counters"].get("webhooks.dropped", 0)
+        assert len(received) + dropped == total
+        assert 0 < dropped < total
+        assert sum(len(n) for n in sim.notifications.values()) == total
+        assert sum(1 for event, _ in received if event == "user_reply") <= 2 * 3 * 4
+        assert {user for _, user in received} <= {"100000", "100001"}
@@ -1,21 +1,31 @@
 from .i18n import I18n, t
 from .logo import show_logo
 from .text_cleaner import clean_text
-from .ports import kill_process_on_port
+from .ports import bind_port
 from .cryptography import  decrypt, encrypt
-from .status import start_status_task, update_status_message
+from .rate_limit import TokenBucket
+from .log import log_context, log_throttled, lazy_t
+from .tracing import get_tracer, span
+from .status import start_status_task, update_status_message, refresh_status_boards
 from .roles_management import has_uex_manager_role, assign_uex_user_role
 
 __all__ = [
     "update_status_message",
-    "kill_process_on_port",
+    "refresh_status_boards",
     "has_uex_manager_role",
     "assign_uex_user_role",
     "start_status_task",
+    "log_throttled",
+    "bind_port",
     "clean_text",
     "show_logo",
+    "TokenBucket",
+    "log_context",
+    "get_tracer",
     "decrypt",
     "encrypt",
+    "lazy_t",
+    "span",
     "I18n",
     "t",
 ]
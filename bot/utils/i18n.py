@@ -2,6 +2,8 @@ import json
 from pathlib import Path
 
 
+LOCALES_PATH = Path(__file__).resolve().parent.parent / "locales"
+
 
 class I18n:
     
@@ -14,33 +16,54 @@ class I18n:
 
     Attributes:
         default_lang (str): The language code to use as a fallback (default is "en").
-        translations (dict): A dictionary storing loaded translation data.
+        translations (dict): A dictionary storing the translation data loaded so far.
     """
     
     
-    def __init__(self, default_lang="en"):
+    def __init__(self, default_lang="en", base_path: Path = LOCALES_PATH):
         self.default_lang = default_lang
+        self.base_path = base_path
         self.translations = {}
-        self.load_locales()
 
 
-    def load_locales(self):
+    def load_locale(self, lang: str) -> dict | None:
         
         """
-        Scans the 'locales' directory and loads all JSON translation files.
+        Loads the JSON translation file of a language from the 'locales' directory, on first use.
 
         Each file should be named after its language code (e.g., 'en.json', 'it.json'). 
-        The stem of the filename is used as the language key in the translations dictionary.
+        Files are only read when a language is first requested, so importing the bot 
+        does not parse every locale. Languages without a file are remembered as missing.
+
+        Args:
+            lang (str): The language code.
+
+        Returns:
+            dict | None: The translations of the language, or None if there is no file for it.
+        """
+        
+        if lang not in self.translations:
+            file = self.base_path / f"{lang}.json"
+            data = None
+            if lang and file.name == f"{lang}.json" and file.is_file():
+                with open(file, encoding="utf-8") as f:
+                    data = json.load(f)
+            self.translations[lang] = data
+
+        return self.translations[lang]
+
+
+    def load_locales(self):
+        
+        """
+        Loads every JSON translation file of the 'locales' directory at once.
 
         Returns:
             None
         """
         
-        base_path = Path("locales")
-        for file in base_path.glob("*.json"):
-            lang = file.stem
-            with open(file, encoding="utf-8") as f:
-                self.translations[lang] = json.load(f)
+        for file in self.base_path.glob("*.json"):
+            self.load_locale(file.stem)
 
     
     def t(self, lang: str, key: str, **kwargs) -> str:
@@ -58,8 +81,9 @@ class I18n:
                 or the key itself if no translation is found.
         """
         
-        data = self.translations.get(lang) or self.translations[self.default_lang]
-        text = data.get(key) or self.translations[self.default_lang].get(key) or key
+        default = self.load_locale(self.default_lang) or {}
+        data = self.load_locale(lang) or default
+        text = data.get(key) or default.get(key) or key
         return text.format(**kwargs)
 
 translator = I18n(default_lang="en")
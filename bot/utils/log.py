@@ -0,0 +1,134 @@
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+from utils.i18n import t
+
+
+_context: contextvars.ContextVar[dict | None] = contextvars.ContextVar("log_context", default=None)
+_throttled: dict[str, list] = {}
+
+
+
+@contextmanager
+def log_context(**fields):
+
+    """
+    Binds fields (event_type, user_id, negotiation_hash, request_id...) to the records
+    logged inside the block, including by the tasks it starts.
+
+    Fields set to None are ignored; nested blocks add to the outer fields.
+
+    Args:
+        **fields: The context fields.
+
+    Returns:
+        ContextManager[None]
+    """
+
+    bound = {key: value for key, value in fields.items() if value is not None}
+    token = _context.set({**(_context.get() or {}), **bound})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def current_context() -> dict:
+
+    """
+    Returns the fields bound by the enclosing `log_context` blocks.
+
+    Returns:
+        dict: The context fields, empty outside of any block.
+    """
+
+    return dict(_context.get() or {})
+
+
+class ContextFilter(logging.Filter):
+
+    """
+    Copies the bound context fields on the record, as `record.context`.
+
+    Context variables only exist in the thread logging the record, so the filter
+    must sit on the handler running in that thread (the queue handler).
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _context.get()
+        if context:
+            record.context = {**context, **getattr(record, "context", {})}
+        return True
+
+
+class LazyText:
+
+    """
+    Translation resolved only when the record is written: `logging.info("%s", lazy_t(...))`.
+    """
+
+    __slots__ = ("lang", "key", "kwargs")
+
+    def __init__(self, lang: str, key: str, kwargs: dict):
+        self.lang = lang
+        self.key = key
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return t(self.lang, self.key, **self.kwargs)
+
+
+def lazy_t(lang: str, key: str, **kwargs) -> LazyText:
+
+    """
+    Like `t`, but translated only if (and when) the log record is written.
+
+    Args:
+        lang (str): The target language code.
+        key (str): The translation key to look up.
+        **kwargs: Dynamic values to be interpolated into the translation string.
+
+    Returns:
+        LazyText: The pending translation, to pass as a `%s` argument.
+    """
+
+    return LazyText(lang, key, {name: str(value) for name, value in kwargs.items()})
+
+
+def log_throttled(key: str, interval: float, level: int, msg: str, *args, **kwargs) -> bool:
+
+    """
+    Logs at most one record per `interval` seconds for a given key.
+
+    Meant for lines that can fire in bursts (retries, full queues...). The next record
+    let through tells how many were suppressed since the previous one. Keys must come
+    from a small fixed set, not from user input.
+
+    Args:
+        key (str): The rate-limit key, e.g. "uex_outbox.retry".
+        interval (float): Minimum seconds between two records of the key.
+        level (int): The logging level.
+        msg (str): The %-style message.
+        *args: The message arguments.
+        **kwargs: Passed to `logging.log` (exc_info, extra...).
+
+    Returns:
+        bool: True if the record was logged, False if it was suppressed.
+    """
+
+    root = logging.getLogger()
+    if not root.isEnabledFor(level):
+        return False
+
+    now = time.monotonic()
+    state = _throttled.setdefault(key, [0.0, 0])
+    if now < state[0]:
+        state[1] += 1
+        return False
+
+    suppressed, state[0], state[1] = state[1], now + interval, 0
+    if suppressed:
+        msg, args = f"{msg} (+%d suppressed)", (*args, suppressed)
+    root.log(level, msg, *args, **kwargs)
+    return True
@@ -1,73 +1,223 @@
 import os
-import psutil
+import time
+import errno
+import signal
+import socket
+import logging
+import threading
+from pathlib import Path
 from utils.i18n import t
-from config import SYSTEM_LANGUAGE
+from config import SYSTEM_LANGUAGE, WEBHOOK_PIDFILE, SHUTDOWN_TIMEOUT
 
 
 
+def _make_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            # Lets the new instance bind while the previous one is still shutting down
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((host, port))
+        sock.listen(128)
+        sock.setblocking(False)
+        return sock
+    except OSError:
+        sock.close()
+        raise
 
-def kill_process_on_port(port: int) -> bool:
-    
-    """
-    Scans for and terminates any existing process occupying a specific network port.
 
-    This utility is used during startup to ensure the required port is free. For 
-    security, it includes protections against killing critical system processes 
-    (like SSH), ignores its own PID, and only targets specific process types 
-    (Python or Gunicorn).
+def _cmdline(pid: int) -> bytes:
+    try:
+        return Path(f"/proc/{pid}/cmdline").read_bytes()
+    except OSError:
+        return b""
 
-    Args:
-        port (int): The network port number to check and clear.
 
-    Returns:
-        bool: True if a process was found and successfully terminated, False otherwise.
+def _exited(pid: int) -> bool:
+    if not Path("/proc/self").exists():
+        try:
+            os.kill(pid, 0)
+            return False
+        except ProcessLookupError:
+            return True
+
+    try:
+        # Zombies keep their PID until reaped, but have released their sockets
+        stat = Path(f"/proc/{pid}/stat").read_text()
+        return stat.rsplit(")", 1)[1].split()[0] == "Z"
+    except OSError:
+        return True
+
+
+def _terminate(pid: int, port: int, timeout: float = SHUTDOWN_TIMEOUT + 5) -> bool:
+    # Blocks until the process exits: the bot drains its in-flight work for up to
+    # SHUTDOWN_TIMEOUT seconds on SIGTERM, SIGKILL only comes after that
 
-    Note:
-        The function attempts a graceful termination (terminate()) followed by a 
-        forced kill (kill()) if the process does not exit within 3 seconds.
-    """
-    
     # --- SECURITY PROTECTION ---
-    # Never touch port 22 (SSH) or invalid ports
-    if port == 22 or port is None:
+    # Never touch ourselves or processes we don't know
+    if pid == os.getpid():
+        return False
+
+    name = _cmdline(pid).split(b"\0")[0].lower()
+    if b"python" not in name and b"gunicorn" not in name:
+        return False
+
+    logging.info(t(SYSTEM_LANGUAGE, "system.kill_found", pid=pid, port=port))
+
+    try:
+        os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while not _exited(pid):
+            if time.monotonic() >= deadline:
+                os.kill(pid, signal.SIGKILL)
+                time.sleep(0.1)
+                break
+            time.sleep(0.05)
+    except ProcessLookupError:
+        pass
+    except PermissionError:
         return False
 
-    current_pid = os.getpid()  # Avoid auto-kill
+    logging.info(t(SYSTEM_LANGUAGE, "system.kill_success", port=port))
+    return True
+
+
+def _previous_instance(pidfile: Path) -> list[int]:
+
+    """Returns the PID of our previous instance, if the pidfile still points to it."""
+
+    try:
+        pid = int(pidfile.read_text().strip())
+    except (OSError, ValueError):
+        return []
+
+    # The PID may have been reused: only trust it if it runs the same command as us
+    if pid == os.getpid() or _cmdline(pid) != _cmdline(os.getpid()):
+        return []
+    return [pid]
+
 
-    for proc in psutil.process_iter(['pid', 'name']):
+def _listening_inodes(port: int) -> set[str]:
+    inodes = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
         try:
-            proc_name = (proc.info['name'] or "").lower()
+            lines = Path(table).read_text().splitlines()[1:]
+        except OSError:
+            continue
+        for line in lines:
+            fields = line.split()
+            # local_address is "<hex ip>:<hex port>", state 0A is LISTEN
+            if int(fields[1].rsplit(":", 1)[1], 16) == port and fields[3] == "0A":
+                inodes.add(fields[9])
+    return inodes
 
-            # Known processes only (extra protection)
-            if 'python' not in proc_name and 'gunicorn' not in proc_name:
-                continue
 
-            for conn in proc.connections(kind='inet'):
-                if conn.laddr.port == port:
-                    if proc.info['pid'] == current_pid:
-                        continue
-
-                    print(
-                        t(SYSTEM_LANGUAGE, "system.kill_found").format(
-                            pid=proc.info['pid'],
-                            port=port
-                        )
-                    )
-
-                    proc.terminate()
-                    try:
-                        proc.wait(timeout=3)
-                    except psutil.TimeoutExpired:
-                        proc.kill()
-
-                    print(
-                        t(SYSTEM_LANGUAGE, "system.kill_success").format(
-                            port=port
-                        )
-                    )
-                    return True
-
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+def _pids_from_proc(port: int) -> list[int]:
+
+    """Finds the processes listening on a port through /proc/net/tcp socket inodes."""
+
+    inodes = {f"socket:[{inode}]" for inode in _listening_inodes(port)}
+    if not inodes:
+        return []
+
+    pids = []
+    for proc in Path("/proc").iterdir():
+        if not proc.name.isdigit():
+            continue
+        try:
+            for fd in (proc / "fd").iterdir():
+                if os.readlink(fd) in inodes:
+                    pids.append(int(proc.name))
+                    break
+        except OSError:
             continue
+    return pids
+
+
+def write_pidfile(pidfile: Path = None):
+
+    """
+    Records the PID of this instance, so the next start can stop it quickly.
+
+    Args:
+        pidfile (Path, optional): The pidfile path (defaults to WEBHOOK_PIDFILE).
+
+    Returns:
+        None
+    """
+
+    Path(pidfile or WEBHOOK_PIDFILE).write_text(str(os.getpid()))
+
+
+def bind_port(host: str, port: int, pidfile: Path = None) -> socket.socket:
 
-    return False
+    """
+    Binds the listening socket of the webhook server, freeing the port if needed.
+
+    The strategies are tried from the cheapest to the most expensive:
+    1. A plain bind with SO_REUSEADDR/SO_REUSEPORT, enough after a clean shutdown.
+    2. Stopping our previous instance, found through the pidfile.
+    3. Last resort: finding the listener through the /proc/net/tcp socket inodes
+       (Linux only) and stopping it if it is a Python process.
+    The time spent freeing the port is logged. A stopped process gets SHUTDOWN_TIMEOUT
+    seconds to drain its work before being killed: this call blocks meanwhile, so
+    async code runs it in a thread. When the plain bind succeeds, the previous
+    instance is stopped in the background instead.
+
+    Args:
+        host (str): The address to bind.
+        port (int): The port to bind.
+        pidfile (Path, optional): The pidfile path (defaults to WEBHOOK_PIDFILE).
+
+    Returns:
+        socket.socket: The bound, listening, non-blocking socket.
+
+    Raises:
+        OSError: If the port could not be freed.
+    """
+
+    pidfile = Path(pidfile or WEBHOOK_PIDFILE)
+
+    # --- SECURITY PROTECTION ---
+    # Never touch port 22 (SSH) or invalid ports
+    if port == 22 or port is None:
+        raise ValueError(f"Refusing to bind port {port}")
+
+    start = time.perf_counter()
+    try:
+        sock = _make_socket(host, port)
+        strategy = "bind"
+    except OSError as e:
+        if e.errno != errno.EADDRINUSE:
+            raise
+
+        sock = None
+        strategies = (
+            ("pidfile", lambda: _previous_instance(pidfile)),
+            ("/proc/net/tcp", lambda: _pids_from_proc(port)),
+        )
+        for strategy, find_pids in strategies:
+            if not any([_terminate(pid, port) for pid in find_pids()]):
+                continue
+            try:
+                sock = _make_socket(host, port)
+                break
+            except OSError as retry_error:
+                if retry_error.errno != errno.EADDRINUSE:
+                    raise
+
+        if sock is None:
+            raise e
+
+    # With SO_REUSEPORT the bind succeeds even if our previous instance still listens:
+    # stop it, so webhooks are not split between the two. It refuses new webhooks while
+    # it drains, and this instance already listens: no need to wait for it
+    if strategy == "bind":
+        for pid in _previous_instance(pidfile):
+            threading.Thread(target=_terminate, args=(pid, port), name=f"stop-{pid}", daemon=True).start()
+
+    logging.info(f"⏱️ Port {port} ready via {strategy} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    write_pidfile(pidfile)
+    return sock
@@ -0,0 +1,122 @@
+import time
+import random
+import asyncio
+
+
+
+def is_retryable(status: int | None) -> bool:
+
+    """
+    Tells whether an HTTP response is a transient failure worth retrying.
+
+    Args:
+        status (int | None): The HTTP status, or None for connection errors.
+
+    Returns:
+        bool: True for connection errors, 429 and 5xx responses.
+    """
+
+    return status is None or status == 429 or status >= 500
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: float | None = None) -> float:
+
+    """
+    Computes the wait before the next attempt using exponential backoff with full jitter.
+
+    Args:
+        attempt (int): The number of attempts already made (1 for the first retry).
+        base (float): The base delay in seconds.
+        cap (float): The maximum delay in seconds.
+        retry_after (float | None): The server's own hint, which is always honoured.
+
+    Returns:
+        float: The delay in seconds.
+    """
+
+    delay = random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+    if retry_after:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class TokenBucket:
+
+    """
+    Asynchronous token bucket used to pace calls against rate-limited APIs.
+
+    The bucket starts full and refills continuously at `rate` tokens per second,
+    never exceeding `capacity`. Callers await `acquire()` to take one token,
+    sleeping just long enough for the next token to become available.
+
+    Attributes:
+        rate (float): Tokens added to the bucket every second.
+        capacity (float): Maximum number of tokens (the allowed burst).
+        tokens (float): Tokens currently available.
+        last_used (float): Monotonic time of the last acquisition.
+    """
+
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self.last_used = self._updated
+        self._lock = asyncio.Lock()
+
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+    def try_acquire(self) -> bool:
+
+        """
+        Takes a token without waiting.
+
+        Returns:
+            bool: True if a token was available and consumed, False otherwise.
+        """
+
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.last_used = time.monotonic()
+            return True
+        return False
+
+
+    async def acquire(self):
+
+        """
+        Waits until a token is available and consumes it.
+
+        Waiters are served in FIFO order so a burst of callers cannot starve
+        the ones that arrived first.
+
+        Returns:
+            None
+        """
+
+        async with self._lock:
+            while not self.try_acquire():
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+    def is_idle(self, seconds: float) -> bool:
+
+        """
+        Tells whether the bucket is full and has not been used recently.
+
+        Args:
+            seconds (float): Minimum idle time.
+
+        Returns:
+            bool: True if the bucket can be discarded without losing state.
+        """
+
+        self._refill()
+        return self.tokens >= self.capacity and time.monotonic() - self.last_used >= seconds
@@ -2,17 +2,143 @@ import discord
 from utils.i18n import t
 import db.sessions as sessions
 import db.banned as ban
+import db.guild_settings as guild_settings
 from discord import app_commands
 from logger import logging
+from config import UEX_MANAGER_ROLE_NAME, UEX_USER_ROLE_NAME
 
 
+MANAGER = "manager"
+USER = "user"
+DEFAULT_ROLE_NAMES = {MANAGER: UEX_MANAGER_ROLE_NAME, USER: UEX_USER_ROLE_NAME}
+
+# Per-guild role names (from guild_settings) and the role IDs resolved from them
+_role_names: dict[int, dict[str, str]] = {}
+_role_ids: dict[int, dict[str, int | None]] = {}
+
+
+
+async def resolve_member(guild: discord.Guild | None, user: discord.abc.User) -> discord.Member | None:
+
+    """ Returns the guild member behind a user, fetching it lazily when it is not at hand.
+
+    Interactions already carry the invoking member with its roles, and the member cache 
+    is disabled by default (see DISCORD_MEMBER_CACHE), so the REST fetch is only a 
+    fallback for the rare cases where a plain User is received.
+
+    Args:
+        guild (discord.Guild | None): The guild the member belongs to.
+        user (discord.abc.User): The user or member to resolve.
+
+    Returns:
+        discord.Member | None: The member, or None outside a guild or if it cannot be fetched.
+    """
+
+    if isinstance(user, discord.Member):
+        return user
+    if guild is None:
+        return None
+
+    member = guild.get_member(user.id)
+    if member:
+        return member
+
+    try:
+        return await guild.fetch_member(user.id)
+    except discord.HTTPException as e:
+        logging.warning(f"⚠️ Unable to fetch member {user.id} in guild {guild.id}: {e}")
+        return None
+
+
+async def get_role_names(guild_id: int) -> dict[str, str]:
+
+    """ Returns the role names of a guild, loading its settings on first use.
+
+    Args:
+        guild_id (int): The Discord guild ID.
+
+    Returns:
+        dict[str, str]: The 'manager' and 'user' role names.
+    """
+
+    names = _role_names.get(guild_id)
+    if names is None:
+        try:
+            stored = await guild_settings.get_guild_role_names(guild_id)
+        except Exception as e:
+            # Don't cache the defaults: retry the database on the next check
+            logging.error(f"❌ Unable to load the role names of guild {guild_id}: {e}")
+            return dict(DEFAULT_ROLE_NAMES)
+
+        names = {kind: stored.get(kind) or default for kind, default in DEFAULT_ROLE_NAMES.items()}
+        _role_names[guild_id] = names
+    return names
+
+
+async def get_role_id(guild: discord.Guild, kind: str) -> int | None:
+
+    """ Returns the ID of a bot role in a guild, resolving it by name only once.
+
+    The IDs are kept until a role of the guild is created, renamed or deleted 
+    (see `invalidate_guild_roles`).
+
+    Args:
+        guild (discord.Guild): The guild.
+        kind (str): MANAGER or USER.
+
+    Returns:
+        int | None: The role ID, or None if the guild has no role with the configured name.
+    """
+
+    ids = _role_ids.get(guild.id)
+    if ids is None:
+        names = await get_role_names(guild.id)
+        by_name = {role.name: role.id for role in guild.roles}
+        ids = {kind_: by_name.get(name) for kind_, name in names.items()}
+        _role_ids[guild.id] = ids
+    return ids.get(kind)
+
+
+def invalidate_guild_roles(guild_id: int, names: bool = False):
+
+    """ Forgets the resolved role IDs of a guild, so they are resolved again on the next check.
+
+    Args:
+        guild_id (int): The Discord guild ID.
+        names (bool): Also reload the configured role names from the database.
+
+    Returns:
+        None
+    """
+
+    _role_ids.pop(guild_id, None)
+    if names:
+        _role_names.pop(guild_id, None)
+
+
+async def has_bot_role(member: discord.Member, kind: str) -> bool:
+
+    """ Tells whether a member has one of the bot roles, by role ID.
+
+    Args:
+        member (discord.Member): The member to check.
+        kind (str): MANAGER or USER.
+
+    Returns:
+        bool: True if the member has the role.
+    """
+
+    role_id = await get_role_id(member.guild, kind)
+    return role_id is not None and member.get_role(role_id) is not None
+
 
 def has_uex_manager_role():
     
     """ A decorator check that restricts command execution to users with the "UEX Manager" role.
 
-    This function verifies the user's roles and, if the required role is not found, 
-    resolves the user's language to send a localized ephemeral error message.
+    This function verifies the user's roles by role ID (the role name is configurable 
+    per guild) and, only if the required role is not found, resolves the user's 
+    language to send a localized ephemeral error message.
 
     Args:
         interaction (discord.Interaction): The interaction object representing the command invocation.
@@ -22,13 +148,13 @@ def has_uex_manager_role():
     """
     
     async def predicate(interaction: discord.Interaction) -> bool:
-        # Verifica se l'utente ha il ruolo con quel nome esatto
-        lang = await sessions.resolve_and_store_language(interaction)
-        role = discord.utils.get(interaction.user.roles, name="UEX Manager")
-        if role:
+        # Verifica se l'utente ha il ruolo manager della gilda
+        member = await resolve_member(interaction.guild, interaction.user)
+        if member and await has_bot_role(member, MANAGER):
             return True
         
         # Se non ha il ruolo, inviamo un messaggio di errore privato
+        lang = await sessions.resolve_and_store_language(interaction)
         await interaction.response.send_message(
             t(lang, "access_denied",),
             ephemeral=True
@@ -55,10 +181,11 @@ async def assign_uex_user_role(interaction: discord.Interaction) -> bool:
     """
     
     guild = interaction.guild
-    member = interaction.user
+    member = await resolve_member(guild, interaction.user)
+    if member is None:
+        return True
 
-    check_manage = has_uex_manager_role()
-    if check_manage:
+    if await has_bot_role(member, MANAGER):
         logging.debug(f"⚠️ User {member} has UEX Manager role, skipping UEX user role assignment")
         return True
 
@@ -70,13 +197,14 @@ async def assign_uex_user_role(interaction: discord.Interaction) -> bool:
         return False
     
     # 2. Get role
-    role = discord.utils.get(guild.roles, name="UEX user")
+    role_id = await get_role_id(guild, USER)
+    role = guild.get_role(role_id) if role_id else None
     if not role:
         logging.error("❌ Role 'UEX user' not found")
         return True  # Role missing, but not a ban, so return True
 
     # 3. Assign role if missing
-    if role not in member.roles:
+    if not member.get_role(role.id):
         await member.add_roles(role, reason="First bot interaction")
         logging.debug(f"✅ Assigned 'UEX user' role to {member}")
     return True
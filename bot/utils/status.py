@@ -1,3 +1,6 @@
+import json
+import asyncio
+import hashlib
 import logging
 import discord
 import db.banned as ban
@@ -5,27 +8,54 @@ from utils.i18n import t
 from discord.ext import tasks
 import db.sessions as sessions
 from datetime import datetime, timezone
-from db.maintenance import get_status_message, set_maintenance, update_maintenance_state_if_needed
-
-
-
-async def build_status_embed(lang: str) -> discord.Embed:
+from utils.rate_limit import TokenBucket
+from utils.roles_management import resolve_member, has_bot_role, MANAGER
+from db.maintenance import (
+    update_maintenance_state_if_needed,
+    attach_status_messages,
+    delete_status_message,
+    save_status_message,
+    get_status_messages,
+)
+from config import (
+    STATUS_FANOUT_CONCURRENCY,
+    STATUS_CHANNEL_EDITS_PER_SECOND,
+    STATUS_CHANNEL_EDITS_BURST,
+)
+
+
+# Status boards keyed by (guild_id, channel_id, lang), loaded from the database once
+_boards: dict[tuple[int | None, int, str], discord.PartialMessage] | None = None
+# Digest of the last embed sent to each board
+_last_digests: dict[tuple[int | None, int, str], str] = {}
+_channel_buckets: dict[int, TokenBucket] = {}
+_transition_task: asyncio.Task | None = None
+_transition_at: datetime | None = None
+_status_loop: tasks.Loop | None = None
+_refreshes: set[asyncio.Task] = set()
+
+
+
+async def build_status_embed(lang: str, state: str = None, status: dict = None) -> discord.Embed:
     
     """ Constructs a dynamic Embed representing the current operational status of the bot.
 
-    This function triggers a maintenance state check and builds a visual summary 
-    of the bot's health. It adjusts colors and fields based on whether maintenance 
-    is currently active, scheduled for the future, or disabled.
+    This function builds a visual summary of the bot's health. It adjusts colors and 
+    fields based on whether maintenance is currently active, scheduled for the future, 
+    or disabled. When no state is given, the maintenance state check is triggered first.
 
     Args:
-        None (Uses internal state from update_maintenance_state_if_needed).
+        lang (str): The language of the embed.
+        state (str, optional): The maintenance state already computed by the caller.
+        status (dict, optional): The maintenance status row matching `state`.
 
     Returns:
         discord.Embed: A formatted embed containing the bot status, maintenance 
                     period details, and automatic update information.
     """
     
-    state, status = await update_maintenance_state_if_needed()
+    if state is None:
+        state, status = await update_maintenance_state_if_needed()
     now = discord.utils.utcnow()
 
     embed = discord.Embed(
@@ -101,41 +131,227 @@ async def build_status_embed(lang: str) -> discord.Embed:
     return embed
 
 
-async def update_status_message(bot: discord.Client):
-    
-    """ Retrieves and updates the existing status embed message with the latest bot information.
+def embed_digest(embed: discord.Embed) -> str:
+
+    """ Computes a fingerprint of the visible content of an embed.
 
-    This function fetches the stored channel and message IDs from the database, 
-    locates the message within the Discord guild, and edits it with a freshly 
-    generated status embed. It handles missing channels or messages gracefully 
-    to avoid unnecessary crashes.
+    The timestamp is left out, so two renders of the same status produce the same digest.
 
     Args:
-        bot (discord.Client): The bot instance used to fetch the channel and edit the message.
+        embed (discord.Embed): The embed to fingerprint.
 
     Returns:
-        None: The function performs an in-place edit of the Discord message 
-            and logs the outcome (success or error).
+        str: The SHA-256 hex digest of the embed content.
     """
 
-    channel_id, message_id, lang = await get_status_message()
-    if not channel_id or not message_id or not lang:
+    data = embed.to_dict()
+    data.pop("timestamp", None)
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def register_status_message(message: discord.Message, lang: str, embed: discord.Embed):
+
+    """ Stores a newly sent status message and adds it to the boards kept up to date.
+
+    A board already registered for the same guild, channel and language is replaced.
+    Boards saved before multiple boards (without a guild) in the channels of the
+    guild are attached to it first, so the new board replaces the old one in the
+    same channel instead of both being kept up to date.
+
+    Args:
+        message (discord.Message): The status message that was just sent.
+        lang (str): The language of the status embed.
+        embed (discord.Embed): The embed the message was sent with.
+
+    Returns:
+        None
+    """
+
+    guild_id = message.guild.id if message.guild else None
+    if guild_id is not None:
+        await _attach_legacy_boards(message.guild, message.channel.id)
+    await save_status_message(message.channel.id, message.id, lang=lang, guild_id=guild_id)
+
+    key = (guild_id, message.channel.id, lang)
+    if _boards is not None:
+        _boards[key] = message.channel.get_partial_message(message.id)
+    _last_digests[key] = embed_digest(embed)
+
+
+async def _attach_legacy_boards(guild: discord.Guild, channel_id: int):
+    channel_ids = {
+        row["channel_id"] for row in await get_status_messages()
+        if row["guild_id"] is None and (row["channel_id"] == channel_id or guild.get_channel_or_thread(row["channel_id"]))
+    }
+    if not channel_ids:
         return
 
-    channel = bot.get_channel(channel_id)
-    if not channel:
+    await attach_status_messages(guild.id, sorted(channel_ids))
+    for key in [key for key in (_boards or {}) if key[0] is None and key[1] in channel_ids]:
+        new_key = (guild.id, *key[1:])
+        message, digest = _boards.pop(key), _last_digests.pop(key, None)
+        if new_key not in _boards:
+            _boards[new_key] = message
+            if digest is not None:
+                _last_digests[new_key] = digest
+    logging.info(f"📌 Status boards of channels {sorted(channel_ids)} attached to guild {guild.id}")
+
+
+async def _load_boards(bot: discord.Client) -> dict:
+    global _boards
+
+    if _boards is None:
+        # PartialMessages are enough to edit, no need to fetch the messages every time
+        _boards = {
+            (row["guild_id"], row["channel_id"], row["lang"]):
+                bot.get_partial_messageable(row["channel_id"]).get_partial_message(row["message_id"])
+            for row in await get_status_messages()
+            if row["channel_id"] and row["message_id"] and row["lang"]
+        }
+
+    return _boards
+
+
+def _next_transition(state: str, status: dict | None) -> datetime | None:
+    if not status:
+        return None
+    if state == "scheduled":
+        return status.get("maintenance_start")
+    if state == "active":
+        return status.get("maintenance_end")
+    return None
+
+
+def _schedule_transition(bot: discord.Client, state: str, status: dict | None):
+    global _transition_task, _transition_at
+
+    when = _next_transition(state, status)
+    if when == _transition_at and _transition_task and not _transition_task.done():
+        return
+
+    if _transition_task and not _transition_task.done():
+        _transition_task.cancel()
+    _transition_task = None
+    _transition_at = when
+
+    if when is None:
         return
 
-    try:
-        message = await channel.fetch_message(message_id)
-        embed = await build_status_embed(lang=lang)
-        await message.edit(embed=embed)
-        logging.debug("✅ Status embed updated")
-    except Exception as e:
-        logging.error(f"❌ Failed to update status embed: {e}")
+    async def wait_and_update():
+        global _transition_task, _transition_at
+
+        delay = (when - datetime.now(timezone.utc)).total_seconds()
+        await asyncio.sleep(max(delay, 0) + 1)
+        _transition_task = None
+        _transition_at = None
+        try:
+            await update_status_message(bot)
+        except Exception as e:
+            logging.exception(f"❌ Error updating status at maintenance transition: {e}")
+
+    _transition_task = asyncio.create_task(wait_and_update())
 
 
-async def check_maintenance(interaction: discord.Interaction, lang: str) -> bool:
+def _channel_bucket(channel_id: int) -> TokenBucket:
+    bucket = _channel_buckets.get(channel_id)
+    if bucket is None:
+        bucket = TokenBucket(STATUS_CHANNEL_EDITS_PER_SECOND, STATUS_CHANNEL_EDITS_BURST)
+        _channel_buckets[channel_id] = bucket
+    return bucket
+
+
+async def _edit_board(key: tuple, message: discord.PartialMessage, embed: discord.Embed, digest: str, semaphore: asyncio.Semaphore) -> bool:
+    async with semaphore:
+        # Edits in the same channel share Discord's per-channel rate limit
+        await _channel_bucket(message.channel.id).acquire()
+        try:
+            await message.edit(embed=embed)
+            _last_digests[key] = digest
+            return True
+        except discord.NotFound:
+            # Deleted message or channel: stop tracking the board
+            logging.warning(f"⚠️ Status message {message.id} not found, board removed")
+            _boards.pop(key, None)
+            _last_digests.pop(key, None)
+            await delete_status_message(message.channel.id, message.id)
+        except Exception as e:
+            logging.error(f"❌ Failed to update status embed {message.id}: {e}")
+        return False
+
+
+async def update_status_message(bot: discord.Client, force: bool = False) -> int:
+    
+    """ Refreshes every status board whose content has changed.
+
+    The boards are loaded from the database once and cached as PartialMessages, 
+    so no fetch is needed. The maintenance state is checked once, each language's 
+    embed is rendered once, and only the boards whose last digest differs are 
+    edited, concurrently under STATUS_FANOUT_CONCURRENCY and a per-channel token 
+    bucket. The next maintenance transition (start or end) is scheduled so the 
+    boards change right when the state does, not on the next timer tick.
+
+    Args:
+        bot (discord.Client): The bot instance used to edit the messages.
+        force (bool): Edit the messages even if the content did not change.
+
+    Returns:
+        int: The number of boards edited.
+    """
+
+    state, status = await update_maintenance_state_if_needed()
+    _schedule_transition(bot, state, status)
+
+    boards = await _load_boards(bot)
+    if not boards:
+        return 0
+
+    rendered: dict[str, tuple[discord.Embed, str]] = {}
+    for _, _, lang in boards:
+        if lang not in rendered:
+            embed = await build_status_embed(lang=lang, state=state, status=status)
+            rendered[lang] = (embed, embed_digest(embed))
+
+    semaphore = asyncio.Semaphore(STATUS_FANOUT_CONCURRENCY)
+    edits = [
+        _edit_board(key, message, *rendered[key[2]], semaphore)
+        for key, message in list(boards.items())
+        if force or _last_digests.get(key) != rendered[key[2]][1]
+    ]
+    if not edits:
+        return 0
+
+    edited = sum(await asyncio.gather(*edits))
+    logging.debug(f"✅ Status embeds updated: {edited}/{len(edits)}")
+    return edited
+
+
+def refresh_status_boards(bot: discord.Client) -> asyncio.Task:
+
+    """ Runs `update_status_message` in the background.
+
+    Editing every board can take longer than Discord's 3 s interaction deadline:
+    commands answer first and let the boards catch up.
+
+    Args:
+        bot (discord.Client): The bot instance used to edit the messages.
+
+    Returns:
+        asyncio.Task: The refresh task.
+    """
+
+    async def refresh():
+        try:
+            await update_status_message(bot)
+        except Exception as e:
+            logging.exception(f"❌ Error refreshing the status boards: {e}")
+
+    task = asyncio.create_task(refresh())
+    _refreshes.add(task)
+    task.add_done_callback(_refreshes.discard)
+    return task
+
+
+async def check_maintenance(interaction: discord.Interaction, lang: str | None = None) -> bool:
     
     """ Validates if the bot is currently available or restricted due to an active maintenance state.
 
@@ -145,6 +361,7 @@ async def check_maintenance(interaction: discord.Interaction, lang: str) -> bool
 
     Args:
         interaction (discord.Interaction): The interaction object used to send the notification if blocked.
+        lang (str, optional): The user's language; resolved only if the interaction is blocked.
 
     Returns:
         bool: True if the bot is operational and the command can proceed; 
@@ -157,6 +374,7 @@ async def check_maintenance(interaction: discord.Interaction, lang: str) -> bool
         return True
 
     msg = status.get("maintenance_message") or "🛠️ Bot in manutenzione"
+    lang = lang or await sessions.resolve_and_store_language(interaction) or "en"
     await interaction.response.send_message(
         
         t(lang=lang,
@@ -188,30 +406,24 @@ async def check_user_security(interaction: discord.Interaction) -> bool:
     if not interaction.guild:
         return True
 
-    member = interaction.user
-
-    uex_manager_role = discord.utils.get(member.roles, name="UEX Manager")
-    if uex_manager_role:
+    member = await resolve_member(interaction.guild, interaction.user)
+    if member is not None and await has_bot_role(member, MANAGER):
         logging.debug(f"Admin bypass: {member.name}")
         return True
 
-    lang = await sessions.resolve_and_store_language(interaction)
-    if not lang:
-        lang = "en"
-        logging.debug(f"Language not set for {member.name}, defaulting to English.")
-
-
-    if not await check_maintenance(interaction, lang):
+    # The language is only needed to explain a denial: resolve it on those paths only
+    if not await check_maintenance(interaction):
         return False
 
-    banned, reason = await ban.is_banned(member.id)
+    user = member or interaction.user
+    banned, reason = await ban.is_banned(user.id)
     if banned:
-        lang = await sessions.resolve_and_store_language(interaction)
+        lang = await sessions.resolve_and_store_language(interaction) or "en"
         await interaction.response.send_message(
             f"❌ {t(lang, 'access_denied_ban', reason=reason)}",
             ephemeral=True
         )
-        logging.debug(f"User {member.name} blocked: banned (reason={reason})")
+        logging.debug(f"User {user.name} blocked: banned (reason={reason})")
         return False
 
     return True
@@ -223,8 +435,9 @@ def start_status_task(bot: discord.Client):
 
     This function defines and starts an asynchronous loop that executes every 30 seconds. 
     During each cycle, it updates the internal maintenance state and refreshes the 
-    public status embed. It includes error handling to ensure that exceptions within 
-    individual cycles do not terminate the entire background process.
+    public status embed, which is only edited when its content changed. It includes 
+    error handling to ensure that exceptions within individual cycles do not terminate 
+    the entire background process. Calling it again while the loop runs has no effect.
 
     Args:
         bot (discord.Client): The bot instance required to perform message edits and 
@@ -234,13 +447,29 @@ def start_status_task(bot: discord.Client):
         None: The function starts the loop as a background process and returns immediately.
     """
 
+    global _status_loop
+
+    if _status_loop is not None and _status_loop.is_running():
+        return
+
     @tasks.loop(seconds=30)
     async def status_loop():
         try:
-            
-            await update_maintenance_state_if_needed()
             await update_status_message(bot)
         except Exception as e:
             logging.exception(f"❌ Error in status_loop: {e}")
 
-    status_loop.start()
\ No newline at end of file
+    _status_loop = status_loop
+    status_loop.start()
+
+
+def stop_status_task():
+
+    """ Stops the status synchronization loop, if running.
+
+    Returns:
+        None
+    """
+
+    if _status_loop is not None:
+        _status_loop.cancel()
@@ -0,0 +1,74 @@
+import time
+import asyncio
+import logging
+import discord
+from db.sessions import count_threads_by_parent
+from utils.roles_management import resolve_member
+from config import THREAD_PARENT_CHANNEL_IDS, THREAD_PLACEMENT_REFRESH
+
+
+# Open threads by parent channel: read from the database every THREAD_PLACEMENT_REFRESH
+# seconds, and counted in memory for the threads placed in between
+_load: dict[int, int] = {}
+_loaded_at: float | None = None
+_lock = asyncio.Lock()
+
+
+
+async def _refresh_load():
+    global _load, _loaded_at
+
+    if _loaded_at is not None and time.monotonic() - _loaded_at < THREAD_PLACEMENT_REFRESH:
+        return
+
+    try:
+        _load = await count_threads_by_parent(THREAD_PARENT_CHANNEL_IDS)
+        _loaded_at = time.monotonic()
+    except Exception as e:
+        # Keep placing with the last known load, the next placement retries
+        logging.error(f"❌ Unable to read the thread load of the parent channels: {e}")
+
+
+async def choose_parent_channel(
+    bot: discord.Client,
+    user: discord.abc.User,
+    fallback: discord.TextChannel
+) -> discord.TextChannel:
+
+    """ Chooses the channel where a user's private thread is created.
+
+    The threads are spread across the THREAD_PARENT_CHANNEL_IDS pool with a
+    least-loaded policy (open threads per channel), so thread creation and the
+    thread listings don't all hit the same channel. Channels of other guilds are
+    only chosen if the user is a member there, since private threads only accept
+    guild members.
+
+    Args:
+        bot (discord.Client): The bot instance.
+        user (discord.abc.User): The user the thread is for.
+        fallback (discord.TextChannel): The channel used when no pool is configured
+            or none of its channels is usable (usually the button's channel).
+
+    Returns:
+        discord.TextChannel: The parent channel of the new thread.
+    """
+
+    if not THREAD_PARENT_CHANNEL_IDS:
+        return fallback
+
+    async with _lock:
+        await _refresh_load()
+
+        candidates = [bot.get_channel(channel_id) for channel_id in THREAD_PARENT_CHANNEL_IDS]
+        candidates = [channel for channel in candidates if isinstance(channel, discord.TextChannel)]
+        candidates.sort(key=lambda channel: _load.get(channel.id, 0))
+
+        for channel in candidates:
+            if channel.guild != fallback.guild and await resolve_member(channel.guild, user) is None:
+                continue
+
+            _load[channel.id] = _load.get(channel.id, 0) + 1
+            return channel
+
+    logging.warning(f"⚠️ No usable parent channel for {user}, using channel {fallback.id}")
+    return fallback
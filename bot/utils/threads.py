@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import discord
+from discord.ext import tasks
+from collections import OrderedDict
+from utils.rate_limit import TokenBucket
+from datetime import datetime, timedelta, timezone
+from db.sessions import touch_threads, get_idle_threads, mark_threads_archived
+from db.counters import record_counter, THREADS_CACHE_HIT, THREADS_REST_FALLBACK, THREADS_ARCHIVED
+from config import (
+    THREAD_CACHE_SIZE,
+    THREAD_IDLE_HOURS,
+    THREAD_ARCHIVE_INTERVAL,
+    THREAD_ARCHIVE_BATCH_SIZE,
+    THREAD_ARCHIVE_PER_SECOND,
+    THREAD_ACTIVITY_FLUSH_INTERVAL,
+)
+
+
+# Thread objects by ID, least recently used first
+_threads: OrderedDict[int, discord.Thread] = OrderedDict()
+# REST lookups in progress, shared by every caller asking for the same thread
+_inflight: dict[int, asyncio.Task] = {}
+# Last activity by thread ID, written by the next `flush_thread_activity()`
+_touched: dict[int, datetime] = {}
+
+_archive_bucket = TokenBucket(THREAD_ARCHIVE_PER_SECOND, max(1, THREAD_ARCHIVE_PER_SECOND))
+_archive_loop = None
+
+
+
+def _remember(thread: discord.Thread):
+    _threads[thread.id] = thread
+    _threads.move_to_end(thread.id)
+    while len(_threads) > THREAD_CACHE_SIZE:
+        _threads.popitem(last=False)
+
+
+def forget_thread(thread_id: int):
+
+    """ Drops a thread from the cache, e.g. once it has been deleted.
+
+    Args:
+        thread_id (int): The thread ID.
+
+    Returns:
+        None
+    """
+
+    _threads.pop(int(thread_id), None)
+
+
+async def _fetch_thread(bot: discord.Client, thread_id: int) -> discord.Thread | None:
+    record_counter(THREADS_REST_FALLBACK)
+    try:
+        channel = await bot.fetch_channel(thread_id)
+    except discord.NotFound:
+        return None
+    return channel if isinstance(channel, discord.Thread) else None
+
+
+async def _fetch(bot: discord.Client, thread_id: int) -> discord.Thread | None:
+    task = _inflight.get(thread_id)
+    if task is None:
+        task = asyncio.create_task(_fetch_thread(bot, thread_id))
+        _inflight[thread_id] = task
+        task.add_done_callback(lambda _: _inflight.pop(thread_id, None))
+    # A cancelled caller must not cancel the lookup the others are waiting for
+    return await asyncio.shield(task)
+
+
+async def get_thread(bot: discord.Client, thread_id: int, unarchive: bool = True) -> discord.Thread | None:
+
+    """ Resolves a thread by ID, even when it is not in the gateway cache.
+
+    Archived threads leave the gateway cache, so the lookup goes through:
+    1. The gateway cache (`bot.get_channel`).
+    2. A bounded LRU cache of the thread objects already resolved (THREAD_CACHE_SIZE).
+    3. A REST `fetch_channel`, shared by concurrent callers asking for the same thread.
+    Cache hits and REST fallbacks are recorded in the bot counters. Resolving a thread 
+    to send to it (`unarchive=True`) counts as activity for the inactivity archiver.
+
+    Args:
+        bot (discord.Client): The bot instance.
+        thread_id (int): The thread ID.
+        unarchive (bool): Unarchive the thread if needed, so it can receive messages.
+
+    Returns:
+        discord.Thread | None: The thread, or None if it does not exist anymore.
+
+    Raises:
+        discord.HTTPException: If the REST lookup or the unarchive fails for another reason.
+    """
+
+    thread_id = int(thread_id)
+
+    thread = bot.get_channel(thread_id)
+    if isinstance(thread, discord.Thread):
+        record_counter(THREADS_CACHE_HIT)
+    else:
+        thread = _threads.get(thread_id)
+        if thread is not None:
+            record_counter(THREADS_CACHE_HIT)
+        else:
+            thread = await _fetch(bot, thread_id)
+            if thread is None:
+                forget_thread(thread_id)
+                return None
+
+    if unarchive:
+        touch_thread(thread_id)
+        if thread.archived and not thread.locked:
+            thread = await thread.edit(archived=False)
+            logging.debug("📂 Thread %s unarchived", thread_id)
+
+    _remember(thread)
+    return thread
+
+
+async def warm_thread_cache(bot: discord.Client) -> int:
+
+    """ Fills the thread cache with the active threads of every guild, one request per guild.
+
+    Args:
+        bot (discord.Client): The bot instance, connected to the gateway.
+
+    Returns:
+        int: The number of threads cached.
+    """
+
+    cached = 0
+    for guild in bot.guilds:
+        try:
+            threads = await guild.active_threads()
+        except discord.HTTPException as e:
+            logging.warning("⚠️ Unable to list the active threads of guild %s: %s", guild.id, e)
+            continue
+
+        for thread in threads[:THREAD_CACHE_SIZE]:
+            _remember(thread)
+        cached += min(len(threads), THREAD_CACHE_SIZE)
+
+    logging.info("🧵 Thread cache warmed with %d active threads", cached)
+    return cached
+
+
+def touch_thread(thread_id: int):
+
+    """ Records activity in a thread (a notification or a user message) without touching the database.
+
+    Args:
+        thread_id (int): The thread ID.
+
+    Returns:
+        None
+    """
+
+    _touched[int(thread_id)] = datetime.now(timezone.utc)
+
+
+async def flush_thread_activity() -> int:
+
+    """ Writes the buffered thread activity to the database in one statement.
+
+    On failure the activity is buffered again for the next flush.
+
+    Returns:
+        int: The number of threads written.
+    """
+
+    global _touched
+
+    if not _touched:
+        return 0
+
+    activity, _touched = _touched, {}
+    try:
+        await touch_threads(activity)
+    except BaseException as e:
+        for thread_id, at in activity.items():
+            _touched[thread_id] = max(at, _touched.get(thread_id, at))
+        if not isinstance(e, Exception):
+            raise
+        logging.error("❌ Unable to write the thread activity: %s", e)
+        return 0
+    return len(activity)
+
+
+async def archive_idle_threads(bot: discord.Client) -> int:
+
+    """ Archives the threads idle for more than THREAD_IDLE_HOURS.
+
+    Keeps the number of active threads per guild under the Discord limit, so new 
+    users can still get a thread. Threads are read from the database in batches of 
+    THREAD_ARCHIVE_BATCH_SIZE, the oldest first, and archived at most 
+    THREAD_ARCHIVE_PER_SECOND per second. An archived thread is reopened by 
+    `get_thread` on its next notification.
+
+    Args:
+        bot (discord.Client): The bot instance.
+
+    Returns:
+        int: The number of threads archived.
+    """
+
+    await flush_thread_activity()
+    idle_since = datetime.now(timezone.utc) - timedelta(hours=THREAD_IDLE_HOURS)
+
+    archived = 0
+    while True:
+        thread_ids = await get_idle_threads(idle_since, THREAD_ARCHIVE_BATCH_SIZE)
+
+        done = []
+        for thread_id in thread_ids:
+            if thread_id in _touched:
+                # Active again since the last flush
+                continue
+            try:
+                thread = await get_thread(bot, thread_id, unarchive=False)
+                if thread is not None and not thread.archived:
+                    await _archive_bucket.acquire()
+                    await thread.edit(archived=True)
+                    archived += 1
+                done.append(thread_id)
+            except discord.HTTPException as e:
+                logging.warning("⚠️ Unable to archive thread %s: %s", thread_id, e)
+
+        await mark_threads_archived(done)
+        if len(thread_ids) < THREAD_ARCHIVE_BATCH_SIZE or not done:
+            break
+
+    if archived:
+        record_counter(THREADS_ARCHIVED, archived)
+        logging.info("🗄️ Archived %d idle threads", archived)
+    return archived
+
+
+@tasks.loop(seconds=THREAD_ACTIVITY_FLUSH_INTERVAL)
+async def thread_activity_flush_loop():
+    await flush_thread_activity()
+
+
+def start_thread_tasks(bot: discord.Client):
+
+    """ Starts the background loops that write the thread activity and archive the idle threads.
+
+    Calling it again while the loops are running has no effect.
+
+    Args:
+        bot (discord.Client): The bot instance.
+
+    Returns:
+        None
+    """
+
+    global _archive_loop
+
+    if not thread_activity_flush_loop.is_running():
+        thread_activity_flush_loop.start()
+
+    if _archive_loop is not None and _archive_loop.is_running():
+        return
+
+    @tasks.loop(seconds=THREAD_ARCHIVE_INTERVAL)
+    async def archive_loop():
+        await bot.wait_until_ready()
+        try:
+            await archive_idle_threads(bot)
+        except Exception as e:
+            logging.exception("❌ Error in thread archive loop: %s", e)
+
+    _archive_loop = archive_loop
+    archive_loop.start()
+
+
+async def stop_thread_tasks() -> int:
+
+    """ Stops the thread background loops and writes the buffered thread activity.
+
+    Returns:
+        int: The number of threads written.
+    """
+
+    thread_activity_flush_loop.cancel()
+    if _archive_loop is not None:
+        _archive_loop.cancel()
+    return await flush_thread_activity()
@@ -0,0 +1,301 @@
+import json
+import time
+import random
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+
+OK = "OK"
+ERROR = "ERROR"
+MAX_SPANS = 500  # per trace: a runaway loop must not grow a trace forever
+
+_current: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("trace_span", default=None)
+
+
+
+class Span:
+
+    """
+    A timed operation of a trace, with the fields of an OpenTelemetry span.
+
+    IDs follow the W3C Trace Context format (32 and 16 hex digits), so traces can be
+    continued from a `traceparent` header and exported as-is.
+    """
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "status", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: str | None, attributes: dict):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.status = OK
+        self.error = ""
+
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+
+    def set_error(self, error: str):
+        self.status, self.error = ERROR, error[:200]
+
+
+    def to_dict(self) -> dict:
+
+        """
+        Returns the span in the OTLP JSON layout.
+
+        Returns:
+            dict: traceId, spanId, parentSpanId, name, start/end times, attributes and status.
+        """
+
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.error},
+        }
+
+
+class Trace:
+
+    """
+    The spans of one request. Spans of tasks started by the request (e.g. an outbox
+    delivery) keep joining the trace after its root span ended.
+    """
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str | None = None):
+        self.trace_id = trace_id or f"{random.getrandbits(128):032x}"
+        self.spans: list[Span] = []
+
+
+    @property
+    def root(self) -> Span:
+        return self.spans[0]
+
+
+    @property
+    def duration_ms(self) -> float:
+        root = self.root
+        end = max((span.end_ns or root.start_ns) for span in self.spans)
+        return (end - root.start_ns) / 1e6
+
+
+    def format(self) -> str:
+
+        """
+        Renders the trace as an indented tree: offset from the start, duration and name of every span.
+
+        Returns:
+            str: One line per span.
+        """
+
+        root = self.root
+        children: dict[str | None, list[Span]] = {}
+        for span in self.spans[1:]:
+            children.setdefault(span.parent_id, []).append(span)
+
+        lines = []
+
+        def walk(span: Span, depth: int):
+            offset = (span.start_ns - root.start_ns) / 1e6
+            status = "" if span.status == OK else f" ❌ {span.error}"
+            target = span.attributes.get("db.statement") or span.attributes.get("target") or ""
+            target = f" {target[:60]}" if target else ""
+            lines.append(f"{offset:>7.0f} {span.duration_ms:>7.0f} ms {'  ' * depth}{span.name}{target}{status}")
+            for child in children.get(span.span_id, []):
+                walk(child, depth + 1)
+
+        walk(root, 0)
+        return "\n".join(lines)
+
+
+class Tracer:
+
+    """
+    Records spans in memory and, optionally, as JSON lines in a file.
+
+    Finished traces go to a ring buffer of `capacity` entries, queried by
+    `slowest()`. With `path`, every finished span is also written (OTLP JSON, one
+    span per line) to a rotating file like the log, by a background thread, so
+    the event loop never writes the file.
+
+    Attributes:
+        capacity (int): Maximum number of traces kept in memory.
+    """
+
+
+    def __init__(self, capacity: int = 2000, path: str | None = None):
+        self.capacity = capacity
+        self._traces: deque[Trace] = deque(maxlen=capacity)
+        self._export = _file_exporter(path) if path else None
+
+
+    def start(self, name: str, attributes: dict, root: bool, traceparent: str | None) -> Span | None:
+        parent = _current.get()
+        if parent is not None:
+            if len(parent.trace.spans) >= MAX_SPANS:
+                return None
+            span = Span(parent.trace, name, parent.span_id, attributes)
+        elif root:
+            trace_id, parent_id = _parse_traceparent(traceparent)
+            span = Span(Trace(trace_id), name, parent_id, attributes)
+            self._traces.append(span.trace)
+        else:
+            return None
+
+        span.trace.spans.append(span)
+        return span
+
+
+    def end(self, span: Span):
+        span.end_ns = time.time_ns()
+        if self._export is not None:
+            self._export(span)
+
+
+    def close(self):
+
+        """
+        Writes out the spans waiting to be exported and closes the file.
+
+        Returns:
+            None
+        """
+
+        if self._export is not None:
+            export, self._export = self._export, None
+            export.listener.stop()
+            for handler in export.listener.handlers:
+                handler.close()
+
+
+    def slowest(self, count: int = 10, since: float = 3600) -> list[Trace]:
+
+        """
+        Returns the slowest traces started in the last `since` seconds.
+
+        Args:
+            count (int): Maximum number of traces.
+            since (float): Age limit in seconds.
+
+        Returns:
+            list[Trace]: The traces, slowest first.
+        """
+
+        oldest = time.time_ns() - int(since * 1e9)
+        recent = [trace for trace in list(self._traces) if trace.root.start_ns >= oldest]
+        recent.sort(key=lambda trace: trace.duration_ms, reverse=True)
+        return recent[:count]
+
+
+def _parse_traceparent(header: str | None) -> tuple[str | None, str | None]:
+    # version-traceid-parentid-flags, e.g. 00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None, None
+    return parts[1], parts[2]
+
+
+def _file_exporter(path: str):
+    import queue
+    import logging.handlers
+    from logger import RotatingLogFileHandler
+
+    class SpanFormatter(logging.Formatter):
+        def format(self, record):
+            return json.dumps(record.msg.to_dict(), ensure_ascii=False, default=str)
+
+    handler = RotatingLogFileHandler(path)
+    handler.setFormatter(SpanFormatter())
+    spans = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(spans, handler)
+    listener.start()
+
+    def export(span: Span):
+        spans.put_nowait(logging.makeLogRecord({"msg": span, "levelno": logging.INFO}))
+
+    export.listener = listener
+    return export
+
+
+_tracer: Tracer | None = None
+
+
+def get_tracer() -> Tracer:
+
+    """
+    Returns the process-wide tracer, creating it on first use (TRACE_BUFFER_SIZE, TRACE_FILE).
+
+    Returns:
+        Tracer: The shared tracer.
+    """
+
+    global _tracer
+    if _tracer is None:
+        from config import TRACE_BUFFER_SIZE, TRACE_FILE
+        _tracer = Tracer(TRACE_BUFFER_SIZE, TRACE_FILE or None)
+    return _tracer
+
+
+@contextmanager
+def span(name: str, *, root: bool = False, traceparent: str | None = None, **attributes):
+
+    """
+    Times the block as a span of the current trace.
+
+    Outside of a trace the block is not recorded, unless `root` is set: it then
+    starts a new trace (continuing the one of `traceparent`, if valid). The span is
+    the current one inside the block and in the tasks it starts, and is marked as
+    failed if the block raises.
+
+    Args:
+        name (str): The span name, e.g. "webhook" or "discord.send".
+        root (bool): Starts a trace if there is none.
+        traceparent (str | None): A W3C `traceparent` header to continue.
+        **attributes: The span attributes.
+
+    Returns:
+        ContextManager[Span | None]: The span, None if not recorded.
+    """
+
+    tracer = get_tracer()
+    current = tracer.start(name, attributes, root, traceparent)
+    if current is None:
+        yield None
+        return
+
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current.reset(token)
+        tracer.end(current)
+
+
+def current_span() -> Span | None:
+    return _current.get()
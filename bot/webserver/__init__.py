@@ -1,6 +1,7 @@
 from .server import start_aiohttp_server, handle_health,handle_webhook
 from .handlers import handle_webhook_unificato
 from .session_http import init_http, get_http_session, close_http
+from .health import deep_health
 
 __all__ = [
     "start_aiohttp_server",
@@ -10,4 +11,5 @@ __all__ = [
     "init_http",
     "get_http_session",
     "close_http",
+    "deep_health",
 ]
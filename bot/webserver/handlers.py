@@ -1,4 +1,5 @@
 import json
+import hashlib
 import logging
 import discord
 from utils.i18n import t
@@ -6,10 +7,18 @@ from db.sessions import *
 from db.negotiations import *
 from discord_bot.bot import bot
 from services.notifications import *
-import discord_bot.events as events
+from utils.threads import get_thread
 from utils.text_cleaner import clean_text
-from services.uex_api import send_uex_message
-from webserver.session_http import get_http_session
+from utils.log import log_context
+from utils.tracing import span
+from services.uex_outbox import get_uex_outbox
+from db.uex_events import claim_event, release_event
+from db.counters import record_counter, EVENTS_DUPLICATE
+from discord_bot.receipts import delivery_receipt, set_delivery_status
+
+
+WEBHOOK = "webhook"
+RECONCILER = "reconciler"
 
 
 async def handle_webhook_unificato(request, event_type: str, user_id: str):
@@ -29,12 +38,105 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
     try:
         body = await request.text()
         data = json.loads(body) if body else {}
-        
+    except Exception as e:
+        logging.exception("💥 Unified webhook_handle error: %s", e)
+        return {"status": 500, "text": f"internal error: {e}"}
+
+    return await process_event(event_type, user_id, data, source=WEBHOOK)
+
+
+def event_key(event_type: str, user_id: str, data: dict) -> str:
+
+    """
+    Fingerprints a UEX event, identically whether it came by webhook or by polling.
+
+    Only the webhook payload fields are used: the reconciler strips the notification
+    envelope (id, type, date) before handing the event over, so both paths compute
+    the same key. The webhook payload carries no event id, so the same message sent
+    twice in a negotiation shares a key: the reconciler does not replay the second
+    one if the webhook delivered the first.
+
+    Args:
+        event_type (str): The type of event.
+        user_id (str): The Discord user ID the event was delivered for.
+        data (dict): The event payload.
+
+    Returns:
+        str: The event fingerprint.
+    """
+
+    parts = [
+        event_type,
+        str(user_id),
+        data.get("negotiation_hash") or "",
+        data.get("client_username") or "",
+        data.get("message") or "",
+    ]
+    return hashlib.sha256("\x1f".join(map(str, parts)).encode()).hexdigest()
+
+
+async def process_event(event_type: str, user_id: str, data: dict, source: str = WEBHOOK) -> dict:
+
+    """
+    Delivers a UEX event to Discord, at most once across the webhook and the reconciler.
+
+    Every event is recorded. A webhook repeated by UEX is delivered again, as it always
+    was, but an event delivered by one path is skipped by the other. A delivery that
+    fails with an internal error is forgotten, so the reconciler can retry it.
+
+    Args:
+        event_type (str): The type of event (e.g., 'negotiation_started', 'user_reply').
+        user_id (str): The Discord user ID the event belongs to.
+        data (dict): The event payload.
+        source (str): WEBHOOK or RECONCILER.
+
+    Returns:
+        dict: A dictionary containing the 'status' (HTTP code) and a 'text' message describing the outcome.
+    """
+
+    # Webhooks arrive inside the trace of their request, reconciled events start their own
+    with span(
+        f"event {event_type}",
+        root=True,
+        source=source,
+        negotiation_hash=data.get("negotiation_hash") or "",
+    ), log_context(
+        event_type=event_type,
+        user_id=str(user_id),
+        negotiation_hash=data.get("negotiation_hash"),
+        source=source,
+    ):
+        key = event_key(event_type, user_id, data)
+        try:
+            earlier = await claim_event(key, user_id, source)
+        except Exception as e:
+            logging.error("❌ Unable to record the event: %s", e)
+            if source != WEBHOOK:
+                return {"status": 503, "text": "event log unavailable"}
+            earlier = None
+
+        if earlier is not None and RECONCILER in (earlier, source):
+            record_counter(EVENTS_DUPLICATE)
+            logging.debug("Event already delivered by %s", earlier)
+            return {"status": 200, "text": "Event already processed", "duplicate": True}
+
+        result = await _dispatch_event(event_type, user_id, data)
+
+        if result["status"] >= 500 and earlier is None:
+            try:
+                await release_event(key)
+            except Exception as e:
+                logging.error("❌ Unable to release the event: %s", e)
+        return result
+
+
+async def _dispatch_event(event_type: str, user_id: str, data: dict) -> dict:
+    try:
         lang = await get_user_language(user_id)
         
         if event_type == "negotiation_started":
             
-            logging.debug(f"Processing 'negotiation_started' for user_id={user_id} with data: {data}")
+            logging.debug("Processing 'negotiation_started' with data: %s", data)
             
             seller = data.get("listing_owner_username")
             buyer = data.get("client_username")
@@ -49,18 +151,18 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
 # ------- Retrieve user thread -------
             thread_id = await get_user_thread_id(str(user_id))
             if not thread_id:
-                logging.warning(f"⚠️ No thread found for User: {seller}")
+                logging.warning("⚠️ No thread found for User: %s", seller)
                 return {"status": 404, "text": "User_thread_id not found"}
             
-            logging.debug(f"Retrieved thread_id={thread_id} for user_id={user_id}")
+            logging.debug("Retrieved thread_id=%s", thread_id)
             
 # ------- Retrieve Thread Seller -------
-            thread = bot.get_channel( thread_id )
+            thread = await get_thread(bot, thread_id)
             if not thread:
-                logging.warning(f"⚠️ No thread found for Seller: {seller}")
+                logging.warning("⚠️ No thread found for Seller: %s", seller)
                 return {"status": 404, "text": "thread not found"}
             
-            logging.debug(f"Retrieved thread channel for sellerthread_id={thread_id}")
+            logging.debug("Retrieved thread channel for seller thread_id=%s", thread_id)
             
 # ------- Notification to Seller of a New Deal -------
             embed = discord.Embed(
@@ -87,46 +189,48 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
             ## TODO controllare questo punto
             
             embed.set_footer(text=t(lang, "add_footer"))
-            await thread.send(embed=embed)
+            with span("discord.send", target=f"thread {thread.id}"):
+                await thread.send(embed=embed)
             
-            logging.debug(f"Notification sent to thread_id={thread_id} for new negotiation started.")
+            logging.debug("Notification sent to thread_id=%s for new negotiation started.", thread_id)
             
 
             enabled, message = await get_user_welcome_message(user_id)
             
-            logging.debug(f"Welcome message status: {enabled}, message: {message}")
+            logging.debug("Welcome message status: %s, message: %s", enabled, message)
                  
             if enabled and message:
                 
-                logging.debug(f"Preparing to send welcome message to user_id={user_id}")
+                logging.debug("Preparing to send welcome message")
                 
                 bearer, key = await get_user_keys(user_id)
                 
-                logging.debug(f"Retrieved API keys for user_id={user_id}")
+                logging.debug("Retrieved API keys")
+                
+                embed=discord.Embed(
+                        title=t(lang, "embed.welcome.title"),
+                        description=message,
+                        color=discord.Color.purple()
+                    )
+                set_delivery_status(embed, lang, "pending")
+                embed.set_footer(text=t(lang, "embed.footer"))
+                with span("discord.send", target=f"thread {thread.id}"):
+                    receipt = await thread.send(embed=embed)
                 
-                ok, error = await send_uex_message(
-                        session= get_http_session(),
+                queued = get_uex_outbox().submit(
+                        user_id=user_id,
                         bearer_token=bearer,
                         secret_key=key,
                         notif_hash=hash,
-                        message=message
+                        message=message,
+                        on_status=delivery_receipt(receipt, embed, lang)
                     )
                             
-                if ok:
-                    
-                    
-                    embed=discord.Embed(
-                            title=t(lang, "embed.welcome.title"),
-                            description=message,
-                            color=discord.Color.purple()
-                        )
-                    embed.set_footer(text=t(lang, "embed.footer"))
-                    await thread.send(embed=embed)            
-                    
-                    logging.debug(f"Welcome message sent successfully for user_id={user_id}")
-                
+                if queued:
+                    logging.debug("Welcome message queued")
                 else:
-                    logging.warning(f"⚠️ error sending welcome message for user_id={user_id}: {error}")
+                    await delivery_receipt(receipt, embed, lang)("failed", t(lang, "errors.uex_queue_full"))
+                    logging.warning("⚠️ error queuing welcome message: outbox full")
             else:
                 logging.error("he does not have the consent to send the message or the message is missing")
             
@@ -143,7 +247,7 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
                 return {"status": 404, "text": "negotiation link not found"}
             
             if user == None:
-                logging.warning(f"Invalid Username")
+                logging.warning("Invalid Username")
                 return {"status": 404, "text": "Invalid Username"}
             
             
@@ -154,20 +258,20 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
                 
                 session_buyer = await find_session_by_username(buyer_username)
                 if not session_buyer:
-                    logging.warning(f"⚠️ Buyer_Session not found")
+                    logging.warning("⚠️ Buyer_Session not found")
                     return {"status": 404, "text": "Buyer_Sessions not found"}
                 
                 
                 buyer_thread_id = session_buyer.get("thread_id")
                 if not buyer_thread_id: 
-                    logging.warning(f"⚠️ Buyer_Thread_Id not found")
+                    logging.warning("⚠️ Buyer_Thread_Id not found")
                     return {"status": 404, "text": "Buyer_thread_id not found"}
                 
                 
 # -------- Retrieve Thread Buyer ----------
-                thread = bot.get_channel( buyer_thread_id )
+                thread = await get_thread(bot, buyer_thread_id)
                 if not thread:
-                    logging.warning(f"⚠️ Thread not found for seller: {seller}")
+                    logging.warning("⚠️ Thread not found for seller: %s", seller)
                     return {"status": 404, "text": "thread not found"}
                 
                 
@@ -185,7 +289,8 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
                     color=discord.Color.gold()
                 )
                 embed.set_footer(text=t(lang, "embed.footer"))
-                await thread.send(embed=embed)
+                with span("discord.send", target=f"thread {thread.id}"):
+                    await thread.send(embed=embed)
 
             
             
@@ -194,13 +299,13 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
 # -------- Recover user session --------
                 thread_id = await get_user_thread_id(str(user_id))
                 if not thread_id:
-                    logging.warning(f"⚠️No Thread_id Found for Seller: {seller}")
+                    logging.warning("⚠️ No Thread_id Found for Seller: %s", seller)
                     return {"status": 404, "text": "Seller_thread_id not found"}
                 
 # -------- Recover Thread Seller --------
-                thread = bot.get_channel( thread_id )
+                thread = await get_thread(bot, thread_id)
                 if not thread:
-                    logging.warning(f"⚠️ Thread not found for Seller: {seller}")
+                    logging.warning("⚠️ Thread not found for Seller: %s", seller)
                     return {"status": 404, "text": "thread not found"}
                 
                 
@@ -217,10 +322,11 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
                     color=discord.Color.gold()
                 )
                 embed.set_footer(text=t(lang, "embed.footer"))
-                await thread.send(embed=embed)
+                with span("discord.send", target=f"thread {thread.id}"):
+                    await thread.send(embed=embed)
                 
             else:
-                logging.warning(f"⚠️ Username '{user}' does not match either the buyer or the seller for hash={hash}")
+                logging.warning("⚠️ Username '%s' does not match either the buyer or the seller", user)
                 return {"status": 400, "text": "Unknown message source"}
             
             
@@ -232,13 +338,13 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
 # -------- Recover user session --------
             thread_id = await get_user_thread_id(str(user_id))
             if not thread_id:
-                logging.warning(f"⚠️ No Thread_id Found for Seller: {seller}")
+                logging.warning("⚠️ No Thread_id Found for Seller: %s", seller)
                 return {"status": 404, "text": "Seller_thread_id not found"}
             
 # -------- Recover Thread Seller --------
-            thread = bot.get_channel( thread_id )
+            thread = await get_thread(bot, thread_id)
             if not thread:
-                logging.warning(f"⚠️ Thread not found for Seller: {seller}")
+                logging.warning("⚠️ Thread not found for Seller: %s", seller)
                 return {"status": 404, "text": "thread not found"}
         
             await delete_negotiation_link(hash)
@@ -257,7 +363,8 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
                 color=discord.Color.red()
             )
             embed.set_footer(text=t(lang, "embed.footer"))
-            await thread.send(embed=embed)
+            with span("discord.send", target=f"thread {thread.id}"):
+                await thread.send(embed=embed)
             
         
         
@@ -266,13 +373,13 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
 # -------- Recover user session --------
             thread_id = await get_user_thread_id(str(user_id))
             if not thread_id:
-                logging.warning(f"⚠️ No Thread_id Found for Seller: {seller}")
+                logging.warning("⚠️ No Thread_id Found for Seller: %s", seller)
                 return {"status": 404, "text": "Seller_thread_id not found"}
             
 # -------- Recover Thread Seller --------
-            thread = bot.get_channel( thread_id )
+            thread = await get_thread(bot, thread_id)
             if not thread:
-                logging.warning(f"⚠️ Thread not found for Seller: {seller}")
+                logging.warning("⚠️ Thread not found for Seller: %s", seller)
                 return {"status": 404, "text": "thread not found"}
             
 # -------- Notice to Seller Error --------
@@ -282,12 +389,14 @@ async def handle_webhook_unificato(request, event_type: str, user_id: str):
             )
             embed.title = f"ℹ️ Evento: {event_type}"
             embed.description = json.dumps(data, indent=2)
-            await thread.send(embed=embed)
+            with span("discord.send", target=f"thread {thread.id}"):
+                await thread.send(embed=embed)
 
-        logging.info(f"✅ Webhook successfully processed for event='{event_type}' → user_id={user_id}")
+        # The webhook server logs every request: this line would double it at INFO level
+        logging.debug("✅ Event successfully processed")
         return {"status": 200, "text": "Webhook processed"}
 
     except Exception as e:
-        logging.exception(f"💥 Unified webhook_handle error: {e}")
+        logging.exception("💥 Unified webhook_handle error: %s", e)
         return {"status": 500, "text": f"internal error: {e}"}
 
@@ -0,0 +1,166 @@
+import math
+import time
+import asyncio
+from collections import deque
+from discord.ext import tasks
+import db.pool as pool
+from discord_bot.bot import bot
+from services.uex_client import get_uex_client, CircuitBreaker
+from webserver.session_http import is_http_open
+from config import HEALTH_CACHE_TTL, HEALTH_PROBE_TIMEOUT, HEALTH_LOOP_LAG_INTERVAL, HEALTH_MAX_LOOP_LAG
+
+
+OK = "ok"
+DEGRADED = "degraded"
+DOWN = "down"
+
+_last_webhook: float | None = None
+_lags: deque[float] = deque(maxlen=60)
+_next_tick: float | None = None
+_cache: tuple[float, dict] | None = None
+_probing: asyncio.Future | None = None
+
+
+
+def mark_webhook_processed():
+
+    """
+    Records that a webhook has just been processed successfully.
+
+    Returns:
+        None
+    """
+
+    global _last_webhook
+    _last_webhook = time.monotonic()
+
+
+@tasks.loop(seconds=HEALTH_LOOP_LAG_INTERVAL)
+async def loop_lag_monitor():
+    # How late this iteration started compared to when it was due
+    global _next_tick
+    now = time.monotonic()
+    if _next_tick is not None:
+        _lags.append(max(0.0, now - _next_tick))
+    _next_tick = now + HEALTH_LOOP_LAG_INTERVAL
+
+
+def start_loop_lag_monitor():
+
+    """
+    Starts the background loop measuring the event-loop lag reported by the deep health check.
+
+    Calling it again while the loop is running has no effect.
+
+    Returns:
+        None
+    """
+
+    if not loop_lag_monitor.is_running():
+        loop_lag_monitor.start()
+
+
+async def _probe_db() -> dict:
+    if pool.db_pool is None:
+        return {"status": DOWN, "error": "not initialized"}
+
+    db_pool = pool.db_pool
+    result = {
+        "size": db_pool.get_size(),
+        "idle": db_pool.get_idle_size(),
+        "max_size": db_pool.get_max_size(),
+    }
+    start = time.perf_counter()
+    try:
+        # Bounds the wait for a free connection too: an exhausted pool is reported, not waited on
+        await asyncio.wait_for(db_pool.fetchval("SELECT 1"), HEALTH_PROBE_TIMEOUT)
+    except asyncio.TimeoutError:
+        return {"status": DOWN, "error": f"no answer within {HEALTH_PROBE_TIMEOUT:g} s", **result}
+    except Exception as e:
+        return {"status": DOWN, "error": str(e) or type(e).__name__, **result}
+    return {"status": OK, "latency_ms": round((time.perf_counter() - start) * 1000, 2), **result}
+
+
+def _probe_discord() -> dict:
+    if not bot.is_ready() or bot.is_closed():
+        return {"status": DOWN, "ready": bot.is_ready(), "closed": bot.is_closed()}
+
+    # bot.latency is not finite until the first heartbeat is acknowledged
+    latency = bot.latency
+    return {
+        "status": OK,
+        "ready": True,
+        "latency_ms": round(latency * 1000, 2) if math.isfinite(latency) else None,
+    }
+
+
+def _probe_http() -> dict:
+    session_open = is_http_open()
+    breaker = get_uex_client().breaker.state
+    degraded = not session_open or breaker != CircuitBreaker.CLOSED
+    return {
+        "status": DEGRADED if degraded else OK,
+        "session": "open" if session_open else "closed",
+        "uex_breaker": breaker,
+    }
+
+
+def _probe_loop() -> dict:
+    if not _lags:
+        return {"status": OK, "lag_ms": None, "max_lag_ms": None}
+    worst = max(_lags)
+    return {
+        "status": DEGRADED if worst > HEALTH_MAX_LOOP_LAG else OK,
+        "lag_ms": round(_lags[-1] * 1000, 2),
+        "max_lag_ms": round(worst * 1000, 2),
+    }
+
+
+def _probe_webhooks() -> dict:
+    age = None if _last_webhook is None else round(time.monotonic() - _last_webhook, 1)
+    return {"status": OK, "last_processed_age_s": age}
+
+
+async def deep_health() -> dict:
+
+    """
+    Probes the bot dependencies: DB pool and `SELECT 1` latency, Discord gateway,
+    HTTP sessions and UEX circuit breaker, event-loop lag, last processed webhook.
+
+    The result is cached for HEALTH_CACHE_TTL seconds and concurrent callers share
+    a single probe, so frequent polling costs at most one `SELECT 1` per TTL.
+    The overall status is the worst of the checks: "down" when the database or
+    the Discord gateway is unavailable, "degraded" for a closed HTTP session, an
+    open UEX circuit or an event loop lagging more than HEALTH_MAX_LOOP_LAG.
+
+    Returns:
+        dict: The overall "status", "checked_at" (Unix time) and one entry per check.
+    """
+
+    global _probing
+
+    if _cache is not None and time.monotonic() - _cache[0] < HEALTH_CACHE_TTL:
+        return _cache[1]
+
+    if _probing is None or _probing.done():
+        _probing = asyncio.ensure_future(_probe_all())
+    # A caller giving up (e.g. client disconnect) must not cancel the shared probe
+    return await asyncio.shield(_probing)
+
+
+async def _probe_all() -> dict:
+    global _cache
+
+    checks = {
+        "database": await _probe_db(),
+        "discord": _probe_discord(),
+        "http": _probe_http(),
+        "event_loop": _probe_loop(),
+        "webhooks": _probe_webhooks(),
+    }
+    states = {check["status"] for check in checks.values()}
+    status = DOWN if DOWN in states else DEGRADED if DEGRADED in states else OK
+
+    report = {"status": status, "checked_at": round(time.time(), 3), **checks}
+    _cache = (time.monotonic(), report)
+    return report
@@ -1,11 +1,22 @@
+import asyncio
 import logging
 from aiohttp import web
 from utils.i18n import t
-from config import PORT, SYSTEM_LANGUAGE
-from utils.ports import kill_process_on_port
+from config import PORT, SYSTEM_LANGUAGE, WEBHOOK_DEADLINE
+from utils.ports import bind_port
+from db.counters import record_counter, webhook_counter
+from discord_bot.bot import bot
 from webserver.handlers import handle_webhook_unificato
+from services.uex_client import uex_deadline
+from webserver.health import DOWN, deep_health, mark_webhook_processed, start_loop_lag_monitor
+from utils.log import log_context, lazy_t
+from utils.tracing import span
 
 
+_runner: web.AppRunner | None = None
+_closing = False
+_in_flight: set[asyncio.Task] = set()
+
 
 
 async def handle_webhook(request):
@@ -24,38 +35,76 @@ async def handle_webhook(request):
         aiohttp.web.Response: HTTP response with the status and result message.
     """
     
+    # Webhooks may arrive before the gateway is ready: let UEX retry them later
+    if not bot.is_ready():
+        return web.Response(status=503, text="Bot starting", headers={"Retry-After": "5"})
+
+    # During a shutdown too: the restarted bot gets the webhook instead of losing it
+    if _closing:
+        return web.Response(status=503, text="Bot shutting down", headers={"Retry-After": "10"})
+
+    task = asyncio.current_task()
+    _in_flight.add(task)
     try:
         
         event_type = request.match_info["event_type"]
         user_id = request.match_info["user_id"]
-        result = await handle_webhook_unificato(request, event_type, user_id)
-        logging.info(
-            t(SYSTEM_LANGUAGE, 
-                "server.webhook_request",
-                user_id=user_id,
-                event=event_type
+        # UEX calls made while handling the webhook share its time budget; the
+        # trace id, continued from a `traceparent` header if any, is the request id
+        with span(
+            "webhook",
+            root=True,
+            traceparent=request.headers.get("traceparent"),
+            event_type=event_type,
+            user_id=user_id,
+        ) as trace_span, log_context(request_id=trace_span.trace.trace_id), uex_deadline(WEBHOOK_DEADLINE):
+            result = await handle_webhook_unificato(request, event_type, user_id)
+            trace_span.set_attribute("http.status_code", result["status"])
+            if result["status"] == 200:
+                record_counter(webhook_counter(event_type))
+                mark_webhook_processed()
+            logging.info(
+                "%s",
+                lazy_t(SYSTEM_LANGUAGE, 
+                    "server.webhook_request",
+                    user_id=user_id,
+                    event=event_type
+                )
             )
-        )
         return web.Response(status=result["status"], text=result["text"])
     
     except Exception as e:
     
         logging.exception(
-            t(SYSTEM_LANGUAGE, "server.webhook_error",error=e)
+            "%s", lazy_t(SYSTEM_LANGUAGE, "server.webhook_error", error=e)
         )
         return web.Response(status=500, text=f"Error: {e}")
 
+    finally:
+        _in_flight.discard(task)
+
 
 async def handle_health(request):
     
     """
-    Simple health check endpoint to verify if the server is reachable.
+    Health check endpoint.
+
+    `/health` only tells the server is reachable. `/health?deep=1` also probes the
+    dependencies (see `webserver.health.deep_health`, cached for a few seconds) and
+    answers 503 when the bot cannot serve webhooks.
+
+    Args:
+        request (aiohttp.web.Request): The incoming HTTP request.
 
     Returns:
-        aiohttp.web.Response: A 200 OK response with 'online' text.
+        aiohttp.web.Response: 'online' text, or the deep health report as JSON.
     """
     
-    return web.Response(status=200, text=f"online")
+    if request.query.get("deep") not in ("1", "true"):
+        return web.Response(status=200, text=f"online")
+
+    report = await deep_health()
+    return web.json_response(report, status=503 if report["status"] == DOWN else 200)
 
 
 async def start_aiohttp_server():
@@ -65,14 +114,21 @@ async def start_aiohttp_server():
 
     This function performs the following setup:
     1. Configures routes for dynamic webhooks and health checks.
-    2. Ensures the target PORT is available by terminating conflicting processes.
-    3. Binds the server to '0.0.0.0' to allow external traffic.
+    2. Binds the target PORT on '0.0.0.0' to allow external traffic, stopping a 
+       previous instance still holding it (see `utils.ports.bind_port`).
+    3. Serves the application on the bound socket.
     4. Logs the successful startup or critical failures.
+    Once the server is running, further calls do nothing.
 
     Returns:
         None
     """
     
+    global _runner
+
+    if _runner is not None:
+        return
+
     app = web.Application()
     app.router.add_post("/webhook/{event_type}/{user_id}", handle_webhook)
     app.router.add_get("/health", handle_health)
@@ -81,12 +137,12 @@ async def start_aiohttp_server():
     await runner.setup()
     
     try:
-        # Free the port only once (using the previously modified safe function)
-        kill_process_on_port(PORT)
-        
-        # Attempt to launch the site
-        site = web.TCPSite(runner, "0.0.0.0", PORT)
+        # Bind (and free if needed) the port off the event loop, then serve on that socket
+        sock = await asyncio.to_thread(bind_port, "0.0.0.0", PORT)
+        site = web.SockSite(runner, sock)
         await site.start()
+        _runner = runner
+        start_loop_lag_monitor()
         logging.info(
             t(SYSTEM_LANGUAGE, "server.started", port=PORT)
         )
@@ -95,4 +151,44 @@ async def start_aiohttp_server():
   
         logging.critical(
             t(SYSTEM_LANGUAGE, "server.start_failed", error=e)
-        )
\ No newline at end of file
+        )
+
+
+def webhooks_in_flight() -> int:
+    return len(_in_flight)
+
+
+async def drain_webhooks(timeout: float) -> int:
+
+    """
+    Refuses new webhooks (503 with Retry-After) and waits for those being handled.
+
+    Args:
+        timeout (float): Maximum time to wait, in seconds.
+
+    Returns:
+        int: The number of webhooks still being handled after the wait.
+    """
+
+    global _closing
+
+    _closing = True
+    if _in_flight:
+        await asyncio.wait(set(_in_flight), timeout=timeout)
+    return len(_in_flight)
+
+
+async def stop_aiohttp_server():
+
+    """
+    Stops the HTTP server and releases its port.
+
+    Returns:
+        None
+    """
+
+    global _runner
+
+    if _runner is not None:
+        runner, _runner = _runner, None
+        await runner.cleanup()
@@ -12,6 +12,9 @@ def get_http_session() -> aiohttp.ClientSession:
         raise RuntimeError("HTTP session not initialized")
     return _http_session
 
+def is_http_open() -> bool:
+    return _http_session is not None and not _http_session.closed
+
 async def close_http():
     global _http_session
     if _http_session and not _http_session.closed: